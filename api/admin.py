@@ -304,12 +304,12 @@ class SessionAdmin(admin.ModelAdmin):
 @admin.register(AirtableSyncLog)
 class AirtableSyncLogAdmin(admin.ModelAdmin):
     list_display = ('sync_type', 'started_at', 'completed_at', 'status_label', 
-                   'records_processed', 'records_created', 'records_updated')
+                   'records_processed', 'records_created', 'records_updated', 'full_sweep')
     list_filter = ('sync_type', 'success', 'started_at')
     search_fields = ('sync_type', 'error_message')
     readonly_fields = ('started_at', 'completed_at', 'records_processed', 
                       'records_created', 'records_updated', 'records_skipped', 
-                      'error_message', 'success')
+                      'error_message', 'success', 'high_water_mark', 'full_sweep')
     ordering = ('-started_at',)
     
     def status_label(self, obj):
@@ -0,0 +1,195 @@
+"""Shared Airtable REST client for the sync commands.
+
+Every sync used to carry its own copy of the offset loop: a bare
+``requests.get`` per page, no connection reuse, and a hard failure on the first
+429 or 5xx. This module is the one place Airtable is paged from:
+
+* one pooled ``requests.Session`` per process (keep-alive across pages/tables);
+* a token bucket per base -- Airtable allows 5 requests/second per base and
+  answers anything faster with a 429 and a 30s penalty;
+* jittered exponential backoff on 429, 5xx and connection errors;
+* ``fetch_tables`` pages several tables concurrently in a thread pool, so a
+  multi-table run overlaps its network waits while each base still stays
+  under its own limit.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone as dt_timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+AIRTABLE_API_URL = "https://api.airtable.com/v0"
+
+REQUESTS_PER_SECOND = 5
+PAGE_SIZE = 100
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0   # seconds; doubled per attempt, then jittered
+BACKOFF_CAP = 30.0   # Airtable's own 429 penalty window
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_WORKERS = 4
+
+
+class AirtableAPIError(ValueError):
+    """An Airtable request that failed for good (non-retryable, or retries spent)."""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        super().__init__(f"Airtable API error {status_code}: {(text or '')[:200]}")
+
+
+class TokenBucket:
+    """Thread-safe token bucket: at most ``rate`` acquisitions per second, with
+    bursts up to ``capacity``. A caller that finds the bucket empty reserves the
+    next token under the lock and sleeps outside it, so waiters queue fairly."""
+
+    def __init__(self, rate, capacity=None, *, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(base_id):
+    """The process-wide rate limiter for one Airtable base."""
+    with _buckets_lock:
+        bucket = _buckets.get(base_id)
+        if bucket is None:
+            bucket = _buckets[base_id] = TokenBucket(REQUESTS_PER_SECOND)
+        return bucket
+
+
+def modified_since_formula(since):
+    """filterByFormula selecting records modified after ``since`` (aware datetime)."""
+    stamp = since.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    return f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{stamp}'))"
+
+
+def _pooled_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS * 2)
+    session.mount("https://", adapter)
+    return session
+
+
+class AirtableClient:
+    """Pages Airtable tables for one token. Prefer ``get_client`` over building
+    one directly, so commands in the same process share the connection pool."""
+
+    def __init__(self, token, *, session=None, max_retries=MAX_RETRIES,
+                 timeout=REQUEST_TIMEOUT, bucket=bucket_for, sleep=time.sleep):
+        self.token = token
+        self.session = session or _pooled_session()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._bucket = bucket
+        self._sleep = sleep
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def get_page(self, base_id, table_id, params):
+        """One GET, rate-limited and retried. Returns the decoded JSON page."""
+        url = f"{AIRTABLE_API_URL}/{base_id}/{table_id}"
+        headers = {"Authorization": f"Bearer {self.token}"}
+        attempt = 0
+        while True:
+            self._bucket(base_id).acquire()
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._sleep(self._backoff(attempt, response))
+                attempt += 1
+                continue
+            raise AirtableAPIError(response.status_code, response.text)
+
+    def iter_pages(self, base_id, table_id, *, since=None, params=None):
+        """Yield each page's record list in turn; ``since`` filters to records
+        modified after it (see api/airtable_sync.py)."""
+        query = {"pageSize": PAGE_SIZE, **(params or {})}
+        if since is not None:
+            query["filterByFormula"] = modified_since_formula(since)
+        while True:
+            data = self.get_page(base_id, table_id, query)
+            yield data.get("records", [])
+            offset = data.get("offset")
+            if not offset:
+                return
+            query["offset"] = offset
+
+    def fetch_all(self, base_id, table_id, *, since=None, params=None):
+        records = []
+        for page in self.iter_pages(base_id, table_id, since=since, params=params):
+            records.extend(page)
+        return records
+
+    def fetch_tables(self, tables, *, max_workers=MAX_WORKERS):
+        """Fetch several tables concurrently. ``tables`` maps a caller-chosen key
+        to ``(base_id, table_id)``; returns ``{key: records}``. The first failure
+        is re-raised once every fetch has finished."""
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tables)))) as pool:
+            futures = {
+                key: pool.submit(self.fetch_all, base_id, table_id)
+                for key, (base_id, table_id) in tables.items()
+            }
+        return {key: future.result() for key, future in futures.items()}
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(token):
+    """The process-wide client for ``token`` (one pooled session per token)."""
+    token = token.strip()
+    with _clients_lock:
+        client = _clients.get(token)
+        if client is None:
+            client = _clients[token] = AirtableClient(token)
+        return client
+
+
+def fetch_records(base_id, table_id, token, *, since=None, params=None):
+    """All records in a table (or those modified after ``since``) as a list."""
+    return get_client(token).fetch_all(base_id.strip(), table_id.strip(), since=since, params=params)
+
+
+def fetch_tables(token, tables, *, max_workers=MAX_WORKERS):
+    """Module-level shortcut for ``get_client(token).fetch_tables(...)``."""
+    return get_client(token).fetch_tables(tables, max_workers=max_workers)
@@ -0,0 +1,151 @@
+"""Incremental Airtable sync: per-table high-water marks on AirtableSyncLog.
+
+Each run stamps the moment its fetch started on its sync log as
+``high_water_mark``. The next run asks Airtable only for records modified since
+that mark (a ``LAST_MODIFIED_TIME()`` filterByFormula), so the nightly cron pulls
+the day's edits rather than the whole year's sessions.
+
+Two things an incremental pull cannot see are left to a periodic full sweep:
+records deleted in Airtable (they simply stop appearing), and edits that only
+touch computed/lookup fields (those don't bump LAST_MODIFIED_TIME). A run is a
+full sweep when forced, when the table has no watermark yet, or when the last
+full sweep is older than ``FULL_SWEEP_DAYS``.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AirtableSyncLog
+
+# Re-read a little before the previous watermark: covers clock skew between us
+# and Airtable, and records saved while the previous fetch was still paging.
+# Upserts are idempotent, so the overlap only costs a few re-written rows.
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+FULL_SWEEP_DAYS = 7
+
+# Prune guard for full sweeps, same shape as the assessment retire guard: a
+# sweep that would delete more than max(floor, fraction * rows) looks like a
+# short pull, so it is skipped unless explicitly allowed.
+PRUNE_FLOOR = 25
+PRUNE_FRACTION = 0.10
+
+
+@dataclass(frozen=True)
+class SyncWindow:
+    """What a sync run should fetch: everything, or records modified since ``since``."""
+    started_at: datetime
+    full: bool
+    since: datetime | None = None
+
+    def describe(self):
+        if self.full:
+            return "full sweep"
+        return f"incremental since {self.since.isoformat()}"
+
+
+def plan_sync_window(sync_type, *, force_full=False, full_sweep_days=FULL_SWEEP_DAYS, now=None):
+    """Decide this run's window from the sync_type's successful log history."""
+    now = now or timezone.now()
+    if force_full:
+        return SyncWindow(started_at=now, full=True)
+
+    marked = AirtableSyncLog.objects.filter(
+        sync_type=sync_type, success=True, high_water_mark__isnull=False,
+    ).order_by('-high_water_mark')
+    last = marked.first()
+    last_full = marked.filter(full_sweep=True).first()
+    if last is None or last_full is None:
+        return SyncWindow(started_at=now, full=True)
+    if last_full.high_water_mark < now - timedelta(days=full_sweep_days):
+        return SyncWindow(started_at=now, full=True)
+    return SyncWindow(started_at=now, full=False, since=last.high_water_mark - WATERMARK_OVERLAP)
+
+
+def stamp_window(sync_log, window):
+    """Record the window on the log; it becomes the next run's watermark once
+    the log is marked successful."""
+    sync_log.high_water_mark = window.started_at
+    sync_log.full_sweep = window.full
+
+
+def prune_unseen(queryset, seen_ids, *, key_field='source_airtable_id', allow=False,
+                 floor=PRUNE_FLOOR, fraction=PRUNE_FRACTION):
+    """Delete rows a full sweep no longer saw in Airtable.
+
+    Only call this after a full (unfiltered) pull -- after an incremental one
+    every untouched row would look deleted. Returns ``{'pruned', 'prune_skipped'}``.
+    """
+    existing = set(queryset.exclude(**{f"{key_field}__isnull": True}).values_list(key_field, flat=True))
+    stale = existing - set(seen_ids)
+    if not stale:
+        return {'pruned': 0, 'prune_skipped': 0}
+    if len(stale) > max(floor, int(fraction * len(existing))) and not allow:
+        return {'pruned': 0, 'prune_skipped': len(stale)}
+    queryset.filter(**{f"{key_field}__in": stale}).delete()
+    return {'pruned': len(stale), 'prune_skipped': 0}
+
+
+UPSERT_BATCH_SIZE = 500
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_upsert(model, pages, extract_row, update_fields, *, key_field='source_airtable_id',
+                  batch_size=UPSERT_BATCH_SIZE, seen=None, previous_field=None, previous=None):
+    """Upsert Airtable records page by page in bounded batches.
+
+    ``pages`` is any iterable of record lists (e.g. ``AirtableClient.iter_pages``),
+    so nothing larger than one batch is ever held: each batch is mapped through
+    ``extract_row`` and written with a single ``INSERT ... ON CONFLICT (key_field)
+    DO UPDATE`` (``bulk_create(update_conflicts=True)``). One small keyed lookup
+    per batch splits the counts into created/updated. Each batch commits on its
+    own; a failed run leaves earlier batches written, which the idempotent
+    upsert and the unadvanced watermark make safe to simply re-run.
+
+    ``seen`` (a set), if given, collects every upserted key for a later
+    ``prune_unseen``. ``previous`` (a set), if given, collects the
+    ``previous_field`` value each existing row held before its batch was
+    written, from the same keyed lookup. Returns ``{'processed', 'created', 'updated', 'skipped'}``.
+    """
+    stats = {'processed': 0, 'created': 0, 'updated': 0, 'skipped': 0}
+    records = (record for page in pages for record in page)
+    for batch in _batched(records, batch_size):
+        stats['processed'] += len(batch)
+        objs = {}  # keyed, so a record repeated within a batch is written once
+        for record in batch:
+            airtable_id = record.get('id')
+            if not airtable_id:
+                stats['skipped'] += 1
+                continue
+            objs[airtable_id] = model(**{key_field: airtable_id}, **extract_row(record))
+        if not objs:
+            continue
+        if seen is not None:
+            seen.update(objs)
+        with transaction.atomic():
+            matched = model.objects.filter(**{f'{key_field}__in': list(objs)})
+            if previous is None:
+                existing = matched.count()
+            else:
+                prior = list(matched.values_list(previous_field, flat=True))
+                previous.update(prior)
+                existing = len(prior)
+            model.objects.bulk_create(
+                list(objs.values()), update_conflicts=True,
+                unique_fields=[key_field], update_fields=update_fields,
+            )
+        stats['created'] += len(objs) - existing
+        stats['updated'] += existing
+    return stats
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Connects the closure-calendar receivers (cache invalidation and the
+        # deletion tombstones) in every process, not only those that import
+        # the closure views.
+        from . import closures  # noqa: F401
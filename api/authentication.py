@@ -2,168 +2,243 @@ from rest_framework import authentication, exceptions
 from django.contrib.auth import get_user_model
 import requests, jwt
 import logging
+import threading
+import time
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+CLERK_JWKS_URL = "https://fancy-walleye-25.clerk.accounts.dev/.well-known/jwks.json"
+CLERK_API_URL = "https://api.clerk.com/v1"
+
+# Clerk rotates signing keys rarely; an hour keeps the steady state free of
+# outbound calls while a rotation is still picked up promptly (an unknown kid
+# forces a refresh regardless, at most once per JWKS_MIN_REFRESH_SECONDS so a
+# stream of junk tokens can't turn into a stream of JWKS fetches).
+JWKS_TTL_SECONDS = 60 * 60
+JWKS_MIN_REFRESH_SECONDS = 60
+# How long a verified Clerk user id maps straight to its Django user without
+# asking Clerk again. Name/email edits in Clerk show up within this window.
+USER_CACHE_TTL_SECONDS = 5 * 60
+CLERK_HTTP_TIMEOUT = 10
+
+
+class JWKSCache:
+    """Process-local cache of Clerk's signing keys, keyed by ``kid``.
+
+    Keys are served from memory until the TTL lapses. A token signed with a kid
+    we haven't seen triggers an immediate refresh (key rotation), rate-limited
+    by ``min_refresh``. ``fetch`` returns the JWKS document; tests pass a stub.
+    """
+
+    def __init__(self, fetch, *, ttl=JWKS_TTL_SECONDS, min_refresh=JWKS_MIN_REFRESH_SECONDS,
+                 clock=time.monotonic):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._clock = clock
+        self._keys = {}  # kid -> public key
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        jwks = self._fetch()
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            try:
+                keys[jwk.get("kid")] = jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
+            except Exception:
+                continue
+        self._keys = keys
+        self._fetched_at = self._clock()
+
+    def get_key(self, kid):
+        """Public key for ``kid`` (or, for a token without a kid, the first
+        usable key -- the historical behaviour). None if Clerk doesn't know it."""
+        with self._lock:
+            now = self._clock()
+            age = None if self._fetched_at is None else now - self._fetched_at
+            if age is None or age >= self.ttl:
+                self._refresh()
+            elif kid is not None and kid not in self._keys and age >= self.min_refresh:
+                self._refresh()
+            if kid is None:
+                return next(iter(self._keys.values()), None)
+            return self._keys.get(kid)
+
+    def clear(self):
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = None
+
+
+class TTLCache:
+    """Tiny thread-safe dict with per-entry expiry."""
+
+    def __init__(self, ttl, *, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            value, expires = hit
+            if expires <= self._clock():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, self._clock() + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _fetch_clerk_jwks():
+    url = getattr(settings, 'CLERK_JWKS_URL', None) or CLERK_JWKS_URL
+    response = requests.get(url, timeout=CLERK_HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+jwks_cache = JWKSCache(_fetch_clerk_jwks)
+clerk_user_cache = TTLCache(USER_CACHE_TTL_SECONDS)  # clerk user id -> Django user pk
+
+
 class ClerkAuthentication(authentication.BaseAuthentication):
+    """Verifies a Clerk session JWT and maps it to a Django user by email.
+
+    Both outbound calls are cached per process: the JWKS by kid (see JWKSCache)
+    and the Clerk user lookup by verified user id (``clerk_user_cache``), so a
+    steady-state authenticated request makes no Internet round trips.
+    """
+
     def authenticate(self, request):
-        print("🔍 ClerkAuthentication.authenticate called")
-        
         auth = request.headers.get("Authorization")
-        print(f"🔍 Authorization header: {auth[:50] if auth else 'None'}...")
-        
         if not auth or not auth.startswith("Bearer "):
-            print("🔍 No valid Authorization header found")
             return None
 
         token = auth.split(" ")[1]
-        print(f"🔍 Token extracted: {token[:20]}...")
-        
+        decoded = self.verify_token(token)
+
+        # Get user ID from token
+        clerk_user_id = decoded.get("sub")
+        if not clerk_user_id:
+            raise exceptions.AuthenticationFailed("No user ID in token")
+
+        user_pk = clerk_user_cache.get(clerk_user_id)
+        if user_pk is not None:
+            user = User.objects.filter(pk=user_pk).first()
+            if user is not None:
+                return (user, None)
+
+        primary_email, first_name, last_name = self.fetch_clerk_user(clerk_user_id)
+        user = self.get_or_update_user(primary_email, first_name, last_name)
+        clerk_user_cache.set(clerk_user_id, user.pk)
+        return (user, None)
+
+    def verify_token(self, token):
         try:
-            # Get JWKS from Clerk
-            print("🔍 Fetching JWKS from Clerk...")
-            jwks_response = requests.get("https://fancy-walleye-25.clerk.accounts.dev/.well-known/jwks.json")
-            jwks = jwks_response.json()
-            print(f"🔍 JWKS fetched successfully, keys count: {len(jwks.get('keys', []))}")
-            
-            # Get the public key
-            public_key = None
-            for key in jwks["keys"]:
-                try:
-                    public_key = jwt.algorithms.RSAAlgorithm.from_jwk(key)
-                    break
-                except Exception:
-                    continue
-            
+            kid = jwt.get_unverified_header(token).get("kid")
+            public_key = jwks_cache.get_key(kid)
             if not public_key:
-                print("🔍 No valid key found in JWKS")
                 raise exceptions.AuthenticationFailed("No valid key found in JWKS")
-            
-            print("🔍 Public key extracted successfully")
-            
+
             # Decode the token (session tokens don't have audience)
-            decoded = jwt.decode(
-                token, 
-                public_key, 
+            return jwt.decode(
+                token,
+                public_key,
                 algorithms=["RS256"],
                 options={"verify_aud": False}
             )
-            print("🔍 Token decoded successfully")
-            print(f"🔍 Decoded payload keys: {list(decoded.keys())}")
-            
+        except exceptions.AuthenticationFailed:
+            raise
         except jwt.ExpiredSignatureError:
-            print("🔍 Token has expired")
             raise exceptions.AuthenticationFailed("Token has expired")
         except jwt.InvalidTokenError as e:
-            print(f"🔍 Invalid Clerk token: {e}")
             logger.error(f"Invalid Clerk token: {e}")
             raise exceptions.AuthenticationFailed("Invalid Clerk token")
         except Exception as e:
-            print(f"🔍 Error validating Clerk token: {e}")
             logger.error(f"Error validating Clerk token: {e}")
             raise exceptions.AuthenticationFailed("Token validation failed")
 
-        # Get user ID from token
-        clerk_user_id = decoded.get("sub")
-        print(f"🔍 Extracted user ID: {clerk_user_id}")
-        
-        if not clerk_user_id:
-            print("🔍 No user ID in token")
-            raise exceptions.AuthenticationFailed("No user ID in token")
+    def fetch_clerk_user(self, clerk_user_id):
+        """(primary_email lowercased, first_name, last_name) from the Clerk API."""
+        clerk_secret = getattr(settings, 'CLERK_SECRET_KEY', None)
+        if not clerk_secret:
+            raise exceptions.AuthenticationFailed("Clerk secret key not configured")
 
-        # Fetch user info from Clerk API
         try:
-            clerk_secret = getattr(settings, 'CLERK_SECRET_KEY', None)
-            print(f"🔍 Clerk secret key configured: {bool(clerk_secret)}")
-            print(f"🔍 Clerk secret key (first 10 chars): {clerk_secret[:10] if clerk_secret else 'None'}...")
-            
-            if not clerk_secret:
-                print("🔍 Clerk secret key not configured")
-                raise exceptions.AuthenticationFailed("Clerk secret key not configured")
-            
             headers = {
                 'Authorization': f'Bearer {clerk_secret}',
                 'Content-Type': 'application/json'
             }
-            
-            api_url = f'https://api.clerk.com/v1/users/{clerk_user_id}'
-            print(f"🔍 Making request to: {api_url}")
-            
-            user_response = requests.get(api_url, headers=headers)
-            print(f"🔍 Clerk API response status: {user_response.status_code}")
-            
+            user_response = requests.get(
+                f'{CLERK_API_URL}/users/{clerk_user_id}', headers=headers, timeout=CLERK_HTTP_TIMEOUT,
+            )
             if user_response.status_code != 200:
-                print(f"🔍 Clerk API error response: {user_response.text}")
+                logger.error(f"Clerk API error {user_response.status_code}: {user_response.text[:200]}")
                 raise exceptions.AuthenticationFailed(f"Failed to fetch user from Clerk: {user_response.status_code}")
-            
+
             user_data = user_response.json()
-            print(f"🔍 User data keys: {list(user_data.keys())}")
-            
-            # Extract user information
-            email_addresses = user_data.get('email_addresses', [])
-            print(f"🔍 Email addresses count: {len(email_addresses)}")
-            
-            primary_email = None
-            for email_obj in email_addresses:
-                if email_obj.get('id') == user_data.get('primary_email_address_id'):
-                    primary_email = email_obj.get('email_address')
-                    break
-            
-            if not primary_email and email_addresses:
-                primary_email = email_addresses[0].get('email_address')
-            
-            print(f"🔍 Primary email found: {primary_email}")
-            
-            if not primary_email:
-                print("🔍 No email found for user")
-                raise exceptions.AuthenticationFailed("No email found for user")
-            
-            # Normalize email to lowercase for consistent lookups
-            primary_email = primary_email.lower()
-            print(f"🔍 Normalized email: {primary_email}")
-            
-            first_name = user_data.get('first_name', '')
-            last_name = user_data.get('last_name', '')
-            print(f"🔍 User info - Name: {first_name} {last_name}, Email: {primary_email}")
-            
+        except exceptions.AuthenticationFailed:
+            raise
         except requests.RequestException as e:
-            print(f"🔍 Request exception: {e}")
             logger.error(f"Error fetching user from Clerk API: {e}")
             raise exceptions.AuthenticationFailed("Failed to fetch user information")
         except Exception as e:
-            print(f"🔍 Unexpected error in Clerk API call: {e}")
             logger.error(f"Unexpected error in Clerk API call: {e}")
             raise exceptions.AuthenticationFailed("Failed to fetch user information")
 
-        # Create or get user using case-insensitive email lookup
-        print(f"🔍 Creating/getting Django user for email: {primary_email}")
+        # Extract user information
+        email_addresses = user_data.get('email_addresses', [])
+        primary_email = None
+        for email_obj in email_addresses:
+            if email_obj.get('id') == user_data.get('primary_email_address_id'):
+                primary_email = email_obj.get('email_address')
+                break
+
+        if not primary_email and email_addresses:
+            primary_email = email_addresses[0].get('email_address')
+
+        if not primary_email:
+            raise exceptions.AuthenticationFailed("No email found for user")
+
+        # Normalize email to lowercase for consistent lookups
+        return primary_email.lower(), user_data.get('first_name', ''), user_data.get('last_name', '')
+
+    def get_or_update_user(self, primary_email, first_name, last_name):
+        """Create or get user using case-insensitive email lookup."""
         try:
-            # Use __iexact for case-insensitive lookup
             user = User.objects.filter(email__iexact=primary_email).first()
-            
+
             if user:
                 # User exists - update if needed
-                print(f"🔍 User found: {user.email}")
                 updated = False
-                
+
                 # Update email to lowercase if it's not already
                 if user.email != primary_email:
                     user.email = primary_email
                     updated = True
-                
+
                 if user.first_name != first_name:
                     user.first_name = first_name
                     updated = True
-                    
+
                 if user.last_name != last_name:
                     user.last_name = last_name
                     updated = True
-                    
+
                 if updated:
                     user.save()
-                    print("🔍 User info updated")
             else:
                 # User doesn't exist - create new one
                 user = User.objects.create(
@@ -172,12 +247,8 @@ class ClerkAuthentication(authentication.BaseAuthentication):
                     first_name=first_name,
                     last_name=last_name
                 )
-                print(f"🔍 User created: {user.email}")
-            
-            print(f"🔍 Authentication successful for user: {user.email}")
-            return (user, None)
-            
+            return user
+
         except Exception as e:
-            print(f"🔍 Error creating/updating Django user: {e}")
             logger.error(f"Error creating/updating Django user: {e}")
-            raise exceptions.AuthenticationFailed("Failed to create user")
\ No newline at end of file
+            raise exceptions.AuthenticationFailed("Failed to create user")
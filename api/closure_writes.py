@@ -0,0 +1,90 @@
+"""Set-based upserts for the closure calendar's bulk endpoints.
+
+``closures_bulk`` and ``absences_bulk`` fan a date range out over many scopes
+or youth. Each (target x weekday) used to cost an ``update_or_create``, which
+is a SELECT plus an INSERT or UPDATE. A term-long closure for every school
+was thousands of round trips inside one open transaction. The full row set is
+now built in memory and written by ``bulk_upsert``:
+
+* On Postgres this is one ``INSERT ... ON CONFLICT (<unique fields>) DO UPDATE
+  ... RETURNING (xmax = 0)`` per batch. ``xmax = 0`` is true for a freshly
+  inserted row and false for a row the conflict clause updated, so the same
+  statement reports the created/updated split.
+* Elsewhere (SQLite in tests and local dev) it is one SELECT for the keys
+  that already exist, then ``bulk_create(update_conflicts=True)``.
+
+Bulk writes send no model signals, so callers must invalidate the closure
+calendar themselves.
+"""
+from django.db import connection, transaction
+
+BATCH_SIZE = 1000
+
+
+def _key(obj, unique_fields):
+    return tuple(getattr(obj, field) for field in unique_fields)
+
+
+def _dedupe(objs, unique_fields):
+    """Last row wins per key (one INSERT cannot touch the same row twice)."""
+    return list({_key(obj, unique_fields): obj for obj in objs}.values())
+
+
+def bulk_upsert(objs, unique_fields, update_fields, batch_size=BATCH_SIZE):
+    """Insert ``objs`` (unsaved instances of one model) or, where a row with
+    the same ``unique_fields`` exists, overwrite its ``update_fields``.
+
+    ``unique_fields`` must match a unique constraint on the model. Returns
+    ``(created, updated)`` counted over the distinct keys.
+    """
+    objs = _dedupe(objs, unique_fields)
+    if not objs:
+        return 0, 0
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            inserted = []
+            for start in range(0, len(objs), batch_size):
+                inserted += _insert_on_conflict(objs[start:start + batch_size], unique_fields, update_fields)
+            created = sum(inserted)
+        else:
+            created = _upsert_fallback(objs, unique_fields, update_fields, batch_size)
+    return created, len(objs) - created
+
+
+def _insert_on_conflict(objs, unique_fields, update_fields):
+    """One INSERT ... ON CONFLICT DO UPDATE; a was-inserted flag per row."""
+    model = type(objs[0])
+    qn = connection.ops.quote_name
+    fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+    conflict_columns = [model._meta.get_field(name).column for name in unique_fields]
+    update_columns = [model._meta.get_field(name).column for name in update_fields]
+
+    params = []
+    for obj in objs:
+        params.extend(f.get_db_prep_save(f.pre_save(obj, add=True), connection) for f in fields)
+    row = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    sql = (
+        f'INSERT INTO {qn(model._meta.db_table)} ({", ".join(qn(f.column) for f in fields)}) '
+        f'VALUES {", ".join([row] * len(objs))} '
+        f'ON CONFLICT ({", ".join(qn(c) for c in conflict_columns)}) DO UPDATE SET '
+        f'{", ".join(f"{qn(c)} = EXCLUDED.{qn(c)}" for c in update_columns)} '
+        'RETURNING (xmax = 0)'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [inserted for (inserted,) in cursor.fetchall()]
+
+
+def _upsert_fallback(objs, unique_fields, update_fields, batch_size):
+    """Count the new keys with one SELECT, then bulk_create with conflicts
+    resolved as updates. Returns the number of rows created."""
+    model = type(objs[0])
+    candidates = model.objects.filter(**{
+        f'{field}__in': {getattr(obj, field) for obj in objs} for field in unique_fields
+    })
+    existing = set(candidates.values_list(*unique_fields))
+    model.objects.bulk_create(
+        objs, batch_size=batch_size,
+        update_conflicts=True, unique_fields=unique_fields, update_fields=update_fields,
+    )
+    return sum(1 for obj in objs if _key(obj, unique_fields) not in existing)
@@ -7,13 +7,25 @@ SchoolClosure has a unique ``(date, scope_key)`` constraint, at most one row
 exists per scope per day, so the most-specific matching row is unambiguous; an
 ``is_open=True`` row at a more specific scope overrides a broader closure (e.g. a
 school that works on a public holiday).
+
+Resolution runs against a ClosureCalendar: the whole closure and absence tables
+loaded once into per-scope sorted day arrays, kept per process and rebuilt only
+when a write changes them (see ``closure_calendar``). The inactive-youth list
+used to run two queries per youth; it now runs none per youth, and each
+"open days in [a, b]" answer is a NumPy mask over that range's weekdays.
 """
-from datetime import timedelta
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
 
 # The canonical-key helpers live on the models module so SchoolClosure.save()
 # can derive scope_key without importing this module (which imports models).
 from .models import (
-    SchoolClosure, StaffAbsence,
+    CalendarTombstone, SchoolClosure, StaffAbsence,
     canonical_school_type, normalize_region, build_scope_key,
 )
 
@@ -41,97 +53,185 @@ def _weekdays(start, end):
         d += timedelta(days=1)
 
 
-def _closed_dates(school, start, end):
-    """Weekday dates in [start, end] where this school's place is closed."""
-    keys = scope_keys_for_school(school)
-    rank = {k: i for i, k in enumerate(keys)}
-    winner = {}  # date -> (rank, is_open)  -- lower rank = more specific
-    rows = SchoolClosure.objects.filter(
-        date__gte=start, date__lte=end, scope_key__in=keys,
-    ).values('date', 'scope_key', 'is_open')
-    for r in rows:
-        rk = rank[r['scope_key']]
-        cur = winner.get(r['date'])
-        if cur is None or rk < cur[0]:
-            winner[r['date']] = (rk, r['is_open'])
-    return {d for d, (_, is_open) in winner.items() if not is_open}
-
-
-def _absence_dates(youth, start, end):
-    if youth is None or not youth.youth_uid:
-        return set()
-    return set(
-        StaffAbsence.objects
-        .filter(youth_uid=youth.youth_uid, date__gte=start, date__lte=end)
-        .values_list('date', flat=True)
-    )
-
-
-def is_closed(school, day):
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _weekday_ordinals(start, end):
+    """Mon-Fri dates in [start, end] as a sorted array of proleptic ordinals."""
+    if end < start:
+        return _EMPTY
+    days = np.arange(start.toordinal(), end.toordinal() + 1, dtype=np.int64)
+    return days[(days - 1) % 7 < 5]  # ordinal 1 (0001-01-01) is a Monday
+
+
+def _to_dates(ordinals):
+    return [date.fromordinal(int(o)) for o in ordinals]
+
+
+class ClosureCalendar:
+    """Every SchoolClosure and StaffAbsence, indexed for range questions.
+
+    ``scope_key -> {ordinal: is_open}`` is resolved most-specific-wins once per
+    distinct scope-key chain (schools sharing a region and type share the work)
+    into a sorted array of closed ordinals; absences are a sorted array per
+    youth_uid. Answering "open days for this school in [a, b]" is then two
+    ``np.isin`` masks over the range's weekdays -- no queries.
+    """
+
+    def __init__(self, closure_rows=(), absence_rows=(), stamp=None):
+        self.stamp = stamp
+        self._by_key = {}  # scope_key -> {ordinal: is_open}
+        for day, scope_key, is_open in closure_rows:
+            self._by_key.setdefault(scope_key, {})[day.toordinal()] = is_open
+        absent = {}
+        for youth_uid, day in absence_rows:
+            absent.setdefault(youth_uid, []).append(day.toordinal())
+        self._absent = {uid: np.unique(np.array(o, dtype=np.int64)) for uid, o in absent.items()}
+        self._resolved = {}  # tuple(scope keys) -> sorted closed ordinals
+
+    @classmethod
+    def load(cls, stamp=None):
+        return cls(
+            SchoolClosure.objects.values_list('date', 'scope_key', 'is_open'),
+            StaffAbsence.objects.exclude(youth_uid='').values_list('youth_uid', 'date'),
+            stamp=stamp,
+        )
+
+    def closed_ordinals(self, keys):
+        """Sorted ordinals closed under this most-specific-first scope-key chain."""
+        keys = tuple(keys)
+        closed = self._resolved.get(keys)
+        if closed is None:
+            decided = {}
+            for k in keys:  # most specific first: the first scope to mention a day wins
+                for o, is_open in self._by_key.get(k, {}).items():
+                    decided.setdefault(o, is_open)
+            closed = np.array(sorted(o for o, is_open in decided.items() if not is_open), dtype=np.int64)
+            self._resolved[keys] = closed
+        return closed
+
+    def absent_ordinals(self, youth_uid):
+        return self._absent.get(youth_uid, _EMPTY) if youth_uid else _EMPTY
+
+    def open_ordinals(self, keys, start, end, *, since=None, youth_uid=None):
+        """Sorted ordinals of weekdays in [max(start, since), end] that are
+        neither closed for ``keys`` nor absences of ``youth_uid``."""
+        if since is not None and since > start:
+            start = since
+        days = _weekday_ordinals(start, end)
+        closed = self.closed_ordinals(keys)
+        if closed.size:
+            days = days[~np.isin(days, closed, assume_unique=True)]
+        absent = self.absent_ordinals(youth_uid)
+        if absent.size:
+            days = days[~np.isin(days, absent, assume_unique=True)]
+        return days
+
+    def is_closed(self, keys, day):
+        closed = self.closed_ordinals(keys)
+        o = day.toordinal()
+        i = np.searchsorted(closed, o)
+        return bool(i < closed.size and closed[i] == o)
+
+
+# Process-wide calendar. Reused while neither table has changed: a local write
+# bumps ``_generation`` (signals below), and writes from other processes show up
+# in the row-count/latest-updated_at stamp checked on each ``closure_calendar()``.
+_calendar = None
+_generation = 0
+_calendar_lock = threading.Lock()
+
+
+def invalidate_closure_calendar(**kwargs):
+    """Drop the cached calendar. Wired to closure/absence saves and deletes;
+    call it after queryset ``update()``s, which send no signals."""
+    global _generation
+    with _calendar_lock:
+        _generation += 1
+
+
+for _model in (SchoolClosure, StaffAbsence):
+    post_save.connect(invalidate_closure_calendar, sender=_model, dispatch_uid=f'closure_calendar_{_model.__name__}')
+    post_delete.connect(invalidate_closure_calendar, sender=_model, dispatch_uid=f'closure_calendar_{_model.__name__}_del')
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """Leave a CalendarTombstone for a deleted closure/absence so the export
+    feed's consumers can drop it (see api/export_feeds.py)."""
+    if sender is SchoolClosure:
+        kind, scope_key = CalendarTombstone.KIND_CLOSURE, instance.scope_key
+    else:
+        kind, scope_key = CalendarTombstone.KIND_ABSENCE, f'youth:{instance.youth_uid}'
+    CalendarTombstone.objects.create(kind=kind, object_id=instance.pk, date=instance.date, scope_key=scope_key)
+
+
+for _model in (SchoolClosure, StaffAbsence):
+    post_delete.connect(record_tombstone, sender=_model, dispatch_uid=f'calendar_tombstone_{_model.__name__}')
+
+
+# A consumer whose tombstone cursor is older than this must resync in full.
+TOMBSTONE_RETENTION_DAYS = 90
+
+
+def purge_tombstones(days=TOMBSTONE_RETENTION_DAYS, now=None):
+    """Delete tombstones older than ``days``. Returns the number deleted."""
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    deleted, _ = CalendarTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+def _table_stamp(model):
+    agg = model.objects.aggregate(n=Count('id'), last=Max('updated_at'))
+    return agg['n'], agg['last']
+
+
+def closure_calendar():
+    """The current ClosureCalendar. Costs two tiny aggregate queries when warm;
+    call once per request and pass it down rather than once per youth."""
+    global _calendar
+    stamp = (_generation, _table_stamp(SchoolClosure), _table_stamp(StaffAbsence))
+    calendar = _calendar
+    if calendar is None or calendar.stamp != stamp:
+        calendar = ClosureCalendar.load(stamp)
+        with _calendar_lock:
+            if _generation == stamp[0]:
+                _calendar = calendar
+    return calendar
+
+
+def is_closed(school, day, *, calendar=None):
     """True if this school's place is closed on ``day`` (ignores weekend/absence)."""
-    return day in _closed_dates(school, day, day)
+    calendar = calendar or closure_calendar()
+    return calendar.is_closed(scope_keys_for_school(school), day)
+
+
+def _open_ordinals(school, start, end, since, youth, calendar):
+    uid = youth.youth_uid if youth is not None else None
+    return calendar.open_ordinals(scope_keys_for_school(school), start, end, since=since, youth_uid=uid)
 
 
-def open_working_days(school, start, end, *, since=None, youth=None):
+def open_working_days(school, start, end, *, since=None, youth=None, calendar=None):
     """Ordered weekday dates in [start, end] the coach is expected to work:
     Mon-Fri, minus school closures, minus days before ``since`` (e.g. the coach's
     start date), minus this ``youth``'s personal absences."""
-    closed = _closed_dates(school, start, end)
-    absent = _absence_dates(youth, start, end)
-    out = []
-    for d in _weekdays(start, end):
-        if since is not None and d < since:
-            continue
-        if d in closed or d in absent:
-            continue
-        out.append(d)
-    return out
-
-
-def working_days_count(school, start, end, *, since=None, youth=None):
-    return len(open_working_days(school, start, end, since=since, youth=youth))
-
-
-def open_working_days_bulk(coaches, start, end, since_by_id=None):
-    """``{youth_id: set(open weekday dates)}`` for many coaches, loading closures
-    and absences for the window once. Each coach is clipped to its own
-    ``start_date`` and has its own absences subtracted. ``since_by_id`` can
-    override that clip date per coach for derived programme-year windows. Pass
-    coaches with ``select_related('school')`` to avoid per-coach school queries."""
-    coaches = list(coaches)
-    weekdays = list(_weekdays(start, end))
-
-    by_key = {}  # scope_key -> {date: is_open}
-    for r in SchoolClosure.objects.filter(
-        date__gte=start, date__lte=end,
-    ).values('date', 'scope_key', 'is_open'):
-        by_key.setdefault(r['scope_key'], {})[r['date']] = r['is_open']
-
-    absences = {}  # youth_uid -> set(date)
-    uids = [c.youth_uid for c in coaches if c.youth_uid]
-    for uid, d in StaffAbsence.objects.filter(
-        youth_uid__in=uids, date__gte=start, date__lte=end,
-    ).values_list('youth_uid', 'date'):
-        absences.setdefault(uid, set()).add(d)
+    calendar = calendar or closure_calendar()
+    return _to_dates(_open_ordinals(school, start, end, since, youth, calendar))
+
+
+def working_days_count(school, start, end, *, since=None, youth=None, calendar=None):
+    calendar = calendar or closure_calendar()
+    return int(_open_ordinals(school, start, end, since, youth, calendar).size)
+
 
+def open_working_days_bulk(coaches, start, end, since_by_id=None, *, calendar=None):
+    """``{youth_id: set(open weekday dates)}`` for many coaches from one calendar.
+    Each coach is clipped to its own ``start_date`` and has its own absences
+    subtracted. ``since_by_id`` can override that clip date per coach for derived
+    programme-year windows. Pass coaches with ``select_related('school')`` to
+    avoid per-coach school queries."""
+    calendar = calendar or closure_calendar()
     result = {}
     for coach in coaches:
-        keys = scope_keys_for_school(coach.school)
-        absent = absences.get(coach.youth_uid, set())
         since = since_by_id.get(coach.id, coach.start_date) if since_by_id else coach.start_date
-        open_days = set()
-        for d in weekdays:
-            if since is not None and d < since:
-                continue
-            if d in absent:
-                continue
-            closed = False
-            for k in keys:  # most specific first
-                day_map = by_key.get(k)
-                if day_map is not None and d in day_map:
-                    closed = not day_map[d]
-                    break
-            if not closed:
-                open_days.add(d)
-        result[coach.id] = open_days
+        result[coach.id] = set(_to_dates(_open_ordinals(coach.school, start, end, since, coach, calendar)))
     return result
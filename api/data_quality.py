@@ -0,0 +1,114 @@
+"""Stored offending-record lists behind the data-quality gauges.
+
+The /api/wig/data-quality gauges are full-dataset counts (one conditional
+aggregate per table, see api/wig_metrics.py). Their drill-down used to re-run
+each gauge's predicate on every click and show only the first 100 offenders.
+
+``refresh_dq_flags`` runs at sync time, after the literacy-session and youth
+syncs and after FK resolution. For each measure it stores the ids of every
+offending record, in display order, as DataQualityFlag rows numbered by
+``position``. The drill-down pages through that list. Both ``offset`` and the
+keyset ``after`` are a seek on the ``(measure, position)`` index, so the last
+page costs the same as the first. Only the page's records are then loaded.
+
+A measure with no stored flags is listed live from its source table. That
+covers a measure that was never refreshed. It also covers one that was clean
+at the last refresh, where the live list is empty or short.
+
+Every page reads one snapshot: the ids, the row count and the flagged total
+(the sum of the stored weights) all come from the last refresh, reported as
+``refreshed_at``. No source table is counted per page.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Max, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import DataQualityFlag, LiteracySession2026, Youth
+from .wig_metrics import CAPTURED_ON_TIME, FLAGGED_DUPLICATE, SITE_JOB_MISMATCH
+
+BATCH_SIZE = 2000
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+_UNIT = Value(1, output_field=IntegerField())
+_UNRESOLVED_SLOTS = (
+    Case(When(child_1__isnull=True, then=1), default=0, output_field=IntegerField())
+    + Case(When(child_2__isnull=True, then=1), default=0, output_field=IntegerField())
+)
+
+# measure -> (source model, offending-record filter, display order, weight).
+# The filters are the complements of the gauges' numerators (or, for the
+# lower-is-better gauges, the numerators themselves).
+DQ_SOURCES = {
+    'dq.duplicate_rate': (LiteracySession2026, FLAGGED_DUPLICATE, ('-session_date', '-id'), _UNIT),
+    'dq.capture_on_time': (LiteracySession2026, ~CAPTURED_ON_TIME, ('-session_date', '-id'), _UNIT),
+    'dq.child_fk_resolution': (LiteracySession2026, Q(child_1__isnull=True) | Q(child_2__isnull=True),
+                               ('-session_date', '-id'), _UNRESOLVED_SLOTS),
+    'dq.site_job_mismatch': (Youth, Q(employment_status='Active') & SITE_JOB_MISMATCH,
+                             ('full_name', 'id'), _UNIT),
+}
+
+
+def _offenders(measure):
+    """``(id, weight)`` of every record failing ``measure``, in display order."""
+    model, flagged, order, weight = DQ_SOURCES[measure]
+    return (model.objects.filter(flagged).annotate(dq_weight=weight)
+            .order_by(*order).values_list('id', 'dq_weight'))
+
+
+def refresh_dq_flags(model=None):
+    """Rewrite the stored lists of the measures read from ``model`` (default:
+    every measure). Returns ``{measure: records flagged}``."""
+    now = timezone.now()
+    result = {}
+    for measure, (source, *_rest) in DQ_SOURCES.items():
+        if model is not None and source is not model:
+            continue
+        with transaction.atomic():
+            DataQualityFlag.objects.filter(measure=measure).delete()
+            batch = []
+            written = 0
+            for position, (object_id, weight) in enumerate(_offenders(measure).iterator(chunk_size=BATCH_SIZE)):
+                batch.append(DataQualityFlag(measure=measure, position=position, object_id=object_id,
+                                             weight=weight, refreshed_at=now))
+                if len(batch) >= BATCH_SIZE:
+                    DataQualityFlag.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            DataQualityFlag.objects.bulk_create(batch)
+            result[measure] = written + len(batch)
+    return result
+
+
+def dq_page(measure, limit=PAGE_SIZE, offset=0, after=None):
+    """One page of ``measure``'s offenders.
+
+    ``after`` (a position from a previous page's ``next_after``) takes
+    precedence over ``offset``. Returns ``{'ids', 'total_rows',
+    'total_flagged', 'next_after', 'refreshed_at'}``, all as of the last
+    refresh. ``total_flagged`` sums the stored weights, so it counts the
+    gauge's units (child slots for dq.child_fk_resolution); ``next_after`` is
+    None on the last page.
+    """
+    start = after + 1 if after is not None else offset
+    flags = DataQualityFlag.objects.filter(measure=measure)
+    summary = flags.aggregate(rows=Count('id'), flagged=Sum('weight'), refreshed_at=Max('refreshed_at'))
+    if summary['rows']:
+        ids = list(flags.filter(position__gte=start).order_by('position')
+                   .values_list('object_id', flat=True)[:limit])
+        total_rows, total_flagged = summary['rows'], summary['flagged']
+        refreshed_at = summary['refreshed_at'].isoformat()
+    else:
+        offenders = list(_offenders(measure))
+        ids = [object_id for object_id, _weight in offenders[start:start + limit]]
+        total_rows = len(offenders)
+        total_flagged = sum(weight for _id, weight in offenders)
+        refreshed_at = None
+    end = start + len(ids)
+    return {
+        'ids': ids,
+        'total_rows': total_rows,
+        'total_flagged': total_flagged,
+        'next_after': end - 1 if ids and end < total_rows else None,
+        'refreshed_at': refreshed_at,
+    }
@@ -0,0 +1,99 @@
+"""Streaming, resumable NDJSON feeds for the Zazi calendar exports.
+
+The closure, absence and identity exports used to build every row as a dict
+and hand the full list to DRF's JSON renderer, so each poll held the whole
+year's calendar in memory. Their ``since`` filter was a bare timestamp: rows
+sharing the boundary ``updated_at`` came back on every poll, and a consumer
+that advanced past the boundary could miss some of them.
+
+With ``?stream=ndjson`` an export is a ``StreamingHttpResponse`` over a
+``.iterator()`` queryset, one JSON object per line. Rows come in keyset order
+``(stamp, id)``, for example ``(updated_at, id)``. The last line is a trailer,
+``{"next_cursor": ..., "has_more": ...}``. The consumer passes that cursor back
+as ``?cursor=`` to resume strictly after the last row it saw, so no row is
+skipped or repeated. ``?limit=`` bounds a page.
+
+The default JSON-list responses are unchanged. Deletions reach the consumer
+through the CalendarTombstone feed, which is keyed the same way on
+``(deleted_at, id)``. Tombstones are purged after
+``api.closures.TOMBSTONE_RETENTION_DAYS``, so a consumer that has not polled
+for longer than that has lost deletions and must re-read the exports in full.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def wants_ndjson(request):
+    return request.query_params.get('stream') == 'ndjson'
+
+
+def encode_cursor(stamp, pk):
+    """Opaque, URL-safe cursor for the keyset position ``(stamp, pk)``."""
+    raw = json.dumps([stamp.isoformat(), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """``(stamp, pk)`` from ``encode_cursor``; ValueError when malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        stamp, pk = json.loads(raw)
+        return datetime.fromisoformat(stamp), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('invalid cursor') from exc
+
+
+def parse_feed_params(request):
+    """``(cursor position or None, limit or None)`` from the query params;
+    ValueError for a malformed cursor or a non-positive limit."""
+    params = request.query_params
+    after = decode_cursor(params['cursor']) if params.get('cursor') else None
+    limit = int(params['limit']) if params.get('limit') else None
+    if limit is not None and limit < 1:
+        raise ValueError('limit must be positive')
+    return after, limit
+
+
+def _line(obj):
+    return json.dumps(obj, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+
+
+def _keyset_rows(queryset, stamp_field, after, limit):
+    queryset = queryset.order_by(stamp_field, 'id')
+    if after:
+        stamp, pk = after
+        queryset = queryset.filter(Q(**{f'{stamp_field}__gt': stamp}) | Q(**{stamp_field: stamp, 'id__gt': pk}))
+    if limit:
+        queryset = queryset[:limit + 1]
+    return queryset.iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+def ndjson_feed(queryset, stamp_field, serialize, after=None, limit=None):
+    """Stream ``serialize(obj)`` for ``queryset`` in ``(stamp_field, id)`` order
+    after the keyset position ``after``, then a trailer with the resume cursor
+    (the incoming position when no rows followed it)."""
+    def lines():
+        last = after
+        has_more = False
+        for n, obj in enumerate(_keyset_rows(queryset, stamp_field, after, limit)):
+            if limit and n == limit:
+                has_more = True
+                break
+            yield _line(serialize(obj))
+            last = (getattr(obj, stamp_field), obj.pk)
+        yield _line({'next_cursor': encode_cursor(*last) if last else None, 'has_more': has_more})
+
+    return StreamingHttpResponse(lines(), content_type=NDJSON_CONTENT_TYPE)
+
+
+def ndjson_stream(rows):
+    """Stream an iterable of dicts as NDJSON, with no cursor."""
+    return StreamingHttpResponse((_line(row) for row in rows), content_type=NDJSON_CONTENT_TYPE)
@@ -4,6 +4,7 @@ import csv
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from api.models import WELA_assessments
+from api.response_cache import ASSESSMENTS, bump_generation
 
 class Command(BaseCommand):
     help = 'Import student assessment data from CSV file'
@@ -156,6 +157,10 @@ class Command(BaseCommand):
                 if dry_run:
                     transaction.set_rollback(True)
         
+        if not dry_run:
+            # The assessment dashboard's cached figures are now stale
+            bump_generation(ASSESSMENTS)
+        
         # Summary
         self.stdout.write(self.style.SUCCESS(
             f"Import complete! "
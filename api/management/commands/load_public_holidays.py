@@ -15,6 +15,7 @@ import holidays
 from django.core.management.base import BaseCommand
 
 from api.models import SchoolClosure
+from api.response_cache import EDITS, bump_generation
 
 
 class Command(BaseCommand):
@@ -44,6 +45,7 @@ class Command(BaseCommand):
                 obj.reason = name
                 obj.save(update_fields=['reason'])
                 updated += 1
+        bump_generation(EDITS)
         self.stdout.write(self.style.SUCCESS(
             f"{year}: {created} created, {updated} updated "
             f"({len(za)} ZA public holidays total)"
@@ -0,0 +1,23 @@
+"""Delete closure/absence tombstones past the retention window.
+
+Every closure or absence delete leaves a CalendarTombstone for the Zazi
+backend's incremental sync. Without a purge the table and the
+/api/closures/tombstones/ feed grow forever. Runs nightly (api/nightly_etl.py).
+A consumer whose cursor is older than the window has missed deletions and
+must resync the closure and absence exports in full.
+"""
+from django.core.management.base import BaseCommand
+
+from api.closures import TOMBSTONE_RETENTION_DAYS, purge_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete calendar tombstones older than the retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=TOMBSTONE_RETENTION_DAYS,
+                            help=f'Keep tombstones this many days (default: {TOMBSTONE_RETENTION_DAYS})')
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} tombstones older than {options['days']} days"))
@@ -0,0 +1,31 @@
+"""Rebuild the SessionDayFact rollup from the raw 2026 session tables.
+
+The session syncs keep the rollup current on their own; run this after loading
+sessions by any other route (fixtures, a restore, manual SQL) or to repair drift.
+``--check`` only compares every date's raw count with the facts and reports
+the dates that differ.
+"""
+from django.core.management.base import BaseCommand
+
+from api.session_facts import SESSION_MODELS, drifted_dates, rebuild_session_facts
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily youth-session rollup (session_day_facts) from the raw session tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--programme', choices=sorted(SESSION_MODELS),
+                            help='Rebuild only this programme (default: both)')
+        parser.add_argument('--check', action='store_true',
+                            help='Report dates whose facts no longer match the raw tables; rebuild nothing')
+
+    def handle(self, *args, **options):
+        programmes = [options['programme']] if options['programme'] else None
+        if options['check']:
+            for programme in programmes or SESSION_MODELS:
+                drifted = sorted(drifted_dates(programme), key=lambda d: (d is None, d))
+                listed = ', '.join(str(d) for d in drifted[:10]) + (' ...' if len(drifted) > 10 else '')
+                self.stdout.write(f"{programme}: {len(drifted)} drifted dates" + (f" ({listed})" if drifted else ''))
+            return
+        for programme, written in rebuild_session_facts(programmes).items():
+            self.stdout.write(self.style.SUCCESS(f"{programme}: {written} fact rows"))
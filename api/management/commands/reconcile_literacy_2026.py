@@ -2,14 +2,12 @@ import os
 import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
 from dotenv import load_dotenv
+from api.airtable_client import fetch_tables
 from api.literacy_2026_grades import SKILLS
 # Reuse the export's winner POLICY (pick_winner) + the sync's generic value coercers (_dt/_clean_status),
 # but NOT the sync's field mapping — the Airtable->fields mapping is re-derived here independently (R3-2/R4).
 from api.management.commands.export_literacy_2026_parquet import DEFAULT_OUT, pick_winner
-from api.management.commands.sync_airtable_literacy_assessments_2026 import (
-    Command as AssessSync, _dt, _clean_status,
-)
-from api.management.commands.sync_airtable_on_the_programme_2026 import Command as RosterSync
+from api.management.commands.sync_airtable_literacy_assessments_2026 import _dt, _clean_status
 
 REQUIRED_COLUMNS = (
     ["child_uid", "Full Name", "Mcode", "Surname", "Name", "Gender",
@@ -141,8 +139,9 @@ class Command(BaseCommand):
         r_table = os.getenv("AIRTABLE_ON_THE_PROGRAMME_2026_TABLE_ID")
         if not all([token, a_base, a_table, r_base, r_table]):
             raise CommandError("Missing Airtable env vars for reconciliation.")
-        a_records = AssessSync().fetch_from_airtable(a_base, a_table, token)
-        r_records = RosterSync().fetch_from_airtable(r_base, r_table, token)
+        # Both tables are paged concurrently through the shared client.
+        fetched = fetch_tables(token, {"assess": (a_base, a_table), "roster": (r_base, r_table)})
+        a_records, r_records = fetched["assess"], fetched["roster"]
         stats = airtable_aggregates(a_records, r_records)
         result = compare(stats, df, min_roster=EXPECTED_ROSTER_MIN, min_jun=EXPECTED_JUN_MIN)
         for c in result["checks"]:
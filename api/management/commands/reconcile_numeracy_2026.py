@@ -4,9 +4,8 @@ import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
 from dotenv import load_dotenv
 
+from api.airtable_client import fetch_tables
 from api.management.commands.export_numeracy_2026_parquet import DEFAULT_OUT, REQUIRED_COLUMNS
-from api.management.commands.sync_airtable_numeracy_assessments_2026 import Command as AssessmentSync
-from api.management.commands.sync_airtable_numeracy_on_programme_2026 import Command as RosterSync
 from api.models import CanonicalChild, NumeracyAssessment2026, NumeracyOnTheProgramme2026
 from api.numeracy_2026 import COMPONENTS, evaluate_quality, parse_numeric, uid_value
 
@@ -202,12 +201,12 @@ class Command(BaseCommand):
         roster_table = os.getenv("AIRTABLE_NUMERACY_ON_THE_PROGRAMME_2026_TABLE_ID")
         if not all((token, assessment_base, assessment_table, roster_base, roster_table)):
             raise CommandError("Missing Airtable configuration for numeracy reconciliation")
-        raw_assessments = AssessmentSync().fetch_from_airtable(
-            assessment_base.strip(), assessment_table.strip(), token.strip()
-        )
-        raw_roster = RosterSync().fetch_from_airtable(
-            roster_base.strip(), roster_table.strip(), token.strip()
-        )
+        # Both tables are paged concurrently through the shared client.
+        fetched = fetch_tables(token, {
+            "assessments": (assessment_base.strip(), assessment_table.strip()),
+            "roster": (roster_base.strip(), roster_table.strip()),
+        })
+        raw_assessments, raw_roster = fetched["assessments"], fetched["roster"]
         source_rows = [_raw_assessment(record) for record in raw_assessments]
         source_roster_uids = {
             uid_value(record.get("fields", {}).get("Child UID")) for record in raw_roster
@@ -0,0 +1,28 @@
+"""Precompute the WIG board (lead measures + every ring's detail) per week.
+
+/api/wig/lead-measures/ and /api/wig/detail/ serve these snapshots and only
+compute live for a week that was never stored. Run this on a schedule after the
+nightly syncs (e.g. daily) so the current week picks up the new data; each run
+recomputes the whole horizon because late captures still land in recent weeks.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.wig_metrics import VALID_WIG_PERIODS
+from api.wig_snapshots import DEFAULT_WEEKS, refresh_wig_snapshots
+
+
+class Command(BaseCommand):
+    help = "Store the WIG lead-measure and detail payloads for the last N completed weeks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=DEFAULT_WEEKS,
+                            help=f'Completed weeks to refresh, newest first (default: {DEFAULT_WEEKS})')
+        parser.add_argument('--period', choices=sorted(VALID_WIG_PERIODS),
+                            help='Refresh only this period (default: all)')
+
+    def handle(self, *args, **options):
+        periods = [options['period']] if options['period'] else None
+        result = refresh_wig_snapshots(timezone.now(), weeks=options['weeks'], periods=periods)
+        for week_ending, written in result.items():
+            self.stdout.write(self.style.SUCCESS(f"Week ending {week_ending}: {written} snapshots"))
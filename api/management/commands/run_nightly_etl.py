@@ -0,0 +1,57 @@
+"""Run the nightly syncs and refreshes as one dependency graph.
+
+Replaces running each command by hand (scripts/prod_manage.sh) one after the
+other: independent branches run concurrently in a process pool, a failure
+skips only the steps that depend on it, and the run is recorded as a
+``nightly_etl`` AirtableSyncLog with every step's timing. See api/nightly_etl.py
+for the graph.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from api.nightly_etl import (
+    DEFAULT_WORKERS, FAILED, NIGHTLY_STEPS, OK, SKIPPED, run_nightly_etl, select_steps,
+)
+
+
+class Command(BaseCommand):
+    help = "Run the nightly ETL steps as a dependency graph, in parallel where possible."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                            help=f'Worker processes (default: {DEFAULT_WORKERS}; 1 runs every step in this process)')
+        parser.add_argument('--only', nargs='+', metavar='STEP',
+                            help='Run only these steps and what they depend on')
+        parser.add_argument('--skip', nargs='+', metavar='STEP', default=(),
+                            help='Leave these steps out (their dependents still run)')
+        parser.add_argument('--list', action='store_true', help='Print the graph and exit')
+
+    def handle(self, *args, **options):
+        try:
+            steps = select_steps(NIGHTLY_STEPS, only=options['only'], skip=options['skip'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['list']:
+            for step in steps:
+                after = f"  <- {', '.join(step.depends)}" if step.depends else ''
+                self.stdout.write(f"{step.name}: {step.command}{after}")
+            return
+
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        log = run_nightly_etl(steps, workers=options['workers'], on_result=self._report)
+        counts = log.details['counts']
+        summary = (f"Nightly ETL finished in {log.details['seconds']}s: {counts[OK]} ok, "
+                   f"{counts[FAILED]} failed, {counts[SKIPPED]} skipped (log ID: {log.id})")
+        if counts[FAILED]:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _report(self, name, result):
+        if result['status'] == OK:
+            self.stdout.write(self.style.SUCCESS(f"  {name}: ok in {result['seconds']}s"))
+        elif result['status'] == SKIPPED:
+            self.stdout.write(self.style.WARNING(f"  {name}: skipped (blocked by {', '.join(result['blocked_by'])})"))
+        else:
+            self.stdout.write(self.style.ERROR(f"  {name}: FAILED -- {result['error']}"))
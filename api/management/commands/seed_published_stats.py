@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from api.models import PublishedStat
+from api.response_cache import EDITS, bump_generation
 
 
 P = "PROVISIONAL - verify before launch. "
@@ -128,5 +129,6 @@ class Command(BaseCommand):
             _, was_created = PublishedStat.objects.update_or_create(key=row["key"], defaults=row)
             created += was_created
             updated += not was_created
+        bump_generation(EDITS)
 
         self.stdout.write(self.style.SUCCESS(f"Seeded published stats: {created} created, {updated} updated"))
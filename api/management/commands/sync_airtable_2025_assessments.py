@@ -1,13 +1,12 @@
 import os
 import json
-import time
-import requests
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
+from api.airtable_client import get_client
 from api.models import Assessment2025, AirtableSyncLog
 
 
@@ -145,58 +144,17 @@ class Command(BaseCommand):
         if not table_id:
             raise ValueError('AIRTABLE_2025_ASSESSMENTS_TABLE_ID not found in environment variables')
         
-        # Construct the API URL
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        
-        # Set up headers with API key
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Initialize empty list for all records
+        client = get_client(api_key)
         all_records = []
-        
-        # Airtable returns records in pages, so handle pagination
-        params = {"pageSize": 100}  # Maximum page size
-        
-        # Keep track of progress
         record_count = 0
         page_count = 0
-        
-        while True:
-            # Make the API request
-            self.stdout.write(f"Fetching page {page_count + 1}...")
-            response = requests.get(url, headers=headers, params=params)
-            
-            # Check if the request was successful
-            if response.status_code != 200:
-                raise ValueError(f"Error fetching data from Airtable: {response.status_code} - {response.text}")
-            
-            # Parse response as JSON
-            data = response.json()
-            
-            # Get records from this page
-            page_records = data.get('records', [])
+
+        # Paged through the shared client (pooled session, rate limit, retries)
+        for page_records in client.iter_pages(base_id, table_id):
+            page_count += 1
             record_count += len(page_records)
-            
-            # Add records to our list
             all_records.extend(page_records)
-            
-            # Update progress
-            page_count += 1
             self.stdout.write(f"Fetched {len(page_records)} records from page {page_count}")
-            
-            # Check if there are more records
-            offset = data.get('offset')
-            if not offset:
-                break
-            
-            # Update params with offset for next page
-            params['offset'] = offset
-            
-            # Add a slight delay to avoid hitting rate limits
-            time.sleep(0.2)
         
         self.stdout.write(f"Fetched a total of {record_count} records from {page_count} pages\n")
         return all_records
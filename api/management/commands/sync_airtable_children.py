@@ -1,9 +1,10 @@
 import os
-import requests
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 from dotenv import load_dotenv
+from api.airtable_client import fetch_records
 from api.models import CanonicalChild, AirtableSyncLog
 
 
@@ -132,8 +133,13 @@ class Command(BaseCommand):
         update_fields = [
             'child_uid', 'mcode', 'participant_id', 'first_name', 'surname', 'full_name',
             'gender', 'identity_confidence', 'years_active', 'programme',
-            'school_2025', 'grade_2025', 'created_in_airtable',
+            'school_2025', 'grade_2025', 'created_in_airtable', 'updated_at',
         ]
+        # bulk_update skips auto_now, so stamp the rows by hand: uid_map's incremental
+        # refresh only re-reads rows whose stamp moved.
+        now = timezone.now()
+        for obj in update_objs:
+            obj.updated_at = now
 
         with transaction.atomic():
             if new_objs:
@@ -196,17 +202,4 @@ class Command(BaseCommand):
         )
 
     def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        all_records = []
-
-        while url:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Airtable API error {response.status_code}: {response.text[:200]}")
-            data = response.json()
-            all_records.extend(data.get('records', []))
-            offset = data.get('offset')
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-
-        return all_records
+        return fetch_records(base_id, table_id, token)
@@ -1,15 +1,15 @@
 import os
 import re
-import time
-import requests
 from collections import Counter
 from datetime import datetime, timezone as dt_timezone
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 from dotenv import load_dotenv
-from api.models import LiteracyAssessment2026, CanonicalChild, AirtableSyncLog
+from api.airtable_client import fetch_records
+from api.models import LiteracyAssessment2026, AirtableSyncLog
 from api.literacy_2026_grades import grade_is_fallback
+from api.uid_resolver import uid_map
 
 SKILL_FIELDS = {
     "Letter Sounds": "letter_sounds", "Story Comprehension": "story_comprehension",
@@ -91,8 +91,7 @@ class Command(BaseCommand):
         try:
             records = self.fetch_from_airtable(base_id, table_id, token)
             self.stdout.write(self.style.SUCCESS(f"Fetched {len(records)} records"))
-            child_map = {row["child_uid"]: row["id"]
-                         for row in CanonicalChild.objects.values("id", "child_uid")}
+            child_map = uid_map("child")
             report = self.qa_report(records, child_map)
             self._print_report(report)
             if options["verbose"]:
@@ -232,17 +231,4 @@ class Command(BaseCommand):
                 "orphans": orphans}
 
     def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        records = []
-        while url:
-            resp = requests.get(url, headers=headers)
-            if resp.status_code != 200:
-                raise ValueError(f"Airtable API error {resp.status_code}: {resp.text[:200]}")
-            data = resp.json()
-            records.extend(data.get("records", []))
-            offset = data.get("offset")
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-            if offset:
-                time.sleep(0.2)
-        return records
+        return fetch_records(base_id, table_id, token)
@@ -1,9 +1,9 @@
 import os
-import requests
 from django.core.management.base import BaseCommand
 from django.utils.dateparse import parse_date
 from django.db import transaction
 from dotenv import load_dotenv
+from api.airtable_client import fetch_records
 from api.models import LiteracySession, AirtableSyncLog
 
 
@@ -182,17 +182,4 @@ class Command(BaseCommand):
         )
 
     def fetch_from_airtable(self, base_id, table_name, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_name}"
-        headers = {"Authorization": f"Bearer {token}"}
-        all_records = []
-
-        while url:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Airtable API error {response.status_code}: {response.text[:200]}")
-            data = response.json()
-            all_records.extend(data.get('records', []))
-            offset = data.get('offset')
-            url = f"https://api.airtable.com/v0/{base_id}/{table_name}?offset={offset}" if offset else None
-
-        return all_records
+        return fetch_records(base_id, table_name, token)
@@ -1,11 +1,26 @@
 import os
-import requests
+from itertools import chain
 from datetime import datetime, timezone
 from django.core.management.base import BaseCommand
 from django.utils.dateparse import parse_date
-from django.db import transaction
 from dotenv import load_dotenv
-from api.models import LiteracySession2026, AirtableSyncLog, Youth, School, CanonicalChild
+from api.airtable_client import get_client
+from api.airtable_sync import plan_sync_window, prune_unseen, stamp_window, stream_upsert
+from api.data_quality import refresh_dq_flags
+from api.session_facts import sync_session_facts
+from api.models import LiteracySession2026, AirtableSyncLog
+from api.uid_resolver import uid_map
+
+
+UPDATE_FIELDS = [
+    'session_record', 'session_uid', 'session_date',
+    'youth_uid', 'school_uid', 'child_uid_1', 'child_uid_2', 'child_names',
+    'youth_id', 'school_id', 'child_1_id', 'child_2_id',
+    'sounds_covered', 'sounds_covered_clean', 'blending_level',
+    'duplicate_status', 'overall_session_status',
+    'capture_delay', 'capture_delay_flag', 'duplicate_fingerprint',
+    'created_in_airtable', 'updated_at',
+]
 
 
 class Command(BaseCommand):
@@ -19,7 +34,11 @@ class Command(BaseCommand):
     Each session involves exactly 2 children (child_uid_1, child_uid_2).
 
     Upsert key: source_airtable_id (unique Airtable record ID).
-    Uses bulk operations for performance.
+    Streams page by page into batched INSERT ... ON CONFLICT upserts.
+
+    Incremental by default: only records modified since the last successful
+    run's watermark are fetched (see api/airtable_sync.py). A weekly full sweep,
+    or --full, pulls the whole table and prunes rows deleted in Airtable.
 
     Required env vars:
       AIRTABLE_LITERACY_2026_BASE_ID   = apppvs3MhpQvVNnDT
@@ -30,6 +49,10 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--dry-run', action='store_true', help='Preview without saving')
+        parser.add_argument('--full', action='store_true',
+                            help='Ignore the watermark: pull the whole table and prune deleted records')
+        parser.add_argument('--allow-prune', action='store_true',
+                            help='Prune even if the prune guard trips (use after verifying a full pull)')
         parser.add_argument('--verbose', action='store_true', help='Show first few records fetched')
 
     def handle(self, *args, **options):
@@ -51,51 +74,76 @@ class Command(BaseCommand):
         if is_dry_run:
             self.stdout.write(self.style.WARNING("=== DRY RUN MODE — no changes will be saved ===\n"))
 
-        # Build FK lookup dicts for resolving UIDs to canonical records
-        self.youth_by_uid = {y.youth_uid: y for y in Youth.objects.filter(youth_uid__isnull=False)}
-        self.school_by_uid = {s.school_uid: s for s in School.objects.filter(school_uid__isnull=False)}
-        self.child_by_uid = {c.child_uid: c for c in CanonicalChild.objects.all()}
+        # UID -> id lookups for resolving FKs to canonical records
+        self.youth_by_uid = uid_map('youth')
+        self.school_by_uid = uid_map('school')
+        self.child_by_uid = uid_map('child')
         self.stdout.write(f"FK lookups: youth={len(self.youth_by_uid)}, school={len(self.school_by_uid)}, child={len(self.child_by_uid)}")
 
+        window = plan_sync_window('literacy_sessions_2026', force_full=options['full'])
+        self.stdout.write(f"Sync window: {window.describe()}")
+
         sync_log = None
         if not is_dry_run:
             sync_log = AirtableSyncLog.objects.create(sync_type='literacy_sessions_2026')
             self.stdout.write(f"Sync log started (ID: {sync_log.id})")
 
         try:
-            all_records = self.fetch_from_airtable(base_id, table_id, token)
-            self.stdout.write(self.style.SUCCESS(f"Fetched {len(all_records)} records from Airtable"))
+            # Streamed: one page is fetched, mapped and upserted at a time, so
+            # memory stays flat however large the table grows.
+            pages = self.fetch_pages(base_id, table_id, token, since=window.since)
 
             if options['verbose']:
-                for r in all_records[:3]:
+                first_page = next(pages, [])
+                pages = chain([first_page], pages)
+                for r in first_page[:3]:
                     self.stdout.write(f"  Sample: {r['fields'].get('Session UID')} | "
                                       f"{r['fields'].get('Session Date')} | "
                                       f"youth={r['fields'].get('Youth UID')} | "
                                       f"school={r['fields'].get('School UID')} | "
                                       f"children={r['fields'].get('Child UID')}")
 
-            db_count = LiteracySession2026.objects.count()
-
             if is_dry_run:
-                self.stdout.write(f"DRY RUN: would process {len(all_records)} records")
-                self.stdout.write(f"Current row count in DB: {db_count}")
+                fetched = sum(len(page) for page in pages)
+                self.stdout.write(f"DRY RUN: would process {fetched} records")
+                self.stdout.write(f"Current row count in DB: {LiteracySession2026.objects.count()}")
                 return
 
-            stats = self.bulk_upsert(all_records)
+            seen = set() if window.full else None
+            previous_dates = set()
+            stats = self.stream_upsert(pages, seen=seen, previous_dates=previous_dates)
+            self.stdout.write(self.style.SUCCESS(f"Fetched {stats['processed']} records from Airtable"))
+
+            prune = {'pruned': 0, 'prune_skipped': 0}
+            if window.full:
+                prune = prune_unseen(LiteracySession2026.objects.all(), seen, allow=options['allow_prune'])
+                if prune['prune_skipped']:
+                    self.stdout.write(self.style.WARNING(
+                        f"PRUNE GUARD: skipped deleting {prune['prune_skipped']} rows — the pull looked short. "
+                        f"Verify it was complete, then re-run with --full --allow-prune."))
+
+            refreshed = sync_session_facts('literacy', window, previous_dates)
+            self.stdout.write("Session facts: " + (
+                "rebuilt" if refreshed is None else f"refreshed {refreshed} dates"))
+            flagged = refresh_dq_flags(LiteracySession2026)
+            self.stdout.write("Data-quality flags: " + ", ".join(f"{m}={n}" for m, n in flagged.items()))
 
             if sync_log:
-                sync_log.records_processed = len(all_records)
+                sync_log.records_processed = stats['processed']
                 sync_log.records_created = stats['created']
                 sync_log.records_updated = stats['updated']
                 sync_log.records_skipped = stats['skipped']
+                sync_log.details = {'window': window.describe(), **prune}
+                stamp_window(sync_log, window)
                 sync_log.mark_complete(success=True)
 
             self.stdout.write(self.style.SUCCESS(
                 f"\nSync complete — "
-                f"Airtable records: {len(all_records)}, "
+                f"Airtable records: {stats['processed']}, "
                 f"created: {stats['created']}, "
                 f"updated: {stats['updated']}, "
-                f"skipped: {stats['skipped']}"
+                f"skipped: {stats['skipped']}, "
+                f"pruned: {prune['pruned']}"
             ))
 
         except Exception as e:
@@ -107,51 +155,15 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"Sync failed: {e}"))
             raise
 
+    def stream_upsert(self, pages, seen=None, previous_dates=None):
+        """Upsert pages of Airtable records in bounded batches via
+        INSERT ... ON CONFLICT (source_airtable_id) DO UPDATE."""
+        return stream_upsert(LiteracySession2026, pages, self.extract_row, UPDATE_FIELDS, seen=seen,
+                             previous_field='session_date', previous=previous_dates)
+
     def bulk_upsert(self, all_records):
-        """
-        Fetch existing source_airtable_ids in one query.
-        Split into new (bulk_create) and existing (bulk_update).
-        """
-        existing = {
-            row['source_airtable_id']: row['id']
-            for row in LiteracySession2026.objects.values('id', 'source_airtable_id')
-        }
-
-        new_objs = []
-        update_objs = []
-        skipped = 0
-
-        for record in all_records:
-            airtable_id = record.get('id')
-            if not airtable_id:
-                skipped += 1
-                continue
-
-            row_data = self.extract_row(record)
-
-            if airtable_id in existing:
-                obj = LiteracySession2026(id=existing[airtable_id], source_airtable_id=airtable_id, **row_data)
-                update_objs.append(obj)
-            else:
-                new_objs.append(LiteracySession2026(source_airtable_id=airtable_id, **row_data))
-
-        update_fields = [
-            'session_record', 'session_uid', 'session_date',
-            'youth_uid', 'school_uid', 'child_uid_1', 'child_uid_2', 'child_names',
-            'youth_id', 'school_id', 'child_1_id', 'child_2_id',
-            'sounds_covered', 'sounds_covered_clean', 'blending_level',
-            'duplicate_status', 'overall_session_status',
-            'capture_delay', 'capture_delay_flag', 'duplicate_fingerprint',
-            'created_in_airtable',
-        ]
-
-        with transaction.atomic():
-            if new_objs:
-                LiteracySession2026.objects.bulk_create(new_objs, batch_size=500)
-            if update_objs:
-                LiteracySession2026.objects.bulk_update(update_objs, update_fields, batch_size=500)
-
-        return {'created': len(new_objs), 'updated': len(update_objs), 'skipped': skipped}
+        """Upsert an already-fetched list of records."""
+        return self.stream_upsert([all_records])
 
     def extract_row(self, record):
         """Extract fields from one Airtable record into a LiteracySession2026 dict."""
@@ -194,10 +206,10 @@ class Command(BaseCommand):
             school_uid=school_uid_val,
             child_uid_1=child_uid_1,
             child_uid_2=child_uid_2,
-            youth=self.youth_by_uid.get(youth_uid_val),
-            school=self.school_by_uid.get(school_uid_val),
-            child_1=self.child_by_uid.get(child_uid_1),
-            child_2=self.child_by_uid.get(child_uid_2),
+            youth_id=self.youth_by_uid.get(youth_uid_val),
+            school_id=self.school_by_uid.get(school_uid_val),
+            child_1_id=self.child_by_uid.get(child_uid_1),
+            child_2_id=self.child_by_uid.get(child_uid_2),
             child_names=fields.get('Unique Child Selected List'),
             sounds_covered=fields.get('Sounds Covered'),
             sounds_covered_clean=fields.get('Sounds Covered (Clean)'),
@@ -210,18 +222,5 @@ class Command(BaseCommand):
             created_in_airtable=created_dt,
         )
 
-    def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        all_records = []
-
-        while url:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Airtable API error {response.status_code}: {response.text[:200]}")
-            data = response.json()
-            all_records.extend(data.get('records', []))
-            offset = data.get('offset')
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-
-        return all_records
+    def fetch_pages(self, base_id, table_id, token, since=None):
+        return get_client(token).iter_pages(base_id, table_id, since=since)
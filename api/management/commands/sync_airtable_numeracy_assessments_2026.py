@@ -1,14 +1,13 @@
 import os
-import time
 from collections import Counter, defaultdict
 
-import requests
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 from dotenv import load_dotenv
 
-from api.models import AirtableSyncLog, CanonicalChild, NumeracyAssessment2026
+from api.airtable_client import fetch_records
+from api.models import AirtableSyncLog, NumeracyAssessment2026
 from api.numeracy_2026 import (
     COMPONENTS,
     evaluate_quality,
@@ -19,6 +18,7 @@ from api.numeracy_2026 import (
     score_tuple,
     uid_value,
 )
+from api.uid_resolver import uid_map
 
 
 RETIRE_FLOOR = 25
@@ -63,7 +63,7 @@ class Command(BaseCommand):
         log = None if dry_run else AirtableSyncLog.objects.create(sync_type="numeracy_assessments_2026")
         try:
             records = self.fetch_from_airtable(base_id.strip(), table_id.strip(), token.strip())
-            child_map = dict(CanonicalChild.objects.values_list("child_uid", "id"))
+            child_map = uid_map("child")
             report = self.qa_report(records, child_map)
             self._print_report(report)
             if options["verbose"]:
@@ -264,20 +264,4 @@ class Command(BaseCommand):
         }
 
     def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        params = {"pageSize": 100}
-        records = []
-        while True:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            if response.status_code != 200:
-                raise CommandError(
-                    f"Airtable API error {response.status_code}: {response.text[:200]}"
-                )
-            payload = response.json()
-            records.extend(payload.get("records", []))
-            offset = payload.get("offset")
-            if not offset:
-                return records
-            params["offset"] = offset
-            time.sleep(0.2)
+        return fetch_records(base_id, table_id, token)
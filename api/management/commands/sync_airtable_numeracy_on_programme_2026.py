@@ -1,13 +1,12 @@
 import os
-import time
 from collections import Counter
 
-import requests
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 from dotenv import load_dotenv
 
+from api.airtable_client import fetch_records
 from api.management.commands.sync_airtable_numeracy_assessments_2026 import (
     RETIRE_FLOOR,
     RETIRE_FRACTION,
@@ -216,20 +215,4 @@ class Command(BaseCommand):
         }
 
     def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        params = {"pageSize": 100}
-        records = []
-        while True:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            if response.status_code != 200:
-                raise CommandError(
-                    f"Airtable API error {response.status_code}: {response.text[:200]}"
-                )
-            payload = response.json()
-            records.extend(payload.get("records", []))
-            offset = payload.get("offset")
-            if not offset:
-                return records
-            params["offset"] = offset
-            time.sleep(0.2)
+        return fetch_records(base_id, table_id, token)
@@ -1,10 +1,24 @@
 import os
-import requests
+from itertools import chain
 from django.core.management.base import BaseCommand
 from django.utils.dateparse import parse_date
-from django.db import transaction
 from dotenv import load_dotenv
-from api.models import NumeracySession2026, AirtableSyncLog, Youth, School
+from api.airtable_client import get_client
+from api.airtable_sync import plan_sync_window, prune_unseen, stamp_window, stream_upsert
+from api.session_facts import sync_session_facts
+from api.models import NumeracySession2026, AirtableSyncLog
+from api.uid_resolver import uid_map
+
+
+UPDATE_FIELDS = [
+    'session_record', 'session_uid', 'session_date',
+    'youth_uid', 'school_uid', 'child_uids', 'children_count',
+    'youth_id', 'school_id',
+    'group_count_level', 'group_number_recognition',
+    'duplicate_status', 'overall_session_status',
+    'capture_delay', 'capture_delay_flag', 'duplicate_fingerprint',
+    'created_in_airtable', 'updated_at',
+]
 
 
 class Command(BaseCommand):
@@ -18,7 +32,11 @@ class Command(BaseCommand):
     - Grain: one Airtable record = one Postgres row
 
     Upsert key: source_airtable_id (unique Airtable record ID).
-    Uses bulk operations for performance.
+    Streams page by page into batched INSERT ... ON CONFLICT upserts.
+
+    Incremental by default: only records modified since the last successful
+    run's watermark are fetched (see api/airtable_sync.py). A weekly full sweep,
+    or --full, pulls the whole table and prunes rows deleted in Airtable.
 
     Required env vars:
       AIRTABLE_NUMERACY_2026_BASE_ID   = appiWLloU1EVXDIxM
@@ -29,6 +47,10 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--dry-run', action='store_true', help='Preview without saving')
+        parser.add_argument('--full', action='store_true',
+                            help='Ignore the watermark: pull the whole table and prune deleted records')
+        parser.add_argument('--allow-prune', action='store_true',
+                            help='Prune even if the prune guard trips (use after verifying a full pull)')
         parser.add_argument('--verbose', action='store_true', help='Show sample records fetched')
 
     def handle(self, *args, **options):
@@ -51,21 +73,27 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("=== DRY RUN MODE — no changes will be saved ===\n"))
 
         # Build FK lookup dicts for resolving UIDs to canonical records
-        self.youth_by_uid = {y.youth_uid: y for y in Youth.objects.filter(youth_uid__isnull=False)}
-        self.school_by_uid = {s.school_uid: s for s in School.objects.filter(school_uid__isnull=False)}
+        self.youth_by_uid = uid_map('youth')
+        self.school_by_uid = uid_map('school')
         self.stdout.write(f"FK lookups: youth={len(self.youth_by_uid)}, school={len(self.school_by_uid)}")
 
+        window = plan_sync_window('numeracy_sessions_2026', force_full=options['full'])
+        self.stdout.write(f"Sync window: {window.describe()}")
+
         sync_log = None
         if not is_dry_run:
             sync_log = AirtableSyncLog.objects.create(sync_type='numeracy_sessions_2026')
             self.stdout.write(f"Sync log started (ID: {sync_log.id})")
 
         try:
-            all_records = self.fetch_from_airtable(base_id, table_id, token)
-            self.stdout.write(self.style.SUCCESS(f"Fetched {len(all_records)} records from Airtable"))
+            # Streamed: one page is fetched, mapped and upserted at a time, so
+            # memory stays flat however large the table grows.
+            pages = self.fetch_pages(base_id, table_id, token, since=window.since)
 
             if options['verbose']:
-                for r in all_records[:3]:
+                first_page = next(pages, [])
+                pages = chain([first_page], pages)
+                for r in first_page[:3]:
                     f = r['fields']
                     self.stdout.write(
                         f"  Sample: {f.get('Session UID')} | "
@@ -76,28 +104,45 @@ class Command(BaseCommand):
                         f"count_level={f.get('Group Current Count Level')}"
                     )
 
-            db_count = NumeracySession2026.objects.count()
-
             if is_dry_run:
-                self.stdout.write(f"DRY RUN: would process {len(all_records)} records")
-                self.stdout.write(f"Current row count in DB: {db_count}")
+                fetched = sum(len(page) for page in pages)
+                self.stdout.write(f"DRY RUN: would process {fetched} records")
+                self.stdout.write(f"Current row count in DB: {NumeracySession2026.objects.count()}")
                 return
 
-            stats = self.bulk_upsert(all_records)
+            seen = set() if window.full else None
+            previous_dates = set()
+            stats = self.stream_upsert(pages, seen=seen, previous_dates=previous_dates)
+            self.stdout.write(self.style.SUCCESS(f"Fetched {stats['processed']} records from Airtable"))
+
+            prune = {'pruned': 0, 'prune_skipped': 0}
+            if window.full:
+                prune = prune_unseen(NumeracySession2026.objects.all(), seen, allow=options['allow_prune'])
+                if prune['prune_skipped']:
+                    self.stdout.write(self.style.WARNING(
+                        f"PRUNE GUARD: skipped deleting {prune['prune_skipped']} rows — the pull looked short. "
+                        f"Verify it was complete, then re-run with --full --allow-prune."))
+
+            refreshed = sync_session_facts('numeracy', window, previous_dates)
+            self.stdout.write("Session facts: " + (
+                "rebuilt" if refreshed is None else f"refreshed {refreshed} dates"))
 
             if sync_log:
-                sync_log.records_processed = len(all_records)
+                sync_log.records_processed = stats['processed']
                 sync_log.records_created = stats['created']
                 sync_log.records_updated = stats['updated']
                 sync_log.records_skipped = stats['skipped']
+                sync_log.details = {'window': window.describe(), **prune}
+                stamp_window(sync_log, window)
                 sync_log.mark_complete(success=True)
 
             self.stdout.write(self.style.SUCCESS(
                 f"\nSync complete — "
-                f"Airtable records: {len(all_records)}, "
+                f"Airtable records: {stats['processed']}, "
                 f"created: {stats['created']}, "
                 f"updated: {stats['updated']}, "
-                f"skipped: {stats['skipped']}"
+                f"skipped: {stats['skipped']}, "
+                f"pruned: {prune['pruned']}"
             ))
 
         except Exception as e:
@@ -109,47 +154,15 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"Sync failed: {e}"))
             raise
 
+    def stream_upsert(self, pages, seen=None, previous_dates=None):
+        """Upsert pages of Airtable records in bounded batches via
+        INSERT ... ON CONFLICT (source_airtable_id) DO UPDATE."""
+        return stream_upsert(NumeracySession2026, pages, self.extract_row, UPDATE_FIELDS, seen=seen,
+                             previous_field='session_date', previous=previous_dates)
+
     def bulk_upsert(self, all_records):
-        existing = {
-            row['source_airtable_id']: row['id']
-            for row in NumeracySession2026.objects.values('id', 'source_airtable_id')
-        }
-
-        new_objs = []
-        update_objs = []
-        skipped = 0
-
-        for record in all_records:
-            airtable_id = record.get('id')
-            if not airtable_id:
-                skipped += 1
-                continue
-
-            row_data = self.extract_row(record)
-
-            if airtable_id in existing:
-                obj = NumeracySession2026(id=existing[airtable_id], source_airtable_id=airtable_id, **row_data)
-                update_objs.append(obj)
-            else:
-                new_objs.append(NumeracySession2026(source_airtable_id=airtable_id, **row_data))
-
-        update_fields = [
-            'session_record', 'session_uid', 'session_date',
-            'youth_uid', 'school_uid', 'child_uids', 'children_count',
-            'youth_id', 'school_id',
-            'group_count_level', 'group_number_recognition',
-            'duplicate_status', 'overall_session_status',
-            'capture_delay', 'capture_delay_flag', 'duplicate_fingerprint',
-            'created_in_airtable',
-        ]
-
-        with transaction.atomic():
-            if new_objs:
-                NumeracySession2026.objects.bulk_create(new_objs, batch_size=500)
-            if update_objs:
-                NumeracySession2026.objects.bulk_update(update_objs, update_fields, batch_size=500)
-
-        return {'created': len(new_objs), 'updated': len(update_objs), 'skipped': skipped}
+        """Upsert an already-fetched list of records."""
+        return self.stream_upsert([all_records])
 
     def extract_row(self, record):
         fields = record.get('fields', {})
@@ -175,8 +188,8 @@ class Command(BaseCommand):
             session_date=parse_date(fields.get('Session Date', '') or ''),
             youth_uid=youth_uid_val,
             school_uid=school_uid_val,
-            youth=self.youth_by_uid.get(youth_uid_val),
-            school=self.school_by_uid.get(school_uid_val),
+            youth_id=self.youth_by_uid.get(youth_uid_val),
+            school_id=self.school_by_uid.get(school_uid_val),
             child_uids=fields.get('Child UID', []),
             children_count=fields.get('Children Count'),
             group_count_level=strip_emoji(fields.get('Group Current Count Level')),
@@ -189,18 +202,5 @@ class Command(BaseCommand):
             created_in_airtable=parse_date(fields.get('Created', '') or ''),
         )
 
-    def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        all_records = []
-
-        while url:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Airtable API error {response.status_code}: {response.text[:200]}")
-            data = response.json()
-            all_records.extend(data.get('records', []))
-            offset = data.get('offset')
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-
-        return all_records
+    def fetch_pages(self, base_id, table_id, token, since=None):
+        return get_client(token).iter_pages(base_id, table_id, since=since)
@@ -1,10 +1,9 @@
 import os
-import time
-import requests
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 from dotenv import load_dotenv
+from api.airtable_client import fetch_records
 from api.models import OnTheProgramme2026, AirtableSyncLog
 from api.management.commands.sync_airtable_literacy_assessments_2026 import (
     _uid, _num, RETIRE_FLOOR, RETIRE_FRACTION,
@@ -154,17 +153,4 @@ class Command(BaseCommand):
                 "retired": retired, "retire_skipped": would_retire if not retire else 0}
 
     def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        records = []
-        while url:
-            resp = requests.get(url, headers=headers)
-            if resp.status_code != 200:
-                raise ValueError(f"Airtable API error {resp.status_code}: {resp.text[:200]}")
-            data = resp.json()
-            records.extend(data.get("records", []))
-            offset = data.get("offset")
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-            if offset:
-                time.sleep(0.2)
-        return records
+        return fetch_records(base_id, table_id, token)
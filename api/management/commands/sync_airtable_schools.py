@@ -1,8 +1,9 @@
 import os
-import requests
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 from dotenv import load_dotenv
+from api.airtable_client import fetch_records
 from api.models import School, AirtableSyncLog
 
 
@@ -168,8 +169,13 @@ class Command(BaseCommand):
         # new) airtable_id attached, converging on a single canonical row.
         update_fields = [
             'airtable_id', 'name', 'type', 'school_uid', 'school_number', 'suburb',
-            'latitude', 'longitude',
+            'latitude', 'longitude', 'last_updated',
         ]
+        # bulk_update skips auto_now, so stamp the rows by hand: uid_map's incremental
+        # refresh only re-reads rows whose stamp moved.
+        now = timezone.now()
+        for obj in update_objs:
+            obj.last_updated = now
 
         with transaction.atomic():
             if new_objs:
@@ -203,17 +209,4 @@ class Command(BaseCommand):
         )
 
     def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        all_records = []
-
-        while url:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Airtable API error {response.status_code}: {response.text[:200]}")
-            data = response.json()
-            all_records.extend(data.get('records', []))
-            offset = data.get('offset')
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-
-        return all_records
+        return fetch_records(base_id, table_id, token)
@@ -1,9 +1,9 @@
 import os
-import requests
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from dotenv import load_dotenv
+from api.airtable_client import fetch_records
 from api.models import Staff, AirtableSyncLog
 
 
@@ -186,17 +186,4 @@ class Command(BaseCommand):
         )
 
     def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        all_records = []
-
-        while url:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Airtable API error {response.status_code}: {response.text[:200]}")
-            data = response.json()
-            all_records.extend(data.get('records', []))
-            offset = data.get('offset')
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-
-        return all_records
+        return fetch_records(base_id, table_id, token)
@@ -1,10 +1,14 @@
 import os
-import requests
 from django.core.management.base import BaseCommand
 from django.utils.dateparse import parse_date
 from django.db import transaction
+from django.utils import timezone
 from dotenv import load_dotenv
+from api.airtable_client import fetch_records
+from api.airtable_sync import plan_sync_window, stamp_window
+from api.data_quality import refresh_dq_flags
 from api.models import Youth, School, Mentor, AirtableSyncLog
+from api.youth_budget import invalidate_cohort_snapshot
 
 
 def _coerce_int(value):
@@ -66,6 +70,9 @@ class Command(BaseCommand):
 
     Run sync_airtable_staff before this command so mentor name lookups work.
 
+    Incremental by default (see api/airtable_sync.py). Orphan deletion needs the
+    whole table, so it only runs on full sweeps (weekly, or --full).
+
     Required env vars:
       AIRTABLE_YOUTH_2026_BASE_ID
       AIRTABLE_YOUTH_2026_TABLE_ID
@@ -75,6 +82,8 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--dry-run', action='store_true', help='Preview without saving')
+        parser.add_argument('--full', action='store_true',
+                            help='Ignore the watermark: pull the whole table and delete orphans')
         parser.add_argument('--verbose', action='store_true', help='Show sample records fetched')
 
     def handle(self, *args, **options):
@@ -96,13 +105,16 @@ class Command(BaseCommand):
         if is_dry_run:
             self.stdout.write(self.style.WARNING("=== DRY RUN MODE — no changes will be saved ===\n"))
 
+        window = plan_sync_window('youth', force_full=options['full'])
+        self.stdout.write(f"Sync window: {window.describe()}")
+
         sync_log = None
         if not is_dry_run:
             sync_log = AirtableSyncLog.objects.create(sync_type='youth')
             self.stdout.write(f"Sync log started (ID: {sync_log.id})")
 
         try:
-            all_records = self.fetch_from_airtable(base_id, table_id, token)
+            all_records = self.fetch_from_airtable(base_id, table_id, token, since=window.since)
             self.stdout.write(self.style.SUCCESS(f"Fetched {len(all_records)} records from Airtable"))
 
             if options['verbose']:
@@ -139,14 +151,20 @@ class Command(BaseCommand):
 
             self.stdout.write(f"Loaded {len(school_map)} schools and {len(mentor_map)} mentors for FK resolution")
 
-            stats = self.bulk_upsert(all_records, school_map, mentor_map)
+            stats = self.bulk_upsert(all_records, school_map, mentor_map, prune_orphans=window.full)
+            refresh_dq_flags(Youth)
 
             if sync_log:
                 sync_log.records_processed = len(all_records)
                 sync_log.records_created = stats['created']
                 sync_log.records_updated = stats['updated']
                 sync_log.records_skipped = stats['skipped']
+                sync_log.details = {'window': window.describe()}
+                stamp_window(sync_log, window)
                 sync_log.mark_complete(success=True)
+            # The budget calculator memoises cohorts per process; drop this
+            # process's copy (other processes see the new sync id in their key).
+            invalidate_cohort_snapshot()
 
             age_bad = stats['age_unparseable_ids']
             self.stdout.write(self.style.SUCCESS(
@@ -174,14 +192,16 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"Sync failed: {e}"))
             raise
 
-    def bulk_upsert(self, all_records, school_map, mentor_map):
-        # Delete orphans — DB records whose airtable_id no longer exists in Airtable
-        incoming_airtable_ids = {r.get('id') for r in all_records if r.get('id')}
-        orphans = Youth.objects.exclude(airtable_id__isnull=True).exclude(airtable_id__in=incoming_airtable_ids)
-        orphan_count = orphans.count()
-        if orphan_count:
-            self.stdout.write(self.style.WARNING(f"Deleting {orphan_count} orphan records not found in Airtable"))
-            orphans.delete()
+    def bulk_upsert(self, all_records, school_map, mentor_map, prune_orphans=True):
+        # Delete orphans — DB records whose airtable_id no longer exists in Airtable.
+        # Only meaningful when all_records is the whole table (a full sweep).
+        if prune_orphans:
+            incoming_airtable_ids = {r.get('id') for r in all_records if r.get('id')}
+            orphans = Youth.objects.exclude(airtable_id__isnull=True).exclude(airtable_id__in=incoming_airtable_ids)
+            orphan_count = orphans.count()
+            if orphan_count:
+                self.stdout.write(self.style.WARNING(f"Deleting {orphan_count} orphan records not found in Airtable"))
+                orphans.delete()
 
         # Build lookup by airtable_id AND employee_id so we match existing
         # records regardless of which key was used to create them
@@ -245,8 +265,13 @@ class Command(BaseCommand):
             'job_title', 'employment_status', 'start_date', 'end_date',
             'subsidy_funder', 'subsidy_status',
             'subsidy_start_date', 'subsidy_end_date',
-            'school_id', 'mentor_id',
+            'school_id', 'mentor_id', 'updated_at',
         ]
+        # bulk_update skips auto_now, so stamp the rows by hand: uid_map's incremental
+        # refresh only re-reads rows whose stamp moved.
+        now = timezone.now()
+        for obj in update_objs:
+            obj.updated_at = now
 
         with transaction.atomic():
             if new_objs:
@@ -340,18 +365,5 @@ class Command(BaseCommand):
             _age_unparseable=age_unparseable,
         )
 
-    def fetch_from_airtable(self, base_id, table_id, token):
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        all_records = []
-
-        while url:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Airtable API error {response.status_code}: {response.text[:200]}")
-            data = response.json()
-            all_records.extend(data.get('records', []))
-            offset = data.get('offset')
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}?offset={offset}" if offset else None
-
-        return all_records
+    def fetch_from_airtable(self, base_id, table_id, token, since=None):
+        return fetch_records(base_id, table_id, token, since=since)
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0045_nys_additive_split'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airtablesynclog',
+            name='full_sweep',
+            field=models.BooleanField(default=False, help_text='True if this run pulled the whole table rather than only recently modified records.', verbose_name='Full Sweep'),
+        ),
+        migrations.AddField(
+            model_name='airtablesynclog',
+            name='high_water_mark',
+            field=models.DateTimeField(blank=True, help_text="When this run's Airtable fetch started; the next incremental run pulls records modified after it.", null=True, verbose_name='High-Water Mark'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0046_airtablesynclog_watermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionDayFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(blank=True, null=True)),
+                ('programme', models.CharField(choices=[('literacy', 'Literacy'), ('numeracy', 'Numeracy')], max_length=10)),
+                ('youth_uid', models.CharField(blank=True, max_length=50, null=True)),
+                ('school_uid', models.CharField(blank=True, max_length=50, null=True)),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.school')),
+                ('youth', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.youth')),
+            ],
+            options={
+                'db_table': 'session_day_facts',
+                'indexes': [models.Index(fields=['programme', 'date'], name='session_day_program_4de32c_idx'), models.Index(fields=['youth_uid', 'date'], name='session_day_youth_u_76c2dd_idx'), models.Index(fields=['school_uid', 'date'], name='session_day_school__51f7b7_idx')],
+            },
+        ),
+    ]
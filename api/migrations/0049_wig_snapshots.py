@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0048_cache_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WigSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('lead_measures', 'Lead measures'), ('detail', 'Measure detail')], max_length=20)),
+                ('week_ending', models.DateField(help_text="Sunday that ends the window (the payload's date_to)")),
+                ('period', models.CharField(max_length=20)),
+                ('programme', models.CharField(blank=True, default='', max_length=30)),
+                ('measure', models.CharField(blank=True, default='', max_length=60)),
+                ('payload', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'wig_snapshots',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'week_ending', 'period', 'programme', 'measure'), name='uniq_wig_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0049_wig_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airtablesynclog',
+            name='table_row_count',
+            field=models.IntegerField(blank=True, help_text='Rows in the synced table when this run completed successfully (see SYNC_TYPE_TABLES).', null=True, verbose_name='Table Row Count'),
+        ),
+        migrations.AddIndex(
+            model_name='airtablesynclog',
+            index=models.Index(fields=['sync_type', 'success', 'completed_at'], name='sync_log_latest_idx'),
+        ),
+    ]
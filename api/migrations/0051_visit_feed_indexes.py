@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0050_sync_log_table_row_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mentorvisit',
+            index=models.Index(fields=['visit_date', 'created_at', 'id'], name='mentorvisit_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='numeracyvisit',
+            index=models.Index(fields=['visit_date', 'created_at', 'id'], name='numeracyvisit_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='thousandstoriesvisit',
+            index=models.Index(fields=['visit_date', 'created_at', 'id'], name='storiesvisit_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='yebovisit',
+            index=models.Index(fields=['visit_date', 'created_at', 'id'], name='yebovisit_feed_idx'),
+        ),
+    ]
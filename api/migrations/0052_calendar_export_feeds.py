@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:14
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0051_visit_feed_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('closure', 'Closure'), ('absence', 'Absence')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('date', models.DateField()),
+                ('scope_key', models.CharField(max_length=120)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='schoolclosure',
+            index=models.Index(fields=['updated_at', 'id'], name='closure_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffabsence',
+            index=models.Index(fields=['updated_at', 'id'], name='absence_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calendartombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='tombstone_feed_idx'),
+        ),
+    ]
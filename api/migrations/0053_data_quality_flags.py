@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0052_calendar_export_feeds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataQualityFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('measure', models.CharField(max_length=60)),
+                ('position', models.PositiveIntegerField()),
+                ('object_id', models.IntegerField()),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'data_quality_flags',
+                'constraints': [models.UniqueConstraint(fields=('measure', 'position'), name='uniq_dq_flag_position')],
+            },
+        ),
+    ]
@@ -346,6 +346,10 @@ class MentorVisit(models.Model):
         ordering = ['-visit_date']
         verbose_name = "Mentor Visit"
         verbose_name_plural = "Mentor Visits"
+        indexes = [
+            # Keyset order of the visit feed (api.visit_facts.VisitFacts.page)
+            models.Index(fields=['visit_date', 'created_at', 'id'], name='mentorvisit_feed_idx'),
+        ]
 
 
 class YeboVisit(models.Model):
@@ -395,6 +399,10 @@ class YeboVisit(models.Model):
         ordering = ['-visit_date']
         verbose_name = "Yebo Visit"
         verbose_name_plural = "Yebo Visits"
+        indexes = [
+            # Keyset order of the visit feed (api.visit_facts.VisitFacts.page)
+            models.Index(fields=['visit_date', 'created_at', 'id'], name='yebovisit_feed_idx'),
+        ]
 
 
 class ThousandStoriesVisit(models.Model):
@@ -442,6 +450,10 @@ class ThousandStoriesVisit(models.Model):
         ordering = ['-visit_date']
         verbose_name = "1000 Stories Visit"
         verbose_name_plural = "1000 Stories Visits"
+        indexes = [
+            # Keyset order of the visit feed (api.visit_facts.VisitFacts.page)
+            models.Index(fields=['visit_date', 'created_at', 'id'], name='storiesvisit_feed_idx'),
+        ]
 
 
 class NumeracyVisit(models.Model):
@@ -491,6 +503,10 @@ class NumeracyVisit(models.Model):
         ordering = ['-visit_date']
         verbose_name = "Numeracy Visit"
         verbose_name_plural = "Numeracy Visits"
+        indexes = [
+            # Keyset order of the visit feed (api.visit_facts.VisitFacts.page)
+            models.Index(fields=['visit_date', 'created_at', 'id'], name='numeracyvisit_feed_idx'),
+        ]
 
 
 class Session(models.Model):
@@ -528,6 +544,22 @@ class Session(models.Model):
         verbose_name_plural = "Sessions"
 
 
+# Sync types whose successful run records the synced table's row count on its
+# log, so the ETL status page reads the count instead of COUNT(*)-ing each table.
+SYNC_TYPE_TABLES = {
+    'schools': 'School',
+    'youth': 'Youth',
+    'canonical_children': 'CanonicalChild',
+    'staff': 'Staff',
+    'literacy_sessions_2026': 'LiteracySession2026',
+    'numeracy_sessions_2026': 'NumeracySession2026',
+    'literacy_assessments_2026': 'LiteracyAssessment2026',
+    'on_the_programme_2026': 'OnTheProgramme2026',
+    'numeracy_assessments_2026': 'NumeracyAssessment2026',
+    'numeracy_on_the_programme_2026': 'NumeracyOnTheProgramme2026',
+}
+
+
 class AirtableSyncLog(models.Model):
     """Model to track Airtable synchronization history"""
     sync_type = models.CharField(max_length=50, verbose_name="Sync Type")  # 'youth', 'sessions', etc.
@@ -541,14 +573,31 @@ class AirtableSyncLog(models.Model):
     success = models.BooleanField(default=False, verbose_name="Success")
     details = models.JSONField(null=True, blank=True, verbose_name="Details",
                                help_text="Structured per-sync report (e.g. the grid health/integrity flags).")
+    high_water_mark = models.DateTimeField(
+        null=True, blank=True, verbose_name="High-Water Mark",
+        help_text="When this run's Airtable fetch started; the next incremental run pulls records modified after it.")
+    full_sweep = models.BooleanField(
+        default=False, verbose_name="Full Sweep",
+        help_text="True if this run pulled the whole table rather than only recently modified records.")
+    table_row_count = models.IntegerField(
+        null=True, blank=True, verbose_name="Table Row Count",
+        help_text="Rows in the synced table when this run completed successfully (see SYNC_TYPE_TABLES).")
 
     def mark_complete(self, success=True, error_message=None):
         """Mark the sync as complete"""
+        from django.apps import apps
+        from .response_cache import SYNC, bump_generation
+
         self.completed_at = timezone.now()
         self.success = success
         if error_message:
             self.error_message = error_message
+        if success and self.sync_type in SYNC_TYPE_TABLES:
+            model = apps.get_model('api', SYNC_TYPE_TABLES[self.sync_type])
+            self.table_row_count = model.objects.count()
         self.save()
+        # Whatever the outcome, rows may have been written: drop cached responses.
+        bump_generation(SYNC)
         
     def __str__(self):
         return f"{self.sync_type} sync on {self.started_at.strftime('%Y-%m-%d %H:%M')}"
@@ -557,6 +606,26 @@ class AirtableSyncLog(models.Model):
         verbose_name = "Airtable Sync Log"
         verbose_name_plural = "Airtable Sync Logs"
         ordering = ['-started_at']
+        indexes = [
+            # Latest successful run per sync type (ETL status, freshness checks).
+            models.Index(fields=['sync_type', 'success', 'completed_at'], name='sync_log_latest_idx'),
+        ]
+
+
+class CacheGeneration(models.Model):
+    """A named invalidation counter for the API response cache.
+
+    Cached responses are keyed on the current value of every scope they depend
+    on (see api/response_cache.py), so bumping a scope orphans all of them at
+    once. Kept in the database rather than the cache so that a sync running in
+    a cron process invalidates what the web workers cached.
+    """
+    scope = models.CharField(max_length=50, primary_key=True)
+    value = models.PositiveBigIntegerField(default=0)
+    bumped_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope}: {self.value}"
 
 
 class ZaziOverviewSnapshot(models.Model):
@@ -586,6 +655,72 @@ class ZaziOverviewSnapshot(models.Model):
         return f"Zazi snapshot [{self.cohort}] ({state}) fetched {self.fetched_at}"
 
 
+class WigSnapshot(models.Model):
+    """Precomputed WIG board payload for one completed week.
+
+    The lead-measure and detail payloads are fully determined by the window's
+    end (a completed Sunday), the period and the measure, so a cron
+    (refresh_wig_snapshots) stores them for the recent weeks and
+    /api/wig/lead-measures/ and /api/wig/detail/ serve the stored copy,
+    computing live only when no snapshot exists. ``programme``/``measure`` are
+    blank for the whole-board lead-measures payload.
+    """
+    KIND_LEAD_MEASURES = 'lead_measures'
+    KIND_DETAIL = 'detail'
+    KIND_CHOICES = [
+        (KIND_LEAD_MEASURES, 'Lead measures'),
+        (KIND_DETAIL, 'Measure detail'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    week_ending = models.DateField(help_text="Sunday that ends the window (the payload's date_to)")
+    period = models.CharField(max_length=20)
+    programme = models.CharField(max_length=30, blank=True, default='')
+    measure = models.CharField(max_length=60, blank=True, default='')
+    payload = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'wig_snapshots'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'week_ending', 'period', 'programme', 'measure'],
+                name='uniq_wig_snapshot',
+            ),
+        ]
+
+    def __str__(self):
+        scope = self.measure or 'board'
+        return f"WIG {self.kind} {scope} [{self.period}] week ending {self.week_ending}"
+
+
+
+class DataQualityFlag(models.Model):
+    """One record that fails a data-quality gauge, as of the last refresh.
+
+    refresh_dq_flags (api/data_quality.py) rewrites a measure's rows at sync
+    time, numbered by ``position`` in the drill-down's display order, so
+    /api/wig/detail/ pages the list by seeking on (measure, position) rather
+    than re-running the gauge's predicate. ``weight`` is how many of the
+    gauge's units the record accounts for (a session with both child slots
+    unresolved counts 2).
+    """
+    measure = models.CharField(max_length=60)
+    position = models.PositiveIntegerField()
+    object_id = models.IntegerField()
+    weight = models.PositiveSmallIntegerField(default=1)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'data_quality_flags'
+        constraints = [
+            models.UniqueConstraint(fields=['measure', 'position'], name='uniq_dq_flag_position'),
+        ]
+
+    def __str__(self):
+        return f"{self.measure} #{self.position}: {self.object_id}"
+
+
 # api/models.py (add to your existing models)
 
 from django.db import models
@@ -840,6 +975,44 @@ class NumeracySession2026(models.Model):
         return f"{self.session_uid or self.source_airtable_id} ({self.session_date})"
 
 
+class SessionDayFact(models.Model):
+    """
+    Daily rollup of the 2026 session tables for the youth-sessions dashboards.
+
+    One row per (date, programme, youth, school) with the number of raw
+    LiteracySession2026 / NumeracySession2026 rows behind it. Both the UID
+    strings and the resolved FKs are carried, so views filter exactly as they
+    did on the raw tables (``youth__job_title``, ``school__type``, ...).
+
+    Derived data: maintained by the 2026 session syncs (see api/session_facts.py)
+    and rebuilt from scratch by ``manage.py rebuild_session_facts``.
+    """
+    PROGRAMME_CHOICES = [
+        ('literacy', 'Literacy'),
+        ('numeracy', 'Numeracy'),
+    ]
+    date = models.DateField(null=True, blank=True)
+    programme = models.CharField(max_length=10, choices=PROGRAMME_CHOICES)
+    youth_uid = models.CharField(max_length=50, blank=True, null=True)
+    school_uid = models.CharField(max_length=50, blank=True, null=True)
+    youth = models.ForeignKey('Youth', on_delete=models.SET_NULL, null=True, blank=True,
+                              related_name='+')
+    school = models.ForeignKey('School', on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='+')
+    session_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'session_day_facts'
+        indexes = [
+            models.Index(fields=['programme', 'date']),
+            models.Index(fields=['youth_uid', 'date']),
+            models.Index(fields=['school_uid', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.programme} {self.date} {self.youth_uid}@{self.school_uid}: {self.session_count}"
+
+
 from django.db import models
 
 class LiteracySession(models.Model):
@@ -1445,7 +1618,11 @@ class SchoolClosure(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['date', 'scope_key'], name='uniq_closure_date_scope'),
         ]
-        indexes = [models.Index(fields=['date', 'scope_type'])]
+        indexes = [
+            models.Index(fields=['date', 'scope_type']),
+            # Keyset order of the incremental export feed (api/export_feeds.py)
+            models.Index(fields=['updated_at', 'id'], name='closure_feed_idx'),
+        ]
         ordering = ['-date', 'scope_key']
 
     def _derive_scope_key(self):
@@ -1527,6 +1704,7 @@ class StaffAbsence(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['date', 'youth_uid'], name='uniq_absence_date_youth_uid'),
         ]
+        indexes = [models.Index(fields=['updated_at', 'id'], name='absence_feed_idx')]
         ordering = ['-date']
 
     def clean(self):
@@ -1544,6 +1722,34 @@ class StaffAbsence(models.Model):
         return f"{self.date} {self.youth_uid} ({self.reason})"
 
 
+class CalendarTombstone(models.Model):
+    """A deleted SchoolClosure or StaffAbsence.
+
+    The Zazi backend syncs the closure calendar incrementally from the export
+    feeds, which only ever show rows that still exist. A tombstone (written by
+    a post_delete receiver in api/closures.py) is how it learns to drop its copy.
+    ``scope_key`` is the row's export scope_key (``youth:<uid>`` for absences).
+    Tombstones are kept for ``TOMBSTONE_RETENTION_DAYS`` (purge_calendar_tombstones,
+    nightly); a consumer whose cursor is older must resync the exports in full.
+    """
+    KIND_CLOSURE = 'closure'
+    KIND_ABSENCE = 'absence'
+    KIND_CHOICES = [(KIND_CLOSURE, 'Closure'), (KIND_ABSENCE, 'Absence')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    date = models.DateField()
+    scope_key = models.CharField(max_length=120)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['deleted_at', 'id'], name='tombstone_feed_idx')]
+        ordering = ['deleted_at', 'id']
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted {self.deleted_at:%Y-%m-%d}"
+
+
 class PublishedStat(models.Model):
     """Hand-approved public stat for the donor-facing impact pages.
 
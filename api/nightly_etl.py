@@ -0,0 +1,284 @@
+"""The nightly ETL as a dependency graph of management commands.
+
+The nightly flow used to be a list of commands run one after another, so the
+window was the sum of every sync's wall time, and one failure left the rest
+to run against whatever it had half-written. ``NIGHTLY_STEPS`` declares what
+each step needs, for example canonical tables before session FK resolution
+before the grid. ``run_dag`` starts every step as soon as its dependencies
+have succeeded, so independent branches run concurrently. Airtable syncs
+spend most of their time waiting on the API. A failed step skips only the
+steps downstream of it.
+
+Airtable allows 5 requests/second per base. The client's token bucket
+(api/airtable_client.py) enforces that limit, but only within one process,
+and each worker is its own process. So a step names the env var holding its
+base id (``base_env``), and ``run_dag`` never runs two steps on the same base
+at once. Syncs of different bases still overlap, and each keeps the full
+per-base budget. Two steps pointing at one base take turns instead of
+doubling the rate and drawing 30s 429 penalties.
+
+Each step runs in its own worker process with its own database connection.
+It counts as failed when the command raises, or when it leaves its
+AirtableSyncLog unsuccessful or missing. Several commands record a failure
+on the log and return normally. The run itself is one AirtableSyncLog
+(``sync_type='nightly_etl'``) whose ``details`` carry every step's status,
+start time and duration.
+
+Module-level imports stay free of models: spawned workers import this module
+before Django is set up.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from io import StringIO
+from multiprocessing import get_context
+from time import perf_counter
+
+OK, FAILED, SKIPPED = 'ok', 'failed', 'skipped'
+RUN_SYNC_TYPE = 'nightly_etl'
+DEFAULT_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    command: str
+    depends: tuple = ()
+    sync_type: str = None  # the AirtableSyncLog the command writes, if any
+    args: tuple = ()
+    base_env: str = None  # env var naming the Airtable base the step reads, if any
+
+
+# In dependency order: every step's dependencies are declared above it.
+NIGHTLY_STEPS = (
+    Step('schools', 'sync_airtable_schools', sync_type='schools',
+         base_env='AIRTABLE_SCHOOLS_BASE_ID'),
+    Step('staff', 'sync_airtable_staff', sync_type='staff',
+         base_env='AIRTABLE_STAFF_2026_BASE_ID'),
+    Step('children', 'sync_airtable_children', sync_type='canonical_children',
+         base_env='AIRTABLE_CHILDREN_2026_BASE_ID'),
+    Step('youth', 'sync_airtable_youth', ('schools',), sync_type='youth',
+         base_env='AIRTABLE_YOUTH_2026_BASE_ID'),
+    Step('literacy_sessions', 'sync_airtable_literacy_sessions_2026',
+         ('schools', 'youth', 'children'), sync_type='literacy_sessions_2026',
+         base_env='AIRTABLE_LITERACY_2026_BASE_ID'),
+    Step('numeracy_sessions', 'sync_airtable_numeracy_sessions_2026',
+         ('schools', 'youth'), sync_type='numeracy_sessions_2026',
+         base_env='AIRTABLE_NUMERACY_2026_BASE_ID'),
+    Step('literacy_assessments', 'sync_airtable_literacy_assessments_2026',
+         ('children',), sync_type='literacy_assessments_2026',
+         base_env='AIRTABLE_LITERACY_ASSESSMENTS_2026_BASE_ID'),
+    Step('numeracy_assessments', 'sync_airtable_numeracy_assessments_2026',
+         ('children',), sync_type='numeracy_assessments_2026',
+         base_env='AIRTABLE_NUMERACY_2026_ASSESSMENTS_BASE_ID'),
+    Step('literacy_roster', 'sync_airtable_on_the_programme_2026',
+         ('children',), sync_type='on_the_programme_2026',
+         base_env='AIRTABLE_ON_THE_PROGRAMME_2026_BASE_ID'),
+    Step('numeracy_roster', 'sync_airtable_numeracy_on_programme_2026',
+         ('children',), sync_type='numeracy_on_the_programme_2026',
+         base_env='AIRTABLE_NUMERACY_ON_THE_PROGRAMME_2026_BASE_ID'),
+    Step('resolve_session_fks', 'resolve_session_fks', ('literacy_sessions', 'numeracy_sessions')),
+    Step('school_programme_grid', 'refresh_school_programme_grid',
+         ('resolve_session_fks', 'children'), sync_type='school_programme_grid'),
+    Step('wig_snapshots', 'refresh_wig_snapshots', ('resolve_session_fks',)),
+    Step('zazi_overview', 'refresh_zazi_overview'),
+    Step('calendar_tombstones', 'purge_calendar_tombstones'),
+)
+STEPS_BY_NAME = {step.name: step for step in NIGHTLY_STEPS}
+
+
+def validate_steps(steps):
+    """Raise ValueError unless names are unique and every dependency is
+    declared before the step that needs it (which also rules out cycles)."""
+    seen = set()
+    for step in steps:
+        if step.name in seen:
+            raise ValueError(f'duplicate step {step.name!r}')
+        missing = [dep for dep in step.depends if dep not in seen]
+        if missing:
+            raise ValueError(f'step {step.name!r} depends on undeclared or later steps: {missing}')
+        seen.add(step.name)
+
+
+def select_steps(steps, only=None, skip=()):
+    """``steps`` narrowed to ``only`` (plus whatever they depend on), minus
+    ``skip``. A skipped dependency is simply not waited for."""
+    by_name = {step.name: step for step in steps}
+    unknown = (set(only or ()) | set(skip)) - set(by_name)
+    if unknown:
+        raise ValueError(f'unknown steps: {sorted(unknown)}')
+    wanted = set(by_name)
+    if only:
+        wanted = set()
+        stack = list(only)
+        while stack:
+            name = stack.pop()
+            if name not in wanted:
+                wanted.add(name)
+                stack.extend(by_name[name].depends)
+    wanted -= set(skip)
+    return tuple(
+        Step(s.name, s.command, tuple(d for d in s.depends if d in wanted), s.sync_type, s.args, s.base_env)
+        for s in steps if s.name in wanted
+    )
+
+
+def airtable_base(step):
+    """The Airtable base ``step`` reads (its env var's value, or the var's
+    name when unset), or None for a step that does not call Airtable."""
+    if not step.base_env:
+        return None
+    return os.environ.get(step.base_env) or step.base_env
+
+
+def run_step(step):
+    """Run one step's command here; returns its result dict."""
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    started = timezone.now()
+    t0 = perf_counter()
+    out = StringIO()
+    try:
+        call_command(step.command, *step.args, stdout=out, stderr=out)
+        error = _sync_log_error(step, started)
+    except Exception as exc:
+        error = f'{type(exc).__name__}: {exc}'
+    return {
+        'status': FAILED if error else OK,
+        'started_at': started.isoformat(),
+        'seconds': round(perf_counter() - t0, 2),
+        'error': error,
+    }
+
+
+def _sync_log_error(step, started):
+    """Why the step's own sync log says it failed, or None."""
+    if not step.sync_type:
+        return None
+    from .models import AirtableSyncLog
+
+    log = (AirtableSyncLog.objects.filter(sync_type=step.sync_type, started_at__gte=started)
+           .order_by('-started_at').first())
+    if log is None:
+        return 'no sync log written (missing configuration?)'
+    if not log.success:
+        return log.error_message or 'sync log marked unsuccessful'
+    return None
+
+
+def _worker_init():
+    import django
+    django.setup()
+
+
+def _run_in_worker(step):
+    from django.db import connections
+    try:
+        return run_step(step)
+    finally:
+        connections.close_all()
+
+
+class InlineExecutor:
+    """Runs each submitted call immediately, in this process (``--workers 1``)."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def process_pool(workers):
+    """Spawned (not forked) workers, so none inherits this process's DB connection."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                               initializer=_worker_init)
+
+
+def run_dag(steps, executor, execute=_run_in_worker, on_result=None, resource=airtable_base):
+    """Run ``steps`` on ``executor``, each once its dependencies succeeded.
+
+    Two steps with the same non-None ``resource(step)`` never run at the same
+    time. Returns ``{step name: result}`` in declaration order. A step whose
+    dependency failed or was skipped is not run; its result is
+    ``{'status': 'skipped', 'blocked_by': [...]}``. ``on_result(name,
+    result)`` is called as each step settles.
+    """
+    validate_steps(steps)
+    resources = {step.name: resource(step) for step in steps}
+    results = {}
+    pending = list(steps)
+    running = {}
+    busy = set()
+
+    def settle(name, result):
+        results[name] = result
+        if on_result:
+            on_result(name, result)
+
+    with executor:
+        while pending or running:
+            still_pending = []
+            # Declaration order is dependency order, so skips cascade in one pass.
+            for step in pending:
+                blocked = [dep for dep in step.depends if results.get(dep, {}).get('status') in (FAILED, SKIPPED)]
+                if blocked:
+                    settle(step.name, {'status': SKIPPED, 'blocked_by': blocked})
+                elif all(dep in results for dep in step.depends) and resources[step.name] not in busy:
+                    if resources[step.name] is not None:
+                        busy.add(resources[step.name])
+                    running[executor.submit(execute, step)] = step.name
+                else:
+                    still_pending.append(step)
+            pending = still_pending
+            if not running:
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                busy.discard(resources[name])
+                try:
+                    result = future.result()
+                except Exception as exc:  # the worker itself died
+                    result = {'status': FAILED, 'error': f'{type(exc).__name__}: {exc}'}
+                settle(name, result)
+    return {step.name: results[step.name] for step in steps}
+
+
+def run_nightly_etl(steps=NIGHTLY_STEPS, workers=DEFAULT_WORKERS, on_result=None):
+    """Run the nightly graph and record it on an AirtableSyncLog. Returns the log."""
+    from django.db import connections
+    from dotenv import load_dotenv
+    from .models import AirtableSyncLog
+
+    load_dotenv()  # as the sync commands do, so each step's base id resolves here too
+    log = AirtableSyncLog.objects.create(sync_type=RUN_SYNC_TYPE)
+    t0 = perf_counter()
+    if workers > 1:
+        connections.close_all()  # reopened on the next query; the workers open their own
+        executor = process_pool(workers)
+    else:
+        executor = InlineExecutor()
+    results = run_dag(steps, executor, execute=_run_in_worker if workers > 1 else run_step,
+                      on_result=on_result)
+
+    counts = {status: sum(1 for r in results.values() if r['status'] == status)
+              for status in (OK, FAILED, SKIPPED)}
+    failed = [name for name, r in results.items() if r['status'] == FAILED]
+    log.records_processed = len(results)
+    log.records_updated = counts[OK]
+    log.records_skipped = counts[SKIPPED]
+    log.details = {'workers': workers, 'seconds': round(perf_counter() - t0, 2),
+                   'counts': counts, 'steps': results}
+    log.mark_complete(success=not failed,
+                      error_message=f"Failed steps: {', '.join(failed)}" if failed else None)
+    return log
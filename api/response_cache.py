@@ -0,0 +1,134 @@
+"""Response cache for read-heavy API endpoints, invalidated by generation.
+
+The WIG board, the school grid, the youth budget and the ETL status page all
+recompute from Postgres on every hit, although their inputs only change when a
+sync runs or someone edits data. ``cached_response`` stores a view's response
+data under a key built from:
+
+* the view, the sorted query params and the caller's role (responses differ
+  by role, e.g. what a project manager may see);
+* today's date, for views whose answer depends on "now" (the completed WIG
+  period, the budget as-of date);
+* the current value of each generation scope the view depends on.
+
+Nothing is ever deleted on write. Instead a write bumps a scope's counter in
+the CacheGeneration table, the key changes, and the stale entries simply age
+out of the backend. The scopes are:
+
+* ``SYNC``: bumped by every ``AirtableSyncLog.mark_complete``, and by
+  refresh_wig_snapshots and resolve_session_fks, which write derived data
+  without a sync log.
+* ``EDITS``: bumped after every successful write request (admin, API or
+  dashboard form) by ``EditGenerationMiddleware``, and by the management
+  commands that write outside a sync. Login, logout and password posts
+  change no data, so they leave it alone.
+* ``ASSESSMENTS``: bumped by import_assessments after a WELA import. Only the
+  assessment dashboard's figures depend on it, so it is not in ALL_SCOPES.
+
+Reading the counters costs one small query per hit. The counters live in the
+database, not the cache, so a sync in a cron process invalidates what the web
+workers cached.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .models import CacheGeneration
+
+SYNC = 'sync'
+EDITS = 'edits'
+ASSESSMENTS = 'assessments'
+ALL_SCOPES = (SYNC, EDITS)
+
+KEY_PREFIX = 'api-response'
+UNSAFE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+# Writes here only touch sessions and passwords, never cached inputs.
+AUTH_PATH_PREFIXES = ('/accounts/', '/admin/login/', '/admin/logout/', '/admin/password_change/')
+
+
+def bump_generation(*scopes):
+    """Invalidate every cached response depending on any of ``scopes``."""
+    now = timezone.now()
+    for scope in scopes:
+        updated = CacheGeneration.objects.filter(scope=scope).update(value=F('value') + 1, bumped_at=now)
+        if not updated:
+            CacheGeneration.objects.get_or_create(scope=scope, defaults={'value': 1})
+
+
+def current_generations(scopes):
+    """``(value, ...)`` for ``scopes`` in order, 0 for a never-bumped scope."""
+    values = dict(CacheGeneration.objects.filter(scope__in=scopes).values_list('scope', 'value'))
+    return tuple(values.get(scope, 0) for scope in scopes)
+
+
+def _role(request):
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return 'anonymous'
+    profile = getattr(user, 'profile', None)
+    return getattr(profile, 'role', None) or 'authenticated'
+
+
+def response_cache_key(name, request, scopes, *, per_day=True):
+    params = sorted((k, request.query_params.getlist(k)) for k in request.query_params)
+    digest = hashlib.sha256(repr(params).encode()).hexdigest()[:24]
+    parts = [KEY_PREFIX, name, _role(request)]
+    if per_day:
+        parts.append(timezone.localdate().isoformat())
+    parts.append('.'.join(str(g) for g in current_generations(scopes)))
+    parts.append(digest)
+    return ':'.join(parts)
+
+
+def cached_response(*, depends=ALL_SCOPES, timeout=None, per_day=True):
+    """Cache a DRF function view's 200 responses; place it *below* the
+    ``@api_view``/auth/permission decorators so it only sees permitted requests.
+    ``timeout`` defaults to ``settings.API_CACHE_TIMEOUT``; ``per_day=False``
+    for views whose answer does not depend on today's date."""
+    depends = tuple(depends)
+
+    def decorator(view):
+        name = f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            key = response_cache_key(name, request, depends, per_day=per_day)
+            hit = cache.get(key)
+            if hit is not None:
+                response = Response(hit)
+                response['X-Cache'] = 'HIT'
+                return response
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout if timeout is not None else settings.API_CACHE_TIMEOUT)
+                response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class EditGenerationMiddleware:
+    """Bump ``EDITS`` after every successful write request outside the auth
+    routes. Admin and form writes land here as much as API writes; write
+    traffic is light enough that invalidating every cached response on each
+    one costs nothing, but a login per user each morning would still empty the
+    cache for no reason."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (request.method in UNSAFE_METHODS and response.status_code < 400
+                and not request.path_info.startswith(AUTH_PATH_PREFIXES)):
+            bump_generation(EDITS)
+        return response
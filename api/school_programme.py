@@ -214,6 +214,35 @@ def masi_child_identities(school_uid, year):
     return {MASI_LITERACY: literacy, NUMERACY: numeracy}
 
 
+def masi_child_identities_by_school(year):
+    """masi_child_identities for every school at once, in two queries:
+    {school_uid: {MASI_LITERACY: set, NUMERACY: set}}. Schools with no session
+    that year are absent (the per-school call would return two empty sets)."""
+    from api.models import LiteracySession2026, NumeracySession2026
+
+    by_uid = defaultdict(lambda: {MASI_LITERACY: set(), NUMERACY: set()})
+    lit_rows = LiteracySession2026.objects.filter(
+        school_uid__isnull=False, session_date__year=year
+    ).values_list("school_uid", "child_uid_1", "child_uid_2")
+    for school_uid, child_uid_1, child_uid_2 in lit_rows:
+        literacy = by_uid[school_uid][MASI_LITERACY]
+        if child_uid_1:
+            literacy.add(child_uid_1)
+        if child_uid_2:
+            literacy.add(child_uid_2)
+
+    num_rows = NumeracySession2026.objects.filter(
+        school_uid__isnull=False, session_date__year=year
+    ).values_list("school_uid", "child_uids")
+    for school_uid, child_uids in num_rows:
+        numeracy = by_uid[school_uid][NUMERACY]
+        for child_uid in child_uids or ():
+            if child_uid:
+                numeracy.add(child_uid)
+
+    return dict(by_uid)
+
+
 def unique_beneficiaries_from_identities(identity_sets, has_whole_school, total_kids):
     """The section 7 dedup rule. Count DISTINCT child identities across the
     school's child-level programmes -- never the sum of aggregate counts.
@@ -241,32 +270,63 @@ _FEMALE_TOKENS = {"F", "FEMALE"}
 _MALE_TOKENS = {"M", "MALE"}
 
 
-def compute_pct_female(child_uids):
+class ChildAttributeIndex:
+    """child_uid -> recorded gender for every canonical child, loaded once.
+
+    The grid cron needs pct_female for every school; querying CanonicalChild per
+    school meant one ``child_uid IN (...)`` per school, some of them thousands of
+    uids long. The index loads only the children with a recorded gender (one
+    query, no IN list -- blank genders never reach a denominator anyway) into two
+    frozensets, so each school's figure is a pair of set intersections.
+    """
+
+    def __init__(self, rows=()):
+        female, male = set(), set()
+        for child_uid, gender in rows:
+            token = (gender or "").strip().upper()
+            if token in _FEMALE_TOKENS:
+                female.add(child_uid)
+            elif token in _MALE_TOKENS:
+                male.add(child_uid)
+        self.female = frozenset(female)
+        self.male = frozenset(male)
+
+    @classmethod
+    def load(cls, child_uids=None):
+        """Every gendered canonical child, or only those in ``child_uids``."""
+        from api.models import CanonicalChild
+
+        qs = CanonicalChild.objects.exclude(gender__isnull=True).exclude(gender="")
+        if child_uids is not None:
+            qs = qs.filter(child_uid__in=child_uids)
+        return cls(qs.values_list("child_uid", "gender").iterator(chunk_size=5000))
+
+    def pct_female(self, child_uids):
+        """compute_pct_female for ``child_uids`` against the index (no query)."""
+        if not child_uids:
+            return None
+        uids = child_uids if isinstance(child_uids, (set, frozenset)) else set(child_uids)
+        female = len(self.female & uids)
+        gendered = female + len(self.male & uids)
+        if gendered == 0:
+            return None
+        return round(100.0 * female / gendered, 2)
+
+
+def compute_pct_female(child_uids, index=None):
     """Percent female among the given children that have a recorded gender.
 
     Children with no recorded gender are excluded from the denominator -- an
     honest percentage over known data, not a figure diluted by ~88% of rows that
     are simply blank. Returns a float rounded to 2 dp, or None when no child in
-    the set has a recorded gender.
+    the set has a recorded gender. Pass a preloaded ChildAttributeIndex to
+    answer without a query (the nightly cron does, for every school).
     """
-    from api.models import CanonicalChild
-
     if not child_uids:
         return None
-    genders = CanonicalChild.objects.filter(child_uid__in=child_uids).values_list(
-        "gender", flat=True
-    )
-    female = male = 0
-    for gender in genders:
-        token = (gender or "").strip().upper()
-        if token in _FEMALE_TOKENS:
-            female += 1
-        elif token in _MALE_TOKENS:
-            male += 1
-    gendered = female + male
-    if gendered == 0:
-        return None
-    return round(100.0 * female / gendered, 2)
+    if index is None:
+        index = ChildAttributeIndex.load(child_uids)
+    return index.pct_female(child_uids)
 
 
 # --- per-programme config: source + basis (Jim, 2026-06-18) -------------------
@@ -406,6 +466,24 @@ def resolve_zazi_export(zazi_export):
 
 # --- the nightly refresh orchestrator (section 8) -----------------------------
 
+def derive_school_year_stats(site_type, identities, programmes_present, total_kids):
+    """The DB-free part of a school's year-stats: unique_beneficiaries plus the
+    identity union pct_female is computed over."""
+    # Union over ALL identity sets the caller supplies -- within-Masi only on the
+    # edit path, masi + zazi on the nightly cron path (see the module docstring).
+    identity_sets = list(identities.values())
+    identity_union = set().union(*identity_sets) if identity_sets else set()
+    has_whole_school = any(
+        is_whole_school(programme, site_type) for programme in programmes_present
+    )
+    unique = unique_beneficiaries_from_identities(identity_sets, has_whole_school, total_kids)
+    return {
+        "unique_beneficiaries": unique,
+        "has_whole_school": has_whole_school,
+        "identity_union": identity_union,
+    }
+
+
 def recompute_school_year_stats(school, year, now=None, identities=None,
                                 programmes_present=None):
     """Recompute and write a school's derived year-stats (unique_beneficiaries,
@@ -431,30 +509,23 @@ def recompute_school_year_stats(school, year, now=None, identities=None,
             .values_list("programme", flat=True)
         )
 
-    # Union over ALL identity sets the caller supplies -- within-Masi only on the
-    # edit path, masi + zazi on the nightly cron path (see the module docstring).
-    identity_sets = list(identities.values())
-    identity_union = set().union(*identity_sets) if identity_sets else set()
-    has_whole_school = any(
-        is_whole_school(programme, site_type) for programme in programmes_present
-    )
-
     stats, _ = SchoolYearStats.objects.get_or_create(school=school, year=year)
-    unique = unique_beneficiaries_from_identities(
-        identity_sets,
-        has_whole_school,
-        stats.total_kids_in_school,
+    derived = derive_school_year_stats(
+        site_type, identities, programmes_present, stats.total_kids_in_school
     )
     SchoolYearStats.objects.filter(pk=stats.pk).update(
-        unique_beneficiaries=unique,
-        pct_female=compute_pct_female(identity_union),
+        unique_beneficiaries=derived["unique_beneficiaries"],
+        pct_female=compute_pct_female(derived["identity_union"]),
         as_of=now,
     )
-    return {
-        "unique_beneficiaries": unique,
-        "has_whole_school": has_whole_school,
-        "identity_union": identity_union,
-    }
+    return derived
+
+
+# System-owned columns the nightly refresh writes (children_count only for
+# computed programmes; see refresh_school_programme_grid).
+_SYSTEM_CELL_FIELDS = ("youth_active", "count_basis", "count_source", "as_of")
+_SYSTEM_STATS_FIELDS = ("unique_beneficiaries", "pct_female", "as_of")
+BULK_BATCH_SIZE = 500
 
 
 def refresh_school_programme_grid(year, zazi_export=None):
@@ -462,9 +533,10 @@ def refresh_school_programme_grid(year, zazi_export=None):
 
     Composes the computation functions above. Writes ONLY system-owned columns
     (youth_active, count_basis/source, computed children_count, as_of,
-    unique_beneficiaries, pct_female) via column-scoped .update() so a concurrent
-    human edit to a human-owned column is never lost (the column-ownership rule,
-    plan section 4 / 8). Surfaces integrity checks rather than swallowing them.
+    unique_beneficiaries, pct_female) via column-scoped bulk_update() so a
+    concurrent human edit to a human-owned column is never lost (the
+    column-ownership rule, plan section 4 / 8). Surfaces integrity checks rather
+    than swallowing them.
 
     youth_active is a current-staffing snapshot, so this is meaningful for the
     current year; pass the current year in production.
@@ -495,11 +567,39 @@ def refresh_school_programme_grid(year, zazi_export=None):
         "unmapped_zazi_schools": list(zazi["unmapped_schools"]),
         "unresolved_zazi_participants": 0,
     }
-    rows_created = 0
-    rows_updated = 0
     schools_processed = 0
 
     grid_schools = [s for s in School.objects.filter(is_active=True) if is_grid_eligible(s.type)]
+    grid_school_ids = {school.id for school in grid_schools}
+
+    # Set-based: every input is loaded up front (identities in two queries,
+    # genders in one, the year's rows in one each), every cell is computed in
+    # memory, and the writes go out as a handful of bulk statements. The nightly
+    # transaction then holds its locks for seconds rather than
+    # O(schools x programmes) round trips.
+    identities_by_uid = masi_child_identities_by_school(year)
+    children = ChildAttributeIndex.load()
+    existing = {
+        (row.school_id, row.programme): row
+        for row in SchoolProgrammeYear.objects.filter(year=year, school_id__in=grid_school_ids)
+    }
+    stats_by_school = {
+        stats.school_id: stats
+        for stats in SchoolYearStats.objects.filter(year=year, school_id__in=grid_school_ids)
+    }
+    missing_stats = [
+        SchoolYearStats(school=school, year=year)
+        for school in grid_schools if school.id not in stats_by_school
+    ]
+    for stats in SchoolYearStats.objects.bulk_create(missing_stats):
+        stats_by_school[stats.school_id] = stats
+
+    to_create = []
+    # Rows whose children_count is cron-owned are written separately so a manual
+    # programme's human-owned count is never part of an UPDATE.
+    to_update = {True: [], False: []}
+    stats_to_update = []
+
     for school in grid_schools:
         schools_processed += 1
         site_type = normalize_site_type(school.type)
@@ -511,11 +611,9 @@ def refresh_school_programme_grid(year, zazi_export=None):
         seeded = programmes_from_site_type(school.site_type)
         integrity["unknown_site_type_tokens"] |= seeded["unknown_tokens"]
 
-        identities = (
-            masi_child_identities(school.school_uid, year)
-            if school.school_uid
-            else {MASI_LITERACY: set(), NUMERACY: set()}
-        )
+        identities = identities_by_uid.get(school.school_uid) if school.school_uid else None
+        if identities is None:
+            identities = {MASI_LITERACY: set(), NUMERACY: set()}
 
         # Fold in Zazi (Increment 2): resolved identities join the dedup union;
         # the full reach is written as the zazi_izandi children_count below.
@@ -534,11 +632,6 @@ def refresh_school_programme_grid(year, zazi_export=None):
         if zazi_here is not None:
             programmes_present.add(ZAZI_IZANDI)
 
-        existing = {
-            row.programme: row
-            for row in SchoolProgrammeYear.objects.filter(school=school, year=year)
-        }
-
         for programme in programmes_present:
             source = count_source_for(programme)
             basis = count_basis_for(programme, site_type)
@@ -560,21 +653,25 @@ def refresh_school_programme_grid(year, zazi_export=None):
                 system_fields["children_count"] = len(identities.get(programme, set()))
             system_fields["count_source"] = source
 
-            row = existing.get(programme)
+            row = existing.get((school.id, programme))
             if row is None:
-                SchoolProgrammeYear.objects.create(
+                to_create.append(SchoolProgrammeYear(
                     school=school, programme=programme, year=year, **system_fields
-                )
-                rows_created += 1
+                ))
             else:
-                SchoolProgrammeYear.objects.filter(pk=row.pk).update(**system_fields)
-                rows_updated += 1
-
-        # School-level derived stats (shared with the human-edit path).
-        recomputed = recompute_school_year_stats(
-            school, year, now=now,
-            identities=identities, programmes_present=programmes_present,
+                for field, value in system_fields.items():
+                    setattr(row, field, value)
+                to_update["children_count" in system_fields].append(row)
+
+        # School-level derived stats (same rule as the human-edit path).
+        stats = stats_by_school[school.id]
+        recomputed = derive_school_year_stats(
+            site_type, identities, programmes_present, stats.total_kids_in_school
         )
+        stats.unique_beneficiaries = recomputed["unique_beneficiaries"]
+        stats.pct_female = compute_pct_female(recomputed["identity_union"], index=children)
+        stats.as_of = now
+        stats_to_update.append(stats)
         # A school with manual reach but no identities (and no whole-school
         # override) computes unique from an empty union -- surface it.
         if (not recomputed["identity_union"]
@@ -585,6 +682,22 @@ def refresh_school_programme_grid(year, zazi_export=None):
                 "programmes": sorted(programmes_present),
             })
 
+    # Column ownership: bulk_update writes exactly the listed system columns;
+    # human-owned columns (percent_of_school, youth_planned, manual counts,
+    # total_kids_in_school, demographics) are never in a SET clause.
+    SchoolProgrammeYear.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+    SchoolProgrammeYear.objects.bulk_update(
+        to_update[True], _SYSTEM_CELL_FIELDS + ("children_count",), batch_size=BULK_BATCH_SIZE
+    )
+    SchoolProgrammeYear.objects.bulk_update(
+        to_update[False], _SYSTEM_CELL_FIELDS, batch_size=BULK_BATCH_SIZE
+    )
+    SchoolYearStats.objects.bulk_update(
+        stats_to_update, _SYSTEM_STATS_FIELDS, batch_size=BULK_BATCH_SIZE
+    )
+    rows_created = len(to_create)
+    rows_updated = len(to_update[True]) + len(to_update[False])
+
     # Active youth whose school FK points OUTSIDE the grid iteration (an
     # is_active=False legacy duplicate row, or a non-grid-eligible type). Their
     # counts were consumed by no cell above, so without this flag they'd vanish
@@ -592,7 +705,6 @@ def refresh_school_programme_grid(year, zazi_export=None):
     # (the 2026-07-27 Lingelethu 0/8-with-7-in-post bug). The youth sync now
     # prefers canonical rows, so entries here should heal on the next sync run;
     # anything persisting needs a school-row merge.
-    grid_school_ids = {school.id for school in grid_schools}
     stranded_ids = set(youth_by_school) - grid_school_ids
     if stranded_ids:
         stranded_schools = School.objects.in_bulk(stranded_ids)
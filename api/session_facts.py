@@ -0,0 +1,111 @@
+"""Maintenance of the SessionDayFact rollup behind the youth-sessions dashboards.
+
+Every youth-sessions endpoint used to re-count the raw 2026 session tables. The
+rollup holds one row per (date, programme, youth, school) instead, so those
+endpoints sum a table that is a small fraction of the raw row count.
+
+Facts are always recomputed from the raw tables for whole dates -- never
+adjusted by deltas -- so a refresh is idempotent and a rebuild is just "refresh
+every date". After an incremental sync the dates to refresh are:
+
+* the dates of rows this run wrote (``updated_at >= window.started_at``), which
+  covers new rows and edits, including re-resolved youth/school FKs;
+* the dates those rows held before the run (collected by the upsert), which
+  covers a session moved to another date (the old date loses a session).
+
+Both read only the rows in the sync window. An incremental sync deletes
+nothing; rows pruned by a full sweep, or removed by hand, are picked up by the
+full sweep's rebuild. ``drifted_dates`` compares every date's raw count with
+its facts, for ``rebuild_session_facts --check``.
+"""
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import LiteracySession2026, NumeracySession2026, SessionDayFact
+
+SESSION_MODELS = {
+    'literacy': LiteracySession2026,
+    'numeracy': NumeracySession2026,
+}
+
+_GRAIN = ('session_date', 'youth_uid', 'school_uid', 'youth_id', 'school_id')
+BATCH_SIZE = 1000
+
+
+def _split_dates(dates):
+    """(real dates, whether undated rows are included) -- ``None`` in ``dates``
+    stands for rows with no session date."""
+    return [d for d in dates if d is not None], None in dates
+
+
+def _aggregate(programme, dates=None):
+    qs = SESSION_MODELS[programme].objects.all()
+    if dates is not None:
+        dated, undated = _split_dates(dates)
+        rows = list(qs.filter(session_date__in=dated).values(*_GRAIN).annotate(n=Count('id')).order_by())
+        if undated:
+            rows += list(qs.filter(session_date__isnull=True).values(*_GRAIN).annotate(n=Count('id')).order_by())
+    else:
+        rows = qs.values(*_GRAIN).annotate(n=Count('id')).order_by()
+    for r in rows:
+        yield SessionDayFact(
+            date=r['session_date'], programme=programme,
+            youth_uid=r['youth_uid'], school_uid=r['school_uid'],
+            youth_id=r['youth_id'], school_id=r['school_id'],
+            session_count=r['n'],
+        )
+
+
+def refresh_session_facts(programme, dates=None):
+    """Recompute the facts for ``dates`` (all dates when None) from the raw
+    table for ``programme``. Returns the number of fact rows written."""
+    facts = SessionDayFact.objects.filter(programme=programme)
+    with transaction.atomic():
+        if dates is None:
+            facts.delete()
+        else:
+            dates = set(dates)
+            if not dates:
+                return 0
+            dated, undated = _split_dates(dates)
+            facts.filter(date__in=dated).delete()
+            if undated:
+                facts.filter(date__isnull=True).delete()
+        written = SessionDayFact.objects.bulk_create(_aggregate(programme, dates), batch_size=BATCH_SIZE)
+    return len(written)
+
+
+def rebuild_session_facts(programmes=None):
+    """Rebuild every fact row for ``programmes`` (default: both). Returns
+    ``{programme: rows written}``."""
+    return {p: refresh_session_facts(p) for p in (programmes or SESSION_MODELS)}
+
+
+def drifted_dates(programme):
+    """Dates whose raw session count differs from the facts' total."""
+    raw = dict(
+        SESSION_MODELS[programme].objects.values('session_date')
+        .annotate(n=Count('id')).order_by().values_list('session_date', 'n')
+    )
+    facts = dict(
+        SessionDayFact.objects.filter(programme=programme).values('date')
+        .annotate(n=Sum('session_count')).order_by().values_list('date', 'n')
+    )
+    return {d for d in raw.keys() | facts.keys() if raw.get(d, 0) != facts.get(d, 0)}
+
+
+def sync_session_facts(programme, window, previous_dates=()):
+    """Bring the facts up to date after a session sync over ``window``
+    (an api.airtable_sync.SyncWindow). ``previous_dates`` are the session dates
+    the upserted rows held before the sync. Returns the number of dates
+    refreshed, or None for a full rebuild."""
+    if window.full:
+        refresh_session_facts(programme)
+        return None
+    touched = set(
+        SESSION_MODELS[programme].objects.filter(updated_at__gte=window.started_at)
+        .values_list('session_date', flat=True).distinct()
+    )
+    dates = touched | set(previous_dates)
+    refresh_session_facts(programme, dates)
+    return len(dates)
@@ -1,6 +1,7 @@
 from datetime import date
 from django.test import TestCase
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from api.models import (
@@ -8,6 +9,7 @@ from api.models import (
     LiteracySession2026, NumeracySession2026,
     AirtableSyncLog, StaffAbsence,
 )
+from api.views.etl_preview import _latest_successful_syncs
 
 
 class TestFKResolution(TestCase):
@@ -112,6 +114,39 @@ class TestEtlStatusEndpoint(TestCase):
         self.assertIn('literacy-2026', names)
         self.assertIn('numeracy-2026', names)
 
+    def test_etl_status_reads_counts_from_the_latest_logs(self):
+        School.objects.create(name='A')
+        older = AirtableSyncLog.objects.create(sync_type='schools')
+        older.mark_complete(success=True)
+        School.objects.create(name='B')
+        latest = AirtableSyncLog.objects.create(sync_type='schools', records_processed=2)
+        latest.mark_complete(success=True)
+        AirtableSyncLog.objects.create(sync_type='schools').mark_complete(success=False)
+        self.assertEqual(latest.table_row_count, 2)
+
+        School.objects.create(name='C')  # after the sync: not counted until the next one
+        for sync_type in ('youth', 'canonical_children', 'staff', 'literacy_sessions_2026',
+                          'numeracy_sessions_2026', 'literacy_assessments_2026',
+                          'on_the_programme_2026', 'numeracy_assessments_2026',
+                          'numeracy_on_the_programme_2026'):
+            AirtableSyncLog.objects.create(sync_type=sync_type).mark_complete(success=True)
+        with self.assertNumQueries(1):
+            logs = _latest_successful_syncs(['schools', 'youth'])
+        self.assertEqual(logs['schools'].pk, latest.pk)
+
+        tables = {t['name']: t for t in self.client.get('/api/etl-status/').json()['tables']}
+        self.assertEqual(tables['schools']['record_count'], 2)
+        self.assertEqual(tables['schools']['last_sync_records'], 2)
+        self.assertEqual(tables['youth']['record_count'], 0)
+
+    def test_etl_status_counts_live_when_the_log_has_no_count(self):
+        School.objects.create(name='A')
+        AirtableSyncLog.objects.create(sync_type='schools', success=True,
+                                       completed_at=timezone.now())
+        tables = {t['name']: t for t in self.client.get('/api/etl-status/').json()['tables']}
+        self.assertEqual(tables['schools']['record_count'], 1)
+        self.assertEqual(tables['literacy-2026']['last_sync'], None)
+
     def test_etl_status_unauthenticated(self):
         client = APIClient()
         # raise_request_exception=False to avoid the Clerk auth backend error in tests
@@ -157,6 +192,8 @@ class TestEtlPreviewEndpoint(TestCase):
         self.assertEqual(data['record_count'], 2)
         self.assertEqual(data['orphan_stats']['youth_resolved'], 1)
         self.assertEqual(data['orphan_stats']['youth_orphaned'], 1)
+        self.assertEqual(data['orphan_stats']['child1_resolved'], 1)
+        self.assertEqual(data['orphan_stats']['child2_orphaned'], 2)
         self.assertIsInstance(data['sample_rows'], list)
 
     def test_unknown_table_returns_400(self):
@@ -0,0 +1,153 @@
+"""Tests for the shared Airtable client (api/airtable_client.py).
+
+No network: a scripted fake session stands in for requests.Session, and sleeps
+are recorded instead of slept.
+"""
+import threading
+from unittest.mock import Mock
+
+import requests
+from django.test import SimpleTestCase
+
+from api.airtable_client import AirtableAPIError, AirtableClient, TokenBucket
+
+
+def _response(status, body=None, headers=None):
+    resp = Mock(status_code=status, headers=headers or {}, text=str(body))
+    resp.json.return_value = body
+    return resp
+
+
+class FakeSession:
+    """Returns scripted responses per table id; records every call's params."""
+
+    def __init__(self, script):
+        self.script = {table: list(responses) for table, responses in script.items()}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        table = url.rsplit('/', 1)[-1]
+        with self._lock:
+            self.calls.append((table, dict(params or {})))
+            nxt = self.script[table].pop(0)
+        if isinstance(nxt, Exception):
+            raise nxt
+        return nxt
+
+
+class NoLimit:
+    def acquire(self):
+        return 0.0
+
+
+def _client(script, **kwargs):
+    sleeps = []
+    client = AirtableClient(
+        "tok", session=FakeSession(script), bucket=lambda base_id: NoLimit(),
+        sleep=sleeps.append, **kwargs,
+    )
+    return client, sleeps
+
+
+class PagingTests(SimpleTestCase):
+    def test_follows_offsets_and_keeps_page_size(self):
+        client, _ = _client({"tbl": [
+            _response(200, {"records": [{"id": "rec1"}], "offset": "o1"}),
+            _response(200, {"records": [{"id": "rec2"}]}),
+        ]})
+        records = client.fetch_all("app", "tbl")
+        self.assertEqual([r["id"] for r in records], ["rec1", "rec2"])
+        self.assertEqual(client.session.calls[1][1], {"pageSize": 100, "offset": "o1"})
+
+    def test_since_adds_last_modified_filter(self):
+        from datetime import datetime, timezone as dt_timezone
+
+        client, _ = _client({"tbl": [_response(200, {"records": []})]})
+        client.fetch_all("app", "tbl", since=datetime(2026, 10, 1, tzinfo=dt_timezone.utc))
+        self.assertIn("LAST_MODIFIED_TIME()", client.session.calls[0][1]["filterByFormula"])
+
+
+class RetryTests(SimpleTestCase):
+    def test_retries_429_then_succeeds(self):
+        client, sleeps = _client({"tbl": [
+            _response(429, "slow down"),
+            _response(503, "busy"),
+            _response(200, {"records": [{"id": "rec1"}]}),
+        ]})
+        self.assertEqual(len(client.fetch_all("app", "tbl")), 1)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_honours_retry_after(self):
+        client, sleeps = _client({"tbl": [
+            _response(429, "slow down", headers={"Retry-After": "7"}),
+            _response(200, {"records": []}),
+        ]})
+        client.fetch_all("app", "tbl")
+        self.assertEqual(sleeps, [7.0])
+
+    def test_retries_connection_errors(self):
+        client, sleeps = _client({"tbl": [
+            requests.ConnectionError("reset"),
+            _response(200, {"records": []}),
+        ]})
+        self.assertEqual(client.fetch_all("app", "tbl"), [])
+        self.assertEqual(len(sleeps), 1)
+
+    def test_non_retryable_status_raises_immediately(self):
+        client, sleeps = _client({"tbl": [_response(404, "NOT_FOUND")]})
+        with self.assertRaisesMessage(AirtableAPIError, "Airtable API error 404"):
+            client.fetch_all("app", "tbl")
+        self.assertEqual(sleeps, [])
+
+    def test_gives_up_after_max_retries(self):
+        client, sleeps = _client({"tbl": [_response(500, "boom")] * 3}, max_retries=2)
+        with self.assertRaises(AirtableAPIError) as ctx:
+            client.fetch_all("app", "tbl")
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_api_error_is_a_value_error(self):
+        # Sync commands historically raised ValueError on API failures.
+        self.assertTrue(issubclass(AirtableAPIError, ValueError))
+
+
+class FetchTablesTests(SimpleTestCase):
+    def test_fetches_each_table_under_its_key(self):
+        client, _ = _client({
+            "tblA": [_response(200, {"records": [{"id": "a1"}]})],
+            "tblB": [_response(200, {"records": [{"id": "b1"}, {"id": "b2"}]})],
+        })
+        out = client.fetch_tables({"a": ("app", "tblA"), "b": ("app", "tblB")})
+        self.assertEqual({k: len(v) for k, v in out.items()}, {"a": 1, "b": 2})
+
+    def test_failure_is_raised(self):
+        client, _ = _client({
+            "tblA": [_response(200, {"records": []})],
+            "tblB": [_response(403, "denied")],
+        })
+        with self.assertRaises(AirtableAPIError):
+            client.fetch_tables({"a": ("app", "tblA"), "b": ("app", "tblB")})
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_then_waits_at_rate(self):
+        now = [0.0]
+        sleeps = []
+        bucket = TokenBucket(5, clock=lambda: now[0], sleep=sleeps.append)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertEqual(sleeps, [])
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual([round(s, 3) for s in sleeps], [0.2, 0.4])
+
+    def test_refills_over_time(self):
+        now = [0.0]
+        sleeps = []
+        bucket = TokenBucket(5, clock=lambda: now[0], sleep=sleeps.append)
+        for _ in range(5):
+            bucket.acquire()
+        now[0] = 1.0
+        bucket.acquire()
+        self.assertEqual(sleeps, [])
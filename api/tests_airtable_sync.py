@@ -0,0 +1,200 @@
+"""Tests for the incremental Airtable sync engine (api/airtable_sync.py).
+
+The window is planned from AirtableSyncLog history: no watermark or a stale full
+sweep means pull everything; otherwise pull only records modified since the last
+successful run (minus a small overlap). Pruning deleted records is only safe
+after a full pull, so it is guarded the same way as the assessment retire.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.airtable_client import modified_since_formula
+from api.airtable_sync import (
+    WATERMARK_OVERLAP, plan_sync_window, prune_unseen, stamp_window, stream_upsert,
+)
+from api.management.commands.sync_airtable_literacy_sessions_2026 import Command as LiteracySync
+from api.models import AirtableSyncLog, LiteracySession2026, Youth
+
+NOW = datetime(2026, 10, 18, 2, 0, tzinfo=dt_timezone.utc)
+
+
+def _log(sync_type, mark, full, success=True):
+    return AirtableSyncLog.objects.create(
+        sync_type=sync_type, success=success, high_water_mark=mark, full_sweep=full)
+
+
+class FormulaTests(TestCase):
+    def test_formula_is_utc_iso(self):
+        since = datetime(2026, 10, 17, 4, 30, tzinfo=dt_timezone(timedelta(hours=2)))
+        self.assertEqual(
+            modified_since_formula(since),
+            "IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('2026-10-17T02:30:00.000Z'))",
+        )
+
+
+class PlanSyncWindowTests(TestCase):
+    def test_first_run_is_full(self):
+        window = plan_sync_window('youth', now=NOW)
+        self.assertTrue(window.full)
+        self.assertIsNone(window.since)
+
+    def test_recent_full_sweep_gives_incremental_from_latest_mark(self):
+        _log('youth', NOW - timedelta(days=3), full=True)
+        _log('youth', NOW - timedelta(days=1), full=False)
+        window = plan_sync_window('youth', now=NOW)
+        self.assertFalse(window.full)
+        self.assertEqual(window.since, NOW - timedelta(days=1) - WATERMARK_OVERLAP)
+
+    def test_failed_runs_do_not_advance_the_mark(self):
+        _log('youth', NOW - timedelta(days=3), full=True)
+        _log('youth', NOW - timedelta(hours=1), full=False, success=False)
+        window = plan_sync_window('youth', now=NOW)
+        self.assertEqual(window.since, NOW - timedelta(days=3) - WATERMARK_OVERLAP)
+
+    def test_stale_full_sweep_forces_full(self):
+        _log('youth', NOW - timedelta(days=8), full=True)
+        _log('youth', NOW - timedelta(days=1), full=False)
+        self.assertTrue(plan_sync_window('youth', now=NOW).full)
+
+    def test_watermarks_are_per_sync_type(self):
+        _log('literacy_sessions_2026', NOW - timedelta(days=1), full=True)
+        self.assertTrue(plan_sync_window('youth', now=NOW).full)
+
+    def test_force_full(self):
+        _log('youth', NOW - timedelta(days=1), full=True)
+        self.assertTrue(plan_sync_window('youth', force_full=True, now=NOW).full)
+
+    def test_stamp_window_sets_next_mark(self):
+        log = AirtableSyncLog.objects.create(sync_type='youth')
+        stamp_window(log, plan_sync_window('youth', now=NOW))
+        log.mark_complete(success=True)
+        log.refresh_from_db()
+        self.assertEqual(log.high_water_mark, NOW)
+        self.assertTrue(log.full_sweep)
+
+
+class PruneUnseenTests(TestCase):
+    def setUp(self):
+        for i in range(40):
+            LiteracySession2026.objects.create(source_airtable_id=f"rec{i}")
+
+    def test_prunes_records_missing_from_full_pull(self):
+        seen = [f"rec{i}" for i in range(38)]
+        stats = prune_unseen(LiteracySession2026.objects.all(), seen)
+        self.assertEqual(stats, {'pruned': 2, 'prune_skipped': 0})
+        self.assertEqual(LiteracySession2026.objects.count(), 38)
+
+    def test_short_pull_trips_guard(self):
+        stats = prune_unseen(LiteracySession2026.objects.all(), ["rec0"])
+        self.assertEqual(stats, {'pruned': 0, 'prune_skipped': 39})
+        self.assertEqual(LiteracySession2026.objects.count(), 40)
+
+    def test_allow_overrides_guard(self):
+        stats = prune_unseen(LiteracySession2026.objects.all(), ["rec0"], allow=True)
+        self.assertEqual(stats['pruned'], 39)
+
+
+class IncrementalCommandTests(TestCase):
+    """The session command passes the watermark through and only prunes on full sweeps."""
+
+    def _run(self, records, **options):
+        env = {
+            "AIRTABLE_LITERACY_2026_BASE_ID": "app", "AIRTABLE_LITERACY_2026_TABLE_ID": "tbl",
+            "AIRTABLE_TOKEN": "tok",
+        }
+        opts = {'dry_run': False, 'verbose': False, 'full': False, 'allow_prune': False}
+        opts.update(options)
+        cmd = LiteracySync(stdout=StringIO())
+        with patch.dict("os.environ", env), \
+                patch.object(LiteracySync, "fetch_pages", return_value=iter([records])) as fetch:
+            cmd.handle(**opts)
+        return fetch
+
+    def test_incremental_run_uses_since_and_keeps_untouched_rows(self):
+        LiteracySession2026.objects.create(source_airtable_id="recOld")
+        _log('literacy_sessions_2026', timezone.now() - timedelta(hours=20), full=True)
+        fetch = self._run([{"id": "recNew", "fields": {}}])
+        self.assertIsNotNone(fetch.call_args.kwargs["since"])
+        self.assertEqual(LiteracySession2026.objects.count(), 2)
+        log = AirtableSyncLog.objects.filter(sync_type='literacy_sessions_2026').latest('started_at')
+        self.assertFalse(log.full_sweep)
+        self.assertIsNotNone(log.high_water_mark)
+
+    def test_full_run_prunes_deleted_records(self):
+        LiteracySession2026.objects.create(source_airtable_id="recGone")
+        fetch = self._run([{"id": "recNew", "fields": {}}], full=True)
+        self.assertIsNone(fetch.call_args.kwargs["since"])
+        self.assertEqual(
+            list(LiteracySession2026.objects.values_list('source_airtable_id', flat=True)), ["recNew"])
+
+
+class StreamUpsertTests(TestCase):
+    """Pages are upserted in bounded batches with ON CONFLICT, keeping the
+    created/updated/skipped split the old materialise-then-diff path reported."""
+
+    @staticmethod
+    def _row(record):
+        return {'session_uid': record['fields'].get('uid')}
+
+    def test_splits_created_updated_and_skipped_across_batches(self):
+        LiteracySession2026.objects.create(source_airtable_id="rec1", session_uid="old")
+        pages = iter([
+            [{"id": "rec1", "fields": {"uid": "new"}}, {"id": "rec2", "fields": {}}],
+            [{"fields": {}}, {"id": "rec3", "fields": {"uid": "three"}}],
+        ])
+        seen = set()
+        stats = stream_upsert(
+            LiteracySession2026, pages, self._row, ['session_uid'], batch_size=2, seen=seen)
+        self.assertEqual(stats, {'processed': 4, 'created': 2, 'updated': 1, 'skipped': 1})
+        self.assertEqual(seen, {"rec1", "rec2", "rec3"})
+        self.assertEqual(LiteracySession2026.objects.get(source_airtable_id="rec1").session_uid, "new")
+
+    def test_repeated_record_in_a_batch_is_written_once(self):
+        pages = [[{"id": "rec1", "fields": {"uid": "a"}}, {"id": "rec1", "fields": {"uid": "b"}}]]
+        stats = stream_upsert(LiteracySession2026, pages, self._row, ['session_uid'])
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(LiteracySession2026.objects.get().session_uid, "b")
+
+    def test_collects_previous_values_of_overwritten_rows(self):
+        LiteracySession2026.objects.create(source_airtable_id="rec1", session_uid="old")
+        previous = set()
+        stats = stream_upsert(LiteracySession2026, [[{"id": "rec1", "fields": {"uid": "new"}},
+                                                     {"id": "rec2", "fields": {"uid": "two"}}]],
+                              self._row, ['session_uid'], previous_field='session_uid', previous=previous)
+        self.assertEqual((stats['created'], stats['updated']), (1, 1))
+        self.assertEqual(previous, {"old"})
+
+    def test_update_preserves_row_identity(self):
+        row = LiteracySession2026.objects.create(source_airtable_id="rec1")
+        stream_upsert(LiteracySession2026, [[{"id": "rec1", "fields": {"uid": "x"}}]],
+                      self._row, ['session_uid'])
+        self.assertEqual(LiteracySession2026.objects.get().id, row.id)
+
+
+class SessionCommandUpsertTests(TestCase):
+    def test_bulk_upsert_resolves_fks_on_update(self):
+        youth = Youth.objects.create(
+            youth_uid="YTH-1", employee_id=1, first_names="A", last_name="B")
+        LiteracySession2026.objects.create(source_airtable_id="rec1", youth_uid="YTH-1")
+        cmd = LiteracySync()
+        cmd.youth_by_uid, cmd.school_by_uid, cmd.child_by_uid = {"YTH-1": youth.id}, {}, {}
+        record = {"id": "rec1", "fields": {"Youth UID": ["YTH-1"], "Session Date": "2026-03-02"}}
+        stats = cmd.bulk_upsert([record])
+        self.assertEqual((stats['created'], stats['updated']), (0, 1))
+        session = LiteracySession2026.objects.get()
+        self.assertEqual(session.youth_id, youth.id)
+        self.assertEqual(str(session.session_date), "2026-03-02")
+
+
+class YouthOrphanPruneTests(TestCase):
+    def test_incremental_upsert_keeps_youth_not_in_the_pull(self):
+        from api.management.commands.sync_airtable_youth import Command as YouthSync
+
+        Youth.objects.create(airtable_id="recKeep", employee_id=1, first_names="A", last_name="B")
+        record = {"id": "recNew", "fields": {"Employee ID": 2, "Full Name": "New Youth"}}
+        YouthSync().bulk_upsert([record], school_map={}, mentor_map={}, prune_orphans=False)
+        self.assertEqual(Youth.objects.count(), 2)
@@ -0,0 +1,151 @@
+"""Tests for ClerkAuthentication's JWKS and user caches (api/authentication.py).
+
+No network: tokens are signed with a locally generated RSA key and the JWKS /
+Clerk user endpoints are stubbed, so each test can count outbound calls.
+"""
+import json
+import time
+from unittest.mock import Mock, patch
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework import exceptions
+
+from api import authentication
+from api.authentication import ClerkAuthentication, JWKSCache, TTLCache
+
+
+def _keypair(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private.public_key()))
+    jwk.update(kid=kid, use="sig", alg="RS256")
+    return private, jwk
+
+
+KEY_A, JWK_A = _keypair("kidA")
+KEY_B, JWK_B = _keypair("kidB")
+
+
+def _token(private=KEY_A, kid="kidA", sub="user_123", **claims):
+    payload = {"sub": sub, "exp": int(time.time()) + 300, **claims}
+    return jwt.encode(payload, private, algorithm="RS256", headers={"kid": kid})
+
+
+class StubJWKS:
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"keys": list(self.keys)}
+
+
+class JWKSCacheTests(TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.stub = StubJWKS(JWK_A)
+        self.cache = JWKSCache(self.stub, ttl=3600, min_refresh=60, clock=lambda: self.now[0])
+
+    def test_known_kid_served_from_memory(self):
+        self.assertIsNotNone(self.cache.get_key("kidA"))
+        self.assertIsNotNone(self.cache.get_key("kidA"))
+        self.assertEqual(self.stub.calls, 1)
+
+    def test_ttl_expiry_refetches(self):
+        self.cache.get_key("kidA")
+        self.now[0] = 3600
+        self.cache.get_key("kidA")
+        self.assertEqual(self.stub.calls, 2)
+
+    def test_unknown_kid_refreshes_for_rotation(self):
+        self.cache.get_key("kidA")
+        self.stub.keys.append(JWK_B)
+        self.now[0] = 61
+        self.assertIsNotNone(self.cache.get_key("kidB"))
+        self.assertEqual(self.stub.calls, 2)
+
+    def test_unknown_kid_refresh_is_rate_limited(self):
+        self.cache.get_key("kidA")
+        for _ in range(5):
+            self.assertIsNone(self.cache.get_key("kidJunk"))
+        self.assertEqual(self.stub.calls, 1)
+
+    def test_missing_kid_falls_back_to_first_key(self):
+        self.assertIsNotNone(self.cache.get_key(None))
+
+
+class TTLCacheTests(TestCase):
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = TTLCache(10, clock=lambda: now[0])
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        now[0] = 10
+        self.assertIsNone(cache.get("a"))
+
+
+def _clerk_user(email="Jane@Example.org"):
+    response = Mock(status_code=200)
+    response.json.return_value = {
+        "primary_email_address_id": "em1",
+        "email_addresses": [{"id": "em1", "email_address": email}],
+        "first_name": "Jane", "last_name": "Doe",
+    }
+    return response
+
+
+@override_settings(CLERK_SECRET_KEY="sk_test")
+class ClerkAuthenticationTests(TestCase):
+    def setUp(self):
+        self.stub = StubJWKS(JWK_A)
+        cache = JWKSCache(self.stub)
+        authentication.clerk_user_cache.clear()
+        patcher = patch.object(authentication, "jwks_cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(authentication.clerk_user_cache.clear)
+        self.factory = RequestFactory()
+
+    def _authenticate(self, token):
+        request = self.factory.get("/api/x/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return ClerkAuthentication().authenticate(request)
+
+    def test_steady_state_makes_no_outbound_calls(self):
+        with patch("api.authentication.requests.get", return_value=_clerk_user()) as get:
+            user, _ = self._authenticate(_token())
+            self.assertEqual(get.call_count, 1)  # first sight: one Clerk profile lookup
+            again, _ = self._authenticate(_token())
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(self.stub.calls, 1)
+        self.assertEqual(again.pk, user.pk)
+        self.assertEqual(user.email, "jane@example.org")
+
+    def test_existing_user_matched_case_insensitively(self):
+        existing = User.objects.create(username="jane", email="JANE@example.org")
+        with patch("api.authentication.requests.get", return_value=_clerk_user()):
+            user, _ = self._authenticate(_token())
+        self.assertEqual(user.pk, existing.pk)
+        self.assertEqual(User.objects.get(pk=existing.pk).email, "jane@example.org")
+
+    def test_deleted_user_falls_back_to_lookup(self):
+        with patch("api.authentication.requests.get", return_value=_clerk_user()) as get:
+            user, _ = self._authenticate(_token())
+            user.delete()
+            recreated, _ = self._authenticate(_token())
+        self.assertEqual(get.call_count, 2)
+        self.assertNotEqual(recreated.pk, user.pk)
+
+    def test_token_signed_by_unknown_key_is_rejected(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self._authenticate(_token(private=KEY_B, kid="kidA"))
+
+    def test_expired_token_is_rejected(self):
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, "Token has expired"):
+            self._authenticate(_token(exp=int(time.time()) - 10))
+
+    def test_no_bearer_header_is_anonymous(self):
+        request = self.factory.get("/api/x/")
+        self.assertIsNone(ClerkAuthentication().authenticate(request))
@@ -140,6 +140,50 @@ class ClipAndAbsenceTests(TestCase):
         self.assertEqual(result[coach_b.id], {MON, TUE, THU, FRI})      # minus Wed (global) only
 
 
+class ClosureCalendarTests(TestCase):
+    """The process-wide calendar is reused across calls and rebuilt on writes."""
+
+    def setUp(self):
+        self.school = School.objects.create(name='S', type='Primary School',
+                                           school_uid='SCH-S', suburb='Walmer')
+        self.youth = Youth.objects.create(employee_id=1, first_names='F', last_name='One',
+                                         youth_uid='YTH-1', school=self.school,
+                                         employment_status='Active')
+
+    def test_warm_calendar_answers_without_loading_rows(self):
+        mk_closure(WED, 'global')
+        calendar = closures.closure_calendar()
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.assertEqual(
+                    closures.working_days_count(self.school, MON, SUN, youth=self.youth, calendar=calendar), 4)
+        with self.assertNumQueries(2):  # stamp check only
+            self.assertIs(closures.closure_calendar(), calendar)
+
+    def test_closure_and_absence_writes_invalidate(self):
+        self.assertEqual(closures.working_days_count(self.school, MON, SUN, youth=self.youth), 5)
+        closure = mk_closure(WED, 'global')
+        self.assertEqual(closures.working_days_count(self.school, MON, SUN, youth=self.youth), 4)
+        StaffAbsence.objects.create(youth=self.youth, date=MON, reason='sick')
+        self.assertEqual(closures.working_days_count(self.school, MON, SUN, youth=self.youth), 3)
+        closure.delete()
+        self.assertEqual(closures.working_days_count(self.school, MON, SUN, youth=self.youth), 4)
+
+    def test_queryset_update_then_invalidate(self):
+        closure = mk_closure(WED, 'global')
+        self.assertTrue(closures.is_closed(self.school, WED))
+        SchoolClosure.objects.filter(id=closure.id).update(is_open=True)
+        closures.invalidate_closure_calendar()
+        self.assertFalse(closures.is_closed(self.school, WED))
+
+    def test_range_spanning_weeks_and_reversed_range(self):
+        mk_closure(date(2026, 6, 10), 'school', school=self.school)
+        got = closures.open_working_days(self.school, date(2026, 5, 29), date(2026, 6, 12))
+        self.assertEqual(len(got), 10)
+        self.assertNotIn(date(2026, 6, 10), got)
+        self.assertEqual(closures.open_working_days(self.school, SUN, MON), [])
+
+
 class ClosureConstraintTests(TestCase):
     """[R1] scope_key must dedupe on Postgres where a nullable composite key would not."""
 
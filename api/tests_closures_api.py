@@ -1,11 +1,17 @@
 """Endpoint tests for the closure calendar API (api/views/closures.py)."""
-from datetime import date
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
 
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
-from api.models import School, Youth, SchoolClosure, StaffAbsence
+from api import closures as closures_svc
+from api.models import CalendarTombstone, School, Youth, SchoolClosure, StaffAbsence
 from core.models import UserProfile
 
 
@@ -77,6 +83,25 @@ class ClosureBulkTests(TestCase):
         row = SchoolClosure.objects.get(scope_key='global', date='2026-06-01')
         self.assertEqual(row.applies_to_programmes, ['masi_literacy'])
 
+    def test_bulk_splits_created_and_updated_in_a_fixed_number_of_queries(self):
+        schools = [School.objects.create(name=f'S{i}', type='Primary School', school_uid=f'SCH-{i}')
+                   for i in range(6)]
+        SchoolClosure.objects.create(date=date(2026, 6, 1), scope_type='school', scope_school=schools[0],
+                                     reason='old', is_open=True)
+        body = {'date_from': '2026-06-01', 'date_to': '2026-06-12', 'scope_type': 'school',
+                'scope_values': [s.school_uid for s in schools], 'reason': 'Strike'}
+        generation = closures_svc._generation
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post('/api/closures/bulk/', body, format='json')
+        self.assertEqual(resp.status_code, 201, resp.content)
+        self.assertEqual(resp.data, {'created': 59, 'updated': 1})
+        # auth + school lookup + existing-keys + the upsert (+ savepoint/generation bookkeeping),
+        # independent of the 60 target rows
+        self.assertLess(len(ctx.captured_queries), 15)
+        self.assertGreater(closures_svc._generation, generation)
+        row = SchoolClosure.objects.get(scope_key='school:SCH-0', date=date(2026, 6, 1))
+        self.assertEqual((row.reason, row.is_open, row.scope_school_id), ('Strike', False, schools[0].id))
+
     def test_bulk_rejects_unknown_programme(self):
         resp = self.client.post('/api/closures/bulk/', {
             'date_from': '2026-06-01', 'date_to': '2026-06-01',
@@ -214,6 +239,59 @@ class ClosureExportAuthTests(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.data[0]['applies_to_programmes'], ['masi_literacy'])
 
+    def _ndjson(self, url):
+        resp = self.client.get(url, HTTP_X_INTERNAL_AUTH='test-secret')
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(resp.streaming_content).decode().splitlines()]
+        return lines[:-1], lines[-1]
+
+    def test_ndjson_feed_resumes_after_same_timestamp_rows(self):
+        stamp = datetime(2026, 6, 1, 8, 0, tzinfo=dt_timezone.utc)
+        for day in (4, 5, 8):
+            SchoolClosure.objects.create(date=date(2026, 6, day), scope_type='global')
+        SchoolClosure.objects.update(updated_at=stamp)  # four rows share one updated_at
+
+        seen, cursor = [], ''
+        while True:
+            rows, trailer = self._ndjson(f'/api/closures/export/?stream=ndjson&limit=3&cursor={cursor}')
+            seen += [row['id'] for row in rows]
+            if not trailer['has_more']:
+                break
+            cursor = trailer['next_cursor']
+        self.assertEqual(seen, sorted(SchoolClosure.objects.values_list('id', flat=True)))
+
+        # Nothing new since the last cursor: an empty page that keeps the cursor.
+        rows, trailer = self._ndjson(f'/api/closures/export/?stream=ndjson&cursor={trailer["next_cursor"]}')
+        self.assertEqual(rows, [])
+        self.assertIsNotNone(trailer['next_cursor'])
+
+        resp = self.client.get('/api/closures/export/?stream=ndjson&cursor=bad', HTTP_X_INTERNAL_AUTH='test-secret')
+        self.assertEqual(resp.status_code, 400)
+
+    def test_deletions_leave_tombstones(self):
+        closure_id = SchoolClosure.objects.get(scope_key='global').id
+        SchoolClosure.objects.filter(id=closure_id).delete()
+        self.assertEqual(CalendarTombstone.objects.get().object_id, closure_id)
+        resp = self.client.get('/api/closures/tombstones/', HTTP_X_INTERNAL_AUTH='test-secret')
+        self.assertEqual(resp.data[0]['kind'], 'closure')
+        self.assertEqual(resp.data[0]['scope_key'], 'global')
+        rows, trailer = self._ndjson('/api/closures/tombstones/?stream=ndjson')
+        self.assertEqual([row['id'] for row in rows], [closure_id])
+        self.assertFalse(trailer['has_more'])
+        self.assertEqual(self.client.get('/api/closures/tombstones/').status_code, 403)
+
+    def test_purge_drops_only_expired_tombstones(self):
+        now = datetime(2026, 6, 30, tzinfo=dt_timezone.utc)
+        old = CalendarTombstone.objects.create(kind='closure', object_id=1, date=date(2026, 1, 5),
+                                               scope_key='global', deleted_at=now - timedelta(days=91))
+        recent = CalendarTombstone.objects.create(kind='closure', object_id=2, date=date(2026, 6, 1),
+                                                  scope_key='global', deleted_at=now - timedelta(days=5))
+        self.assertEqual(closures_svc.purge_tombstones(now=now), 1)
+        self.assertEqual(list(CalendarTombstone.objects.values_list('id', flat=True)), [recent.id])
+        self.assertFalse(CalendarTombstone.objects.filter(id=old.id).exists())
+        call_command('purge_calendar_tombstones', '--days', '1', stdout=StringIO())
+        self.assertFalse(CalendarTombstone.objects.exists())
+
     def test_staff_crud_still_requires_user_auth(self):
         # The shared secret must not open the authoring endpoints.
         resp = self.client.get('/api/closures/', HTTP_X_INTERNAL_AUTH='test-secret')
@@ -245,6 +323,16 @@ class AbsenceApiTests(TestCase):
         self.assertEqual(resp.data['created'], 5)
         self.assertEqual(StaffAbsence.objects.filter(youth_uid='YTH-1').count(), 5)
 
+    def test_bulk_absence_rerun_updates_in_place(self):
+        body = {'youth_uids': ['YTH-1'], 'date_from': '2026-06-01', 'date_to': '2026-06-03',
+                'reason': 'vacation'}
+        self.client.post('/api/absences/bulk/', body, format='json')
+        resp = self.client.post('/api/absences/bulk/', {**body, 'date_to': '2026-06-04', 'reason': 'sick'},
+                                format='json')
+        self.assertEqual(resp.data, {'created': 1, 'updated': 3})
+        self.assertEqual(set(StaffAbsence.objects.values_list('reason', flat=True)), {'sick'})
+        self.assertEqual(StaffAbsence.objects.filter(youth=self.youth).count(), 4)
+
 
 class ClosureLookupsTests(TestCase):
     def setUp(self):
@@ -297,3 +385,9 @@ class IdentityExportTests(TestCase):
         youth = resp.data['youth'][0]
         self.assertEqual(youth['youth_uid'], 'YTH-5')
         self.assertEqual(youth['email'], 'sip.v@masinyusane.org')  # normalised
+
+    def test_ndjson_streams_kind_tagged_lines(self):
+        resp = self.client.get('/api/identity/export/?stream=ndjson', HTTP_X_INTERNAL_AUTH='test-secret')
+        lines = [json.loads(line) for line in b''.join(resp.streaming_content).decode().splitlines()]
+        self.assertEqual([(row['kind'], row.get('school_uid') or row.get('youth_uid')) for row in lines],
+                         [('school', 'SCH-W'), ('youth', 'YTH-5')])
@@ -0,0 +1,133 @@
+"""Tests for the nightly ETL graph runner (api/nightly_etl.py)."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from api.models import AirtableSyncLog
+from api.nightly_etl import (
+    FAILED, NIGHTLY_STEPS, OK, SKIPPED, InlineExecutor, Step,
+    run_dag, run_nightly_etl, select_steps, validate_steps,
+)
+
+GRAPH = (
+    Step('a', 'cmd_a'),
+    Step('b', 'cmd_b'),
+    Step('c', 'cmd_c', ('a',)),
+    Step('d', 'cmd_d', ('c',)),
+    Step('e', 'cmd_e', ('b',)),
+)
+
+
+def _fake(failing=()):
+    def execute(step):
+        return {'status': FAILED if step.name in failing else OK, 'seconds': 0, 'error': None}
+    return execute
+
+
+class RunDagTests(SimpleTestCase):
+    def test_nightly_graph_is_valid(self):
+        validate_steps(NIGHTLY_STEPS)
+
+    def test_rejects_dependencies_declared_later(self):
+        with self.assertRaises(ValueError):
+            validate_steps((Step('x', 'cmd', ('y',)), Step('y', 'cmd')))
+
+    def test_failure_skips_only_its_dependents(self):
+        results = run_dag(GRAPH, InlineExecutor(), execute=_fake(failing={'a'}))
+        self.assertEqual({name: r['status'] for name, r in results.items()},
+                         {'a': FAILED, 'b': OK, 'c': SKIPPED, 'd': SKIPPED, 'e': OK})
+        self.assertEqual(results['d']['blocked_by'], ['c'])
+
+    def test_independent_branches_run_concurrently(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def execute(step):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+            return {'status': OK}
+
+        results = run_dag(GRAPH, ThreadPoolExecutor(max_workers=2), execute=execute)
+        self.assertTrue(all(r['status'] == OK for r in results.values()))
+        self.assertEqual(state['peak'], 2)
+
+    def test_steps_on_the_same_airtable_base_take_turns(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def execute(step):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+            return {'status': OK}
+
+        steps = (Step('x', 'cmd_x', base_env='BASE_X'), Step('y', 'cmd_y', base_env='BASE_Y'))
+        with patch.dict('os.environ', {'BASE_X': 'appShared', 'BASE_Y': 'appShared'}):
+            results = run_dag(steps, ThreadPoolExecutor(max_workers=2), execute=execute)
+        self.assertTrue(all(r['status'] == OK for r in results.values()))
+        self.assertEqual(state['peak'], 1)
+
+    def test_select_steps_pulls_in_dependencies(self):
+        steps = select_steps(GRAPH, only=['d'])
+        self.assertEqual([s.name for s in steps], ['a', 'c', 'd'])
+        steps = select_steps(GRAPH, skip=['a'])
+        self.assertEqual(steps[1], Step('c', 'cmd_c'))
+        with self.assertRaises(ValueError):
+            select_steps(GRAPH, only=['nope'])
+
+
+class RunNightlyEtlTests(TestCase):
+    STEPS = (
+        Step('schools', 'sync_airtable_schools', sync_type='schools'),
+        Step('youth', 'sync_airtable_youth', ('schools',), sync_type='youth'),
+        Step('zazi_overview', 'refresh_zazi_overview'),
+    )
+
+    def _call_command(self, failing_sync=None):
+        def fake(command, *args, **kwargs):
+            step = next(s for s in self.STEPS if s.command == command)
+            if step.sync_type:
+                log = AirtableSyncLog.objects.create(sync_type=step.sync_type)
+                # Like the sync commands: the failure is recorded, not raised.
+                log.mark_complete(success=step.sync_type != failing_sync, error_message='boom')
+        return fake
+
+    def test_records_per_step_timing_on_the_run_log(self):
+        with patch('django.core.management.call_command', side_effect=self._call_command()):
+            log = run_nightly_etl(self.STEPS, workers=1)
+        self.assertEqual(log.sync_type, 'nightly_etl')
+        self.assertTrue(log.success)
+        self.assertEqual(log.details['counts'], {OK: 3, FAILED: 0, SKIPPED: 0})
+        self.assertIn('seconds', log.details['steps']['youth'])
+
+    def test_failed_sync_log_fails_the_step_and_skips_dependents(self):
+        with patch('django.core.management.call_command', side_effect=self._call_command('schools')):
+            log = run_nightly_etl(self.STEPS, workers=1)
+        steps = log.details['steps']
+        self.assertEqual(steps['schools'], {**steps['schools'], 'status': FAILED, 'error': 'boom'})
+        self.assertEqual(steps['youth']['status'], SKIPPED)
+        self.assertEqual(steps['zazi_overview']['status'], OK)
+        self.assertFalse(log.success)
+        self.assertEqual(log.error_message, 'Failed steps: schools')
+
+    def test_command_lists_the_graph(self):
+        out = StringIO()
+        call_command('run_nightly_etl', '--list', '--only', 'resolve_session_fks', stdout=out)
+        self.assertIn('resolve_session_fks: resolve_session_fks  <- literacy_sessions, numeracy_sessions',
+                      out.getvalue())
+        self.assertNotIn('zazi_overview', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('run_nightly_etl', '--only', 'nope')
@@ -0,0 +1,103 @@
+"""Tests for the API response cache (api/response_cache.py).
+
+The suite runs with a dummy cache (see masi_website/test_runner.py), so
+these opt in to a local memory cache and clear it per test.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models import AirtableSyncLog, PublishedStat, School
+from api.response_cache import EDITS, EditGenerationMiddleware, bump_generation, current_generations
+from masi_website.test_runner import LOCMEM
+
+
+def _stat(key):
+    return PublishedStat.objects.create(
+        key=key, value="1", label=key, source_system="s", population="p",
+        comparison_type="none", as_of="2026-06-01", methodology_note="n", is_published=True,
+    )
+
+
+@override_settings(CACHES=LOCMEM)
+class CachedResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_second_hit_is_served_from_cache_until_a_bump(self):
+        _stat("first")
+        first = self.client.get("/api/impact/published-stats/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        _stat("second")  # written behind the cache's back (no request, no bump)
+        again = self.client.get("/api/impact/published-stats/")
+        self.assertEqual(again["X-Cache"], "HIT")
+        self.assertEqual(list(again.json()["stats"]), ["first"])
+
+        bump_generation(EDITS)
+        fresh = self.client.get("/api/impact/published-stats/")
+        self.assertEqual(fresh["X-Cache"], "MISS")
+        self.assertEqual(sorted(fresh.json()["stats"]), ["first", "second"])
+
+    def test_sync_completion_invalidates(self):
+        self.client.force_authenticate(User.objects.create_user("u", password="x"))
+        School.objects.create(name="A")
+        self.client.get("/api/etl-status/")
+        School.objects.create(name="B")
+        self.assertEqual(self.client.get("/api/etl-status/")["X-Cache"], "HIT")
+
+        AirtableSyncLog.objects.create(sync_type="schools").mark_complete(success=True)
+        res = self.client.get("/api/etl-status/")
+        self.assertEqual(res["X-Cache"], "MISS")
+        schools = next(t for t in res.json()["tables"] if t["name"] == "schools")
+        self.assertEqual(schools["record_count"], 2)
+
+    def test_query_params_and_role_are_part_of_the_key(self):
+        admin = User.objects.create_user("admin", password="x")
+        admin.profile.role = "ADMIN"
+        admin.profile.save()
+        self.client.force_authenticate(admin)
+        self.client.get("/api/etl-status/")
+        self.assertEqual(self.client.get("/api/etl-status/?x=1")["X-Cache"], "MISS")
+        self.assertEqual(self.client.get("/api/etl-status/?x=1")["X-Cache"], "HIT")
+
+        self.client.force_authenticate(User.objects.create_user("other", password="x"))
+        self.assertEqual(self.client.get("/api/etl-status/")["X-Cache"], "MISS")
+
+    def test_error_responses_are_not_cached(self):
+        admin = User.objects.create_user("admin", password="x")
+        admin.profile.role = "ADMIN"
+        admin.profile.save()
+        self.client.force_authenticate(admin)
+        res = self.client.get("/api/wig/lead-measures/?period=decade")
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(res.has_header("X-Cache"))
+
+
+class GenerationTests(TestCase):
+    def test_bump_counts_from_zero(self):
+        self.assertEqual(current_generations(("sync", EDITS)), (0, 0))
+        bump_generation(EDITS)
+        bump_generation(EDITS)
+        self.assertEqual(current_generations(("sync", EDITS)), (0, 2))
+
+    def test_middleware_bumps_on_successful_writes_only(self):
+        factory = RequestFactory()
+        ok = EditGenerationMiddleware(lambda request: HttpResponse(status=201))
+        failed = EditGenerationMiddleware(lambda request: HttpResponse(status=400))
+        ok(factory.get("/api/x/"))
+        failed(factory.post("/api/x/"))
+        self.assertEqual(current_generations((EDITS,)), (0,))
+        ok(factory.post("/admin/api/school/1/change/"))
+        self.assertEqual(current_generations((EDITS,)), (1,))
+
+    def test_middleware_ignores_login_and_logout(self):
+        factory = RequestFactory()
+        ok = EditGenerationMiddleware(lambda request: HttpResponse(status=302))
+        for path in ("/accounts/login/", "/accounts/logout/", "/admin/login/", "/admin/logout/"):
+            ok(factory.post(path))
+        self.assertEqual(current_generations((EDITS,)), (0,))
+        ok(factory.post("/dashboard/youth/1/edit/"))
+        self.assertEqual(current_generations((EDITS,)), (1,))
@@ -387,6 +387,19 @@ class MasiChildIdentitiesTests(TestCase):
         ids = masi_child_identities("SCH-09200", 2026)
         self.assertEqual(ids["numeracy"], set())
 
+    def test_bulk_load_matches_per_school(self):
+        from api.school_programme import masi_child_identities, masi_child_identities_by_school
+
+        self._lit(session_date="2026-02-01", child_uid_1="CH-1", child_uid_2="CH-2")
+        self._lit(session_date="2025-02-01", child_uid_1="CH-OLD")
+        self._num(session_date="2026-02-01", child_uids=["CH-5", ""])
+        self._num(source_airtable_id="other-1", school_uid="SCH-OTHER",
+                  session_date="2026-02-01", child_uids=["CH-X"])
+        with self.assertNumQueries(2):
+            by_uid = masi_child_identities_by_school(2026)
+        self.assertEqual(by_uid["SCH-09200"], masi_child_identities("SCH-09200", 2026))
+        self.assertEqual(by_uid["SCH-OTHER"]["numeracy"], {"CH-X"})
+
 
 class ComputePctFemaleTests(TestCase):
     """pct_female from CanonicalChild.gender. Prod uses 'F' / 'M', mostly blank."""
@@ -445,6 +458,20 @@ class ComputePctFemaleTests(TestCase):
 
         self.assertIsNone(compute_pct_female(set()))
 
+    def test_preloaded_index_answers_without_queries(self):
+        from api.school_programme import ChildAttributeIndex, compute_pct_female
+
+        self._child("CH-1", " female ")
+        self._child("CH-2", "m")
+        self._child("CH-3", "")
+        self._child("CH-4", "X")
+        index = ChildAttributeIndex.load()
+        self.assertEqual((index.female, index.male), ({"CH-1"}, {"CH-2"}))
+        with self.assertNumQueries(0):
+            self.assertEqual(compute_pct_female({"CH-1", "CH-2", "CH-3"}, index=index), 50.0)
+            self.assertEqual(compute_pct_female(["CH-1", "CH-UNKNOWN"], index=index), 100.0)
+            self.assertIsNone(compute_pct_female({"CH-3", "CH-4"}, index=index))
+
 
 class ProgrammesFromSiteTypeTests(SimpleTestCase):
     """site_type is a comma-joined programme-membership list -- a non-authoritative
@@ -738,6 +765,40 @@ class RefreshGridTests(TestCase):
         ).count()
         self.assertEqual(count_after_first, count_after_second)
 
+    def test_rerun_updates_in_place(self):
+        from api.models import SchoolProgrammeYear
+        from api.school_programme import refresh_school_programme_grid
+
+        self._lit(child_uid_1="CH-1")
+        first = refresh_school_programme_grid(self.YEAR)
+        self._lit(child_uid_1="CH-2")
+        second = refresh_school_programme_grid(self.YEAR)
+        self.assertEqual(second["rows_created"], 0)
+        self.assertEqual(second["rows_updated"], first["rows_created"])
+        lit = SchoolProgrammeYear.objects.get(
+            school=self.primary, programme="masi_literacy", year=self.YEAR
+        )
+        self.assertEqual(lit.children_count, 2)
+
+    def test_query_count_does_not_grow_with_schools(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api.models import School
+        from api.school_programme import refresh_school_programme_grid
+
+        self._lit(child_uid_1="CH-1")
+        refresh_school_programme_grid(self.YEAR)
+        with CaptureQueriesContext(connection) as few:
+            refresh_school_programme_grid(self.YEAR)
+        for n in range(5):
+            School.objects.create(name=f"Extra {n}", school_uid=f"SCH-0940{n}",
+                                  type="ECDC", site_type="Literacy", is_active=True)
+        refresh_school_programme_grid(self.YEAR)
+        with CaptureQueriesContext(connection) as many:
+            refresh_school_programme_grid(self.YEAR)
+        self.assertEqual(len(many), len(few))
+
 
 class RefreshGridCommandTests(TestCase):
     """The nightly management command: AirtableSyncLog logging + fail-closed."""
@@ -1077,9 +1138,10 @@ class FetchSchoolProgrammeExportTests(SimpleTestCase):
         from unittest.mock import patch, MagicMock
         from api import zazi_client
 
+        zazi_client.client.reset()
         with patch.dict("os.environ", {"ZAZI_API_BASE_URL": "http://zz.test",
                                        "ZAZI_INTERNAL_API_SECRET": "sek"}):
-            with patch("api.zazi_client.requests.get") as mget:
+            with patch("api.zazi_client.requests.Session.get") as mget:
                 resp = MagicMock()
                 resp.json.return_value = {"schools": []}
                 mget.return_value = resp
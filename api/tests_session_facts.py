@@ -0,0 +1,187 @@
+"""Tests for the SessionDayFact rollup (api/session_facts.py) and the
+youth-sessions endpoints that read it.
+
+Calendar anchor: 2026-06-01 is a Monday.
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.airtable_sync import SyncWindow
+from api.management.commands.sync_airtable_literacy_sessions_2026 import Command as LiteracySync
+from api.models import AirtableSyncLog, LiteracySession2026, NumeracySession2026, School, SessionDayFact, Youth
+from api.session_facts import drifted_dates, refresh_session_facts, sync_session_facts
+
+MON, TUE, WED = date(2026, 6, 1), date(2026, 6, 2), date(2026, 6, 3)
+
+
+class FactFixture(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="P", type="Primary School", school_uid="SCH-P")
+        self.ecd = School.objects.create(name="E", type="ECDC", school_uid="SCH-E")
+        self.lit = Youth.objects.create(
+            employee_id=1, first_names="L", last_name="One", youth_uid="YTH-1",
+            job_title="Literacy Coach", school=self.school, employment_status="Active")
+        self.num = Youth.objects.create(
+            employee_id=2, first_names="N", last_name="Two", youth_uid="YTH-2",
+            job_title="Numeracy Coach", school=self.ecd, employment_status="Active")
+        self._n = 0
+
+    def lit_session(self, day, youth=None, school=None):
+        youth, school = youth or self.lit, school or self.school
+        self._n += 1
+        return LiteracySession2026.objects.create(
+            source_airtable_id=f"lit{self._n}", session_date=day,
+            youth=youth, youth_uid=youth.youth_uid, school=school, school_uid=school.school_uid)
+
+    def num_session(self, day):
+        self._n += 1
+        return NumeracySession2026.objects.create(
+            source_airtable_id=f"num{self._n}", session_date=day,
+            youth=self.num, youth_uid="YTH-2", school=self.ecd, school_uid="SCH-E")
+
+
+class RefreshTests(FactFixture):
+    def test_rebuild_rolls_up_per_day_youth_school(self):
+        self.lit_session(MON)
+        self.lit_session(MON)
+        self.lit_session(TUE)
+        self.lit_session(None)
+        out = StringIO()
+        call_command("rebuild_session_facts", stdout=out)
+        self.assertIn("literacy: 3 fact rows", out.getvalue())
+        counts = dict(SessionDayFact.objects.filter(programme="literacy").values_list("date", "session_count"))
+        self.assertEqual(counts, {MON: 2, TUE: 1, None: 1})
+
+    def test_refresh_of_some_dates_leaves_others(self):
+        self.lit_session(MON)
+        refresh_session_facts("literacy")
+        self.lit_session(TUE)
+        LiteracySession2026.objects.filter(session_date=MON).delete()
+        refresh_session_facts("literacy", {TUE})
+        self.assertEqual(
+            dict(SessionDayFact.objects.values_list("date", "session_count")), {MON: 1, TUE: 1})
+        self.assertEqual(drifted_dates("literacy"), {MON})
+        out = StringIO()
+        call_command("rebuild_session_facts", "--check", stdout=out)
+        self.assertIn("literacy: 1 drifted dates (2026-06-01)", out.getvalue())
+        self.assertEqual(SessionDayFact.objects.get(date=MON).session_count, 1)  # nothing rebuilt
+
+    def test_incremental_sync_refreshes_touched_and_previous_dates(self):
+        moved = self.lit_session(MON)
+        self.lit_session(TUE)
+        refresh_session_facts("literacy")
+        started = timezone.now()
+        moved.session_date = WED  # edited in Airtable: moved to another day
+        moved.save()
+        window = SyncWindow(started_at=started, full=False, since=started)
+        refreshed = sync_session_facts("literacy", window, previous_dates={MON})
+        self.assertEqual(refreshed, 2)  # WED (touched) + MON (moved away from)
+        self.assertEqual(
+            dict(SessionDayFact.objects.values_list("date", "session_count")), {TUE: 1, WED: 1})
+        self.assertEqual(drifted_dates("literacy"), set())
+
+    def test_incremental_command_clears_the_date_a_session_left(self):
+        self.lit_session(MON)  # source_airtable_id "lit1"
+        self.lit_session(TUE)
+        refresh_session_facts("literacy")
+        AirtableSyncLog.objects.create(sync_type="literacy_sessions_2026", success=True, full_sweep=True,
+                                       high_water_mark=timezone.now() - timedelta(hours=1))
+        env = {"AIRTABLE_LITERACY_2026_BASE_ID": "app", "AIRTABLE_LITERACY_2026_TABLE_ID": "tbl",
+               "AIRTABLE_TOKEN": "tok"}
+        moved = [{"id": "lit1", "fields": {"Session Date": "2026-06-03"}}]
+        with patch.dict("os.environ", env), \
+                patch.object(LiteracySync, "fetch_pages", return_value=iter([moved])):
+            LiteracySync(stdout=StringIO()).handle(dry_run=False, verbose=False, full=False, allow_prune=False)
+        self.assertEqual(
+            dict(SessionDayFact.objects.values_list("date", "session_count")), {TUE: 1, WED: 1})
+
+    def test_full_window_rebuilds(self):
+        self.lit_session(MON)
+        SessionDayFact.objects.create(date=TUE, programme="literacy", session_count=9)
+        self.assertIsNone(sync_session_facts("literacy", SyncWindow(started_at=timezone.now(), full=True)))
+        self.assertEqual(list(SessionDayFact.objects.values_list("date", flat=True)), [MON])
+
+    def test_youth_delete_nulls_fact_fk_like_the_sessions(self):
+        self.lit_session(MON)
+        refresh_session_facts("literacy")
+        self.lit.delete()
+        self.assertIsNone(SessionDayFact.objects.get().youth_id)
+
+
+class FactBackedEndpointTests(FactFixture):
+    """The endpoints answer from the rollup with the same numbers the raw
+    tables would give."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("u", password="x"))
+        self.now = datetime(2026, 6, 3, 12, 0, tzinfo=dt_timezone.utc)  # Wed
+        for day in (MON, TUE, WED, WED):
+            self.lit_session(day)
+        for day in (TUE, WED):
+            self.num_session(day)
+        self.lit_session(WED, school=self.ecd)
+        call_command("rebuild_session_facts", stdout=StringIO())
+
+    def _get(self, url):
+        with patch("api.views.youth_sessions.timezone.now", return_value=self.now):
+            return self.client.get(url).data
+
+    def test_summary(self):
+        data = self._get("/api/youth-sessions/summary/")
+        self.assertEqual(data["total_sessions_today"], 4)
+        self.assertEqual(data["total_sessions_this_week"], 7)
+        self.assertEqual(data["active_youth_today"], 2)
+        self.assertEqual(data["schools_covered_today"], 2)
+        self.assertEqual(data["literacy_sessions"], 5)
+        self.assertEqual(data["numeracy_sessions"], 2)
+        self.assertEqual(data["avg_sessions_per_youth_this_week"], 3.5)
+
+    def test_summary_programme_filter(self):
+        data = self._get("/api/youth-sessions/summary/?programme=numeracy")
+        self.assertEqual((data["total_sessions_this_week"], data["literacy_sessions"]), (2, 0))
+
+    def test_daily_activity_by_school_type(self):
+        data = self._get("/api/youth-sessions/daily-activity/?date_from=2026-06-01&date_to=2026-06-03")
+        wed = data["data"][-1]
+        self.assertEqual((wed["primary_school"], wed["ecd"], wed["total"]), (2, 2, 4))
+
+    def test_school_coverage_keeps_per_programme_youth_count(self):
+        data = self._get("/api/youth-sessions/school-coverage/?date_from=2026-06-01")
+        by_uid = {row["school_uid"]: row for row in data["covered"]}
+        self.assertEqual(by_uid["SCH-E"]["session_count"], 3)
+        self.assertEqual(by_uid["SCH-E"]["youth_count"], 1)  # max(lit 1, num 1), not union 2
+
+    def test_uncovered_school_reports_last_session(self):
+        data = self._get(f"/api/youth-sessions/school-coverage/?date_from={WED + timedelta(days=1)}")
+        last = {row["school_uid"]: row["last_session_date"] for row in data["uncovered"]}
+        self.assertEqual(last, {"SCH-P": "2026-06-03", "SCH-E": "2026-06-03"})
+
+
+class SummaryCountsTests(FactFixture):
+    """_summary_counts is one query and reproduces the old per-card numbers,
+    including a missing school uid counting as one covered "school"."""
+
+    def test_one_query_and_null_uids_count_once(self):
+        from api.views.youth_sessions import _get_fact_queryset, _summary_counts
+
+        self.lit_session(WED)
+        LiteracySession2026.objects.create(
+            source_airtable_id="noschool", session_date=WED, youth=self.lit, youth_uid="YTH-1")
+        self.num_session(TUE)
+        refresh_session_facts("literacy")
+        refresh_session_facts("numeracy")
+        with self.assertNumQueries(1):
+            counts = _summary_counts(_get_fact_queryset({}), WED)
+        self.assertEqual(counts, {
+            'today': 2, 'week': 3, 'month': 3, 'literacy': 2, 'numeracy': 1,
+            'youth_today': 1, 'youth_week': 2, 'schools_today': 2,
+        })
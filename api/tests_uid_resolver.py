@@ -0,0 +1,77 @@
+"""Tests for the shared UID -> id lookups (api/uid_resolver.py) and the
+set-based resolve_session_fks command."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.management.commands.sync_airtable_children import Command as ChildrenSync
+from api.models import CanonicalChild, LiteracySession2026, NumeracySession2026, School, Youth
+from api.response_cache import SYNC, current_generations
+from api.uid_resolver import UidIndex
+
+
+class UidIndexTests(TestCase):
+    def setUp(self):
+        self.youth = Youth.objects.create(employee_id=1, first_names='A', last_name='B', youth_uid='YTH-1')
+        Youth.objects.create(employee_id=2, first_names='C', last_name='D')  # no UID
+        self.index = UidIndex(Youth, 'youth_uid')
+
+    def test_loads_uid_id_pairs(self):
+        self.assertEqual(self.index.refresh(), {'YTH-1': self.youth.id})
+
+    def test_refresh_picks_up_new_and_renamed_uids(self):
+        ids = self.index.refresh()
+        self.youth.youth_uid = 'YTH-9'
+        self.youth.save()
+        other = Youth.objects.create(employee_id=3, first_names='E', last_name='F', youth_uid='YTH-3')
+        self.index.refresh()
+        self.assertEqual(ids, {'YTH-9': self.youth.id, 'YTH-3': other.id})
+
+    def test_refresh_reads_only_changed_rows(self):
+        self.index.refresh()
+        with CaptureQueriesContext(connection) as ctx:
+            self.index.refresh()
+        # count check, newest stamp, changed rows -- no full reload
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertIn('updated_at', ctx.captured_queries[-1]['sql'])
+
+    def test_sync_bulk_update_rename_is_seen(self):
+        # The canonical syncs rewrite UIDs with bulk_update, which skips auto_now.
+        child = CanonicalChild.objects.create(source_airtable_id='rec1', child_uid='CH-1', mcode=1)
+        index = UidIndex(CanonicalChild, 'child_uid')
+        ids = index.refresh()
+        ChildrenSync().bulk_upsert([{'id': 'rec1', 'fields': {'Mcode': 1, 'Child UID': 'CH-9'}}])
+        index.refresh()
+        self.assertEqual(ids, {'CH-9': child.id})
+
+    def test_deleted_row_forces_a_reload(self):
+        self.index.refresh()
+        self.youth.delete()
+        self.assertEqual(self.index.refresh(), {})
+
+
+class ResolveSessionFksTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='S', school_uid='SCH-1')
+        self.youth = Youth.objects.create(employee_id=1, first_names='A', last_name='B', youth_uid='YTH-1')
+        self.child = CanonicalChild.objects.create(source_airtable_id='c1', child_uid='CH-1', mcode=1)
+
+    def test_resolves_each_column_in_sql(self):
+        LiteracySession2026.objects.create(
+            source_airtable_id='l1', youth_uid='YTH-1', school_uid='SCH-1',
+            child_uid_1='CH-1', child_uid_2='CH-404')
+        NumeracySession2026.objects.create(source_airtable_id='n1', youth_uid='YTH-1', school_uid='SCH-X')
+        out = StringIO()
+        call_command('resolve_session_fks', stdout=out)
+
+        lit = LiteracySession2026.objects.get()
+        self.assertEqual((lit.youth_id, lit.school_id, lit.child_1_id, lit.child_2_id),
+                         (self.youth.id, self.school.id, self.child.id, None))
+        num = NumeracySession2026.objects.get()
+        self.assertEqual((num.youth_id, num.school_id), (self.youth.id, None))
+        self.assertIn('child_2: updated=0, resolved=0, orphaned=1', out.getvalue())
+        self.assertIn('school: updated=0, resolved=0, orphaned=1', out.getvalue())
+        self.assertEqual(current_generations([SYNC]), (1,))  # cached WIG responses dropped
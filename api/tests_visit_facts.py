@@ -0,0 +1,159 @@
+"""Tests for the unified visit query layer (api/visit_facts.py), the
+recent-visits feed and the mentor dashboards built on it."""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import MentorVisit, NumeracyVisit, School, ThousandStoriesVisit, YeboVisit
+from api.visit_facts import VisitFacts, decode_cursor, encode_cursor, feed_key, time_filter_start
+
+
+class VisitFactsTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='Alpha', type='Primary School',
+                                            latitude=-33.9, longitude=18.4)
+        self.other = School.objects.create(name='Beta', type='ECD')
+        self.mentor = User.objects.create(username='m1', first_name='Ann', last_name='Lee')
+        self.mentor2 = User.objects.create(username='m2')
+        MentorVisit.objects.create(mentor=self.mentor, school=self.school,
+                                   visit_date=date(2026, 3, 2), quality_rating=8, commentary='lit')
+        MentorVisit.objects.create(mentor=self.mentor, school=self.school,
+                                   visit_date=date(2026, 3, 9), quality_rating=6)
+        YeboVisit.objects.create(mentor=self.mentor2, school=self.other,
+                                 visit_date=date(2026, 3, 10), afternoon_session_quality=7,
+                                 commentary='yebo')
+        ThousandStoriesVisit.objects.create(mentor=self.mentor, school=self.other,
+                                            visit_date=date(2026, 2, 1), story_time_quality=9,
+                                            other_comments='stories')
+        NumeracyVisit.objects.create(mentor=self.mentor2, school=self.school,
+                                     visit_date=date(2026, 3, 5), quality_rating=5)
+
+    def test_recent_merges_programmes_newest_first_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = VisitFacts().recent(3)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual([r['programme'] for r in rows], ['yebo', 'literacy', 'numeracy'])
+        self.assertEqual(rows[0]['quality'], 7)
+        self.assertEqual(rows[0]['school_name'], 'Beta')
+
+    def test_filters_apply_to_every_branch(self):
+        facts = VisitFacts(since=date(2026, 3, 3), mentor_id=self.mentor2.id)
+        self.assertEqual({r['programme'] for r in facts.rows()}, {'yebo', 'numeracy'})
+        facts = VisitFacts(school_id=self.other.id, programmes=['stories'])
+        self.assertEqual([r['comments'] for r in facts.rows()], ['stories'])
+
+    def test_grouped_aggregates(self):
+        facts = VisitFacts()
+        with CaptureQueriesContext(connection) as ctx:
+            by_quality = facts.counts_by_quality()
+            per_school = facts.per_school()
+            summary = facts.summary(date(2026, 3, 6))
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertEqual(by_quality['literacy'], {8: 1, 6: 1})
+        self.assertEqual(per_school['literacy'], {self.school.id: (2, 7.0)})
+        self.assertEqual(per_school['numeracy'], {self.school.id: (1, 5.0)})
+        self.assertEqual(summary['literacy'], {'total': 2, 'recent': 1, 'avg_quality': 7.0})
+        self.assertEqual(summary['stories']['recent'], 0)
+        self.assertEqual(sum(facts.counts_by_period('month')['literacy'].values()), 2)
+
+    def test_latest_per_school_and_activity(self):
+        latest = VisitFacts().latest_per_school()
+        self.assertEqual(latest[self.school.id]['programme'], 'literacy')
+        self.assertEqual(latest[self.school.id]['visit_date'], date(2026, 3, 9))
+        self.assertEqual(latest[self.other.id]['programme'], 'yebo')
+        self.assertEqual(VisitFacts().school_ids(), {self.school.id, self.other.id})
+        self.assertEqual(VisitFacts().mentor_ids(), {self.mentor.id, self.mentor2.id})
+
+        activity = VisitFacts(since=date(2026, 3, 1)).activity()
+        self.assertEqual(activity[(self.mentor2.id, date(2026, 3, 10))], {'yebo'})
+        self.assertNotIn((self.mentor.id, date(2026, 2, 1)), activity)
+
+    def test_pages_walk_the_whole_feed_in_order(self):
+        # Same visit_date and created_at across programmes: ties break on programme, then id
+        stamp = timezone.now()
+        for model in (MentorVisit, YeboVisit, NumeracyVisit):
+            model.objects.update(created_at=stamp)
+        expected = [feed_key(row) for row in VisitFacts().recent(100)]
+
+        seen, after = [], None
+        while True:
+            with CaptureQueriesContext(connection) as ctx:
+                rows, after = VisitFacts().page(2, after=after)
+            self.assertLessEqual(len(ctx.captured_queries), 4)
+            seen.extend(feed_key(row) for row in rows)
+            if after is None:
+                break
+            after = decode_cursor(encode_cursor(after))
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 5)
+
+    def test_cursor_rejects_garbage(self):
+        for cursor in ('nope', encode_cursor((date(2026, 1, 1), timezone.now(), 'literacy', 1))[:-3]):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_time_filter_start(self):
+        today = date(2026, 6, 15)
+        self.assertEqual(time_filter_start('7days', today), date(2026, 6, 8))
+        self.assertEqual(time_filter_start('thisyear', today), date(2026, 1, 1))
+        self.assertIsNone(time_filter_start('all', today))
+
+
+class VisitViewsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='pw',
+                                             first_name='Vee', last_name='Ewer')
+        school = School.objects.create(name='Alpha', type='Primary School',
+                                       latitude=-33.9, longitude=18.4)
+        today = timezone.now().date()
+        MentorVisit.objects.create(mentor=self.user, school=school, visit_date=today,
+                                   quality_rating=8, commentary='fresh')
+        YeboVisit.objects.create(mentor=self.user, school=school,
+                                 visit_date=today - timedelta(days=40), afternoon_session_quality=4)
+
+    def test_recent_visits_keeps_its_payload(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        body = api.get('/api/recent-visits/?time_filter=30days').json()
+        self.assertEqual(body['total_count'], 1)
+        visit = body['visits'][0]
+        self.assertEqual(visit['program_name'], 'MASI Literacy')
+        self.assertEqual(visit['program_type'], 'literacy')
+        self.assertTrue(visit['id'].startswith('literacy-'))
+        self.assertEqual(visit['comments'], 'fresh')
+        self.assertEqual(visit['mentor_name'], 'Vee Ewer')
+
+    def test_visit_feed_pages_with_cursors(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        first = api.get('/api/recent-visits/feed/?page_size=1').json()
+        self.assertEqual([v['program_type'] for v in first['visits']], ['literacy'])
+        second = api.get(f"/api/recent-visits/feed/?page_size=1&cursor={first['next']}").json()
+        self.assertEqual([v['program_type'] for v in second['visits']], ['yebo'])
+        # Yebo filled its page_size, so only the next read can tell it is exhausted
+        last = api.get(f"/api/recent-visits/feed/?page_size=1&cursor={second['next']}").json()
+        self.assertEqual(last, {'visits': [], 'next': None})
+        self.assertEqual(api.get('/api/recent-visits/feed/?cursor=zz').status_code, 400)
+
+    def test_mentor_dashboard_renders_from_the_union(self):
+        self.client.force_login(self.user)
+        res = self.client.get('/dashboard/mentor-dashboard/')
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('error_message', res.context)
+        self.assertEqual(res.context['combined_summary']['total_visits'], 2)
+        self.assertEqual(res.context['schools_last_visited'][0]['visit_type'], 'Literacy')
+
+    def test_literacy_dashboard_activity_grid(self):
+        self.client.force_login(self.user)
+        res = self.client.get('/dashboard/literacy/')
+        self.assertEqual(res.status_code, 200)
+        row = res.context['visit_activity'][0]
+        self.assertEqual(row['mentor_name'], 'Vee Ewer')
+        today = [day for day in row['activity'] if day['date'] == timezone.now().date()]
+        if today:  # the grid only lists weekdays
+            self.assertEqual(today[0]['visit_types'], ['Literacy'])
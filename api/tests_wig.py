@@ -1,15 +1,18 @@
 """Tests for the WIG dashboard metric service (api/wig_metrics.py)."""
-from datetime import datetime, date, timezone as dt_timezone
+from datetime import datetime, date, timedelta, timezone as dt_timezone
 from unittest.mock import patch
 
 from django.contrib.auth.models import User, AnonymousUser
+from django.db import connection
 from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIRequestFactory, APIClient
 
 from api.models import (
     School, Youth, LiteracySession2026, NumeracySession2026, MentorVisit, CanonicalChild,
-    ZaziOverviewSnapshot,
+    ZaziOverviewSnapshot, DataQualityFlag,
 )
+from api.data_quality import dq_page, refresh_dq_flags
 from api.permissions import IsAdminOrProjectManager
 from api.zazi_client import build_zazi_measures, refresh_zazi_snapshot
 from api.wig_detail import build_wig_detail
@@ -29,6 +32,8 @@ from api.wig_metrics import (
     site_job_mismatch,
     build_lead_measures,
     build_data_quality,
+    ProgrammeWindow,
+    _first_session_by_coach,
     visit_compliance,
     school_visits,
     child_fk_resolution,
@@ -345,6 +350,21 @@ class DataQualityTests(TestCase):
         self.assertEqual(m['denominator'], 4)  # 2 sessions x 2 slots
         self.assertEqual(m['value'], 0.75)
 
+    def test_payload_is_one_aggregate_query_per_table(self):
+        self._lit(1, delay=0, dup='Duplicate')
+        self._lit(2, delay=9)
+        Youth.objects.create(employee_id=1, first_names='A', last_name='1',
+                             job_title='ZZ ECD Coach', school=self.primary)
+        Youth.objects.create(employee_id=2, first_names='B', last_name='2', job_title='Literacy Coach')
+        with CaptureQueriesContext(connection) as ctx:
+            dq = build_data_quality()['measures']
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual((dq['dq.capture_on_time']['numerator'], dq['dq.capture_on_time']['denominator']), (1, 2))
+        self.assertEqual(dq['dq.duplicate_rate']['numerator'], 1)
+        self.assertEqual(dq['dq.child_fk_resolution']['numerator'], 0)
+        # The school-less youth still counts in the active denominator.
+        self.assertEqual((dq['dq.site_job_mismatch']['numerator'], dq['dq.site_job_mismatch']['denominator']), (1, 2))
+
 
 class VisitComplianceTests(TestCase):
     """% of observation visits where all tracker booleans are true. Attributed
@@ -411,6 +431,11 @@ class SchoolVisitsTests(TestCase):
         self.assertEqual(m['denominator'], 2)   # 2 mentors
         self.assertEqual(m['value'], 3.0)
 
+    def test_standalone_measure_loads_only_the_visits(self):
+        self._visit(self.m1, date(2026, 5, 20))
+        with self.assertNumQueries(1):  # no coach or session load
+            school_visits('core_literacy', self.START, self.END)
+
 
 class AssemblyTests(TestCase):
     """The endpoint payloads: a window envelope + measures keyed by source."""
@@ -435,6 +460,68 @@ class AssemblyTests(TestCase):
             self.assertIn(key, dq['measures'])
 
 
+class BatchedLeadMeasureTests(TestCase):
+    """build_lead_measures loads each programme once and derives every ring
+    from it; the numbers match the standalone measure functions."""
+
+    START = date(2026, 5, 18)
+    END = date(2026, 5, 24)
+
+    def setUp(self):
+        self.p1 = School.objects.create(name='P1', type='Primary School', school_uid='SCH-1')
+        self.p2 = School.objects.create(name='P2', type='Primary School', school_uid='SCH-2')
+        self.a = Youth.objects.create(employee_id=1, first_names='A', last_name='1',
+                                      job_title='Literacy Coach', school=self.p1, start_date=date(2026, 1, 1))
+        self.b = Youth.objects.create(employee_id=2, first_names='B', last_name='2',
+                                      job_title='Literacy Coach', school=self.p2, start_date=date(2026, 1, 1))
+        for i, day in enumerate((20, 21, 19)):
+            LiteracySession2026.objects.create(source_airtable_id=f's{i}', session_date=date(2026, 5, day),
+                                                youth=self.a, school=self.p1)
+        LiteracySession2026.objects.create(source_airtable_id='orphan', session_date=date(2026, 5, 20),
+                                            school=self.p1)
+        mentor = User.objects.create(username='mentor')
+        MentorVisit.objects.create(mentor=mentor, school=self.p1, visit_date=date(2026, 5, 20),
+                                   visit_type='observation', letter_trackers_correct=True,
+                                   reading_trackers_correct=True, sessions_correct=True, admin_correct=None)
+
+    def test_rings_match_the_standalone_measures(self):
+        payload = build_lead_measures(datetime(2026, 5, 30, 12, 0, tzinfo=dt_timezone.utc))
+        ms = payload['measures']
+        self.assertEqual(ms['core_literacy.sessions_per_day'],
+                         sessions_per_day('core_literacy', self.START, self.END))
+        self.assertEqual(ms['core_literacy.active_coaches'],
+                         active_coaches('core_literacy', self.START, self.END))
+        self.assertEqual(ms['core_literacy.school_coverage']['numerator'], 1)
+        self.assertEqual(ms['core_literacy.tracker_compliance'],
+                         visit_compliance('core_literacy', self.START, self.END))
+        self.assertEqual(ms['core_literacy.tracker_compliance']['incomplete_count'], 1)
+        self.assertEqual(ms['core_literacy.school_visits'],
+                         school_visits('core_literacy', self.START, self.END))
+        self.assertNotIn('timings_ms', payload)
+
+    def test_first_session_by_coach_matches_the_query(self):
+        window = ProgrammeWindow('core_literacy', self.START, self.END)
+        self.assertEqual(window.first_session_by_coach(),
+                         _first_session_by_coach('core_literacy', self.START, self.END))
+        self.assertEqual(window.first_session_by_coach(), {self.a.id: date(2026, 5, 19)})
+
+    def test_one_load_serves_every_ring(self):
+        window = ProgrammeWindow('core_literacy', self.START, self.END)
+        window.visit_compliance()
+        with self.assertNumQueries(0):
+            window.active_coaches()
+            window.school_coverage()
+            window.sessions_per_week()
+            window.school_visits()
+
+    def test_debug_adds_per_measure_timings(self):
+        payload = build_lead_measures(datetime(2026, 5, 30, 12, 0, tzinfo=dt_timezone.utc), debug=True)
+        timings = payload['timings_ms']
+        for key in payload['measures']:
+            self.assertIn(key, timings)
+        self.assertIn('numeracy.load', timings)
+
+
 class PermissionTests(TestCase):
     """WIG is leadership-only: ADMIN + PROJECT MANAGER, enforced server-side."""
 
@@ -492,6 +579,10 @@ class WigEndpointTests(TestCase):
         self.assertIn('window', body)
         self.assertIn('core_literacy.sessions_per_day', body['measures'])
 
+    def test_debug_flag_returns_timings(self):
+        r = self._client_as('dbg', 'ADMIN').get('/api/wig/lead-measures/?debug=1')
+        self.assertIn('core_literacy.load', r.json()['timings_ms'])
+
     def test_admin_can_request_month_period(self):
         r = self._client_as('period', 'ADMIN').get('/api/wig/lead-measures/?period=month')
         self.assertEqual(r.status_code, 200)
@@ -775,6 +866,39 @@ class WigDetailBuilderTests(TestCase):
         self.assertEqual(build_wig_detail('core_literacy', 'dq.duplicate_rate', DETAIL_REF)['kind'], 'none')
         self.assertEqual(build_wig_detail('data_team', 'dq.duplicate_rate', DETAIL_REF)['kind'], 'dq_records')
 
+    def test_dq_pages_the_stored_list_past_the_first_hundred(self):
+        for i in range(130):
+            self._lit(f'p{i}', date(2026, 1, 1) + timedelta(days=i), duplicate_status='Duplicate')
+        self.assertEqual(refresh_dq_flags(LiteracySession2026)['dq.duplicate_rate'], 130)
+        self._lit('late', date(2026, 6, 1), duplicate_status='Duplicate')  # after the refresh
+
+        first = build_wig_detail('data_team', 'dq.duplicate_rate', DETAIL_REF)
+        self.assertEqual(len(first['rows']), 100)
+        self.assertEqual(first['rows'][0]['session_date'], '2026-05-10')  # newest stored first
+        # One snapshot: the late row shows up after the next refresh.
+        self.assertEqual((first['total_flagged'], first['page']['total_rows']), (130, 130))
+        self.assertIsNotNone(first['refreshed_at'])
+
+        rest = build_wig_detail('data_team', 'dq.duplicate_rate', DETAIL_REF,
+                                after=first['page']['next_after'])
+        self.assertEqual(len(rest['rows']), 30)
+        self.assertEqual(rest['rows'][-1]['session_date'], '2026-01-01')
+        self.assertIsNone(rest['page']['next_after'])
+        by_offset = build_wig_detail('data_team', 'dq.duplicate_rate', DETAIL_REF, offset=100, limit=10)
+        self.assertEqual(by_offset['rows'], rest['rows'][:10])
+
+        table = LiteracySession2026._meta.db_table
+        with CaptureQueriesContext(connection) as ctx:
+            dq_page('dq.duplicate_rate', after=first['page']['next_after'])
+        self.assertFalse([q for q in ctx.captured_queries if table in q['sql']])  # no source recount
+
+    def test_dq_refresh_stores_slot_weights(self):
+        self._lit('w1', date(2026, 5, 20))
+        refresh_dq_flags()
+        self.assertEqual(DataQualityFlag.objects.get(measure='dq.child_fk_resolution').weight, 2)
+        d = build_wig_detail('data_team', 'dq.child_fk_resolution', DETAIL_REF)
+        self.assertEqual((d['total_flagged'], d['rows'][0]['unresolved']), (2, 'child_1, child_2'))
+
 
 class WigDetailEndpointTests(TestCase):
     """/api/wig/detail/ is role-gated and dispatches by measure key."""
@@ -797,3 +921,17 @@ class WigDetailEndpointTests(TestCase):
         r = self._client_as('dm', 'MENTOR').get(
             '/api/wig/detail/?programme=core_literacy&measure=core_literacy.school_coverage')
         self.assertEqual(r.status_code, 403)
+
+    def test_dq_paging_params(self):
+        client = self._client_as('dq', 'ADMIN')
+        for i in range(3):
+            LiteracySession2026.objects.create(source_airtable_id=f'q{i}', duplicate_status='Duplicate',
+                                               session_date=date(2026, 5, 1 + i))
+        r = client.get('/api/wig/detail/?programme=data_team&measure=dq.duplicate_rate&limit=2')
+        self.assertEqual(r.status_code, 200)
+        page = r.json()['page']
+        self.assertEqual((page['total_rows'], page['next_after']), (3, 1))
+        r = client.get(f"/api/wig/detail/?programme=data_team&measure=dq.duplicate_rate&after={page['next_after']}")
+        self.assertEqual([row['session_date'] for row in r.json()['rows']], ['2026-05-01'])
+        r = client.get('/api/wig/detail/?programme=data_team&measure=dq.duplicate_rate&offset=x')
+        self.assertEqual(r.status_code, 400)
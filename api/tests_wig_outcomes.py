@@ -677,11 +677,14 @@ class ZaziMergeTests(TestCase):
 
 
 class ZaziClientRequestTests(TestCase):
+    def setUp(self):
+        zazi_client.client.reset()
+
     @patch.dict("os.environ", {
         "ZAZI_API_BASE_URL": "https://zazi.example.test/base/",
         "ZAZI_INTERNAL_API_SECRET": "secret-123",
     })
-    @patch("api.zazi_client.requests.get")
+    @patch("api.zazi_client.requests.Session.get")
     def test_fetch_zazi_wig_outcomes_request_contract_and_success_json(self, get):
         response = Mock()
         response.json.return_value = {"ok": True}
@@ -703,7 +706,7 @@ class ZaziClientRequestTests(TestCase):
         "ZAZI_API_BASE_URL": "https://zazi.example.test",
         "ZAZI_INTERNAL_API_SECRET": "secret-123",
     })
-    @patch("api.zazi_client.requests.get")
+    @patch("api.zazi_client.requests.Session.get")
     def test_fetch_zazi_wig_outcomes_raises_http_errors(self, get):
         response = Mock()
         response.raise_for_status.side_effect = requests.HTTPError("500")
@@ -0,0 +1,107 @@
+"""Tests for the stored WIG board payloads (api/wig_snapshots.py) and the
+views that serve them.
+
+Calendar anchor: 2026-05-30 is a Saturday, so the board then shows the week
+ending Sunday 2026-05-24.
+"""
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import LiteracySession2026, School, WigSnapshot, Youth
+from api.response_cache import SYNC, current_generations
+from api.wig_metrics import build_lead_measures
+from api.wig_snapshots import (
+    DETAIL_MEASURES, lead_measures_snapshot, reference_for_week, refresh_week, refresh_wig_snapshots,
+    snapshot_week,
+)
+
+NOW = datetime(2026, 5, 30, 12, 0, tzinfo=dt_timezone.utc)
+WEEK = date(2026, 5, 24)
+
+
+class SnapshotRefreshTests(TestCase):
+    def setUp(self):
+        school = School.objects.create(name='P', type='Primary School', school_uid='SCH-P')
+        self.coach = Youth.objects.create(employee_id=1, first_names='A', last_name='1',
+                                          job_title='Literacy Coach', school=school,
+                                          start_date=date(2026, 1, 1))
+        LiteracySession2026.objects.create(source_airtable_id='s1', session_date=date(2026, 5, 20),
+                                            youth=self.coach, school=school)
+
+    def test_reference_for_week_points_the_board_at_that_week(self):
+        self.assertEqual(snapshot_week(reference_for_week(WEEK)), WEEK)
+        self.assertEqual(snapshot_week(reference_for_week(date(2026, 5, 20))), WEEK)
+        self.assertEqual(snapshot_week(NOW), WEEK)
+
+    def test_refresh_week_stores_board_and_every_ring(self):
+        written = refresh_week(NOW, periods=['week'])
+        self.assertEqual(written, 1 + len(DETAIL_MEASURES))
+        self.assertEqual(lead_measures_snapshot(NOW, 'week'), build_lead_measures(NOW, period='week'))
+
+    def test_refresh_overwrites_in_place(self):
+        refresh_week(NOW, periods=['week'])
+        LiteracySession2026.objects.create(source_airtable_id='late', session_date=date(2026, 5, 21),
+                                            youth=self.coach, school=self.coach.school)
+        refresh_week(NOW, periods=['week'])
+        self.assertEqual(WigSnapshot.objects.count(), 1 + len(DETAIL_MEASURES))
+        payload = lead_measures_snapshot(NOW, 'week')
+        self.assertEqual(payload['measures']['core_literacy.sessions_per_day']['numerator'], 2)
+
+    def test_command_refreshes_the_horizon(self):
+        out = StringIO()
+        with patch('api.management.commands.refresh_wig_snapshots.timezone.now', return_value=NOW):
+            call_command('refresh_wig_snapshots', '--weeks', '2', '--period', 'week', stdout=out)
+        self.assertIn('Week ending 2026-05-24', out.getvalue())
+        self.assertIn('Week ending 2026-05-17', out.getvalue())
+        self.assertEqual(
+            set(WigSnapshot.objects.values_list('week_ending', flat=True)),
+            {WEEK, date(2026, 5, 17)})
+
+    def test_refresh_invalidates_cached_responses(self):
+        before = current_generations([SYNC])
+        refresh_wig_snapshots(NOW, weeks=1, periods=['week'])
+        self.assertEqual(current_generations([SYNC])[0], before[0] + 1)
+
+
+class SnapshotServingTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(username='admin')
+        user.profile.role = 'ADMIN'
+        user.profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def _get(self, url):
+        with patch('api.views.wig.timezone.now', return_value=NOW):
+            return self.client.get(url)
+
+    def test_lead_measures_serve_the_stored_payload(self):
+        WigSnapshot.objects.create(kind=WigSnapshot.KIND_LEAD_MEASURES, week_ending=WEEK,
+                                   period='week', payload={'stored': True})
+        self.assertEqual(self._get('/api/wig/lead-measures/').json(), {'stored': True})
+
+    def test_missing_snapshot_falls_back_to_live(self):
+        body = self._get('/api/wig/lead-measures/?period=month').json()
+        self.assertEqual(body['window']['period'], 'month')
+
+    def test_detail_serves_the_stored_payload(self):
+        WigSnapshot.objects.create(kind=WigSnapshot.KIND_DETAIL, week_ending=date(2026, 5, 10),
+                                   period='week', programme='numeracy',
+                                   measure='numeracy.school_coverage', payload={'kind': 'stored'})
+        res = self._get('/api/wig/detail/?programme=numeracy&measure=numeracy.school_coverage'
+                        '&week_ending=2026-05-10')
+        self.assertEqual(res.json(), {'kind': 'stored'})
+
+    def test_week_ending_browses_a_past_week_live(self):
+        body = self._get('/api/wig/lead-measures/?week_ending=2026-05-13').json()
+        self.assertEqual(body['window']['date_to'], '2026-05-17')
+
+    def test_week_ending_must_be_completed_and_valid(self):
+        self.assertEqual(self._get('/api/wig/lead-measures/?week_ending=2026-05-31').status_code, 400)
+        self.assertEqual(self._get('/api/wig/lead-measures/?week_ending=May').status_code, 400)
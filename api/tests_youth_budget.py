@@ -18,6 +18,7 @@ from rest_framework.test import APIClient
 from api import youth_budget
 from api.management.commands.sync_airtable_youth import Command as YouthSyncCommand
 from api.models import (
+    AirtableSyncLog,
     BudgetScenario,
     FundingPot,
     MonthlyYouthExpenditure,
@@ -626,6 +627,7 @@ class YouthBudgetEndpointTests(TestCase):
     """HTTP tests pin the shared-scenario contract and role boundary."""
 
     def setUp(self):
+        youth_budget.invalidate_cohort_snapshot()
         self.client = APIClient()
         self.school = School.objects.create(
             name="Endpoint Primary",
@@ -1190,3 +1192,213 @@ class UtilisationLeverTests(SimpleTestCase):
                 )
         self.assertEqual(matrix["primary"]["literacy coach"]["hours_per_day"], 4.5)
         self.assertEqual(matrix["ecd"]["literacy coach"]["hours_per_day"], 5.5)
+
+
+def _scalar_project_rows(scenario, rows, as_of, include_holiday_pay=True):
+    """The original per-cell Decimal projection, kept as the oracle the
+    vectorised engine must match to the cent."""
+    value = youth_budget._scenario_value
+    year = int(value(scenario, "year", as_of.year))
+    matrix = value(scenario, "hours_matrix") or youth_budget.HOURS_MATRIX_DEFAULTS
+    wage_rate = youth_budget._decimal(value(scenario, "wage_rate"), Decimal("32.01"))
+    contribution = youth_budget._decimal(value(scenario, "subsidy_contribution"), Decimal("1400"))
+    conversion_month = int(value(scenario, "nys_conversion_start_month", 8))
+    vacancy_month = int(value(scenario, "vacancy_start_month", 8))
+    utilisation = youth_budget._decimal(value(scenario, "utilisation_pct", 100), Decimal("100")) / 100
+    full_time = max(int(value(scenario, "nys_full_time_count", 160) or 0), 0)
+    part_time = max(int(value(scenario, "nys_part_time_count", 40) or 0), 0)
+    zero_cost, relief_converted = youth_budget._nys_conversions(rows, full_time + part_time, part_time)
+
+    months, school_totals = [], {}
+    for month in youth_budget._projection_months(year, as_of):
+        days = youth_budget.school_days_in_month(year, month, start_from=as_of)
+        totals = dict.fromkeys(("gross", "uif", "subsidy_relief", "net"), Decimal("0"))
+        for index, row in enumerate(rows):
+            if row.get("programme") == youth_budget.YEBO:
+                continue
+            if row.get("_vacancy") and month < vacancy_month:
+                continue
+            headcount = max(int(row.get("headcount") or 0), 0)
+            if not row.get("_vacancy") and month >= conversion_month:
+                headcount = max(headcount - zero_cost[index], 0)
+            if headcount == 0:
+                continue
+            hours, days_per_week = youth_budget.hours_for(
+                matrix, row.get("site_type") or "primary", row.get("job_title") or "")
+            gross_each = hours * Decimal(days) * (days_per_week / Decimal("5")) * wage_rate * utilisation
+            gross = gross_each * headcount
+            uif = gross * (youth_budget.UIF_FACTOR - Decimal("1"))
+            subsidised = 0
+            if not row.get("_vacancy"):
+                subsidised = youth_budget._actual_subsidised_count(row, year, month)
+                if month >= conversion_month:
+                    subsidised += relief_converted[index]
+                subsidised = min(subsidised, headcount)
+            relief = min(contribution, gross_each * youth_budget.UIF_FACTOR) * subsidised
+            net = gross + uif - relief
+            for key, amount in (("gross", gross), ("uif", uif), ("subsidy_relief", relief), ("net", net)):
+                totals[key] += amount
+            school_totals[row.get("school_id")] = school_totals.get(row.get("school_id"), Decimal("0")) + net
+        months.append({"month": month, "school_days": days,
+                       **{key: youth_budget._money(amount) for key, amount in totals.items()}})
+    holiday_pay = youth_budget._decimal(value(scenario, "holiday_pay"), Decimal("0")) if include_holiday_pay else 0
+    return {
+        "months": months,
+        "total": youth_budget._money(sum((row["net"] for row in months), Decimal("0")) + holiday_pay),
+        "school_totals": {key: youth_budget._money(total) for key, total in school_totals.items()},
+    }
+
+
+class ProjectionEngineTests(SimpleTestCase):
+    """The vectorised engine reproduces the per-cell Decimal projection
+    exactly, including the half-cent cases float arithmetic gets wrong."""
+
+    def _random_rows(self, rng, count):
+        titles = ["literacy coach", "numeracy coach", "practitioner", "zazi izandi coach"]
+        rows = []
+        for index in range(count):
+            vacancy = rng.random() < 0.2
+            headcount = rng.randint(0, 12)
+            rows.append(_cohort(
+                school_id=rng.choice([None, 1, 2, 3]),
+                site_type=rng.choice(["primary", "ecd"]),
+                job_title=rng.choice(titles),
+                programme=rng.choice(["masi_literacy", "numeracy", youth_budget.YEBO]),
+                headcount=headcount,
+                subsidised_count=0 if vacancy else rng.randint(0, headcount),
+                nys_eligible_count=0 if vacancy else rng.randint(0, headcount),
+                subsidy_end_date=rng.choice([None, date(2026, 9, 15), "2026-10-31", "bad"]),
+                **({"_vacancy": True} if vacancy else {}),
+            ))
+        return rows
+
+    def test_matches_the_scalar_projection_to_the_cent(self):
+        import random
+
+        rng = random.Random(20260801)
+        matrix = deepcopy(youth_budget.HOURS_MATRIX_DEFAULTS)
+        matrix["primary"]["numeracy coach"] = {"hours_per_day": 4.25, "days_per_week": 3}
+        matrix["ecd"]["practitioner"] = {"hours_per_day": 5.75, "days_per_week": 4.5}
+        for _trial in range(40):
+            scenario = _scenario(
+                hours_matrix=matrix,
+                wage_rate=Decimal(rng.choice(["32.01", "28.5", "35.333", "0"])),
+                subsidy_contribution=Decimal(rng.choice(["1400", "1600.55", "0"])),
+                utilisation_pct=rng.choice([100, 85, 50, 120, 1]),
+                nys_full_time_count=rng.randint(0, 30),
+                nys_part_time_count=rng.randint(0, 10),
+                nys_conversion_start_month=rng.randint(7, 11),
+                vacancy_start_month=rng.randint(7, 11),
+                holiday_pay=Decimal(rng.choice(["0", "250.10"])),
+            )
+            rows = self._random_rows(rng, rng.randint(0, 25))
+            as_of = rng.choice([date(2026, 7, 28), date(2026, 9, 3), date(2025, 6, 1)])
+            self.assertEqual(
+                youth_budget._project_rows(scenario, rows, as_of),
+                _scalar_project_rows(scenario, rows, as_of),
+            )
+
+    def test_overrides_match_a_saved_scenario(self):
+        rows = [_cohort(headcount=4, subsidised_count=1, nys_eligible_count=2)]
+        engine = youth_budget.ProjectionEngine(_scenario(), rows, date(2026, 8, 1))
+        override = engine.run(wage_rate=Decimal("30"), utilisation_pct=90, nys_full_time_count=1)
+        saved = youth_budget._project_rows(
+            _scenario(wage_rate=Decimal("30"), utilisation_pct=90, nys_full_time_count=1),
+            rows, date(2026, 8, 1))
+        self.assertEqual(override, saved)
+
+    def test_extreme_precision_falls_back_to_exact_integers(self):
+        matrix = {"primary": {"literacy coach": {"hours_per_day": 4.123456789123, "days_per_week": 5}}}
+        scenario = _scenario(hours_matrix=matrix, wage_rate=Decimal("32.0123456789"),
+                             subsidy_contribution=Decimal("1400.123456789"))
+        rows = [_cohort(headcount=900, subsidised_count=400)]
+        self.assertEqual(
+            youth_budget._project_rows(scenario, rows, date(2026, 8, 1)),
+            _scalar_project_rows(scenario, rows, date(2026, 8, 1)),
+        )
+
+
+class SweepTests(TestCase):
+    def test_sweep_evaluates_every_combination(self):
+        scenario = _scenario(nys_full_time_count=0, nys_part_time_count=0)
+        rows = [_cohort(headcount=2)]
+        points = youth_budget.sweep(
+            scenario, rows, [], date(2026, 8, 1),
+            {"wage_rate": [Decimal("30"), Decimal("32.01")], "utilisation_pct": [80, 100]},
+            Decimal("100000"),
+        )
+        self.assertEqual(len(points), 4)
+        for point in points:
+            expected = youth_budget.project(
+                _scenario(nys_full_time_count=0, nys_part_time_count=0,
+                          wage_rate=point["wage_rate"], utilisation_pct=point["utilisation_pct"]),
+                rows, [], date(2026, 8, 1))
+            self.assertEqual(point["committed_total"], expected["committed"]["total"])
+            self.assertEqual(point["verdict_at_plan"], Decimal("100000") - expected["at_plan"]["total"])
+
+    def test_endpoint_parses_levers_and_caps_the_grid(self):
+        client = APIClient()
+        client.force_authenticate(user=_make_user("sweeper", "MENTOR"))
+        response = client.get(
+            "/api/youth-budget/sweep/?year=2026&wage_rate=30,32.01&nys_full_time_count=0,10,20")
+        self.assertEqual(response.status_code, 200)
+        points = response.json()["points"]
+        self.assertEqual(len(points), 6)
+        self.assertEqual({p["utilisation_pct"] for p in points}, {100})
+        self.assertEqual(sorted({p["wage_rate"] for p in points}), [30.0, 32.01])
+
+        self.assertEqual(client.get("/api/youth-budget/sweep/?utilisation_pct=0").status_code, 400)
+        too_many = ",".join(str(n) for n in range(40))
+        response = client.get(
+            f"/api/youth-budget/sweep/?nys_full_time_count={too_many}&nys_part_time_count={too_many}")
+        self.assertEqual(response.status_code, 400)
+
+
+class CohortSnapshotTests(TestCase):
+    """The memo must never outlive a change to the rows it was built from."""
+
+    def setUp(self):
+        youth_budget.invalidate_cohort_snapshot()
+        self.school = School.objects.create(
+            name="Snapshot Primary", school_uid="SCH-YB-SNAP", type="Primary School")
+        self.as_of = date(2026, 5, 1)
+
+    def _youth(self, employee_id):
+        return Youth.objects.create(
+            employee_id=employee_id, first_names="S", last_name=str(employee_id),
+            job_title="Literacy Coach", school=self.school, employment_status="Active",
+            start_date=date(2026, 1, 1))
+
+    def test_repeat_call_reuses_the_snapshot(self):
+        self._youth(1)
+        first = youth_budget.cohort_snapshot(2026, self.as_of)
+        with self.assertNumQueries(4):  # the key's stamp only
+            again = youth_budget.cohort_snapshot(2026, self.as_of)
+        self.assertIs(again, first)
+        self.assertIsNot(youth_budget.cohort_snapshot(2026, date(2026, 6, 1)), first)
+
+    def test_data_changes_move_the_key(self):
+        self._youth(1)
+        first = youth_budget.cohort_snapshot(2026, self.as_of)
+        self._youth(2)
+        second = youth_budget.cohort_snapshot(2026, self.as_of)
+        self.assertIsNot(second, first)
+        self.assertEqual(sum(c["headcount"] for c in second["cohorts"]["costing_cohorts"]), 2)
+
+        AirtableSyncLog.objects.create(sync_type="youth").mark_complete(success=True)
+        self.assertIsNot(youth_budget.cohort_snapshot(2026, self.as_of), second)
+
+    def test_invalidate_and_pot_writes_clear_the_memo(self):
+        first = youth_budget.cohort_snapshot(2026, self.as_of)
+        youth_budget.invalidate_cohort_snapshot()
+        second = youth_budget.cohort_snapshot(2026, self.as_of)
+        self.assertIsNot(second, first)
+
+        client = APIClient()
+        client.force_authenticate(user=_make_user("snap_admin", "ADMIN"))
+        pot = FundingPot.objects.create(
+            year=2026, funder_name="F", amount=Decimal("1"), as_of=date(2026, 5, 1))
+        response = client.patch(
+            f"/api/youth-budget/pots/{pot.pk}/", {"funder_name": "G"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNot(youth_budget.cohort_snapshot(2026, self.as_of), second)
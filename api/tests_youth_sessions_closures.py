@@ -11,6 +11,7 @@ from django.test import TestCase
 from rest_framework.test import APIClient
 
 from api.models import School, Youth, SchoolClosure, StaffAbsence, LiteracySession2026
+from api.session_facts import rebuild_session_facts
 
 MON, TUE, WED, THU, FRI = (
     date(2026, 6, 1), date(2026, 6, 2), date(2026, 6, 3), date(2026, 6, 4), date(2026, 6, 5),
@@ -91,6 +92,7 @@ class InactiveClosureAwarenessTests(TestCase):
                 youth=self.youth, youth_uid="YTH-1", school=self.school,
                 school_uid="SCH-P", session_date=d,
             )
+        rebuild_session_facts()
         StaffAbsence.objects.create(youth=self.youth, date=THU, reason="vacation")
         StaffAbsence.objects.create(youth=self.youth, date=FRI, reason="vacation")
         self.assertNotIn("YTH-1", self._inactive_uids(days=2))
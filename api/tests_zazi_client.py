@@ -0,0 +1,143 @@
+"""Tests for the pooled Zazi client (api/zazi_client.py) against a local stub
+HTTP server: connection reuse, the circuit breaker, and the stale-while-
+revalidate cache behind the public Programmatic-impact proxy.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+
+from api import zazi_client
+from api.zazi_client import CircuitBreaker, ZaziClient, ZaziUnavailable
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _StubZazi(BaseHTTPRequestHandler):
+    """Answers every GET with the server's current ``status``/``payload`` and
+    logs (path, client port, auth header) so tests can see what went out."""
+    protocol_version = 'HTTP/1.1'  # keep-alive, so pooling is observable
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address[1],
+                                self.headers.get('X-Internal-Auth')))
+        body = json.dumps(server.payload).encode()
+        self.send_response(server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServerMixin:
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubZazi)
+        self.server.requests = []
+        self.server.status = 200
+        self.server.payload = {'version': 1}
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.clock = _Clock()
+        self.client = ZaziClient(self.base_url, 'sek', clock=self.clock)
+        self.addCleanup(self.client.session.close)
+
+
+class ZaziClientTests(StubServerMixin, SimpleTestCase):
+    def test_requests_reuse_one_pooled_connection(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get_json('/api/wig-outcomes/', timeout=5), {'version': 1})
+        ports = {port for _path, port, _auth in self.server.requests}
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(ports), 1)
+        self.assertEqual(self.server.requests[0][2], 'sek')
+
+    def test_breaker_opens_after_repeated_failures_then_probes(self):
+        self.server.status = 500
+        for _ in range(zazi_client.BREAKER_THRESHOLD):
+            with self.assertRaises(zazi_client.requests.HTTPError):
+                self.client.get_json('/api/wig-outcomes/')
+        with self.assertRaises(ZaziUnavailable):
+            self.client.get_json('/api/wig-outcomes/')
+        self.assertEqual(len(self.server.requests), zazi_client.BREAKER_THRESHOLD)
+
+        self.server.status = 200
+        self.clock.now += zazi_client.BREAKER_COOLDOWN_SECONDS
+        self.assertEqual(self.client.get_json('/api/wig-outcomes/'), {'version': 1})
+        self.assertFalse(self.client.breaker.is_open)
+
+    def test_stale_payload_is_served_while_one_refresh_runs(self):
+        ttl = 60
+        self.assertEqual(self.client.cached_json('/p/', ttl=ttl), {'version': 1})
+        self.server.payload = {'version': 2}
+        self.assertEqual(self.client.cached_json('/p/', ttl=ttl), {'version': 1})
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.clock.now += ttl
+        self.assertEqual(self.client.cached_json('/p/', ttl=ttl), {'version': 1})
+        self.client.wait_for_refreshes(timeout=5)
+        self.assertEqual(self.client.cached_json('/p/', ttl=ttl), {'version': 2})
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_failed_refresh_keeps_the_last_good_payload(self):
+        self.client.cached_json('/p/', ttl=60)
+        self.server.status = 503
+        self.clock.now += 60
+        self.assertEqual(self.client.cached_json('/p/', ttl=60), {'version': 1})
+        self.client.wait_for_refreshes(timeout=5)
+        self.assertEqual(self.client.cached_json('/p/', ttl=60), {'version': 1})
+        self.assertEqual(self.client.breaker.failures, 1)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_half_open_lets_exactly_one_probe_through(self):
+        clock = _Clock()
+        breaker = CircuitBreaker(threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        clock.now += 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()  # the probe failed: open for another cool-down
+        clock.now += 5
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.retry_in(), 5)
+
+
+class ProgrammaticProxyTests(StubServerMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        zazi_client.client.reset()
+        self.addCleanup(zazi_client.client.reset)
+        env = patch.dict('os.environ', {'ZAZI_API_BASE_URL': self.base_url,
+                                        'ZAZI_INTERNAL_API_SECRET': 'sek'})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_proxy_passes_the_payload_through_and_503s_when_cold_and_down(self):
+        api = APIClient()
+        res = api.get('/api/impact/zazi-programmatic/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {'version': 1})
+        self.assertEqual(self.server.requests[0][0], '/api/programmatic-impact-2026/')
+
+        zazi_client.client.reset()
+        self.server.status = 502
+        res = api.get('/api/impact/zazi-programmatic/')
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.json()['error'], 'Zazi backend unavailable')
@@ -0,0 +1,94 @@
+"""UID -> primary-key lookups for the 2026 session and assessment syncs.
+
+Airtable rows name their youth, school and child by UID (YTH-/SCH-/CH-...).
+Each sync command used to build ``{uid: instance}`` for every Youth, School
+and CanonicalChild at startup. That hydrated every column of every canonical
+child as a full model, only to read its id, and it repeated the work in every
+command of a nightly run.
+
+``uid_map(name)`` returns a process-wide ``{uid: id}`` dict built from
+``(uid, id)`` tuples only. Later calls refresh it incrementally, re-reading
+only the rows whose ``updated_at`` (School: ``last_updated``) is at or after
+the newest one already seen. A renamed or cleared UID replaces its old key.
+The canonical syncs write with ``bulk_update``, which skips ``auto_now``, so
+they set the stamp on updated rows themselves. A writer that does not set it
+leaves its changes unseen until a full reload.
+Deleted rows never show up as "changed", so a row-count mismatch triggers a
+full reload instead.
+
+resolve_session_fks does not need the maps. It resolves each FK column with one
+``UPDATE ... FROM`` join (see ``resolve_fk_column``).
+"""
+from django.db import connection
+from django.db.models import Max
+
+from .models import CanonicalChild, School, Youth
+
+
+class UidIndex:
+    """``{uid: id}`` for one canonical model, kept fresh from its auto_now
+    ``stamp_field``."""
+
+    def __init__(self, model, uid_field, stamp_field='updated_at'):
+        self.model = model
+        self.uid_field = uid_field
+        self.stamp_field = stamp_field
+        self.ids = {}
+        self._uid_by_id = {}
+        self._seen_until = None
+
+    def _with_uid(self):
+        return (self.model.objects.filter(**{f'{self.uid_field}__isnull': False})
+                .exclude(**{self.uid_field: ''}))
+
+    def refresh(self, full=False):
+        """Bring the map up to date and return it."""
+        if full or self._seen_until is None or self._with_uid().count() != len(self.ids):
+            self.ids.clear()
+            self._uid_by_id.clear()
+            changed = self.model.objects.all()
+        else:
+            changed = self.model.objects.filter(**{f'{self.stamp_field}__gte': self._seen_until})
+        newest = changed.aggregate(newest=Max(self.stamp_field))['newest']
+        for pk, uid in changed.values_list('id', self.uid_field).iterator():
+            old = self._uid_by_id.pop(pk, None)
+            if old is not None and self.ids.get(old) == pk:
+                del self.ids[old]
+            if uid:
+                self.ids[uid] = pk
+                self._uid_by_id[pk] = uid
+        if newest is not None and (self._seen_until is None or newest > self._seen_until):
+            self._seen_until = newest
+        return self.ids
+
+
+_INDEXES = {
+    'youth': UidIndex(Youth, 'youth_uid'),
+    'school': UidIndex(School, 'school_uid', stamp_field='last_updated'),
+    'child': UidIndex(CanonicalChild, 'child_uid'),
+}
+
+
+def uid_map(name, full=False):
+    """The process-wide ``{uid: id}`` dict for 'youth', 'school' or 'child',
+    refreshed first (``full`` forces a reload)."""
+    return _INDEXES[name].refresh(full=full)
+
+
+def resolve_fk_column(model, fk_field, uid_field, target, target_uid_field):
+    """Set ``model.fk_field`` from ``uid_field`` for every row whose FK is
+    still null, with one ``UPDATE ... FROM`` join against ``target``.
+    Returns the number of rows resolved."""
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    fk_column = qn(model._meta.get_field(fk_field).column)
+    uid_column = qn(model._meta.get_field(uid_field).column)
+    sql = (
+        f'UPDATE {table} SET {fk_column} = canonical.{qn("id")} '
+        f'FROM {qn(target._meta.db_table)} AS canonical '
+        f'WHERE {table}.{fk_column} IS NULL '
+        f'AND {table}.{uid_column} = canonical.{qn(target._meta.get_field(target_uid_field).column)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.rowcount
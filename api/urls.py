@@ -27,6 +27,7 @@ urlpatterns = [
     path('schools/', views.SchoolListAPIView.as_view(), name='schools_list'),
     path('dashboard-summary/', views.dashboard_summary, name='dashboard_summary'),
     path('recent-visits/', views.recent_visits, name='recent_visits'),
+    path('recent-visits/feed/', views.visit_feed, name='visit_feed'),
 
     path("me/", views.me, name="me"),
 
@@ -64,6 +65,7 @@ urlpatterns = [
     # Youth Budget Calculator
     path('youth-budget/', views.youth_budget_summary, name='youth_budget'),
     path('youth-budget/scenario/', views.update_youth_budget_scenario, name='youth_budget_scenario'),
+    path('youth-budget/sweep/', views.youth_budget_sweep, name='youth_budget_sweep'),
     path('youth-budget/pots/', views.create_youth_budget_pot, name='youth_budget_pots'),
     path('youth-budget/pots/<int:pk>/', views.update_youth_budget_pot, name='youth_budget_pot_detail'),
     path('youth-budget/expenditure/', views.create_youth_budget_expenditure, name='youth_budget_expenditure'),
@@ -75,6 +77,7 @@ urlpatterns = [
     path('closures/bulk-set/', views.closures_bulk_set, name='closures_bulk_set'),
     path('closures/lookups/', views.closures_lookups, name='closures_lookups'),
     path('closures/export/', views.closures_export, name='closures_export'),
+    path('closures/tombstones/', views.calendar_tombstones, name='calendar_tombstones'),
     path('closures/<int:pk>/', views.ClosureDetailAPIView.as_view(), name='closure_detail'),
     path('absences/', views.AbsenceListCreateAPIView.as_view(), name='absences'),
     path('absences/bulk/', views.absences_bulk, name='absences_bulk'),
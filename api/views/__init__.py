@@ -6,7 +6,7 @@ from .lookups import SchoolListAPIView, MentorListAPIView
 from .info import api_info, me
 from .impact import published_stats, zazi_programmatic
 from .dashboard import dashboard_summary
-from .recent_visits import recent_visits
+from .recent_visits import recent_visits, visit_feed
 from .etl_preview import etl_status, etl_preview
 from .youth_sessions import (
     youth_sessions_summary,
@@ -24,6 +24,7 @@ from .school_programme import (
 )
 from .youth_budget import (
     youth_budget_summary,
+    youth_budget_sweep,
     update_youth_budget_scenario,
     create_youth_budget_pot,
     update_youth_budget_pot,
@@ -32,7 +33,7 @@ from .youth_budget import (
 )
 from .closures import (
     ClosureListCreateAPIView, ClosureDetailAPIView, closures_bulk, closures_bulk_set, closures_export,
-    closures_lookups, identity_export,
+    closures_lookups, identity_export, calendar_tombstones,
     AbsenceListCreateAPIView, AbsenceDetailAPIView, absences_bulk, absences_export,
 )
 
@@ -53,6 +54,7 @@ __all__ = [
     'zazi_programmatic',
     'dashboard_summary',
     'recent_visits',
+    'visit_feed',
     'etl_status',
     'etl_preview',
     'youth_sessions_summary',
@@ -73,6 +75,7 @@ __all__ = [
     'update_grid_stats',
     'rollover_grid',
     'youth_budget_summary',
+    'youth_budget_sweep',
     'update_youth_budget_scenario',
     'create_youth_budget_pot',
     'update_youth_budget_pot',
@@ -85,6 +88,7 @@ __all__ = [
     'closures_export',
     'closures_lookups',
     'identity_export',
+    'calendar_tombstones',
     'AbsenceListCreateAPIView',
     'AbsenceDetailAPIView',
     'absences_bulk',
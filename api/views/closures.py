@@ -2,14 +2,17 @@
 
 Authoring CRUD and bulk fan-out are gated to ADMIN / PROJECT MANAGER. The export
 endpoints carry no user identity -- they are gated only by the X-Internal-Auth
-shared secret, which the Zazi backend sends when pulling the calendar.
+shared secret, which the Zazi backend sends when pulling the calendar. With
+``?stream=ndjson`` they stream resumable NDJSON instead (api/export_feeds.py).
 """
 import hashlib
+import itertools
 import json
 
 from datetime import date as date_cls, timedelta
 
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
@@ -17,16 +20,27 @@ from rest_framework.response import Response
 
 from ..authentication import ClerkAuthentication
 from ..permissions import IsAdminOrProjectManager, IsInternalService
-from ..models import SchoolClosure, StaffAbsence, School, Youth
+from ..models import CalendarTombstone, SchoolClosure, StaffAbsence, School, Youth
 from ..school_programme import PROGRAMME_CHOICES, _PROGRAMME_KEYS
 from ..serializers import SchoolClosureSerializer, StaffAbsenceSerializer
 from .. import closures as closures_svc
+from .. import export_feeds
+from ..closure_writes import bulk_upsert
 
 AUTH = [SessionAuthentication, ClerkAuthentication]
 PERM = [IsAdminOrProjectManager]
 
 _CANONICAL_TYPES = {'primary', 'ecd', 'secondary', 'other'}
 
+# Bulk fan-out upserts: the unique key, and what a re-run overwrites (everything
+# the request sets; created_at is kept).
+_CLOSURE_KEY = ['date', 'scope_key']
+_CLOSURE_UPDATE_FIELDS = ['scope_type', 'scope_school', 'scope_school_type', 'scope_region',
+                          'applies_to_programmes', 'is_open', 'source', 'reason', 'created_by',
+                          'updated_at']
+_ABSENCE_KEY = ['date', 'youth_uid']
+_ABSENCE_UPDATE_FIELDS = ['youth', 'reason', 'note', 'created_by', 'updated_at']
+
 
 def _parse_date(value):
     try:
@@ -123,8 +137,9 @@ def closures_lookups(request):
     })
 
 
-def _closure_scope_kwargs(scope_type, value):
-    """Return (model field kwargs, scope_key) for one (scope_type, value)."""
+def _closure_scope_kwargs(scope_type, value, schools=None):
+    """Return (model field kwargs, scope_key) for one (scope_type, value).
+    ``schools`` ({school_uid: School}) saves a lookup per school value."""
     if scope_type == 'global':
         return {}, 'global'
     if scope_type == 'type':
@@ -139,7 +154,10 @@ def _closure_scope_kwargs(scope_type, value):
         return ({'scope_region': norm},
                 closures_svc.build_scope_key('region', region=norm))
     if scope_type == 'school':
-        school = School.objects.filter(school_uid=value).first()
+        if schools is not None:
+            school = schools.get(value)
+        else:
+            school = School.objects.filter(school_uid=value).first()
         if not school:
             raise ValueError(f'unknown school_uid: {value!r}')
         return ({'scope_school': school},
@@ -242,7 +260,10 @@ def closures_bulk_set(request):
         locked = _closure_records(SchoolClosure.objects.select_for_update().filter(id__in=ids))
         if {r['id'] for r in locked} != set(ids) or _closure_digest(locked) != data.get('digest'):
             return Response({'detail': 'rows changed since preview; re-preview.'}, status=status.HTTP_409_CONFLICT)
-        n = SchoolClosure.objects.filter(id__in=ids).update(**updates)
+        # update() skips auto_now and sends no signals; bump both by hand so
+        # the working-days calendar (here and in other workers) sees the change.
+        n = SchoolClosure.objects.filter(id__in=ids).update(**updates, updated_at=timezone.now())
+    closures_svc.invalidate_closure_calendar()
     return Response({'updated': n})
 
 
@@ -275,42 +296,29 @@ def closures_bulk(request):
     user = _request_user(request)
 
     # Resolve every scope target up front so a bad value fails before any write.
+    schools = None
+    if scope_type == 'school':
+        schools = {s.school_uid: s for s in School.objects.filter(school_uid__in=[v for v in values if v])}
     try:
-        targets = [_closure_scope_kwargs(scope_type, value) for value in values]
+        targets = [_closure_scope_kwargs(scope_type, value, schools) for value in values]
     except ValueError as e:
         return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    created = updated = 0
-    with transaction.atomic():
-        for fields, scope_key in targets:
-            for day in _weekdays(start, end):
-                _, was_created = SchoolClosure.objects.update_or_create(
-                    date=day, scope_key=scope_key,
-                    defaults={'scope_type': scope_type, 'is_open': is_open,
-                              'reason': reason, 'source': 'manual', 'created_by': user,
-                              'applies_to_programmes': programmes,
-                              **fields},
-                )
-                created += int(was_created)
-                updated += int(not was_created)
+    # Build every (target x weekday) row, then write them set-based.
+    rows = [
+        SchoolClosure(date=day, scope_key=scope_key, scope_type=scope_type, is_open=is_open,
+                      reason=reason, source='manual', created_by=user,
+                      applies_to_programmes=programmes, **fields)
+        for fields, scope_key in targets
+        for day in _weekdays(start, end)
+    ]
+    created, updated = bulk_upsert(rows, _CLOSURE_KEY, _CLOSURE_UPDATE_FIELDS)
+    closures_svc.invalidate_closure_calendar()
     return Response({'created': created, 'updated': updated}, status=status.HTTP_201_CREATED)
 
 
-@api_view(['GET'])
-@authentication_classes([])
-@permission_classes([IsInternalService])
-def closures_export(request):
-    """Bounded-window closure feed for the Zazi backend (shared-secret only)."""
-    p = request.query_params
-    qs = SchoolClosure.objects.select_related('scope_school').all()
-    df, dt = _parse_date(p.get('date_from')), _parse_date(p.get('date_to'))
-    if df:
-        qs = qs.filter(date__gte=df)
-    if dt:
-        qs = qs.filter(date__lte=dt)
-    if p.get('since'):
-        qs = qs.filter(updated_at__gte=p['since'])
-    rows = [{
+def _closure_export_row(c):
+    return {
         'id': c.id,
         'date': c.date,
         'scope_key': c.scope_key,
@@ -323,8 +331,60 @@ def closures_export(request):
         'reason': c.reason,
         'applies_to_programmes': c.applies_to_programmes,
         'updated_at': c.updated_at,
-    } for c in qs]
-    return Response(rows)
+    }
+
+
+def _date_window(qs, params, field='date'):
+    df, dt = _parse_date(params.get('date_from')), _parse_date(params.get('date_to'))
+    if df:
+        qs = qs.filter(**{f'{field}__gte': df})
+    if dt:
+        qs = qs.filter(**{f'{field}__lte': dt})
+    return qs
+
+
+def _export(request, qs, stamp_field, serialize):
+    """A JSON list filtered by ``since``, or with ``?stream=ndjson`` a
+    keyset-resumable NDJSON stream (see api/export_feeds.py)."""
+    p = request.query_params
+    if export_feeds.wants_ndjson(request):
+        try:
+            after, limit = export_feeds.parse_feed_params(request)
+        except ValueError:
+            return Response({'detail': 'Invalid cursor or limit.'}, status=status.HTTP_400_BAD_REQUEST)
+        return export_feeds.ndjson_feed(qs, stamp_field, serialize, after=after, limit=limit)
+    if p.get('since'):
+        qs = qs.filter(**{f'{stamp_field}__gte': p['since']})
+    return Response([serialize(obj) for obj in qs])
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([IsInternalService])
+def closures_export(request):
+    """Bounded-window closure feed for the Zazi backend (shared-secret only)."""
+    qs = _date_window(SchoolClosure.objects.select_related('scope_school'), request.query_params)
+    return _export(request, qs, 'updated_at', _closure_export_row)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([IsInternalService])
+def calendar_tombstones(request):
+    """Deleted closures and absences, for incremental consumers of the export
+    feeds (shared-secret only). ``?kind=closure|absence`` narrows the feed.
+    Only the last TOMBSTONE_RETENTION_DAYS are kept; a consumer whose cursor
+    is older must resync the exports in full."""
+    qs = _date_window(CalendarTombstone.objects.all(), request.query_params)
+    if request.query_params.get('kind'):
+        qs = qs.filter(kind=request.query_params['kind'])
+    return _export(request, qs, 'deleted_at', lambda t: {
+        'id': t.object_id,
+        'kind': t.kind,
+        'date': t.date,
+        'scope_key': t.scope_key,
+        'deleted_at': t.deleted_at,
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -383,17 +443,13 @@ def absences_bulk(request):
     if missing:
         return Response({'detail': f'unknown youth_uid: {missing[0]}'}, status=status.HTTP_400_BAD_REQUEST)
 
-    created = updated = 0
-    with transaction.atomic():
-        for uid in uids:
-            youth = youths[uid]
-            for day in _weekdays(start, end):
-                _, was_created = StaffAbsence.objects.update_or_create(
-                    date=day, youth_uid=uid,
-                    defaults={'youth': youth, 'reason': reason, 'note': note, 'created_by': user},
-                )
-                created += int(was_created)
-                updated += int(not was_created)
+    rows = [
+        StaffAbsence(date=day, youth_uid=uid, youth=youths[uid], reason=reason, note=note, created_by=user)
+        for uid in uids
+        for day in _weekdays(start, end)
+    ]
+    created, updated = bulk_upsert(rows, _ABSENCE_KEY, _ABSENCE_UPDATE_FIELDS)
+    closures_svc.invalidate_closure_calendar()
     return Response({'created': created, 'updated': updated}, status=status.HTTP_201_CREATED)
 
 
@@ -409,40 +465,39 @@ def identity_export(request):
         .exclude(school_uid__isnull=True).exclude(school_uid='')
         .order_by('name')
     )
-    school_rows = [{
-        'school_uid': s.school_uid,
-        'name': s.name,
-        'suburb': closures_svc.normalize_region(s.suburb) or None,
-        'canonical_type': closures_svc.canonical_school_type(s.type),
-    } for s in schools]
     youth = (
         Youth.objects.filter(employment_status='Active')
         .exclude(youth_uid__isnull=True).exclude(youth_uid='')
         .order_by('first_names', 'last_name')
     )
-    youth_rows = [{
-        'youth_uid': y.youth_uid,
-        'name': (y.full_name or f'{y.first_names} {y.last_name}').strip(),
-        'email': (y.email or '').strip().lower() or None,
-    } for y in youth]
-    return Response({'schools': school_rows, 'youth': youth_rows})
-
 
-@api_view(['GET'])
-@authentication_classes([])
-@permission_classes([IsInternalService])
-def absences_export(request):
-    """Bounded-window absence feed for the Zazi backend (shared-secret only)."""
-    p = request.query_params
-    qs = StaffAbsence.objects.all()
-    df, dt = _parse_date(p.get('date_from')), _parse_date(p.get('date_to'))
-    if df:
-        qs = qs.filter(date__gte=df)
-    if dt:
-        qs = qs.filter(date__lte=dt)
-    if p.get('since'):
-        qs = qs.filter(updated_at__gte=p['since'])
-    rows = [{
+    def school_row(s):
+        return {
+            'school_uid': s.school_uid,
+            'name': s.name,
+            'suburb': closures_svc.normalize_region(s.suburb) or None,
+            'canonical_type': closures_svc.canonical_school_type(s.type),
+        }
+
+    def youth_row(y):
+        return {
+            'youth_uid': y.youth_uid,
+            'name': (y.full_name or f'{y.first_names} {y.last_name}').strip(),
+            'email': (y.email or '').strip().lower() or None,
+        }
+
+    if export_feeds.wants_ndjson(request):
+        # One line per entity, tagged with its kind; schools first.
+        rows = itertools.chain(
+            ({'kind': 'school', **school_row(s)} for s in schools.iterator()),
+            ({'kind': 'youth', **youth_row(y)} for y in youth.iterator()),
+        )
+        return export_feeds.ndjson_stream(rows)
+    return Response({'schools': [school_row(s) for s in schools], 'youth': [youth_row(y) for y in youth]})
+
+
+def _absence_export_row(a):
+    return {
         'id': a.id,
         'date': a.date,
         'scope_key': f'youth:{a.youth_uid}',
@@ -450,5 +505,13 @@ def absences_export(request):
         'reason': a.reason,
         'note': a.note,
         'updated_at': a.updated_at,
-    } for a in qs]
-    return Response(rows)
+    }
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([IsInternalService])
+def absences_export(request):
+    """Bounded-window absence feed for the Zazi backend (shared-secret only)."""
+    qs = _date_window(StaffAbsence.objects.all(), request.query_params)
+    return _export(request, qs, 'updated_at', _absence_export_row)
@@ -1,4 +1,4 @@
-from django.db.models import Count, Max, Q
+from django.db.models import Count, Max, OuterRef, Q, Subquery
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated
@@ -12,6 +12,7 @@ from api.models import (
     NumeracyAssessment2026, NumeracyOnTheProgramme2026,
 )
 from api.numeracy_2026 import COMPONENTS
+from api.response_cache import cached_response
 
 # Map of table names to (model, sync_type) pairs
 TABLE_CONFIG = {
@@ -31,20 +32,27 @@ TABLE_CONFIG = {
 @api_view(['GET'])
 @authentication_classes([SessionAuthentication, ClerkAuthentication])
 @permission_classes([IsAuthenticated])
+@cached_response(per_day=False)
 def etl_status(request):
-    """Sync health summary for all ETL tables."""
-    # Get latest successful sync per sync_type
-    latest_syncs = {}
-    for log in AirtableSyncLog.objects.filter(success=True).order_by('-completed_at'):
-        if log.sync_type not in latest_syncs:
-            latest_syncs[log.sync_type] = log
+    """Sync health summary for all ETL tables.
+
+    Reads only the latest successful log per sync type (one query); each log
+    carries the table's row count captured when that sync completed, so no
+    table is counted here. A table whose latest log predates that capture is
+    counted live until its next sync.
+    """
+    latest_syncs = _latest_successful_syncs(sync_type for _model, sync_type in TABLE_CONFIG.values())
 
     tables = []
     for name, (model, sync_type) in TABLE_CONFIG.items():
         log = latest_syncs.get(sync_type)
+        if log and log.table_row_count is not None:
+            record_count = log.table_row_count
+        else:
+            record_count = model.objects.count()
         tables.append({
             'name': name,
-            'record_count': model.objects.count(),
+            'record_count': record_count,
             'last_sync': log.completed_at.isoformat() if log and log.completed_at else None,
             'last_sync_records': log.records_processed if log else None,
         })
@@ -52,6 +60,19 @@ def etl_status(request):
     return Response({'tables': tables})
 
 
+def _latest_successful_syncs(sync_types):
+    """{sync_type: latest successful AirtableSyncLog}, in one query.
+
+    A correlated subquery rather than Postgres' DISTINCT ON so it runs on SQLite
+    too; both walk the (sync_type, success, completed_at) index.
+    """
+    successful = AirtableSyncLog.objects.filter(success=True, completed_at__isnull=False)
+    newest = (successful.filter(sync_type=OuterRef('sync_type'))
+              .order_by('-completed_at', '-pk').values('pk')[:1])
+    logs = successful.filter(sync_type__in=set(sync_types), pk=Subquery(newest))
+    return {log.sync_type: log for log in logs}
+
+
 @api_view(['GET'])
 @authentication_classes([SessionAuthentication, ClerkAuthentication])
 @permission_classes([IsAuthenticated])
@@ -121,37 +142,37 @@ def _numeracy_roster_quality_stats():
 
 
 def _literacy_orphan_stats():
-    total = LiteracySession2026.objects.count()
+    counts = LiteracySession2026.objects.aggregate(
+        total=Count('id'),
+        youth_resolved=Count('id', filter=Q(youth__isnull=False)),
+        school_resolved=Count('id', filter=Q(school__isnull=False)),
+        child1_resolved=Count('id', filter=Q(child_1__isnull=False)),
+        child2_resolved=Count('id', filter=Q(child_2__isnull=False)),
+    )
+    total = counts.pop('total')
     if total == 0:
         return {}
-    youth_resolved = LiteracySession2026.objects.filter(youth__isnull=False).count()
-    school_resolved = LiteracySession2026.objects.filter(school__isnull=False).count()
-    child1_resolved = LiteracySession2026.objects.filter(child_1__isnull=False).count()
-    child2_resolved = LiteracySession2026.objects.filter(child_2__isnull=False).count()
-    return {
-        'youth_resolved': youth_resolved,
-        'youth_orphaned': total - youth_resolved,
-        'school_resolved': school_resolved,
-        'school_orphaned': total - school_resolved,
-        'child1_resolved': child1_resolved,
-        'child1_orphaned': total - child1_resolved,
-        'child2_resolved': child2_resolved,
-        'child2_orphaned': total - child2_resolved,
-    }
+    stats = {}
+    for fk in ('youth', 'school', 'child1', 'child2'):
+        stats[f'{fk}_resolved'] = counts[f'{fk}_resolved']
+        stats[f'{fk}_orphaned'] = total - counts[f'{fk}_resolved']
+    return stats
 
 
 def _numeracy_orphan_stats():
-    total = NumeracySession2026.objects.count()
+    counts = NumeracySession2026.objects.aggregate(
+        total=Count('id'),
+        youth_resolved=Count('id', filter=Q(youth__isnull=False)),
+        school_resolved=Count('id', filter=Q(school__isnull=False)),
+    )
+    total = counts.pop('total')
     if total == 0:
         return {}
-    youth_resolved = NumeracySession2026.objects.filter(youth__isnull=False).count()
-    school_resolved = NumeracySession2026.objects.filter(school__isnull=False).count()
-    return {
-        'youth_resolved': youth_resolved,
-        'youth_orphaned': total - youth_resolved,
-        'school_resolved': school_resolved,
-        'school_orphaned': total - school_resolved,
-    }
+    stats = {}
+    for fk in ('youth', 'school'):
+        stats[f'{fk}_resolved'] = counts[f'{fk}_resolved']
+        stats[f'{fk}_orphaned'] = total - counts[f'{fk}_resolved']
+    return stats
 
 
 def _literacy_sample_rows():
@@ -4,12 +4,14 @@ from rest_framework.decorators import api_view, authentication_classes, permissi
 from rest_framework.response import Response
 
 from ..models import PublishedStat
-from ..zazi_client import fetch_zazi_programmatic_impact
+from ..response_cache import cached_response
+from ..zazi_client import cached_zazi_programmatic_impact
 
 
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([permissions.AllowAny])
+@cached_response(per_day=False)
 def published_stats(request):
     """Public, aggregate-only stats for the donor-facing impact pages."""
     rows = PublishedStat.objects.filter(is_published=True).order_by('group', 'sort_order')
@@ -49,12 +51,12 @@ def zazi_programmatic(request):
 
     Calls the separate Zazi backend server-side with the shared secret (the house
     pattern: the frontend only talks to the Masi backend) and passes the verified
-    payload through. The data is aggregate and funder-facing, so this is public;
-    the frontend's ISR layer caches it and keeps the last-good copy if Zazi is
-    briefly unreachable.
+    payload through. The data is aggregate and funder-facing, so this is public.
+    The payload is cached stale-while-revalidate in zazi_client, so only a cold
+    process waits on Zazi; the frontend's ISR layer keeps its own last-good copy.
     """
     try:
-        payload = fetch_zazi_programmatic_impact()
+        payload = cached_zazi_programmatic_impact()
     except requests.RequestException as exc:
         return Response(
             {'error': 'Zazi backend unavailable', 'detail': str(exc)},
@@ -19,6 +19,7 @@ from ..authentication import ClerkAuthentication
 from ..permissions import IsAdminOrProjectManager
 from ..models import SchoolProgrammeYear, SchoolYearStats
 from .. import school_programme
+from ..response_cache import cached_response
 
 AUTH_CLASSES = [SessionAuthentication, ClerkAuthentication]
 
@@ -26,6 +27,7 @@ AUTH_CLASSES = [SessionAuthentication, ClerkAuthentication]
 @api_view(['GET'])
 @authentication_classes(AUTH_CLASSES)
 @permission_classes([IsAuthenticated])
+@cached_response()
 def school_programme_grid(request):
     """The pivoted grid for a year (schools x programmes + school-level stats)."""
     year = int(request.query_params.get('year') or timezone.now().year)
@@ -3,7 +3,13 @@
 Thin views over api.wig_metrics. The Masi-PG programmes (Core Literacy,
 Numeracy, ECD) and the Data team are computed here; the Zazi iZandi tile is
 served separately (Masi backend calls the Zazi backend API).
+
+Lead measures and ring details are served from WigSnapshot rows precomputed by
+refresh_wig_snapshots, falling back to live computation for a week never
+stored. ``?week_ending=YYYY-MM-DD`` browses a past completed week.
 """
+from datetime import date
+
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
@@ -12,30 +18,65 @@ from django.utils import timezone
 
 from ..authentication import ClerkAuthentication
 from ..permissions import IsAdminOrProjectManager
+from ..data_quality import MAX_PAGE_SIZE as DQ_MAX_PAGE_SIZE, PAGE_SIZE as DQ_PAGE_SIZE
 from ..wig_metrics import build_lead_measures, build_data_quality, VALID_WIG_PERIODS, WIG_PERIOD_WEEK
+from ..wig_snapshots import detail_snapshot, lead_measures_snapshot, reference_for_week, snapshot_week
 from .. import zazi_client
+from ..response_cache import cached_response
 
 AUTH_CLASSES = [SessionAuthentication, ClerkAuthentication]
 PERM_CLASSES = [IsAdminOrProjectManager]
 
 
+def _reference_dt(request):
+    """(reference datetime, error Response) for the board's week: now, or the
+    completed week named by ``?week_ending=``."""
+    now = timezone.now()
+    raw = request.query_params.get('week_ending')
+    if not raw:
+        return now, None
+    try:
+        reference = reference_for_week(date.fromisoformat(raw))
+    except ValueError:
+        return None, Response({'detail': 'Invalid week_ending. Use YYYY-MM-DD.'},
+                              status=status.HTTP_400_BAD_REQUEST)
+    if snapshot_week(reference) > snapshot_week(now):
+        return None, Response({'detail': 'week_ending must be a completed week.'},
+                              status=status.HTTP_400_BAD_REQUEST)
+    return reference, None
+
+
 @api_view(['GET'])
 @authentication_classes(AUTH_CLASSES)
 @permission_classes(PERM_CLASSES)
+@cached_response()
 def wig_lead_measures(request):
-    """Lead-measure scoreboard for the requested completed period."""
+    """Lead-measure scoreboard for the requested completed period.
+
+    ``?debug=1`` adds a per-measure ``timings_ms`` breakdown to the payload.
+    """
     period = request.query_params.get('period', WIG_PERIOD_WEEK)
     if period not in VALID_WIG_PERIODS:
         return Response(
             {'detail': 'Invalid period. Use week, month, or programme_year.'},
             status=status.HTTP_400_BAD_REQUEST,
         )
-    return Response(build_lead_measures(timezone.now(), period=period))
+    reference, error = _reference_dt(request)
+    if error:
+        return error
+    if request.query_params.get('debug') in ('1', 'true'):
+        # Timings describe a live computation, so never serve them from a snapshot.
+        return Response(build_lead_measures(reference, period=period, debug=True))
+    payload = lead_measures_snapshot(reference, period)
+    if payload is None:
+        payload = build_lead_measures(reference, period=period)
+    return Response(payload)
 
 
 @api_view(['GET'])
 @authentication_classes(AUTH_CLASSES)
 @permission_classes(PERM_CLASSES)
+@cached_response()
 def wig_data_quality(request):
     """Data-team accuracy sub-gauges over the full dataset."""
     return Response(build_data_quality())
@@ -80,6 +121,9 @@ def wig_detail(request):
     Dispatches by measure key to the right builder (session heatmap, school
     coverage, visit table, or a data-quality record table) and returns a
     discriminated {'kind': ...} payload. Unknown measures return {'kind': 'none'}.
+
+    A data-quality table pages with ``?limit=`` (default 100, max 500) and
+    ``?offset=``, or ``?after=`` set to the previous page's ``page.next_after``.
     """
     from ..wig_detail import build_wig_detail
 
@@ -91,7 +135,25 @@ def wig_detail(request):
             {'detail': 'Invalid period. Use week, month, or programme_year.'},
             status=status.HTTP_400_BAD_REQUEST,
         )
-    return Response(build_wig_detail(programme, measure, timezone.now(), period=period))
+    reference, error = _reference_dt(request)
+    if error:
+        return error
+    if measure.startswith('dq.'):
+        params = request.query_params
+        try:
+            paging = {
+                'limit': min(max(int(params.get('limit', DQ_PAGE_SIZE)), 1), DQ_MAX_PAGE_SIZE),
+                'offset': max(int(params.get('offset', 0)), 0),
+                'after': int(params['after']) if params.get('after') else None,
+            }
+        except ValueError:
+            return Response({'detail': 'Invalid limit, offset or after.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_wig_detail(programme, measure, reference, period=period, **paging))
+    payload = detail_snapshot(programme, measure, reference, period)
+    if payload is None:
+        payload = build_wig_detail(programme, measure, reference, period=period)
+    return Response(payload)
 
 
 @api_view(['GET'])
@@ -26,6 +26,7 @@ from ..models import (
     School,
 )
 from ..permissions import IsAdminOrProjectManager
+from ..response_cache import cached_response
 
 
 AUTH_CLASSES = [SessionAuthentication, ClerkAuthentication]
@@ -239,20 +240,9 @@ def _schools_from_ids(value):
     return schools
 
 
-@api_view(["GET"])
-@authentication_classes(AUTH_CLASSES)
-@permission_classes([IsAuthenticated])
-def youth_budget_summary(request):
-    """Return the saved scenario and its current committed and at-plan forecast."""
-    try:
-        year = _integer(
-            request.query_params.get("year") or timezone.localdate().year,
-            "year",
-        )
-    except ValueError as exc:
-        return Response({"detail": str(exc)}, status=400)
-
-    as_of = timezone.localdate()
+def _budget_inputs(year, as_of):
+    """The saved scenario, the year's pots and the cohort/vacancy rows the
+    summary and the sweep both project from."""
     with transaction.atomic():
         scenario, _created = BudgetScenario.objects.get_or_create(
             year=year,
@@ -279,18 +269,43 @@ def youth_budget_summary(request):
         for pot in active_ringfenced_pots
         for school in pot.schools.all()
     )
+    snapshot = youth_budget.cohort_snapshot(year, as_of, ringfenced_school_ids)
+    return {
+        "scenario": scenario,
+        "pots": pots,
+        "active_core_pots_total": active_core_pots_total,
+        "active_ringfenced_pots": active_ringfenced_pots,
+        "cohorts": snapshot["cohorts"],
+        "vacancies": snapshot["vacancies"],
+    }
+
+
+@api_view(["GET"])
+@authentication_classes(AUTH_CLASSES)
+@permission_classes([IsAuthenticated])
+@cached_response()
+def youth_budget_summary(request):
+    """Return the saved scenario and its current committed and at-plan forecast."""
+    try:
+        year = _integer(
+            request.query_params.get("year") or timezone.localdate().year,
+            "year",
+        )
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=400)
+
+    as_of = timezone.localdate()
+    inputs = _budget_inputs(year, as_of)
+    scenario = inputs["scenario"]
+    pots = inputs["pots"]
+    active_core_pots_total = inputs["active_core_pots_total"]
+    active_ringfenced_pots = inputs["active_ringfenced_pots"]
+    cohorts = inputs["cohorts"]
+    vacancies = inputs["vacancies"]
     ringfenced_total = sum(
         (pot.amount for pot in active_ringfenced_pots),
         Decimal("0"),
     )
-    cohorts = youth_budget.build_cohorts(
-        today=as_of,
-        ringfenced_school_ids=ringfenced_school_ids,
-    )
-    vacancies = youth_budget.build_vacancies(
-        year,
-        ringfenced_school_ids=ringfenced_school_ids,
-    )
     projections = youth_budget.project(
         scenario,
         cohorts,
@@ -362,6 +377,89 @@ def youth_budget_summary(request):
     )
 
 
+def _lever_values(raw, field):
+    """Parse one comma-separated sweep lever with the scenario PATCH rules."""
+    values = []
+    for item in raw.split(","):
+        item = item.strip()
+        if field == "wage_rate":
+            values.append(_nonnegative_decimal(item, field))
+        elif field == "utilisation_pct":
+            pct = _integer(item, field)
+            if not 1 <= pct <= 120:
+                raise ValueError("utilisation_pct must be between 1 and 120.")
+            values.append(pct)
+        else:
+            count = _integer(item, field)
+            if count < 0:
+                raise ValueError(f"{field} must be non-negative.")
+            values.append(count)
+    return sorted(set(values))
+
+
+@api_view(["GET"])
+@authentication_classes(AUTH_CLASSES)
+@permission_classes([IsAuthenticated])
+@cached_response()
+def youth_budget_sweep(request):
+    """Evaluate a grid of what-if lever values against the saved scenario.
+
+    Each of wage_rate, utilisation_pct, nys_full_time_count and
+    nys_part_time_count takes a comma-separated list (omitted = the saved
+    value); every combination is projected in one request.
+    """
+    try:
+        year = _integer(
+            request.query_params.get("year") or timezone.localdate().year,
+            "year",
+        )
+        levers = {
+            field: _lever_values(request.query_params[field], field)
+            for field in youth_budget.SWEEP_LEVERS
+            if request.query_params.get(field)
+        }
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=400)
+    points = 1
+    for values in levers.values():
+        points *= len(values)
+    if points > youth_budget.SWEEP_MAX_POINTS:
+        return Response(
+            {"detail": f"A sweep is limited to {youth_budget.SWEEP_MAX_POINTS} points."},
+            status=400,
+        )
+
+    as_of = timezone.localdate()
+    inputs = _budget_inputs(year, as_of)
+    results = youth_budget.sweep(
+        inputs["scenario"],
+        inputs["cohorts"],
+        inputs["vacancies"]["vacancies"],
+        as_of,
+        levers,
+        inputs["active_core_pots_total"],
+    )
+    return Response(
+        {
+            "year": year,
+            "as_of": as_of.isoformat(),
+            "points": [
+                {
+                    "wage_rate": _number(point["wage_rate"]),
+                    "utilisation_pct": point["utilisation_pct"],
+                    "nys_full_time_count": point["nys_full_time_count"],
+                    "nys_part_time_count": point["nys_part_time_count"],
+                    "committed_total": _number(point["committed_total"]),
+                    "at_plan_total": _number(point["at_plan_total"]),
+                    "verdict_committed": _number(point["verdict_committed"]),
+                    "verdict_at_plan": _number(point["verdict_at_plan"]),
+                }
+                for point in results
+            ],
+        }
+    )
+
+
 @api_view(["PATCH"])
 @authentication_classes(AUTH_CLASSES)
 @permission_classes([IsAdminOrProjectManager])
@@ -445,6 +543,7 @@ def create_youth_budget_pot(request):
             pot = _create_pot(request.data)
     except ValueError as exc:
         return Response({"detail": str(exc)}, status=400)
+    youth_budget.invalidate_cohort_snapshot()
     return Response(serialize_pot(pot), status=201)
 
 
@@ -458,6 +557,7 @@ def update_youth_budget_pot(request, pk):
             pot = FundingPot.objects.select_for_update().get(pk=pk)
             if request.method == "DELETE":
                 pot.delete()
+                youth_budget.invalidate_cohort_snapshot()
                 return Response(status=204)
 
             if "year" in request.data:
@@ -496,6 +596,7 @@ def update_youth_budget_pot(request, pk):
         return Response({"detail": "Funding pot not found."}, status=404)
     except ValueError as exc:
         return Response({"detail": str(exc)}, status=400)
+    youth_budget.invalidate_cohort_snapshot()
     return Response(serialize_pot(pot))
 
 
@@ -3,18 +3,18 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.authentication import SessionAuthentication
 from django.utils import timezone
-from django.db.models import Count, Max, Q
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Coalesce
 from datetime import timedelta, date
 from collections import defaultdict
-from itertools import chain
 
 from ..models import (
-    LiteracySession2026, NumeracySession2026,
+    LiteracySession2026, NumeracySession2026, SessionDayFact,
     Youth, School, Mentor,
     StaffAbsence,
 )
 from ..authentication import ClerkAuthentication
-from ..closures import open_working_days_bulk, working_days_count
+from ..closures import closure_calendar, open_working_days_bulk, working_days_count
 from ..permissions import WIG_ALLOWED_ROLES
 
 AUTH_CLASSES = [SessionAuthentication, ClerkAuthentication]
@@ -85,8 +85,8 @@ def _last_n_working_days(n, ref_date=None):
     return sorted(days)
 
 
-def _apply_common_filters(qs, params):
-    """Apply common query params to a session queryset."""
+def _apply_common_filters(qs, params, date_field='session_date'):
+    """Apply common query params to a session (or SessionDayFact) queryset."""
     date_from = params.get('date_from')
     date_to = params.get('date_to')
     youth_uid = params.get('youth_uid')
@@ -94,9 +94,9 @@ def _apply_common_filters(qs, params):
     mentor_id = params.get('mentor_id')
 
     if date_from:
-        qs = qs.filter(session_date__gte=date_from)
+        qs = qs.filter(**{f'{date_field}__gte': date_from})
     if date_to:
-        qs = qs.filter(session_date__lte=date_to)
+        qs = qs.filter(**{f'{date_field}__lte': date_to})
     if youth_uid:
         qs = qs.filter(youth__youth_uid=youth_uid)
     if school_uid:
@@ -107,29 +107,20 @@ def _apply_common_filters(qs, params):
     return qs
 
 
-def _get_session_querysets(params):
-    """Return (literacy_qs, numeracy_qs) with common filters applied.
-    Respects the 'programme' param to return empty querysets when filtered out.
-    Also restricts sessions to only those from included youth (by job title)."""
+def _get_fact_queryset(params):
+    """SessionDayFact rows for the dashboard filters, both programmes in one
+    queryset (split on ``programme``). Respects the 'programme' param and only
+    counts sessions from included youth (by job title). Counts are
+    ``Sum('session_count')``, not ``Count('id')``."""
     programme = params.get('programme', 'all')
     titles = _get_job_titles_for_programme(programme)
+    qs = SessionDayFact.objects.filter(youth__job_title__in=titles)
+    if programme in ('literacy', 'numeracy'):
+        qs = qs.filter(programme=programme)
+    return _apply_common_filters(qs, params, date_field='date')
 
-    # Only include sessions from youth with included job titles
-    lit_qs = LiteracySession2026.objects.filter(youth__job_title__in=titles)
-    num_qs = NumeracySession2026.objects.filter(youth__job_title__in=titles)
 
-    if programme == 'literacy':
-        num_qs = num_qs.none()
-    elif programme == 'numeracy':
-        lit_qs = lit_qs.none()
-
-    lit_qs = _apply_common_filters(lit_qs, params)
-    num_qs = _apply_common_filters(num_qs, params)
-
-    return lit_qs, num_qs
-
-
-def _inactivity_state(params, days, today):
+def _inactivity_state(params, days, today, calendar=None):
     """Inputs for closure/absence-aware inactivity: the active youth, each youth's
     open working days (closures + absences + start-date applied), and the dates
     each had sessions. Looks back a generous window so closures don't shorten the
@@ -137,13 +128,9 @@ def _inactivity_state(params, days, today):
     active = list(_active_youth_qs(params, reference_date=today).select_related('mentor', 'school'))
     lookback = _last_n_working_days(days + 14, today)
     window_start = lookback[0] if lookback else today
-    open_by_id = open_working_days_bulk(active, window_start, today)
-    lit_qs, num_qs = _get_session_querysets(params)
+    open_by_id = open_working_days_bulk(active, window_start, today, calendar=calendar)
     sess = defaultdict(set)
-    for uid, d in lit_qs.filter(session_date__gte=window_start).values_list('youth_uid', 'session_date'):
-        if uid:
-            sess[uid].add(d)
-    for uid, d in num_qs.filter(session_date__gte=window_start).values_list('youth_uid', 'session_date'):
+    for uid, d in _get_fact_queryset(params).filter(date__gte=window_start).values_list('youth_uid', 'date'):
         if uid:
             sess[uid].add(d)
     return active, open_by_id, sess
@@ -159,36 +146,59 @@ def _is_inactive(youth, open_by_id, sess, days):
     return not (last_n_open & sess.get(youth.youth_uid, set()))
 
 
+def _summary_counts(facts, today):
+    """Every session-derived stat card in one conditional-aggregate query.
+
+    Distinct youth/school counts treat a missing uid as one more distinct value
+    (COUNT(DISTINCT) skips NULLs), matching the len(set(values_list(...)))
+    these numbers were originally computed with.
+    """
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    in_today, in_week, in_month = Q(date=today), Q(date__gte=week_start), Q(date__gte=month_start)
+
+    def total(q):
+        return Coalesce(Sum('session_count', filter=q), 0)
+
+    def distinct(field, q):
+        return Count(field, distinct=True, filter=q)
+
+    def has_null(field, q):
+        return Count('id', filter=q & Q(**{f'{field}__isnull': True}))
+
+    agg = facts.aggregate(
+        today=total(in_today),
+        week=total(in_week),
+        month=total(in_month),
+        literacy=total(Q(programme='literacy')),
+        numeracy=total(Q(programme='numeracy')),
+        youth_today=distinct('youth_uid', in_today),
+        youth_today_null=has_null('youth_uid', in_today),
+        youth_week=distinct('youth_uid', in_week),
+        youth_week_null=has_null('youth_uid', in_week),
+        schools_today=distinct('school_uid', in_today),
+        schools_today_null=has_null('school_uid', in_today),
+    )
+    return {
+        'today': agg['today'],
+        'week': agg['week'],
+        'month': agg['month'],
+        'literacy': agg['literacy'],
+        'numeracy': agg['numeracy'],
+        'youth_today': agg['youth_today'] + bool(agg['youth_today_null']),
+        'youth_week': agg['youth_week'] + bool(agg['youth_week_null']),
+        'schools_today': agg['schools_today'] + bool(agg['schools_today_null']),
+    }
+
+
 @api_view(['GET'])
 @authentication_classes(AUTH_CLASSES)
 @permission_classes(PERM_CLASSES)
 def youth_sessions_summary(request):
     """Top-level stat cards for youth sessions dashboard."""
     params = request.query_params
-    lit_qs, num_qs = _get_session_querysets(params)
-
     today = timezone.now().date()
-    week_start = today - timedelta(days=today.weekday())
-    month_start = today.replace(day=1)
-
-    lit_today = lit_qs.filter(session_date=today).count()
-    num_today = num_qs.filter(session_date=today).count()
-    lit_week = lit_qs.filter(session_date__gte=week_start).count()
-    num_week = num_qs.filter(session_date__gte=week_start).count()
-    lit_month = lit_qs.filter(session_date__gte=month_start).count()
-    num_month = num_qs.filter(session_date__gte=month_start).count()
-
-    today_youth_uids = set(
-        lit_qs.filter(session_date=today).values_list('youth_uid', flat=True)
-    ) | set(
-        num_qs.filter(session_date=today).values_list('youth_uid', flat=True)
-    )
-
-    active_youth_week_uids = set(
-        lit_qs.filter(session_date__gte=week_start).values_list('youth_uid', flat=True)
-    ) | set(
-        num_qs.filter(session_date__gte=week_start).values_list('youth_uid', flat=True)
-    )
+    counts = _summary_counts(_get_fact_queryset(params), today)
 
     active_youth = _active_youth_qs(params, reference_date=today)
     total_active_youth = active_youth.count()
@@ -201,30 +211,25 @@ def youth_sessions_summary(request):
         if y.youth_uid and _is_inactive(y, inactive_open, inactive_sess, 2)
     )
 
-    today_school_uids = set(
-        lit_qs.filter(session_date=today).values_list('school_uid', flat=True)
-    ) | set(
-        num_qs.filter(session_date=today).values_list('school_uid', flat=True)
-    )
     total_schools = School.objects.filter(is_active=True).count()
 
-    week_total = lit_week + num_week
-    active_week_count = len(active_youth_week_uids)
+    week_total = counts['week']
+    active_week_count = counts['youth_week']
     avg_sessions = round(week_total / active_week_count, 1) if active_week_count else 0
 
     return Response({
-        'total_sessions_today': lit_today + num_today,
-        'total_sessions_this_week': lit_week + num_week,
-        'total_sessions_this_month': lit_month + num_month,
-        'active_youth_today': len(today_youth_uids),
-        'active_youth_this_week': len(active_youth_week_uids),
+        'total_sessions_today': counts['today'],
+        'total_sessions_this_week': week_total,
+        'total_sessions_this_month': counts['month'],
+        'active_youth_today': counts['youth_today'],
+        'active_youth_this_week': active_week_count,
         'total_active_youth': total_active_youth,
         'inactive_youth_2_days': inactive_count,
-        'schools_covered_today': len(today_school_uids),
+        'schools_covered_today': counts['schools_today'],
         'total_schools': total_schools,
         'avg_sessions_per_youth_this_week': avg_sessions,
-        'literacy_sessions': lit_qs.count(),
-        'numeracy_sessions': num_qs.count(),
+        'literacy_sessions': counts['literacy'],
+        'numeracy_sessions': counts['numeracy'],
     })
 
 
@@ -234,21 +239,19 @@ def youth_sessions_summary(request):
 def youth_sessions_daily_activity(request):
     """Stacked bar chart data: daily session counts grouped by school type."""
     params = request.query_params
-    lit_qs, num_qs = _get_session_querysets(params)
+    facts = _get_fact_queryset(params)
 
     today = timezone.now().date()
     if not params.get('date_from'):
-        lit_qs = lit_qs.filter(session_date__gte=today - timedelta(days=30))
-        num_qs = num_qs.filter(session_date__gte=today - timedelta(days=30))
+        facts = facts.filter(date__gte=today - timedelta(days=30))
 
-    def _agg(qs):
-        return qs.filter(school__isnull=False).values(
-            'session_date', 'school__type'
-        ).annotate(count=Count('id'))
+    rows = facts.filter(school__isnull=False).values(
+        'date', 'school__type'
+    ).annotate(count=Sum('session_count'))
 
     pivot = defaultdict(lambda: defaultdict(int))
-    for row in chain(_agg(lit_qs), _agg(num_qs)):
-        d = str(row['session_date'])
+    for row in rows:
+        d = str(row['date'])
         school_type = row['school__type'] or 'Other'
         if 'primary' in school_type.lower():
             key = 'primary_school'
@@ -287,7 +290,7 @@ def youth_sessions_daily_activity(request):
 def youth_sessions_heatmap(request):
     """Youth x date heatmap of daily session counts."""
     params = request.query_params
-    lit_qs, num_qs = _get_session_querysets(params)
+    facts = _get_fact_queryset(params)
 
     today = timezone.now().date()
 
@@ -299,17 +302,13 @@ def youth_sessions_heatmap(request):
         working_days = _get_working_days(d_from, d_to)
 
     if working_days:
-        lit_qs = lit_qs.filter(session_date__in=working_days)
-        num_qs = num_qs.filter(session_date__in=working_days)
-
-    def _agg(qs):
-        return qs.values('youth_uid', 'session_date').annotate(count=Count('id'))
+        facts = facts.filter(date__in=working_days)
 
     youth_data = defaultdict(lambda: defaultdict(int))
-    for row in chain(_agg(lit_qs), _agg(num_qs)):
+    for row in facts.values('youth_uid', 'date').annotate(count=Sum('session_count')):
         uid = row['youth_uid']
         if uid:
-            youth_data[uid][str(row['session_date'])] += row['count']
+            youth_data[uid][str(row['date'])] += row['count']
 
     max_date = working_days[-1] if working_days else None
     active_youth = list(
@@ -392,49 +391,35 @@ def youth_sessions_inactive(request):
 
     today = timezone.now().date()
 
-    active_youth, open_by_id, sess_dates = _inactivity_state(params, days, today)
+    calendar = closure_calendar()
+    active_youth, open_by_id, sess_dates = _inactivity_state(params, days, today, calendar)
     inactive_youth = [
         y for y in active_youth
         if y.youth_uid and _is_inactive(y, open_by_id, sess_dates, days)
     ]
     inactive_uids = [y.youth_uid for y in inactive_youth]
 
-    last_lit = dict(
-        LiteracySession2026.objects.filter(
-            youth_uid__in=inactive_uids
-        ).values('youth_uid').annotate(last=Max('session_date')).values_list('youth_uid', 'last')
-    )
-    last_num = dict(
-        NumeracySession2026.objects.filter(
-            youth_uid__in=inactive_uids
-        ).values('youth_uid').annotate(last=Max('session_date')).values_list('youth_uid', 'last')
-    )
-
     month_start = today.replace(day=1)
-    month_lit = dict(
-        LiteracySession2026.objects.filter(
-            youth_uid__in=inactive_uids, session_date__gte=month_start
-        ).values('youth_uid').annotate(c=Count('id')).values_list('youth_uid', 'c')
+    inactive_facts = SessionDayFact.objects.filter(youth_uid__in=inactive_uids)
+    last_by_uid = dict(
+        inactive_facts.values('youth_uid').annotate(last=Max('date')).values_list('youth_uid', 'last')
     )
-    month_num = dict(
-        NumeracySession2026.objects.filter(
-            youth_uid__in=inactive_uids, session_date__gte=month_start
-        ).values('youth_uid').annotate(c=Count('id')).values_list('youth_uid', 'c')
+    month_by_uid = dict(
+        inactive_facts.filter(date__gte=month_start)
+        .values('youth_uid').annotate(c=Sum('session_count')).values_list('youth_uid', 'c')
     )
 
     result = []
     for y in inactive_youth:
         uid = y.youth_uid
-        lit_last = last_lit.get(uid)
-        num_last = last_num.get(uid)
-        last_session = max(filter(None, [lit_last, num_last]), default=None)
+        last_session = last_by_uid.get(uid)
         if last_session:
             calendar_days_inactive = (today - last_session).days
             # OPEN working days (excluding closures + this youth's absences) strictly
             # after last_session through today -- over the full gap, not just the
             # recent inactivity lookback window.
             working_days_inactive = working_days_count(
-                y.school, last_session + timedelta(days=1), today, youth=y,
+                y.school, last_session + timedelta(days=1), today, youth=y, calendar=calendar,
             )
         else:
             calendar_days_inactive = None
@@ -448,7 +433,7 @@ def youth_sessions_inactive(request):
             'last_session_date': str(last_session) if last_session else None,
             'calendar_days_inactive': calendar_days_inactive,
             'working_days_inactive': working_days_inactive,
-            'total_sessions_this_month': month_lit.get(uid, 0) + month_num.get(uid, 0),
+            'total_sessions_this_month': month_by_uid.get(uid, 0),
         })
 
     result.sort(key=lambda x: -(x['working_days_inactive'] or 0))
@@ -462,24 +447,24 @@ def youth_sessions_inactive(request):
 def youth_sessions_school_coverage(request):
     """Schools with/without sessions in the date range."""
     params = request.query_params
-    lit_qs, num_qs = _get_session_querysets(params)
+    facts = _get_fact_queryset(params)
 
     today = timezone.now().date()
     if not params.get('date_from'):
         week_start = today - timedelta(days=today.weekday())
-        lit_qs = lit_qs.filter(session_date__gte=week_start)
-        num_qs = num_qs.filter(session_date__gte=week_start)
-
-    def _covered(qs):
-        return qs.filter(school__isnull=False).values(
-            'school__school_uid', 'school__name', 'school__type'
-        ).annotate(
-            session_count=Count('id'),
-            youth_count=Count('youth_uid', distinct=True),
-        )
+        facts = facts.filter(date__gte=week_start)
+
+    # Grouped per programme too: a school's youth_count is the larger of its
+    # literacy and numeracy coach counts, not their union.
+    covered_rows = facts.filter(school__isnull=False).values(
+        'programme', 'school__school_uid', 'school__name', 'school__type'
+    ).annotate(
+        session_count=Sum('session_count'),
+        youth_count=Count('youth_uid', distinct=True),
+    )
 
     covered_map = {}
-    for row in chain(_covered(lit_qs), _covered(num_qs)):
+    for row in covered_rows:
         uid = row['school__school_uid']
         if uid not in covered_map:
             covered_map[uid] = {
@@ -496,28 +481,19 @@ def youth_sessions_school_coverage(request):
 
     # Schools that have ever had sessions but not in this range
     all_session_school_uids = set(
-        LiteracySession2026.objects.filter(school_uid__isnull=False).values_list('school_uid', flat=True).distinct()
-    ) | set(
-        NumeracySession2026.objects.filter(school_uid__isnull=False).values_list('school_uid', flat=True).distinct()
+        SessionDayFact.objects.filter(school_uid__isnull=False).values_list('school_uid', flat=True).distinct()
     )
     uncovered_uids = all_session_school_uids - set(covered_map.keys())
 
-    last_lit = dict(
-        LiteracySession2026.objects.filter(
-            school_uid__in=uncovered_uids
-        ).values('school_uid').annotate(last=Max('session_date')).values_list('school_uid', 'last')
-    )
-    last_num = dict(
-        NumeracySession2026.objects.filter(
+    last_by_school = dict(
+        SessionDayFact.objects.filter(
             school_uid__in=uncovered_uids
-        ).values('school_uid').annotate(last=Max('session_date')).values_list('school_uid', 'last')
+        ).values('school_uid').annotate(last=Max('date')).values_list('school_uid', 'last')
     )
 
     uncovered = []
     for s in School.objects.filter(school_uid__in=uncovered_uids):
-        lit_last = last_lit.get(s.school_uid)
-        num_last = last_num.get(s.school_uid)
-        last_session = max(filter(None, [lit_last, num_last]), default=None)
+        last_session = last_by_school.get(s.school_uid)
         uncovered.append({
             'school_uid': s.school_uid,
             'name': s.name,
@@ -0,0 +1,276 @@
+"""One query layer over the four mentor-visit models.
+
+MentorVisit (Masi literacy), YeboVisit, ThousandStoriesVisit and NumeracyVisit
+share a shape: a mentor, a school, a visit date, one 1-10 quality rating and a
+comment. Each model names the rating and the comment its own way. The
+recent-visits feed and the mentor dashboards used to apply every filter to four
+querysets, run each chart's GROUP BY four times and merge the results in
+Python.
+
+``VisitFacts`` applies the filters once. It answers each question with one
+``UNION ALL`` statement whose rows carry a ``programme`` discriminator, so a
+chart is one query, and "latest n visits" is a single ``ORDER BY ... LIMIT``.
+
+Grouped questions (visits per week, per rating, per school) group inside each
+branch of the union, so each branch can use its model's indexes, and the
+database returns at most one row per (programme, group).
+
+Deep history is paged by keyset rather than offset. ``page`` reads at most
+``size`` rows from each model, newer than nothing and older than the cursor,
+walking each model's ``(visit_date, created_at, id)`` index. It merges the four
+sorted runs in Python. Each page costs the same however far back it is.
+"""
+import base64
+import heapq
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.db.models import Avg, CharField, Count, F, Max, Q, Value
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import MentorVisit, NumeracyVisit, ThousandStoriesVisit, YeboVisit
+
+
+@dataclass(frozen=True)
+class VisitProgramme:
+    key: str
+    label: str
+    model: type
+    quality_field: str
+    comments_field: str
+
+
+PROGRAMMES = (
+    VisitProgramme('literacy', 'MASI Literacy', MentorVisit, 'quality_rating', 'commentary'),
+    VisitProgramme('yebo', 'Yebo', YeboVisit, 'afternoon_session_quality', 'commentary'),
+    VisitProgramme('stories', '1000 Stories', ThousandStoriesVisit, 'story_time_quality', 'other_comments'),
+    VisitProgramme('numeracy', 'Numeracy', NumeracyVisit, 'quality_rating', 'commentary'),
+)
+PROGRAMME_BY_KEY = {p.key: p for p in PROGRAMMES}
+
+# The dashboards' time_filter values, as days back from today ('thisyear' and
+# 'all' are handled in time_filter_start).
+TIME_FILTER_DAYS = {'7days': 7, '30days': 30, '90days': 90}
+
+# Columns every rows() record carries, in every branch.
+ROW_FIELDS = (
+    'programme', 'id', 'visit_date', 'created_at', 'school_id', 'mentor_id',
+    'quality', 'comments', 'school_name', 'mentor_first_name', 'mentor_last_name',
+    'mentor_username',
+)
+
+
+def encode_cursor(key):
+    """Opaque, URL-safe cursor for a feed key ``(visit_date, created_at, programme, id)``."""
+    visit_date, created_at, programme, pk = key
+    raw = json.dumps([visit_date.isoformat(), created_at.isoformat(), programme, pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """The feed key in ``cursor``; ValueError when it is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        visit_date, created_at, programme, pk = json.loads(raw)
+        key = (date.fromisoformat(visit_date), datetime.fromisoformat(created_at), programme, int(pk))
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('invalid cursor') from exc
+    if programme not in PROGRAMME_BY_KEY:
+        raise ValueError('invalid cursor')
+    return key
+
+
+def feed_key(row):
+    """The feed's sort key for a rows() record: newest first, ties broken by
+    programme then id so that every visit has exactly one place."""
+    return (row['visit_date'], row['created_at'], row['programme'], row['id'])
+
+
+def time_filter_start(time_filter, today):
+    """First visit date a dashboard ``time_filter`` keeps; None for 'all'."""
+    if time_filter in TIME_FILTER_DAYS:
+        return today - timedelta(days=TIME_FILTER_DAYS[time_filter])
+    if time_filter == 'thisyear':
+        return today.replace(month=1, day=1)
+    return None
+
+
+class VisitFacts:
+    """The visits of the selected programmes, filtered once.
+
+    ``since``/``until`` bound ``visit_date`` (inclusive); ``school_id`` and
+    ``mentor_id`` narrow to one school or mentor; ``programmes`` is an
+    iterable of PROGRAMMES keys (default: all four).
+    """
+
+    def __init__(self, *, since=None, until=None, school_id=None, mentor_id=None, programmes=None):
+        self.programmes = [PROGRAMME_BY_KEY[k] for k in programmes] if programmes else list(PROGRAMMES)
+        self.filters = Q()
+        if since:
+            self.filters &= Q(visit_date__gte=since)
+        if until:
+            self.filters &= Q(visit_date__lte=until)
+        if school_id:
+            self.filters &= Q(school_id=school_id)
+        if mentor_id:
+            self.filters &= Q(mentor_id=mentor_id)
+
+    def _branch(self, programme):
+        return (programme.model.objects.filter(self.filters).order_by()
+                .annotate(programme=Value(programme.key, output_field=CharField())))
+
+    def _union(self, build, programmes=None):
+        """``build(programme, branch)`` for each programme, UNION ALL-ed."""
+        branches = [build(p, self._branch(p)) for p in programmes or self.programmes]
+        if len(branches) == 1:
+            return branches[0]
+        return branches[0].union(*branches[1:], all=True)
+
+    @staticmethod
+    def _row_values(programme, queryset):
+        return queryset.annotate(
+            quality=F(programme.quality_field),
+            comments=F(programme.comments_field),
+            school_name=F('school__name'),
+            mentor_first_name=F('mentor__first_name'),
+            mentor_last_name=F('mentor__last_name'),
+            mentor_username=F('mentor__username'),
+        ).values(*ROW_FIELDS)
+
+    def rows(self):
+        """One record per visit with the ROW_FIELDS columns (unordered)."""
+        return self._union(self._row_values)
+
+    def recent(self, limit):
+        """The ``limit`` latest visits across programmes, newest first."""
+        return list(self.rows().order_by('-visit_date', '-created_at', '-programme', '-id')[:limit])
+
+    def page(self, size, after=None):
+        """(rows, next key): the ``size`` visits that follow the feed key
+        ``after`` (None: from the newest), newest first, and the key to pass
+        as ``after`` for the next page (None when the feed is exhausted).
+
+        Reads at most ``size`` rows per programme; the runs are k-way merged.
+        A programme that filled its ``size`` rows may have more, so the feed can
+        end with an empty page.
+        """
+        runs = []
+        exhausted = True
+        for programme in self.programmes:
+            branch = self._branch(programme)
+            if after:
+                branch = branch.filter(self._before(programme, after))
+            run = list(self._row_values(programme, branch)
+                       .order_by('-visit_date', '-created_at', '-id')[:size])
+            runs.append(run)
+            exhausted = exhausted and len(run) < size
+        merged = heapq.merge(*runs, key=feed_key, reverse=True)
+        rows = [row for row, _ in zip(merged, range(size))]
+        more = sum(len(run) for run in runs) > len(rows) or not exhausted
+        return rows, (feed_key(rows[-1]) if rows and more else None)
+
+    @staticmethod
+    def _before(programme, key):
+        """Rows of ``programme`` that sort after feed key ``key`` (i.e. are older)."""
+        visit_date, created_at, key_programme, pk = key
+        older = Q(visit_date__lt=visit_date) | Q(visit_date=visit_date, created_at__lt=created_at)
+        same_instant = Q(visit_date=visit_date, created_at=created_at)
+        if programme.key < key_programme:
+            return older | same_instant
+        if programme.key == key_programme:
+            return older | (same_instant & Q(id__lt=pk))
+        return older
+
+    def counts_by_period(self, period='week'):
+        """``{programme key: {period start: visits}}``; ``period`` is 'week' or 'month'."""
+        trunc = TruncWeek if period == 'week' else TruncMonth
+        result = {p.key: {} for p in self.programmes}
+        rows = self._union(lambda p, qs: qs.annotate(period=trunc('visit_date'))
+                           .values('programme', 'period').annotate(n=Count('id')))
+        for row in rows:
+            result[row['programme']][row['period']] = row['n']
+        return result
+
+    def counts_by_quality(self):
+        """``{programme key: {rating: visits}}`` (a None rating included)."""
+        result = {p.key: {} for p in self.programmes}
+        rows = self._union(lambda p, qs: qs.annotate(rating=F(p.quality_field))
+                           .values('programme', 'rating').annotate(n=Count('id')))
+        for row in rows:
+            result[row['programme']][row['rating']] = row['n']
+        return result
+
+    def per_school(self):
+        """``{programme key: {school id: (visits, average quality or None)}}``."""
+        result = {p.key: {} for p in self.programmes}
+        rows = self._union(lambda p, qs: qs.values('programme', 'school_id')
+                           .annotate(n=Count('id'), avg_quality=Avg(p.quality_field)))
+        for row in rows:
+            result[row['programme']][row['school_id']] = (row['n'], row['avg_quality'])
+        return result
+
+    def summary(self, recent_since):
+        """``{programme key: {'total', 'recent', 'avg_quality'}}`` where recent
+        counts visits on or after ``recent_since``."""
+        result = {p.key: {'total': 0, 'recent': 0, 'avg_quality': None} for p in self.programmes}
+        rows = self._union(lambda p, qs: qs.values('programme').annotate(
+            total=Count('id'),
+            recent=Count('id', filter=Q(visit_date__gte=recent_since)),
+            avg_quality=Avg(p.quality_field),
+        ))
+        for row in rows:
+            programme = row.pop('programme')
+            result[programme] = row
+        return result
+
+    def school_ids(self):
+        """Distinct schools visited, across programmes."""
+        branches = [self._branch(p).values_list('school_id') for p in self.programmes]
+        return {school_id for (school_id,) in branches[0].union(*branches[1:])}
+
+    def mentor_ids(self):
+        """Distinct mentors with a visit, across programmes."""
+        branches = [self._branch(p).values_list('mentor_id') for p in self.programmes]
+        return {mentor_id for (mentor_id,) in branches[0].union(*branches[1:])}
+
+    def latest_per_school(self):
+        """``{school id: row}`` for each school's most recent visit, where a row
+        is a rows() record. Ties on the date go to the earlier programme in
+        PROGRAMMES.
+
+        Reads each school's latest date per programme (one grouped query), then
+        only the visits on those dates.
+        """
+        latest = self._union(lambda p, qs: qs.values('programme', 'school_id')
+                             .annotate(last=Max('visit_date')))
+        order = {p.key: i for i, p in enumerate(self.programmes)}
+        best = {}
+        for row in latest:
+            key = (row['last'], -order[row['programme']])
+            if row['school_id'] not in best or key > best[row['school_id']][0]:
+                best[row['school_id']] = (key, row['programme'])
+        if not best:
+            return {}
+
+        wanted = {}
+        for school_id, ((last, _), programme) in best.items():
+            wanted[programme] = wanted.get(programme, Q()) | Q(school_id=school_id, visit_date=last)
+        rows = self._union(
+            lambda p, qs: self._row_values(p, qs.filter(wanted[p.key])),
+            programmes=[p for p in self.programmes if p.key in wanted],
+        )
+        result = {}
+        for row in rows.order_by('-created_at'):
+            if best[row['school_id']][1] == row['programme']:
+                result.setdefault(row['school_id'], row)
+        return result
+
+    def activity(self):
+        """``{(mentor id, visit date): {programme keys}}``: which programmes each
+        mentor visited on each day."""
+        result = {}
+        rows = self._union(lambda p, qs: qs.values('programme', 'mentor_id', 'visit_date').distinct())
+        for row in rows:
+            result.setdefault((row['mentor_id'], row['visit_date']), set()).add(row['programme'])
+        return result
@@ -8,11 +8,12 @@ cohorts as the headline measure, so the detail always matches the gauge.
 from collections import defaultdict
 from datetime import date, timedelta
 
-from django.db.models import Count, Max, Q
+from django.db.models import Count, Max
 
-from .models import Youth, LiteracySession2026, NumeracySession2026
+from .data_quality import DQ_SOURCES, PAGE_SIZE as DQ_PAGE_SIZE, dq_page
+from .models import Youth
 from .wig_metrics import (
-    COHORTS, ECD_JOB_TITLES, PRIMARY_SITE_TYPES,
+    COHORTS,
     lead_measure_window, eligible_coaches,
     _programme_session_qs, _visit_spec, _programme_visit_qs,
 )
@@ -204,69 +205,81 @@ def _session_row(s):
     }
 
 
-def _dq(title, columns, rows, total, note):
-    return {'kind': 'dq_records', 'title': title, 'columns': columns,
-            'rows': rows, 'total_flagged': total, 'note': note}
-
-
-def dq_detail(measure):
-    if measure == 'dq.duplicate_rate':
-        qs = (LiteracySession2026.objects.filter(duplicate_status='Duplicate')
-              .select_related('youth', 'school').order_by('-session_date'))
-        return _dq('Duplicate sessions', _SESSION_COLUMNS, [_session_row(s) for s in qs[:100]],
-                   qs.count(), "Literacy sessions flagged duplicate_status='Duplicate'.")
-
-    if measure == 'dq.capture_on_time':
-        qs = (LiteracySession2026.objects
-              .exclude(capture_delay__gte=0, capture_delay__lte=2)
-              .select_related('youth', 'school').order_by('-session_date'))
-        rows = [{**_session_row(s), 'capture_delay': s.capture_delay} for s in qs[:100]]
-        cols = _SESSION_COLUMNS + [{'key': 'capture_delay', 'label': 'Capture delay (days)'}]
-        return _dq('Late / abnormal captures', cols, rows, qs.count(),
-                   'Sessions captured outside the 0-2 day window (or missing a delay).')
-
-    if measure == 'dq.child_fk_resolution':
-        base = LiteracySession2026.objects
-        qs = (base.filter(Q(child_1__isnull=True) | Q(child_2__isnull=True))
-              .select_related('youth', 'school').order_by('-session_date'))
-        rows = []
-        for s in qs[:100]:
-            missing = [slot for slot, val in (('child_1', s.child_1_id), ('child_2', s.child_2_id)) if val is None]
-            rows.append({**_session_row(s), 'unresolved': ', '.join(missing)})
-        cols = _SESSION_COLUMNS + [{'key': 'unresolved', 'label': 'Unresolved slot'}]
-        # Count unresolved *slots* (each session has two), matching the gauge.
-        unresolved_slots = (base.filter(child_1__isnull=True).count()
-                            + base.filter(child_2__isnull=True).count())
-        return _dq('Unresolved child links', cols, rows, unresolved_slots,
-                   'Unresolved child_1 / child_2 slots (each session has two).')
-
-    if measure == 'dq.site_job_mismatch':
-        qs = (Youth.objects.filter(employment_status='Active', job_title__in=ECD_JOB_TITLES,
-                                   school__type__in=PRIMARY_SITE_TYPES)
-              .select_related('school').order_by('full_name'))
-        rows = [{
-            'name': y.full_name,
-            'job_title': y.job_title,
-            'school': y.school.name if y.school_id else '',
-            'type': y.school.type if y.school_id else '',
-        } for y in qs[:100]]
-        cols = [{'key': 'name', 'label': 'Youth'}, {'key': 'job_title', 'label': 'Job title'},
-                {'key': 'school', 'label': 'School'}, {'key': 'type', 'label': 'Site type'}]
-        return _dq('ECD title at a primary site', cols, rows, qs.count(),
-                   'Active youth with an ECD job title assigned to a primary site.')
+def _youth_row(y):
+    return {
+        'name': y.full_name,
+        'job_title': y.job_title,
+        'school': y.school.name if y.school_id else '',
+        'type': y.school.type if y.school_id else '',
+    }
+
+
+def _unresolved_row(s):
+    missing = [slot for slot, val in (('child_1', s.child_1_id), ('child_2', s.child_2_id)) if val is None]
+    return {**_session_row(s), 'unresolved': ', '.join(missing)}
+
+
+# measure -> (title, columns, row builder, note). The offending ids come from
+# the lists refresh_dq_flags stores at sync time (api/data_quality.py).
+_DQ_TABLES = {
+    'dq.duplicate_rate': (
+        'Duplicate sessions', _SESSION_COLUMNS, _session_row,
+        "Literacy sessions flagged duplicate_status='Duplicate'."),
+    'dq.capture_on_time': (
+        'Late / abnormal captures',
+        _SESSION_COLUMNS + [{'key': 'capture_delay', 'label': 'Capture delay (days)'}],
+        lambda s: {**_session_row(s), 'capture_delay': s.capture_delay},
+        'Sessions captured outside the 0-2 day window (or missing a delay).'),
+    'dq.child_fk_resolution': (
+        # total_flagged counts unresolved *slots* (each session has two), matching the gauge.
+        'Unresolved child links',
+        _SESSION_COLUMNS + [{'key': 'unresolved', 'label': 'Unresolved slot'}],
+        _unresolved_row,
+        'Unresolved child_1 / child_2 slots (each session has two).'),
+    'dq.site_job_mismatch': (
+        'ECD title at a primary site',
+        [{'key': 'name', 'label': 'Youth'}, {'key': 'job_title', 'label': 'Job title'},
+         {'key': 'school', 'label': 'School'}, {'key': 'type', 'label': 'Site type'}],
+        _youth_row,
+        'Active youth with an ECD job title assigned to a primary site.'),
+}
 
-    return {'kind': 'none'}
+
+def dq_detail(measure, limit=DQ_PAGE_SIZE, offset=0, after=None):
+    """One page of the records failing a data-quality gauge.
+
+    ``offset``/``limit`` or the keyset ``after`` (the previous page's
+    ``page.next_after``) select the page from the stored offender list, and
+    the whole payload is as of ``refreshed_at``.
+    """
+    if measure not in _DQ_TABLES:
+        return {'kind': 'none'}
+    title, columns, build_row, note = _DQ_TABLES[measure]
+    page = dq_page(measure, limit=limit, offset=offset, after=after)
+    model = DQ_SOURCES[measure][0]
+    related = ('school',) if model is Youth else ('youth', 'school')
+    records = model.objects.select_related(*related).in_bulk(page['ids'])
+    # A record deleted since the last refresh is skipped until the next one.
+    rows = [build_row(records[pk]) for pk in page['ids'] if pk in records]
+    return {'kind': 'dq_records', 'title': title, 'columns': columns,
+            'rows': rows, 'total_flagged': page['total_flagged'], 'note': note,
+            'page': {'offset': offset if after is None else None, 'after': after, 'limit': limit,
+                     'total_rows': page['total_rows'], 'next_after': page['next_after']},
+            'refreshed_at': page['refreshed_at']}
 
 
 _SESSION_COUNT_SUFFIXES = {'sessions_per_day', 'sessions_per_week'}
 _VISIT_SUFFIXES = {'tracker_compliance', 'admin_compliance', 'school_visits'}
 
 
-def build_wig_detail(programme, measure, reference_dt, period='week'):
-    """Dispatch a (programme, measure) to the right detail builder."""
+def build_wig_detail(programme, measure, reference_dt, period='week', **dq_paging):
+    """Dispatch a (programme, measure) to the right detail builder.
+
+    ``dq_paging`` (limit/offset/after) pages a data-quality record table.
+    """
     if measure.startswith('dq.'):
         # Data-quality gauges are global accuracy, owned by the data_team page.
-        return dq_detail(measure) if programme == 'data_team' else {'kind': 'none'}
+        return dq_detail(measure, **dq_paging) if programme == 'data_team' else {'kind': 'none'}
     if programme not in COHORTS:
         return {'kind': 'none'}
     # The measure must belong to the requested programme (reject e.g.
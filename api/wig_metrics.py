@@ -5,14 +5,16 @@ layer so it can be unit-tested directly. See
 frontend `_plans/wig-dashboard/metric-contract.md` for definitions.
 """
 from datetime import date, timedelta
+from time import perf_counter
 from zoneinfo import ZoneInfo
 
-from django.db.models import Min, Q
+import numpy as np
+from django.db.models import Count, Min, Q
 
 from .models import (
     Youth, LiteracySession2026, NumeracySession2026, MentorVisit, NumeracyVisit,
 )
-from .closures import open_working_days_bulk
+from .closures import closure_calendar, open_working_days_bulk
 
 # Programme dates are South African; the server runs UTC, so resolve the
 # business day in SAST before deriving week boundaries.
@@ -199,43 +201,12 @@ def sessions_per_day(programme, start, end, first_session_by_coach=None):
     Zero eligible coaches (or zero open coach-days) -> value None, so the frontend
     can render "no eligible coaches" rather than a misleading 0 or a crash.
     """
-    coaches = list(eligible_coaches(programme, end).select_related('school'))
-    open_days = open_working_days_bulk(
-        coaches,
-        start,
-        end,
-        since_by_id={
-            c.id: _effective_since(c, start, first_session_by_coach)
-            for c in coaches
-        } if first_session_by_coach else None,
-    )
-    denominator = sum(len(open_days.get(c.id, ())) for c in coaches)
-    numerator = _programme_session_qs(programme, start, end).count()
-    value = (numerator / denominator) if denominator else None
-    return {
-        'numerator': numerator,
-        'denominator': denominator,
-        'value': value,
-        'eligible_entity_count': len(coaches),
-        'calculation_note': f'{numerator} sessions / {denominator} open coach-days '
-                            f"({len(coaches)} coaches across their schools' open days)",
-    }
+    return ProgrammeWindow(programme, start, end).sessions_per_day(first_session_by_coach)
 
 
 def active_coaches(programme, start, end):
     """Fraction of eligible coaches who taught at least one session this window."""
-    eligible_qs = eligible_coaches(programme, end)
-    eligible = eligible_qs.count()
-    taught_ids = set(_programme_session_qs(programme, start, end).values_list('youth_id', flat=True))
-    active = eligible_qs.filter(id__in=taught_ids).count()
-    value = (active / eligible) if eligible else None
-    return {
-        'numerator': active,
-        'denominator': eligible,
-        'value': value,
-        'eligible_entity_count': eligible,
-        'calculation_note': f'{active} of {eligible} eligible coaches taught this week',
-    }
+    return ProgrammeWindow(programme, start, end).active_coaches()
 
 
 def school_coverage(programme, start, end):
@@ -243,22 +214,7 @@ def school_coverage(programme, start, end):
 
     Denominator is intentional - schools we staffed, not 'schools ever touched'.
     """
-    assigned_ids = set(
-        eligible_coaches(programme, end)
-        .exclude(school__isnull=True)
-        .values_list('school_id', flat=True)
-    )
-    reached_ids = set(_programme_session_qs(programme, start, end).values_list('school_id', flat=True))
-    covered = assigned_ids & reached_ids
-    denominator = len(assigned_ids)
-    value = (len(covered) / denominator) if denominator else None
-    return {
-        'numerator': len(covered),
-        'denominator': denominator,
-        'value': value,
-        'eligible_entity_count': denominator,
-        'calculation_note': f'{len(covered)} of {denominator} assigned schools reached this week',
-    }
+    return ProgrammeWindow(programme, start, end).school_coverage()
 
 
 # --- Data-team quality sub-gauges (over the full dataset; accuracy is a state) ---
@@ -274,39 +230,74 @@ def _quality_measure(numerator, denominator, note=''):
             'calculation_note': note}
 
 
+# The gauges' predicates, shared with the drill-down lists (api/data_quality.py).
+CAPTURED_ON_TIME = Q(capture_delay__gte=0, capture_delay__lte=2)
+FLAGGED_DUPLICATE = Q(duplicate_status='Duplicate')
+SITE_JOB_MISMATCH = Q(job_title__in=ECD_JOB_TITLES, school__type__in=PRIMARY_SITE_TYPES)
+
+
+def literacy_quality_counts():
+    """Every LiteracySession2026 gauge's numerator and denominator from one
+    conditional-aggregate pass over the table."""
+    return LiteracySession2026.objects.aggregate(
+        total=Count('id'),
+        on_time=Count('id', filter=CAPTURED_ON_TIME),
+        duplicates=Count('id', filter=FLAGGED_DUPLICATE),
+        child_1=Count('child_1'),
+        child_2=Count('child_2'),
+    )
+
+
+def youth_quality_counts():
+    """The active-roster gauge counts from one pass over Youth."""
+    return Youth.objects.filter(employment_status='Active').aggregate(
+        active=Count('id'),
+        mismatched=Count('id', filter=SITE_JOB_MISMATCH),
+    )
+
+
+def _capture_on_time(counts):
+    on_time, total = counts['on_time'], counts['total']
+    return _quality_measure(on_time, total, f'{on_time} of {total} captured within 2 days')
+
+
+def _duplicate_rate(counts):
+    dups, total = counts['duplicates'], counts['total']
+    return _quality_measure(dups, total, f'{dups} of {total} flagged Duplicate')
+
+
+def _site_job_mismatch(counts):
+    flagged = counts['mismatched']
+    return _quality_measure(flagged, counts['active'],
+                            f'{flagged} active youth with an ECD title at a primary site')
+
+
+def _child_fk_resolution(counts):
+    slots = counts['total'] * 2
+    resolved = counts['child_1'] + counts['child_2']
+    return _quality_measure(resolved, slots, f'{resolved} of {slots} child slots resolved')
+
+
 def capture_on_time():
     """Share of literacy sessions captured within 2 days of the session date."""
-    total = LiteracySession2026.objects.count()
-    on_time = LiteracySession2026.objects.filter(
-        capture_delay__gte=0, capture_delay__lte=2).count()
-    return _quality_measure(on_time, total, f'{on_time} of {total} captured within 2 days')
+    return _capture_on_time(literacy_quality_counts())
 
 
 def duplicate_rate():
     """Share of literacy sessions flagged as duplicates (lower is better)."""
-    total = LiteracySession2026.objects.count()
-    dups = LiteracySession2026.objects.filter(duplicate_status='Duplicate').count()
-    return _quality_measure(dups, total, f'{dups} of {total} flagged Duplicate')
+    return _duplicate_rate(literacy_quality_counts())
 
 
 def site_job_mismatch():
     """Active youth with an ECD job title assigned to a primary site (likely
     data error). Lower is better."""
-    active = Youth.objects.filter(employment_status='Active')
-    flagged = active.filter(
-        job_title__in=ECD_JOB_TITLES, school__type__in=PRIMARY_SITE_TYPES).count()
-    return _quality_measure(flagged, active.count(),
-                            f'{flagged} active youth with an ECD title at a primary site')
+    return _site_job_mismatch(youth_quality_counts())
 
 
 def child_fk_resolution():
     """Share of literacy child *slots* resolved to a CanonicalChild. Each session
     has two child slots; counts both (a null child_2 is an unresolved slot)."""
-    total = LiteracySession2026.objects.count()
-    slots = total * 2
-    resolved = (LiteracySession2026.objects.filter(child_1__isnull=False).count()
-                + LiteracySession2026.objects.filter(child_2__isnull=False).count())
-    return _quality_measure(resolved, slots, f'{resolved} of {slots} child slots resolved')
+    return _child_fk_resolution(literacy_quality_counts())
 
 
 def sessions_per_week(programme, start, end, first_session_by_coach=None):
@@ -314,19 +305,7 @@ def sessions_per_week(programme, start, end, first_session_by_coach=None):
 
     Used by numeracy, whose lead measure is "N sessions per week per coach".
     """
-    coaches = list(eligible_coaches(programme, end))
-    eligible = len(coaches)
-    numerator = _programme_session_qs(programme, start, end).count()
-    denominator = _coach_weeks(coaches, start, end, first_session_by_coach)
-    value = (numerator / denominator) if denominator else None
-    return {
-        'numerator': numerator,
-        'denominator': denominator,
-        'value': value,
-        'eligible_entity_count': eligible,
-        'calculation_note': f'{numerator} sessions / {denominator:.1f} coach-weeks '
-                            f'({eligible} eligible coaches)',
-    }
+    return ProgrammeWindow(programme, start, end).sessions_per_week(first_session_by_coach)
 
 
 # --- Mentor-visit lead measures (attributed by visited school's site type) ---
@@ -354,25 +333,59 @@ def _programme_visit_qs(programme, start, end):
     return qs
 
 
+class VisitWindow:
+    """A programme's observation visits in a window, loaded once on first use.
+
+    Only the visit rings read these, so the standalone visit measures use this
+    on its own rather than a ProgrammeWindow's coach and session loads.
+    """
+
+    def __init__(self, programme, start, end):
+        self.programme, self.start, self.end = programme, start, end
+        self._visits = None
+
+    @property
+    def visits(self):
+        """(mentor_id, *bundle booleans) per observation visit, loaded once."""
+        if self._visits is None:
+            _model, bundle, _st = _visit_spec(self.programme)
+            self._visits = list(
+                _programme_visit_qs(self.programme, self.start, self.end)
+                .values_list('mentor_id', *bundle)
+            )
+        return self._visits
+
+    def visit_compliance(self):
+        total = len(self.visits)
+        compliant = sum(1 for _mentor, *flags in self.visits if all(f is True for f in flags))
+        incomplete = sum(1 for _mentor, *flags in self.visits if any(f is None for f in flags))
+        value = (compliant / total) if total else None
+        return {
+            'numerator': compliant,
+            'denominator': total,
+            'value': value,
+            'incomplete_count': incomplete,
+            'calculation_note': f'{compliant} of {total} observation visits fully compliant',
+        }
+
+    def school_visits(self):
+        visits = len(self.visits)
+        mentors = len({mentor for mentor, *_flags in self.visits})
+        mentor_weeks = mentors * _window_weeks(self.start, self.end)
+        value = (visits / mentor_weeks) if mentor_weeks else None
+        return {
+            'numerator': visits,
+            'denominator': mentor_weeks,
+            'value': value,
+            'eligible_entity_count': mentors,
+            'calculation_note': f'{visits} observation visits / {mentor_weeks:.1f} mentor-weeks',
+        }
+
+
 def visit_compliance(programme, start, end):
     """Share of observation visits where every tracker boolean is true. A null
     boolean is non-compliant (and counted as incomplete for transparency)."""
-    _model, bundle, _st = _visit_spec(programme)
-    qs = _programme_visit_qs(programme, start, end)
-    total = qs.count()
-    compliant = qs.filter(**{f: True for f in bundle}).count()
-    incomplete_q = Q()
-    for f in bundle:
-        incomplete_q |= Q(**{f'{f}__isnull': True})
-    incomplete = qs.filter(incomplete_q).count()
-    value = (compliant / total) if total else None
-    return {
-        'numerator': compliant,
-        'denominator': total,
-        'value': value,
-        'incomplete_count': incomplete,
-        'calculation_note': f'{compliant} of {total} observation visits fully compliant',
-    }
+    return VisitWindow(programme, start, end).visit_compliance()
 
 
 def school_visits(programme, start, end):
@@ -381,47 +394,178 @@ def school_visits(programme, start, end):
     Counted per submitting user; mentors are dedicated per site type, so a
     submitter crossing site types would be a data issue (see notes in contract).
     """
-    qs = _programme_visit_qs(programme, start, end)
-    visits = qs.count()
-    mentors = qs.values('mentor_id').distinct().count()
-    mentor_weeks = mentors * _window_weeks(start, end)
-    value = (visits / mentor_weeks) if mentor_weeks else None
-    return {
-        'numerator': visits,
-        'denominator': mentor_weeks,
-        'value': value,
-        'eligible_entity_count': mentors,
-        'calculation_note': f'{visits} observation visits / {mentor_weeks:.1f} mentor-weeks',
-    }
+    return VisitWindow(programme, start, end).school_visits()
+
+
+# --- Batched evaluation: one load per programme feeds every ring ---
+
+class ProgrammeWindow:
+    """One programme's window, loaded once for all of its lead measures.
+
+    The board shows up to six rings per programme, and each standalone measure
+    used to re-run ``eligible_coaches`` and the session query over the same
+    window. This loads the eligible coaches, the window's sessions (as youth /
+    school / day arrays) and, on first use, the observation visits (a
+    VisitWindow), then derives every ring in memory. The standalone measure functions above
+    delegate here, so each number and note is defined once.
+    """
+
+    def __init__(self, programme, start, end, *, calendar=None):
+        self.programme, self.start, self.end = programme, start, end
+        self.calendar = calendar
+        self.coaches = list(eligible_coaches(programme, end).select_related('school'))
+        self.coach_ids = np.array([c.id for c in self.coaches], dtype=np.int64)
+        rows = list(
+            _programme_session_qs(programme, start, end)
+            .values_list('youth_id', 'school_id', 'session_date')
+        )
+        # Unresolved FKs become -1, which matches no coach or school id.
+        self.session_youth = np.array([-1 if y is None else y for y, _s, _d in rows], dtype=np.int64)
+        self.session_school = np.array([-1 if s is None else s for _y, s, _d in rows], dtype=np.int64)
+        self.session_days = np.array([d.toordinal() for _y, _s, d in rows], dtype=np.int64)
+        self.visit_window = VisitWindow(programme, start, end)
+
+    @property
+    def session_count(self):
+        return len(self.session_days)
+
+    def first_session_by_coach(self):
+        """{youth_id: first session date} in the window (``_first_session_by_coach``
+        without the query)."""
+        known = self.session_youth >= 0
+        youth, days = self.session_youth[known], self.session_days[known]
+        order = np.lexsort((days, youth))
+        ids, first = np.unique(youth[order], return_index=True)
+        return {int(y): date.fromordinal(int(d)) for y, d in zip(ids, days[order][first])}
+
+    def sessions_per_day(self, first_session_by_coach=None):
+        open_days = open_working_days_bulk(
+            self.coaches,
+            self.start,
+            self.end,
+            since_by_id={
+                c.id: _effective_since(c, self.start, first_session_by_coach)
+                for c in self.coaches
+            } if first_session_by_coach else None,
+            calendar=self.calendar,
+        )
+        denominator = sum(len(open_days.get(c.id, ())) for c in self.coaches)
+        numerator = self.session_count
+        value = (numerator / denominator) if denominator else None
+        return {
+            'numerator': numerator,
+            'denominator': denominator,
+            'value': value,
+            'eligible_entity_count': len(self.coaches),
+            'calculation_note': f'{numerator} sessions / {denominator} open coach-days '
+                                f"({len(self.coaches)} coaches across their schools' open days)",
+        }
+
+    def active_coaches(self):
+        eligible = len(self.coaches)
+        active = int(np.isin(self.coach_ids, self.session_youth).sum())
+        value = (active / eligible) if eligible else None
+        return {
+            'numerator': active,
+            'denominator': eligible,
+            'value': value,
+            'eligible_entity_count': eligible,
+            'calculation_note': f'{active} of {eligible} eligible coaches taught this week',
+        }
+
+    def school_coverage(self):
+        assigned = np.unique([c.school_id for c in self.coaches if c.school_id is not None]).astype(np.int64)
+        covered = int(np.isin(assigned, self.session_school).sum())
+        denominator = len(assigned)
+        value = (covered / denominator) if denominator else None
+        return {
+            'numerator': covered,
+            'denominator': denominator,
+            'value': value,
+            'eligible_entity_count': denominator,
+            'calculation_note': f'{covered} of {denominator} assigned schools reached this week',
+        }
+
+    def sessions_per_week(self, first_session_by_coach=None):
+        eligible = len(self.coaches)
+        numerator = self.session_count
+        denominator = _coach_weeks(self.coaches, self.start, self.end, first_session_by_coach)
+        value = (numerator / denominator) if denominator else None
+        return {
+            'numerator': numerator,
+            'denominator': denominator,
+            'value': value,
+            'eligible_entity_count': eligible,
+            'calculation_note': f'{numerator} sessions / {denominator:.1f} coach-weeks '
+                                f'({eligible} eligible coaches)',
+        }
+
+    @property
+    def visits(self):
+        return self.visit_window.visits
+
+    def visit_compliance(self):
+        return self.visit_window.visit_compliance()
+
+    def school_visits(self):
+        return self.visit_window.school_visits()
+
+
+# Rings per programme, in payload order: (measure suffix, ProgrammeWindow method).
+LEAD_MEASURES = {
+    'core_literacy': (
+        ('sessions_per_day', 'sessions_per_day'),
+        ('active_coaches', 'active_coaches'),
+        ('school_coverage', 'school_coverage'),
+        ('tracker_compliance', 'visit_compliance'),
+        ('school_visits', 'school_visits'),
+    ),
+    'ecd_literacy': (
+        ('sessions_per_day', 'sessions_per_day'),
+        ('active_coaches', 'active_coaches'),
+        ('school_coverage', 'school_coverage'),
+        ('tracker_compliance', 'visit_compliance'),
+        ('school_visits', 'school_visits'),
+    ),
+    'numeracy': (
+        ('sessions_per_week', 'sessions_per_week'),
+        ('active_coaches', 'active_coaches'),
+        ('school_coverage', 'school_coverage'),
+        ('admin_compliance', 'visit_compliance'),
+    ),
+}
+# The coach-day measures take the programme-year first-session clip.
+_CLIPPED_MEASURES = {'sessions_per_day', 'sessions_per_week'}
+
+
+def _elapsed_ms(since):
+    return round((perf_counter() - since) * 1000, 2)
 
 
 # --- Assembly into the API payload shapes (see metric-contract.md) ---
 
-def build_lead_measures(reference_dt, period=WIG_PERIOD_WEEK):
-    """Assemble the /api/wig/lead-measures payload for the requested period."""
+def build_lead_measures(reference_dt, period=WIG_PERIOD_WEEK, *, debug=False):
+    """Assemble the /api/wig/lead-measures payload for the requested period.
+
+    Each programme is loaded once (``ProgrammeWindow``) and the closure calendar
+    is shared by all three. With ``debug`` the payload also carries
+    ``timings_ms``: the load and each ring's derivation, per programme.
+    """
     start, end = lead_measure_window(reference_dt, period)
+    calendar = closure_calendar()
     measures = {}
-    for prog in ('core_literacy', 'ecd_literacy'):
-        first_by_coach = (
-            _first_session_by_coach(prog, start, end)
-            if period == WIG_PERIOD_PROGRAMME_YEAR else None
-        )
-        measures[f'{prog}.sessions_per_day'] = sessions_per_day(prog, start, end, first_by_coach)
-        measures[f'{prog}.active_coaches'] = active_coaches(prog, start, end)
-        measures[f'{prog}.school_coverage'] = school_coverage(prog, start, end)
-        measures[f'{prog}.tracker_compliance'] = visit_compliance(prog, start, end)
-        measures[f'{prog}.school_visits'] = school_visits(prog, start, end)
-    numeracy_first_by_coach = (
-        _first_session_by_coach('numeracy', start, end)
-        if period == WIG_PERIOD_PROGRAMME_YEAR else None
-    )
-    measures['numeracy.sessions_per_week'] = sessions_per_week(
-        'numeracy', start, end, numeracy_first_by_coach
-    )
-    measures['numeracy.active_coaches'] = active_coaches('numeracy', start, end)
-    measures['numeracy.school_coverage'] = school_coverage('numeracy', start, end)
-    measures['numeracy.admin_compliance'] = visit_compliance('numeracy', start, end)
-    return {
+    timings = {}
+    for prog, rings in LEAD_MEASURES.items():
+        t0 = perf_counter()
+        window = ProgrammeWindow(prog, start, end, calendar=calendar)
+        first_by_coach = window.first_session_by_coach() if period == WIG_PERIOD_PROGRAMME_YEAR else None
+        timings[f'{prog}.load'] = _elapsed_ms(t0)
+        for suffix, method in rings:
+            t0 = perf_counter()
+            args = (first_by_coach,) if method in _CLIPPED_MEASURES else ()
+            measures[f'{prog}.{suffix}'] = getattr(window, method)(*args)
+            timings[f'{prog}.{suffix}'] = _elapsed_ms(t0)
+    payload = {
         'window': {
             'period': period,
             'date_from': start.isoformat(),
@@ -431,20 +575,25 @@ def build_lead_measures(reference_dt, period=WIG_PERIOD_WEEK):
         },
         'measures': measures,
     }
+    if debug:
+        payload['timings_ms'] = timings
+    return payload
 
 
 def build_data_quality():
     """Assemble the /api/wig/data-quality payload (full-dataset accuracy gauges).
 
     The headline "98% accurate" formula is deferred to the team; v1 surfaces the
-    concrete sub-gauges only.
+    concrete sub-gauges only. Two queries: one aggregate pass per table.
     """
+    literacy = literacy_quality_counts()
+    youth = youth_quality_counts()
     return {
         'scope': 'full_dataset',
         'measures': {
-            'dq.child_fk_resolution': child_fk_resolution(),
-            'dq.capture_on_time': capture_on_time(),
-            'dq.duplicate_rate': duplicate_rate(),
-            'dq.site_job_mismatch': site_job_mismatch(),
+            'dq.child_fk_resolution': _child_fk_resolution(literacy),
+            'dq.capture_on_time': _capture_on_time(literacy),
+            'dq.duplicate_rate': _duplicate_rate(literacy),
+            'dq.site_job_mismatch': _site_job_mismatch(youth),
         },
     }
@@ -0,0 +1,98 @@
+"""Stored WIG board payloads, precomputed per completed week.
+
+Every board load (and every click back through past weeks) recomputed the lead
+measures and the ring details from the session and visit tables. Those payloads
+depend only on the window -- the completed week the reference date falls after,
+plus the period -- so ``refresh_wig_snapshots`` (cron) stores them for the
+recent weeks and the views read the stored copy.
+
+Late captures still land in recent weeks, so each run recomputes the whole
+horizon rather than only the newest week. A week older than the horizon keeps
+its last stored payload; a week never stored is computed live by the view.
+"""
+from datetime import datetime, time, timedelta
+
+from .models import WigSnapshot
+from .response_cache import SYNC, bump_generation
+from .wig_detail import build_wig_detail
+from .wig_metrics import (
+    LEAD_MEASURES, SAST, VALID_WIG_PERIODS, build_lead_measures, last_completed_week,
+)
+
+DEFAULT_WEEKS = 8
+
+# Every ring the board can drill into, as (programme, measure key).
+DETAIL_MEASURES = [
+    (prog, f'{prog}.{suffix}')
+    for prog, rings in LEAD_MEASURES.items()
+    for suffix, _method in rings
+]
+
+
+def reference_for_week(week_ending):
+    """A reference datetime whose last completed week ends on ``week_ending``
+    (any date in the wanted week; normalised to its Sunday)."""
+    sunday = week_ending + timedelta(days=6 - week_ending.weekday())
+    return datetime.combine(sunday + timedelta(days=1), time(12), tzinfo=SAST)
+
+
+def snapshot_week(reference_dt):
+    """The week_ending a reference datetime's board is stored under."""
+    return last_completed_week(reference_dt)[1]
+
+
+def lead_measures_snapshot(reference_dt, period):
+    """Stored /api/wig/lead-measures payload, or None."""
+    snap = WigSnapshot.objects.filter(
+        kind=WigSnapshot.KIND_LEAD_MEASURES, week_ending=snapshot_week(reference_dt),
+        period=period, programme='', measure='',
+    ).only('payload').first()
+    return snap.payload if snap else None
+
+
+def detail_snapshot(programme, measure, reference_dt, period):
+    """Stored /api/wig/detail payload for one ring, or None."""
+    snap = WigSnapshot.objects.filter(
+        kind=WigSnapshot.KIND_DETAIL, week_ending=snapshot_week(reference_dt),
+        period=period, programme=programme, measure=measure,
+    ).only('payload').first()
+    return snap.payload if snap else None
+
+
+def _store(kind, week_ending, period, payload, programme='', measure=''):
+    WigSnapshot.objects.update_or_create(
+        kind=kind, week_ending=week_ending, period=period,
+        programme=programme, measure=measure,
+        defaults={'payload': payload},
+    )
+
+
+def refresh_week(reference_dt, periods=None):
+    """Recompute and store every payload for the week ``reference_dt`` points
+    at. Returns the number of snapshots written."""
+    week_ending = snapshot_week(reference_dt)
+    written = 0
+    for period in sorted(periods or VALID_WIG_PERIODS):
+        _store(WigSnapshot.KIND_LEAD_MEASURES, week_ending, period,
+               build_lead_measures(reference_dt, period=period))
+        written += 1
+        for programme, measure in DETAIL_MEASURES:
+            _store(WigSnapshot.KIND_DETAIL, week_ending, period,
+                   build_wig_detail(programme, measure, reference_dt, period=period),
+                   programme=programme, measure=measure)
+            written += 1
+    return written
+
+
+def refresh_wig_snapshots(reference_dt, weeks=DEFAULT_WEEKS, periods=None):
+    """Refresh the board the reference date shows plus the ``weeks - 1``
+    completed weeks before it. Returns ``{week_ending: snapshots written}``."""
+    latest = snapshot_week(reference_dt)
+    result = {}
+    for back in range(weeks):
+        week_ending = latest - timedelta(weeks=back)
+        result[week_ending] = refresh_week(reference_for_week(week_ending), periods)
+    # The lead-measures view caches the stored payload; drop what it cached
+    # from the previous snapshots.
+    bump_generation(SYNC)
+    return result
@@ -4,11 +4,15 @@ This module keeps calendar, cohort, and costing rules separate from HTTP views.
 Model imports are lazy inside query functions so the rules can be tested without
 loading Django's app registry.
 """
+import threading
 from calendar import monthrange
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from copy import deepcopy
 from datetime import date, timedelta
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from itertools import product
+
+import numpy as np
 
 from api.school_programme import (
     SITE_UNASSIGNED,
@@ -345,6 +349,79 @@ def build_vacancies(year, ringfenced_school_ids=frozenset()):
     }
 
 
+# --- memoised cohort/vacancy snapshot -----------------------------------------
+
+# build_cohorts walks every active youth and build_vacancies the year's grid,
+# yet both only change when a sync runs, the grid is edited, or a pot's school
+# restriction moves. The budget UI's PATCH-scenario-then-reload loop changes
+# none of those, so the per-process snapshot below lets it redo only the
+# projection. Entries are keyed by everything the inputs depend on: the as-of
+# date, the ringfenced school set, the last youth and grid sync runs, and a
+# (count, last updated_at) stamp of Youth, School and the year's grid rows,
+# which catches admin and grid-cell edits between syncs.
+_SNAPSHOT_LIMIT = 8
+_snapshots = OrderedDict()
+_snapshot_generation = 0
+_snapshot_lock = threading.Lock()
+
+
+def invalidate_cohort_snapshot():
+    """Drop every memoised snapshot in this process. Called by the youth sync
+    and by pot writes; other processes still see the change through the key."""
+    global _snapshot_generation
+    with _snapshot_lock:
+        _snapshot_generation += 1
+        _snapshots.clear()
+
+
+def _snapshot_stamp(year):
+    from django.db.models import Count, Max
+    from api.models import AirtableSyncLog, School, SchoolProgrammeYear, Youth
+
+    last_syncs = dict(
+        AirtableSyncLog.objects.filter(sync_type__in=("youth", "school_programme_grid"))
+        .values("sync_type")
+        .annotate(last=Max("id"))
+        .values_list("sync_type", "last")
+    )
+    stamps = [
+        queryset.aggregate(n=Count("id"), last=Max(updated_field))
+        for queryset, updated_field in (
+            (Youth.objects.all(), "updated_at"),
+            (School.objects.all(), "last_updated"),
+            (SchoolProgrammeYear.objects.filter(year=year), "updated_at"),
+        )
+    ]
+    return (
+        last_syncs.get("youth"),
+        last_syncs.get("school_programme_grid"),
+        *((stamp["n"], stamp["last"]) for stamp in stamps),
+    )
+
+
+def cohort_snapshot(year, as_of, ringfenced_school_ids=frozenset()):
+    """``{'cohorts': build_cohorts(...), 'vacancies': build_vacancies(...)}``,
+    memoised per process. Treat the result as read-only: it is shared between
+    requests."""
+    generation = _snapshot_generation
+    key = (year, as_of, frozenset(ringfenced_school_ids), _snapshot_stamp(year))
+    with _snapshot_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            _snapshots.move_to_end(key)
+            return snapshot
+    snapshot = {
+        "cohorts": build_cohorts(today=as_of, ringfenced_school_ids=key[2]),
+        "vacancies": build_vacancies(year, ringfenced_school_ids=key[2]),
+    }
+    with _snapshot_lock:
+        if _snapshot_generation == generation:
+            _snapshots[key] = snapshot
+            while len(_snapshots) > _SNAPSHOT_LIMIT:
+                _snapshots.popitem(last=False)
+    return snapshot
+
+
 def hours_for(matrix, site_type, job_title):
     """Read one Hours Matrix entry with the specified conservative fallback."""
     entry = (
@@ -444,124 +521,226 @@ def _nys_conversions(rows, requested, subsidy_only=0):
     return zero_cost, relief
 
 
-def _project_rows(scenario, rows, as_of, include_holiday_pay=True):
-    year = int(_scenario_value(scenario, "year", as_of.year))
-    matrix = _scenario_value(scenario, "hours_matrix") or HOURS_MATRIX_DEFAULTS
-    wage_rate = _decimal(
-        _scenario_value(scenario, "wage_rate"),
-        Decimal("32.01"),
-    )
-    contribution = _decimal(
-        _scenario_value(scenario, "subsidy_contribution"),
-        Decimal("1400"),
-    )
-    conversion_month = int(
-        _scenario_value(scenario, "nys_conversion_start_month", 8)
-    )
-    vacancy_month = int(_scenario_value(scenario, "vacancy_start_month", 8))
-    utilisation = _decimal(
-        _scenario_value(scenario, "utilisation_pct", 100),
-        Decimal("100"),
-    ) / Decimal("100")
-    if utilisation < 0:
-        utilisation = Decimal("1")
-    full_time = max(int(_scenario_value(scenario, "nys_full_time_count", 160) or 0), 0)
-    part_time = max(int(_scenario_value(scenario, "nys_part_time_count", 40) or 0), 0)
-    # The split is additive: total conversions = FT + PT, of which the PT
-    # youth cost R0 (they never touch payroll).
-    zero_cost_converted, relief_converted = _nys_conversions(
-        rows,
-        full_time + part_time,
-        part_time,
-    )
+def _exponent(value):
+    """Decimal places needed to hold ``value`` as an integer."""
+    return max(-value.as_tuple().exponent, 0)
+
 
-    months = []
-    school_totals = defaultdict(lambda: Decimal("0"))
-    for month in _projection_months(year, as_of):
-        days = school_days_in_month(year, month, start_from=as_of)
-        month_gross = Decimal("0")
-        month_uif = Decimal("0")
-        month_relief = Decimal("0")
-        month_net = Decimal("0")
-
-        for index, row in enumerate(rows):
-            if row.get("programme") == YEBO:
-                continue
-            if row.get("_vacancy") and month < vacancy_month:
-                continue
-            headcount = max(int(row.get("headcount") or 0), 0)
-            # Subsidy-only converts leave the costed population from their
-            # start month: no gross, no UIF, not merely relief.
-            if not row.get("_vacancy") and month >= conversion_month:
-                headcount = max(headcount - zero_cost_converted[index], 0)
-            if headcount == 0:
-                continue
+def _from_units(value, places):
+    """An exact integer count of 10**-places back to a Decimal."""
+    return Decimal(int(value)).scaleb(-places)
 
+
+# Largest magnitude the int64 path may reach; beyond it the engine falls back
+# to exact Python-int arrays (dtype=object) rather than overflow.
+_INT64_SAFE = 2 ** 62
+
+
+class ProjectionEngine:
+    """Vectorised monthly projection for one set of cohort rows.
+
+    The rows are held as arrays -- headcount, hours x days-per-week,
+    subsidised-by-month, vacancy and NYS eligibility -- and every month is
+    costed in one pass. ``run`` takes the scenario's levers (or overrides of
+    them), so a what-if sweep reuses the arrays and only redoes the arithmetic.
+
+    Money stays exact: every cell is an integer count of 10**-P rand, where P
+    covers the decimal places of the rates, the utilisation, the 1% UIF and the
+    subsidy contribution. The results therefore equal the per-cell Decimal
+    arithmetic exactly and round to the same ``_money`` cents.
+    """
+
+    def __init__(self, scenario, rows, as_of):
+        self.scenario = scenario
+        self.rows = list(rows)
+        year = int(_scenario_value(scenario, "year", as_of.year))
+        matrix = _scenario_value(scenario, "hours_matrix") or HOURS_MATRIX_DEFAULTS
+        self.conversion_month = int(
+            _scenario_value(scenario, "nys_conversion_start_month", 8)
+        )
+        vacancy_month = int(_scenario_value(scenario, "vacancy_start_month", 8))
+
+        self.months = _projection_months(year, as_of)
+        months = np.array(self.months, dtype=np.int64)
+        self.school_days = [
+            school_days_in_month(year, month, start_from=as_of)
+            for month in self.months
+        ]
+        self.days = np.array(self.school_days, dtype=np.int64)
+
+        # YEBO youth are shown but never costed; drop them up front (their
+        # positions still count for the NYS allocation, see _conversions).
+        self.costed = [
+            index for index, row in enumerate(self.rows)
+            if row.get("programme") != YEBO
+        ]
+        costed_rows = [self.rows[index] for index in self.costed]
+        self.school_ids = [row.get("school_id") for row in costed_rows]
+        self.is_vacancy = np.array(
+            [bool(row.get("_vacancy")) for row in costed_rows], dtype=bool
+        )
+        self.headcount = np.array(
+            [max(int(row.get("headcount") or 0), 0) for row in costed_rows],
+            dtype=np.int64,
+        )
+        self.hours_days = []
+        for row in costed_rows:
             hours, days_per_week = hours_for(
                 matrix,
                 row.get("site_type") or "primary",
                 row.get("job_title") or "",
             )
-            gross_each = (
-                hours
-                * Decimal(days)
-                * (days_per_week / Decimal("5"))
-                * wage_rate
-                * utilisation
+            self.hours_days.append(hours * days_per_week)
+        self.subsidised = np.array(
+            [
+                [
+                    0 if row.get("_vacancy") else _actual_subsidised_count(row, year, month)
+                    for row in costed_rows
+                ]
+                for month in self.months
+            ],
+            dtype=np.int64,
+        ).reshape(len(self.months), len(costed_rows))
+        self.vacancy_open = (months >= vacancy_month)[:, None]
+        self.converted = (months >= self.conversion_month)[:, None]
+        self._conversion_cache = {}
+
+    def _conversions(self, full_time, part_time):
+        """NYS (zero-cost, relief) allocations per costed row, memoised per
+        count pair so a sweep allocates each pair once."""
+        key = (full_time, part_time)
+        if key not in self._conversion_cache:
+            # The split is additive: total conversions = FT + PT, of which the
+            # PT youth cost R0 (they never touch payroll).
+            zero_cost, relief = _nys_conversions(self.rows, full_time + part_time, part_time)
+            self._conversion_cache[key] = (
+                np.array([zero_cost[index] for index in self.costed], dtype=np.int64),
+                np.array([relief[index] for index in self.costed], dtype=np.int64),
             )
-            gross = gross_each * headcount
-            uif = gross * (UIF_FACTOR - Decimal("1"))
-            subsidised = 0
-            if not row.get("_vacancy"):
-                subsidised = _actual_subsidised_count(row, year, month)
-                if month >= conversion_month:
-                    subsidised += relief_converted[index]
-                subsidised = min(subsidised, headcount)
-            relief_each = min(contribution, gross_each * UIF_FACTOR)
-            relief = relief_each * subsidised
-            net = gross + uif - relief
-
-            month_gross += gross
-            month_uif += uif
-            month_relief += relief
-            month_net += net
-            school_totals[row.get("school_id")] += net
-
-        months.append(
+        return self._conversion_cache[key]
+
+    def _lever(self, overrides, name, fallback):
+        if overrides.get(name) is not None:
+            return overrides[name]
+        return _scenario_value(self.scenario, name, fallback)
+
+    def run(self, include_holiday_pay=True, **overrides):
+        """Project every month; keyword overrides replace scenario levers
+        (wage_rate, utilisation_pct, subsidy_contribution, nys_full_time_count,
+        nys_part_time_count)."""
+        wage_rate = _decimal(self._lever(overrides, "wage_rate", None), Decimal("32.01"))
+        contribution = _decimal(
+            self._lever(overrides, "subsidy_contribution", None), Decimal("1400")
+        )
+        utilisation_pct = _decimal(
+            self._lever(overrides, "utilisation_pct", 100), Decimal("100")
+        )
+        if utilisation_pct < 0:
+            utilisation_pct = Decimal("100")
+        full_time = max(int(self._lever(overrides, "nys_full_time_count", 160) or 0), 0)
+        part_time = max(int(self._lever(overrides, "nys_part_time_count", 40) or 0), 0)
+        zero_cost, relief_converted = self._conversions(full_time, part_time)
+
+        # Headcount and subsidised youth per (month, row). Subsidy-only
+        # converts leave the costed population from their start month: no
+        # gross, no UIF, not merely relief.
+        headcount = np.broadcast_to(self.headcount, self.subsidised.shape)
+        headcount = np.where(
+            ~self.is_vacancy & self.converted,
+            np.maximum(headcount - zero_cost, 0),
+            headcount,
+        )
+        headcount = np.where(self.is_vacancy & ~self.vacancy_open, 0, headcount)
+        subsidised = np.where(
+            self.is_vacancy,
+            0,
+            np.minimum(self.subsidised + np.where(self.converted, relief_converted, 0), headcount),
+        )
+
+        # gross_each = hours x days x (days_per_week / 5) x wage x (pct / 100)
+        #            = rate x days / 500, with rate = hours x dpw x wage x pct.
+        rates = [hours_days * wage_rate * utilisation_pct for hours_days in self.hours_days]
+        rate_places = max((_exponent(rate) for rate in rates), default=0)
+        places = max(rate_places + 5, _exponent(contribution))
+        scale = 10 ** (places - rate_places - 5)
+        rate_units = [int(rate.scaleb(rate_places)) for rate in rates]
+        contribution_units = int(contribution.scaleb(places))
+
+        peak = (
+            2 * 101 * scale
+            * max(rate_units, default=0)
+            * int(self.days.max(initial=0))
+            * int(self.headcount.max(initial=0) + 1)
+            * (len(rate_units) + 1)
+        )
+        dtype = np.int64 if peak < _INT64_SAFE and contribution_units < _INT64_SAFE else object
+        rate = np.array(rate_units, dtype=dtype)
+        days = self.days.astype(dtype)[:, None]
+        headcount = headcount.astype(dtype)
+        subsidised = subsidised.astype(dtype)
+
+        # In units of 10**-places: gross_each is 100x, and gross_each x 1.01
+        # is 101x, the 1% UIF base.
+        uif_each = 2 * rate * days * scale
+        gross_each = uif_each * 100
+        relief_each = np.minimum(uif_each * 101, contribution_units)
+        gross = gross_each * headcount
+        uif = uif_each * headcount
+        relief = relief_each * subsidised
+        net = gross + uif - relief
+
+        months = [
             {
                 "month": month,
                 # Exposed so the frontend can recompute lever what-ifs without
                 # duplicating the term calendar client-side.
-                "school_days": days,
-                "gross": _money(month_gross),
-                "uif": _money(month_uif),
-                "subsidy_relief": _money(month_relief),
-                "net": _money(month_net),
+                "school_days": self.school_days[index],
+                "gross": _money(_from_units(gross[index].sum(), places)),
+                "uif": _money(_from_units(uif[index].sum(), places)),
+                "subsidy_relief": _money(_from_units(relief[index].sum(), places)),
+                "net": _money(_from_units(net[index].sum(), places)),
             }
+            for index, month in enumerate(self.months)
+        ]
+
+        school_totals = {}
+        costed_any_month = (headcount > 0).any(axis=0)
+        row_net = net.sum(axis=0)
+        for column, school_id in enumerate(self.school_ids):
+            if costed_any_month[column]:
+                school_totals[school_id] = school_totals.get(school_id, 0) + int(row_net[column])
+
+        holiday_pay = (
+            _decimal(_scenario_value(self.scenario, "holiday_pay"), Decimal("0"))
+            if include_holiday_pay
+            else Decimal("0")
         )
+        return {
+            "months": months,
+            "total": _money(sum((row["net"] for row in months), Decimal("0")) + holiday_pay),
+            "school_totals": {
+                school_id: _money(_from_units(total, places))
+                for school_id, total in school_totals.items()
+            },
+        }
 
-    holiday_pay = (
-        _decimal(_scenario_value(scenario, "holiday_pay"), Decimal("0"))
-        if include_holiday_pay
-        else Decimal("0")
-    )
-    return {
-        "months": months,
-        "total": _money(sum((row["net"] for row in months), Decimal("0")) + holiday_pay),
-        "school_totals": {
-            school_id: _money(total)
-            for school_id, total in school_totals.items()
-        },
-    }
 
+def _project_rows(scenario, rows, as_of, include_holiday_pay=True):
+    return ProjectionEngine(scenario, rows, as_of).run(include_holiday_pay=include_holiday_pay)
 
-def project(scenario, cohorts, vacancies, as_of):
-    """Return committed and at-plan monthly projections for one scenario."""
+
+def _core_rows(cohorts, vacancies):
+    """(active rows, vacancy rows) for the core (non-ringfenced) projection."""
     if isinstance(cohorts, dict):
         active_rows = list(cohorts.get("costing_cohorts", cohorts.get("cohorts", [])))
     else:
         active_rows = list(cohorts)
-    vacancy_rows = [{**row, "_vacancy": True} for row in vacancies]
+    return active_rows, [{**row, "_vacancy": True} for row in vacancies]
+
+
+def project(scenario, cohorts, vacancies, as_of):
+    """Return committed and at-plan monthly projections for one scenario."""
+    active_rows, vacancy_rows = _core_rows(cohorts, vacancies)
 
     # Headcounts explain WHY at-plan exceeds committed: staff read the gap as
     # "cost of N more posts", so both projections carry their costed population.
@@ -583,6 +762,51 @@ def project(scenario, cohorts, vacancies, as_of):
     return {"committed": committed, "at_plan": at_plan}
 
 
+SWEEP_LEVERS = (
+    "wage_rate",
+    "utilisation_pct",
+    "nys_full_time_count",
+    "nys_part_time_count",
+)
+SWEEP_MAX_POINTS = 1000
+
+
+def sweep(scenario, cohorts, vacancies, as_of, levers, core_pots_total):
+    """Committed and at-plan totals for every combination of lever values.
+
+    ``levers`` maps each SWEEP_LEVERS name to a list of values; a missing lever
+    keeps the scenario's value. Both projections are built once and re-run per
+    point, so a grid costs arithmetic only.
+    """
+    active_rows, vacancy_rows = _core_rows(cohorts, vacancies)
+    committed = ProjectionEngine(scenario, active_rows, as_of)
+    at_plan = ProjectionEngine(scenario, active_rows + vacancy_rows, as_of)
+    mentor_reserve = _scenario_value(scenario, "mentor_reserve")
+    axes = [
+        levers.get(name) or [_scenario_value(scenario, name)]
+        for name in SWEEP_LEVERS
+    ]
+    points = []
+    for values in product(*axes):
+        overrides = dict(zip(SWEEP_LEVERS, values))
+        committed_total = committed.run(**overrides)["total"]
+        at_plan_total = at_plan.run(**overrides)["total"]
+        points.append(
+            {
+                **overrides,
+                "committed_total": committed_total,
+                "at_plan_total": at_plan_total,
+                "verdict_committed": calculate_verdict(
+                    core_pots_total, mentor_reserve, committed_total
+                ),
+                "verdict_at_plan": calculate_verdict(
+                    core_pots_total, mentor_reserve, at_plan_total
+                ),
+            }
+        )
+    return points
+
+
 def project_ringfenced(
     scenario,
     pots,
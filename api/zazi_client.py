@@ -5,10 +5,183 @@ Masi backend calls its existing API server-side with the shared-secret
 `X-Internal-Auth` header and normalises the result into the WIG measure shape, so
 the frontend only ever talks to the Masi backend. See
 frontend `documentation/data-architecture.md`.
+
+Every call goes through one process-wide ``ZaziClient``: a pooled
+``requests.Session`` (no TCP/TLS handshake per call), a circuit breaker that
+fails fast for a cool-down after repeated failures, and a stale-while-revalidate
+cache for the payloads user requests read live. When Zazi is slow or down, a
+page then stalls at most once per cool-down instead of for the full timeout on
+every load, and a cached payload keeps being served while one background
+refresh runs.
 """
 import os
+import threading
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Consecutive failures that open the breaker, and how long it then stays open.
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 60
+POOL_SIZE = 10
+
+# Programmatic impact is recomputed per call by Zazi but changes at most daily.
+PROGRAMMATIC_IMPACT_TTL_SECONDS = 300
+
+
+class ZaziUnavailable(requests.ConnectionError):
+    """Raised without a request while the circuit breaker is open. A
+    RequestException, so callers' existing handlers degrade the same way."""
+
+
+class CircuitBreaker:
+    """Closed -> open after ``threshold`` consecutive failures; after
+    ``cooldown`` seconds one probe is let through (half-open) and its outcome
+    closes or re-opens the breaker. Other callers keep failing fast meanwhile."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN_SECONDS,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        """True if a request may go out now (claims the probe when half-open)."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._probing or self.clock() - self.opened_at < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0
+        return max(0, int(self.cooldown - (self.clock() - self.opened_at)))
+
+    def record_success(self):
+        with self._lock:
+            self.reset()
+
+    def record_failure(self):
+        with self._lock:
+            self._probing = False
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = self.clock()
+
+
+class ZaziClient:
+    """Pooled, breaker-guarded GETs against the Zazi backend.
+
+    ``base_url``/``secret`` default to the environment, read per call so a
+    deploy's config (or a test's) applies without rebuilding the client.
+    """
+
+    def __init__(self, base_url=None, secret=None, *, breaker=None, clock=time.monotonic):
+        self._base_url = base_url
+        self._secret = secret
+        self.clock = clock
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self._session = None
+        self._lock = threading.Lock()
+        self._cache = {}  # (path, params) -> {'payload', 'fetched_at', 'refresh'}
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def reset(self):
+        """Forget cached payloads and breaker state (tests, or after a config change)."""
+        with self._lock:
+            self._cache.clear()
+        self.breaker.reset()
+
+    def get_json(self, path, params=None, timeout=30):
+        """GET ``path`` and return its JSON; raises on any failure (including
+        ZaziUnavailable while the breaker is open)."""
+        if not self.breaker.allow():
+            raise ZaziUnavailable(
+                f'Zazi circuit open after {self.breaker.failures} failures; '
+                f'retrying in {self.breaker.retry_in()}s')
+        base = (self._base_url or os.environ.get('ZAZI_API_BASE_URL', '')).rstrip('/')
+        secret = self._secret or os.environ.get('ZAZI_INTERNAL_API_SECRET', '')
+        kwargs = {'headers': {'X-Internal-Auth': secret}, 'timeout': timeout}
+        if params:
+            kwargs['params'] = params
+        try:
+            resp = self.session.get(f'{base}{path}', **kwargs)
+            resp.raise_for_status()
+            payload = resp.json()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return payload
+
+    def cached_json(self, path, params=None, *, ttl, timeout=30):
+        """``get_json`` behind a stale-while-revalidate cache.
+
+        A payload younger than ``ttl`` is returned as is. An older one is still
+        returned at once while a single background refresh replaces it; a failed
+        refresh keeps serving it. Only a cold cache waits on (and raises from)
+        the request.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if self.clock() - entry['fetched_at'] >= ttl and entry['refresh'] is None:
+                    entry['refresh'] = threading.Thread(
+                        target=self._revalidate, args=(key, entry, path, params, timeout),
+                        name=f'zazi-refresh{path}', daemon=True)
+                    entry['refresh'].start()
+                return entry['payload']
+        payload = self.get_json(path, params=params, timeout=timeout)
+        with self._lock:
+            self._cache[key] = {'payload': payload, 'fetched_at': self.clock(), 'refresh': None}
+        return payload
+
+    def _revalidate(self, key, entry, path, params, timeout):
+        try:
+            payload = self.get_json(path, params=params, timeout=timeout)
+        except Exception:  # keep serving the stale payload
+            with self._lock:
+                entry['refresh'] = None
+            return
+        with self._lock:
+            self._cache[key] = {'payload': payload, 'fetched_at': self.clock(), 'refresh': None}
+
+    def wait_for_refreshes(self, timeout=None):
+        """Join any in-flight background refreshes (tests, graceful shutdown)."""
+        with self._lock:
+            threads = [e['refresh'] for e in self._cache.values() if e['refresh'] is not None]
+        for thread in threads:
+            thread.join(timeout)
+
+
+client = ZaziClient()
 
 # Zazi WIG segments: (programme key, Zazi cohort, measure-key prefix). One cached
 # snapshot row per cohort feeds the Primary and ECD tabs of the WIG board.
@@ -26,17 +199,8 @@ def fetch_zazi_programme_overview(cohort=None, timeout=30):
     this runs out-of-band (via the refresh_zazi_overview cron) rather than on a
     user's board load. The timeout is generous because nothing user-facing waits.
     """
-    base = os.environ.get('ZAZI_API_BASE_URL', '').rstrip('/')
-    secret = os.environ.get('ZAZI_INTERNAL_API_SECRET', '')
     params = {'cohort': cohort} if cohort and cohort != 'all' else {}
-    resp = requests.get(
-        f'{base}/api/programme-overview/',
-        headers={'X-Internal-Auth': secret},
-        params=params,
-        timeout=timeout,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return client.get_json('/api/programme-overview/', params=params, timeout=timeout)
 
 
 def fetch_zazi_programmatic_impact(timeout=30):
@@ -48,15 +212,15 @@ def fetch_zazi_programmatic_impact(timeout=30):
     the WIG overview this needs no out-of-band snapshot; the frontend's ISR layer
     provides caching and stale-serve resilience.
     """
-    base = os.environ.get('ZAZI_API_BASE_URL', '').rstrip('/')
-    secret = os.environ.get('ZAZI_INTERNAL_API_SECRET', '')
-    resp = requests.get(
-        f'{base}/api/programmatic-impact-2026/',
-        headers={'X-Internal-Auth': secret},
-        timeout=timeout,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return client.get_json('/api/programmatic-impact-2026/', timeout=timeout)
+
+
+def cached_zazi_programmatic_impact(timeout=10):
+    """The Programmatic-impact payload for the public proxy, served
+    stale-while-revalidate so a slow Zazi never holds up the impact page once
+    a payload has been fetched."""
+    return client.cached_json('/api/programmatic-impact-2026/',
+                              ttl=PROGRAMMATIC_IMPACT_TTL_SECONDS, timeout=timeout)
 
 
 def fetch_school_programme_export(year, timeout=60):
@@ -67,29 +231,13 @@ def fetch_school_programme_export(year, timeout=60):
     against CanonicalChild. Raises on failure so the cron fails closed (leaving
     the prior grid intact rather than publishing a Zazi-less undercount).
     """
-    base = os.environ.get('ZAZI_API_BASE_URL', '').rstrip('/')
-    secret = os.environ.get('ZAZI_INTERNAL_API_SECRET', '')
-    resp = requests.get(
-        f'{base}/api/school-programme-export/',
-        headers={'X-Internal-Auth': secret},
-        params={'year': year},
-        timeout=timeout,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return client.get_json('/api/school-programme-export/', params={'year': year},
+                           timeout=timeout)
 
 
 def fetch_zazi_wig_outcomes(timeout=5):
     """WIG outcome benchmarks (fast aggregate; fetched live, 5s timeout)."""
-    base = os.environ.get('ZAZI_API_BASE_URL', '').rstrip('/')
-    secret = os.environ.get('ZAZI_INTERNAL_API_SECRET', '')
-    resp = requests.get(
-        f'{base}/api/wig-outcomes/',
-        headers={'X-Internal-Auth': secret},
-        timeout=timeout,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return client.get_json('/api/wig-outcomes/', timeout=timeout)
 
 
 # For a cohort-scoped overview, the *other* school type must be absent. Used to
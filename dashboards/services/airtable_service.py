@@ -1,7 +1,7 @@
 import os
-import requests
 import pandas as pd
 from django.conf import settings
+from api.airtable_client import AirtableAPIError, fetch_records
 from dashboards.services.data_processing import process_airtable_records
 
 def fetch_youth_airtable_records():
@@ -26,47 +26,13 @@ def fetch_youth_airtable_records():
     if not table_id:
         return None, "Airtable table ID not found in environment variables. Make sure AIRTABLE_COMBINED_YOUTH_DATA_TABLE_ID is set."
     
-    # Construct the API URL
-    url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-    
-    # Set up headers with API key
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    # Initialize empty list for all records
-    all_records = []
-    
     try:
-        # Airtable returns records in pages, so we need to handle pagination
-        params = {"pageSize": 100}  # Maximum page size
-        
-        while True:
-            # Make the API request
-            response = requests.get(url, headers=headers, params=params)
-            
-            # Check if the request was successful
-            if response.status_code != 200:
-                return None, f"Error fetching data from Airtable: {response.status_code} - {response.text}"
-            
-            # Parse response as JSON
-            data = response.json()
-            
-            # Add records to our list
-            all_records.extend(data.get('records', []))
-            
-            # Check if there are more records
-            offset = data.get('offset')
-            if not offset:
-                break
-            
-            # Update params with offset for next page
-            params['offset'] = offset
-        
-        # Return the records
-        return all_records, None
-    
+        # Paged through the shared client (pooled session, rate limit, retries)
+        return fetch_records(base_id, table_id, api_key), None
+
+    except AirtableAPIError as e:
+        return None, f"Error fetching data from Airtable: {e}"
+
     except Exception as e:
         # Return an error message if an exception occurs
         return None, f"Error connecting to Airtable API: {str(e)}"
@@ -0,0 +1,67 @@
+"""Cached Plotly figure specs for the WELA assessment dashboard.
+
+Each chart used to be rendered with ``fig.to_html(include_plotlyjs=True)``, so
+the dashboard page inlined the multi-megabyte plotly.js bundle once per chart
+(and again on every skill-period switch), and each view re-ran every
+chart's aggregates. Charts are now served as Plotly JSON specs that the
+templates draw with one shared plotly.js script tag, and the specs are cached
+per chart and filter combination.
+
+WELA data only changes on import (import_assessments) or an edit, so a spec's
+key carries the ASSESSMENTS and EDITS cache generations. A re-import bumps
+ASSESSMENTS and every cached figure goes stale at once.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from api.response_cache import ASSESSMENTS, EDITS, current_generations
+from dashboards.visualizations.assessment_charts import AssessmentCharts
+
+CACHE_PREFIX = 'assessment-figure'
+DEPENDS = (ASSESSMENTS, EDITS)
+
+# Pinned plotly.js build the dashboards load once per page (as the public pages do).
+PLOTLY_JS_URL = 'https://cdn.plot.ly/plotly-2.32.0.min.js'
+
+# chart name -> (builder, the filters it uses). Filters a chart ignores are
+# left out of its cache key, so e.g. the school comparison is cached once per year.
+CHARTS = {
+    'progress': (AssessmentCharts.get_progress_over_time_chart, ('year', 'school', 'grade')),
+    'schools': (AssessmentCharts.get_school_comparison_chart, ('year',)),
+    'skills': (AssessmentCharts.get_skill_breakdown_chart, ('year', 'period')),
+    'grades': (AssessmentCharts.get_grade_performance_chart, ('year',)),
+}
+
+
+def figure_key(chart, filters):
+    digest = hashlib.sha256(repr(sorted(filters.items())).encode()).hexdigest()[:24]
+    generations = '.'.join(str(g) for g in current_generations(DEPENDS))
+    return ':'.join([CACHE_PREFIX, chart, generations, digest])
+
+
+def figure_spec(chart, **filters):
+    """The Plotly JSON spec (a string) for ``chart`` under ``filters``, or
+    None when the chart has no data. Raises KeyError for an unknown chart."""
+    build, uses = CHARTS[chart]
+    filters = {name: filters.get(name) or None for name in uses}
+    key = figure_key(chart, filters)
+    cached = cache.get(key)
+    if cached is None:
+        fig = build(**{name: value for name, value in filters.items() if value is not None})
+        # '' stands for "no data" so that empty charts are cached too.
+        cached = fig.to_json() if fig is not None else ''
+        cache.set(key, cached)
+    return cached or None
+
+
+def figure_specs(year=None, school=None, grade=None, period='nov'):
+    """``{chart name: spec or None}`` for every dashboard chart."""
+    filters = {'year': year, 'school': school, 'grade': grade, 'period': period}
+    return {chart: figure_spec(chart, **filters) for chart in CHARTS}
+
+
+def decode(spec):
+    """A spec as a dict, for json_script; None stays None."""
+    return json.loads(spec) if spec else None
@@ -0,0 +1,194 @@
+"""Youth dashboard figures aggregated from the synced Youth table.
+
+The youth dashboard used to page through the whole Airtable youth table on
+every view, load it into a DataFrame and count it in pandas, so each page load
+waited on Airtable's latency and rate limits. Youth is already synced into
+Postgres (sync_airtable_youth), so the summary and every chart series are now
+GROUP BY aggregates over it, and the assembled figures are cached per filter
+combination under the API response cache's generations: a youth sync or any
+edit moves the key, and the date is part of it because months active runs to
+today.
+
+Column mapping from the old Airtable frame: Site Placement is the youth's
+school name and Site Type its ``School.type``.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Avg, Case, CharField, Count, DateField, F, Q, Value, When
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, TruncMonth
+from django.utils import timezone
+
+from api.models import Youth
+from api.response_cache import ALL_SCOPES, current_generations
+from dashboards.visualizations.youth_charts import (
+    AGE_BINS,
+    DURATION_BINS,
+    generate_age_distribution_chart,
+    generate_employment_duration_chart,
+    generate_gender_chart,
+    generate_hiring_trend_chart,
+    generate_job_title_chart,
+    generate_leaving_reasons_chart,
+    generate_race_chart,
+    generate_site_type_chart,
+)
+
+ACTIVE = 'Active'
+HIRING_TREND_MONTHS = 24
+CACHE_PREFIX = 'youth-dashboard'
+
+# Upper bounds (exclusive) of each bin; the last bin takes everything above.
+_AGE_UPPER = [20, 25, 30, 35, 40, 45, 50]
+_DURATION_UPPER = [3, 6, 12, 24, 36, 60]
+
+
+def _present(field):
+    """Rows where ``field`` has a value (value_counts dropped nulls and blanks)."""
+    return Q(**{f'{field}__isnull': False}) & ~Q(**{field: ''})
+
+
+def _counts(queryset, field, limit=None):
+    """[(value, rows)] for ``field``, most common first."""
+    rows = (queryset.filter(_present(field)).values_list(field)
+            .annotate(n=Count('id')).order_by('-n', field))
+    if limit:
+        rows = rows[:limit]
+    return [(value, n) for value, n in rows]
+
+
+def _binned(queryset, expression, upper_bounds, labels):
+    """[(label, rows)] for every label, bucketing ``expression`` by upper bounds."""
+    bucket = Case(
+        *[When(**{'value__lt': upper, 'then': Value(label)})
+          for upper, label in zip(upper_bounds, labels)],
+        default=Value(labels[-1]),
+        output_field=CharField(),
+    )
+    found = dict(
+        queryset.annotate(value=expression).filter(value__isnull=False)
+        .annotate(bucket=bucket).values_list('bucket').annotate(n=Count('id')).values_list('bucket', 'n')
+    )
+    return [(label, found.get(label, 0)) for label in labels]
+
+
+def _months_active(today):
+    """Whole months from start_date to today (active youth) or end_date
+    (others, falling back to today); null without a start date."""
+    until = Case(
+        When(employment_status=ACTIVE, then=Value(today)),
+        default=Coalesce('end_date', Value(today)),
+        output_field=DateField(),
+    )
+    return ((ExtractYear(until) - ExtractYear('start_date')) * 12
+            + ExtractMonth(until) - ExtractMonth('start_date'))
+
+
+def youth_summary():
+    """Headline numbers over all youth (the dashboard's stat cards)."""
+    active = Youth.objects.filter(employment_status=ACTIVE)
+    totals = active.aggregate(
+        active=Count('id'),
+        sites=Count('school__name', distinct=True),
+        avg_age=Avg('age'),
+        male=Count('id', filter=Q(gender='Male')),
+        female=Count('id', filter=Q(gender='Female')),
+    )
+    n_active = totals['active']
+    return {
+        'total_youth': Youth.objects.count(),
+        'active_youth': n_active,
+        'sites_count': totals['sites'],
+        'avg_age': totals['avg_age'],
+        'gender_ratio': {
+            'male': totals['male'] / n_active * 100 if n_active else 0,
+            'female': totals['female'] / n_active * 100 if n_active else 0,
+        },
+    }
+
+
+def hiring_trend():
+    """[('YYYY-MM', hires)] for the most recent HIRING_TREND_MONTHS months with hires."""
+    rows = (Youth.objects.filter(start_date__isnull=False)
+            .annotate(month=TruncMonth('start_date')).values_list('month')
+            .annotate(n=Count('id')).order_by('-month')[:HIRING_TREND_MONTHS])
+    return [(month.strftime('%Y-%m'), n) for month, n in reversed(rows)]
+
+
+def site_placement_table(queryset):
+    """Active youth per (school, site type), largest first."""
+    rows = (queryset.filter(employment_status=ACTIVE, school__isnull=False)
+            .values_list('school__name', 'school__type')
+            .annotate(n=Count('id')).order_by('-n', 'school__name'))
+    return [{'site_name': name, 'site_type': site_type, 'youth_count': n}
+            for name, site_type, n in rows]
+
+
+def filter_options():
+    """Distinct values for the dashboard's filter dropdowns."""
+    def distinct(field):
+        return list(Youth.objects.filter(_present(field))
+                    .order_by(field).values_list(field, flat=True).distinct())
+    return {
+        'status_options': distinct('employment_status'),
+        'site_type_options': distinct('school__type'),
+        'job_title_options': distinct('job_title'),
+    }
+
+
+def build_youth_dashboard(employment_status=ACTIVE, site_type='', job_title='', today=None):
+    """Template context for the youth dashboard, uncached.
+
+    The filters narrow the demographic charts and the site table, which then
+    count active youth only (as the Airtable version did); the summary, hiring
+    trend, leaving reasons and employment duration always cover every youth.
+    """
+    today = today or timezone.localdate()
+    filtered = Youth.objects.all()
+    if employment_status and employment_status != 'All':
+        filtered = filtered.filter(employment_status=employment_status)
+    if site_type:
+        filtered = filtered.filter(school__type=site_type)
+    if job_title:
+        filtered = filtered.filter(job_title=job_title)
+    active = filtered.filter(employment_status=ACTIVE)
+    former = Youth.objects.exclude(employment_status=ACTIVE)
+
+    return {
+        'title': 'Youth Dashboard',
+        'summary': youth_summary(),
+        'gender_chart': generate_gender_chart(_counts(active, 'gender')),
+        'race_chart': generate_race_chart(_counts(active, 'race')),
+        'job_title_chart': generate_job_title_chart(_counts(active, 'job_title', limit=10)),
+        'site_type_chart': generate_site_type_chart(_counts(active, 'school__type')),
+        'hiring_trend_chart': generate_hiring_trend_chart(hiring_trend()),
+        'leaving_reasons_chart': generate_leaving_reasons_chart(
+            _counts(former, 'reason_for_leaving', limit=10)),
+        'age_distribution_chart': generate_age_distribution_chart(
+            _binned(active, F('age'), _AGE_UPPER, AGE_BINS)),
+        'employment_duration_chart': generate_employment_duration_chart(
+            _binned(Youth.objects.filter(start_date__isnull=False), _months_active(today),
+                    _DURATION_UPPER, DURATION_BINS)),
+        'site_placement_table': site_placement_table(filtered),
+        **filter_options(),
+        'selected_status': employment_status,
+        'selected_site_type': site_type,
+        'selected_job_title': job_title,
+    }
+
+
+def youth_dashboard_context(employment_status=ACTIVE, site_type='', job_title=''):
+    """``build_youth_dashboard``, cached per filter combination until the next
+    sync or edit (or midnight)."""
+    filters = repr((employment_status, site_type, job_title))
+    key = ':'.join([
+        CACHE_PREFIX,
+        timezone.localdate().isoformat(),
+        '.'.join(str(g) for g in current_generations(ALL_SCOPES)),
+        hashlib.sha256(filters.encode()).hexdigest()[:24],
+    ])
+    context = cache.get(key)
+    if context is None:
+        context = build_youth_dashboard(employment_status, site_type, job_title)
+        cache.set(key, context)
+    return context
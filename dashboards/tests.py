@@ -1,3 +1,146 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.models import AirtableSyncLog, School, WELA_assessments, Youth
+from dashboards.services.assessment_figures import PLOTLY_JS_URL, figure_spec
+from dashboards.services.youth_analytics import build_youth_dashboard, youth_dashboard_context
+from dashboards.visualizations.assessment_charts import AssessmentCharts
+from masi_website.test_runner import LOCMEM
+
+
+def _data(chart):
+    chart = json.loads(chart)
+    return dict(zip(chart['labels'], chart['datasets'][0]['data']))
+
+
+class YouthAnalyticsTests(TestCase):
+    def setUp(self):
+        self.primary = School.objects.create(name='Primary A', type='Primary School')
+        self.ecd = School.objects.create(name='ECD B', type='ECD')
+        self._youth(1, school=self.primary, gender='Female', age=22, job_title='Literacy Coach',
+                    start_date=date(2025, 1, 15))
+        self._youth(2, school=self.primary, gender='Male', age=31, job_title='Literacy Coach',
+                    start_date=date(2025, 11, 3))
+        self._youth(3, school=self.ecd, gender='Female', age=19, job_title='ECD Practitioner',
+                    start_date=date(2026, 2, 1))
+        self._youth(4, school=self.primary, gender='Female', age=40, job_title='Literacy Coach',
+                    employment_status='Resigned', reason_for_leaving='Studies',
+                    start_date=date(2024, 1, 1), end_date=date(2024, 5, 31))
+
+    def _youth(self, employee_id, **fields):
+        return Youth.objects.create(employee_id=employee_id, first_names='Y',
+                                    last_name=str(employee_id), **fields)
+
+    def test_summary_and_series_match_the_airtable_semantics(self):
+        ctx = build_youth_dashboard(today=date(2026, 6, 15))
+        self.assertEqual(ctx['summary']['total_youth'], 4)
+        self.assertEqual(ctx['summary']['active_youth'], 3)
+        self.assertEqual(ctx['summary']['sites_count'], 2)
+        self.assertAlmostEqual(ctx['summary']['avg_age'], 24)
+        self.assertAlmostEqual(ctx['summary']['gender_ratio']['female'], 200 / 3)
+
+        self.assertEqual(_data(ctx['gender_chart']), {'Female': 2, 'Male': 1})
+        self.assertEqual(_data(ctx['site_type_chart']), {'Primary School': 2, 'ECD': 1})
+        self.assertEqual(_data(ctx['age_distribution_chart'])['15-19'], 1)
+        self.assertEqual(_data(ctx['age_distribution_chart'])['30-34'], 1)
+        self.assertEqual(_data(ctx['leaving_reasons_chart']), {'Studies': 1})
+        self.assertEqual(list(_data(ctx['hiring_trend_chart'])),
+                         ['2024-01', '2025-01', '2025-11', '2026-02'])
+        # 17, 7 and 4 months active; the leaver worked Jan-May 2024.
+        duration = _data(ctx['employment_duration_chart'])
+        self.assertEqual((duration['3-6'], duration['6-12'], duration['12-24']), (2, 1, 1))
+        self.assertEqual(ctx['site_placement_table'][0],
+                         {'site_name': 'Primary A', 'site_type': 'Primary School', 'youth_count': 2})
+        self.assertEqual(ctx['site_type_options'], ['ECD', 'Primary School'])
+
+    def test_filters_narrow_the_demographic_charts_only(self):
+        ctx = build_youth_dashboard(site_type='ECD', today=date(2026, 6, 15))
+        self.assertEqual(_data(ctx['gender_chart']), {'Female': 1})
+        self.assertEqual(ctx['summary']['active_youth'], 3)
+        self.assertEqual(sum(_data(ctx['hiring_trend_chart']).values()), 4)
+
+    @override_settings(CACHES=LOCMEM)
+    def test_context_is_cached_per_filter_until_a_sync(self):
+        cache.clear()
+        first = youth_dashboard_context()
+        self._youth(5, school=self.ecd, gender='Male')
+        with self.assertNumQueries(1):  # the generation lookup only
+            self.assertEqual(youth_dashboard_context()['summary'], first['summary'])
+        self.assertEqual(youth_dashboard_context(job_title='ECD Practitioner')['summary']['active_youth'], 4)
+
+        AirtableSyncLog.objects.create(sync_type='youth').mark_complete(success=True)
+        self.assertEqual(youth_dashboard_context()['summary']['active_youth'], 4)
+
+    def test_dashboard_page_renders_without_airtable(self):
+        self.client.force_login(User.objects.create_user('viewer', password='x'))
+        response = self.client.get('/dashboard/youth-dashboard/?site_type=ECD')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('error_message', response.context)
+        self.assertEqual(response.context['selected_site_type'], 'ECD')
+
+
+class AssessmentFigureTests(TestCase):
+    def setUp(self):
+        for i, (school, grade, jan, nov) in enumerate([
+            ('Alpha', 'Grade R', 10, 30), ('Alpha', 'Grade 1', 20, 25), ('Beta', 'Grade 1', 40, 35),
+        ]):
+            WELA_assessments.objects.create(
+                mcode=f'M{i}', assessment_year=2024, school=school, city='PE', grade=grade,
+                language='isiXhosa', surname='S', name='N', full_name=f'Learner {i}', gender='F',
+                jan_total=jan, nov_total=nov, nov_letter_sounds=jan)
+
+    def test_summary_stats_in_one_aggregate(self):
+        stats = AssessmentCharts.get_summary_stats(year=2024)
+        self.assertEqual(stats['total_students'], 3)
+        self.assertEqual(stats['avg_improvement'], 6.7)
+        self.assertEqual(stats['improvement_rate'], 66.7)
+        self.assertEqual(stats['schools_count'], 2)
+
+    def test_school_comparison_sorts_by_improvement(self):
+        fig = AssessmentCharts.get_school_comparison_chart(year=2024)
+        self.assertEqual(list(fig.data[0].x), ['Alpha', 'Beta'])
+        self.assertEqual(list(fig.data[0].y), [12.5, -5.0])
+        self.assertIsNone(AssessmentCharts.get_school_comparison_chart(year=1999))
+
+    @override_settings(CACHES=LOCMEM)
+    def test_specs_are_cached_until_the_next_import(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        spec = json.loads(figure_spec('progress', year=2024, school='Alpha'))
+        self.assertEqual(spec['data'][0]['y'], [15.0, 0.0, 27.5])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertIsNotNone(figure_spec('progress', year=2024, school='Alpha'))
+        self.assertEqual(len(ctx.captured_queries), 1)  # the generation read only
+
+        WELA_assessments.objects.filter(school='Alpha').update(nov_total=40)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            csv_file.write('Mcode,School\n')
+            csv_file.flush()
+            call_command('import_assessments', csv_file.name, '--year', '2024', stdout=None)
+        spec = json.loads(figure_spec('progress', year=2024, school='Alpha'))
+        self.assertEqual(spec['data'][0]['y'], [15.0, 0.0, 40.0])
+
+    def test_dashboard_loads_plotly_once_and_serves_specs(self):
+        user = User.objects.create_user(username='viewer', password='pw')
+        self.client.force_login(user)
+        page = self.client.get('/dashboard/assessments/?year=2024').content.decode()
+        self.assertEqual(page.count(PLOTLY_JS_URL), 1)
+        self.assertIn('id="assessment-figures"', page)
+
+        res = self.client.get('/dashboard/assessment-data/?chart_type=skills&year=2024&period=nov')
+        self.assertEqual(res.json()['figure']['data'][0]['name'], 'Nov Averages')
+        self.assertIsNone(self.client.get('/dashboard/assessment-data/?chart_type=schools&year=1999')
+                          .json()['figure'])
+        self.assertEqual(self.client.get('/dashboard/assessment-data/?chart_type=pie').status_code, 400)
+
+        page = self.client.get('/dashboard/student/M0/').content.decode()
+        self.assertEqual(page.count(PLOTLY_JS_URL), 1)
+        self.assertIn('id="individual-chart"', page)
@@ -18,50 +18,38 @@ from api.models import MentorVisit, School, YeboVisit, ThousandStoriesVisit, Num
 
 # Airtable Services
 from .services.airtable_service import fetch_youth_airtable_records
-from .services.airtable_service import process_youth_airtable_records
 from .services.data_processing import get_active_records, count_job_titles
 
 # Mentor Dashboard Visualizations
 from .visualizations.charts import create_job_title_chart
 from .visualizations.mentor_charts import (
+    ACTIVITY_LABELS,
     generate_combined_visit_frequency_chart,
     generate_visit_frequency_chart,
     generate_combined_quality_rating_chart,
     generate_quality_rating_chart,
-    generate_yebo_quality_rating_chart,
-    generate_thousand_stories_quality_rating_chart,
-    generate_numeracy_quality_rating_chart,
     generate_letter_tracker_accuracy_chart,
     generate_tracker_accuracy_chart,
+    school_locations,
     generate_combined_school_visit_map,
     generate_school_visit_map,
-    generate_yebo_school_visit_map,
-    generate_thousand_stories_school_visit_map,
-    generate_numeracy_school_visit_map,
     generate_combined_dashboard_summary,
     generate_dashboard_summary,
+    generate_schools_last_visited_comprehensive,
     get_recent_literacy_submissions,
     get_recent_yebo_submissions,
     get_recent_thousand_stories_submissions,
     get_recent_numeracy_submissions
 )
 
-# Youth Dashboard Visualizations
-from .visualizations.youth_charts import (
-    ensure_string_values,
-    generate_youth_summary,
-    generate_gender_chart,
-    generate_race_chart,
-    generate_job_title_chart,
-    generate_site_type_chart,
-    generate_hiring_trend_chart,
-    generate_leaving_reasons_chart,
-    generate_age_distribution_chart,
-    generate_employment_duration_chart,
-    generate_site_placement_table
-)
+# One query layer over the four visit models
+from api.visit_facts import VisitFacts, time_filter_start
+
+# Youth Dashboard (aggregated from the synced Youth table)
+from .services.youth_analytics import youth_dashboard_context, youth_summary
 
 from dashboards.visualizations.assessment_charts import AssessmentCharts
+from .services.assessment_figures import CHARTS, PLOTLY_JS_URL, decode, figure_spec, figure_specs
 
 def dashboard_main(request):
     """
@@ -103,19 +91,7 @@ def dashboard_main(request):
     
     # Try to get youth stats if available
     try:
-        from .services.airtable_service import fetch_youth_airtable_records, process_youth_airtable_records
-        from .visualizations.youth_charts import generate_youth_summary
-        
-        # Fetch youth data from Airtable
-        records, error = fetch_youth_airtable_records()
-        
-        if not error and records:
-            # Process the records
-            youth_df = process_youth_airtable_records(records)
-            
-            # Generate summary stats
-            if not youth_df.empty:
-                youth_stats = generate_youth_summary(youth_df)
+        youth_stats = youth_summary()
     except Exception as e:
         # If there's an error, we'll just use the default values in the template
         import logging
@@ -195,87 +171,41 @@ def mentor_dashboard(request):
         school_filter = request.GET.get('school', '')
         mentor_filter = request.GET.get('mentor', '')
         
-        # Base querysets for all four visit types
-        mentor_visits = MentorVisit.objects.all()
-        yebo_visits = YeboVisit.objects.all()
-        thousand_stories_visits = ThousandStoriesVisit.objects.all()
-        numeracy_visits = NumeracyVisit.objects.all()
-        
-        # Apply time filter to all visit types
-        if time_filter == '7days':
-            seven_days_ago = timezone.now().date() - timedelta(days=7)
-            mentor_visits = mentor_visits.filter(visit_date__gte=seven_days_ago)
-            yebo_visits = yebo_visits.filter(visit_date__gte=seven_days_ago)
-            thousand_stories_visits = thousand_stories_visits.filter(visit_date__gte=seven_days_ago)
-            numeracy_visits = numeracy_visits.filter(visit_date__gte=seven_days_ago)
-        elif time_filter == '30days':
-            thirty_days_ago = timezone.now().date() - timedelta(days=30)
-            mentor_visits = mentor_visits.filter(visit_date__gte=thirty_days_ago)
-            yebo_visits = yebo_visits.filter(visit_date__gte=thirty_days_ago)
-            thousand_stories_visits = thousand_stories_visits.filter(visit_date__gte=thirty_days_ago)
-            numeracy_visits = numeracy_visits.filter(visit_date__gte=thirty_days_ago)
-        elif time_filter == '90days':
-            ninety_days_ago = timezone.now().date() - timedelta(days=90)
-            mentor_visits = mentor_visits.filter(visit_date__gte=ninety_days_ago)
-            yebo_visits = yebo_visits.filter(visit_date__gte=ninety_days_ago)
-            thousand_stories_visits = thousand_stories_visits.filter(visit_date__gte=ninety_days_ago)
-            numeracy_visits = numeracy_visits.filter(visit_date__gte=ninety_days_ago)
-        elif time_filter == 'thisyear':
-            year_start = timezone.now().date().replace(month=1, day=1)
-            mentor_visits = mentor_visits.filter(visit_date__gte=year_start)
-            yebo_visits = yebo_visits.filter(visit_date__gte=year_start)
-            thousand_stories_visits = thousand_stories_visits.filter(visit_date__gte=year_start)
-            numeracy_visits = numeracy_visits.filter(visit_date__gte=year_start)
-        
-        # Apply school filter to all visit types
+        # One filter for all four visit types: the charts read the VisitFacts
+        # aggregates (one UNION ALL query each), the recent-submission tables
+        # the per-type querysets
+        since = time_filter_start(time_filter, timezone.now().date())
+        visit_filters = {}
+        if since:
+            visit_filters['visit_date__gte'] = since
         if school_filter:
-            mentor_visits = mentor_visits.filter(school_id=school_filter)
-            yebo_visits = yebo_visits.filter(school_id=school_filter)
-            thousand_stories_visits = thousand_stories_visits.filter(school_id=school_filter)
-            numeracy_visits = numeracy_visits.filter(school_id=school_filter)
-        
-        # Apply mentor filter to all visit types
+            visit_filters['school_id'] = school_filter
         if mentor_filter:
-            mentor_visits = mentor_visits.filter(mentor_id=mentor_filter)
-            yebo_visits = yebo_visits.filter(mentor_id=mentor_filter)
-            thousand_stories_visits = thousand_stories_visits.filter(mentor_id=mentor_filter)
-            numeracy_visits = numeracy_visits.filter(mentor_id=mentor_filter)
+            visit_filters['mentor_id'] = mentor_filter
+        facts = VisitFacts(since=since, school_id=school_filter, mentor_id=mentor_filter)
+        
+        mentor_visits = MentorVisit.objects.filter(**visit_filters)
+        yebo_visits = YeboVisit.objects.filter(**visit_filters)
+        thousand_stories_visits = ThousandStoriesVisit.objects.filter(**visit_filters)
+        numeracy_visits = NumeracyVisit.objects.filter(**visit_filters)
         
         # Get all schools for the filter dropdown
         schools = School.objects.filter(is_active=True).order_by('name')
         
         # Get all mentors for the filter dropdown (mentors who have submitted any type of visit)
-        mentor_ids = set()
-        mentor_ids.update(MentorVisit.objects.values_list('mentor_id', flat=True))
-        mentor_ids.update(YeboVisit.objects.values_list('mentor_id', flat=True))
-        mentor_ids.update(ThousandStoriesVisit.objects.values_list('mentor_id', flat=True))
-        mentor_ids.update(NumeracyVisit.objects.values_list('mentor_id', flat=True))
-        mentors = User.objects.filter(id__in=mentor_ids).distinct().order_by('first_name', 'last_name')
+        mentors = User.objects.filter(id__in=VisitFacts().mentor_ids()).order_by('first_name', 'last_name')
         
         # Generate chart data
         time_period = 'week' if time_filter in ['7days', '30days', '90days'] else 'month'
+        counts_by_period = facts.counts_by_period(time_period)
+        counts_by_quality = facts.counts_by_quality()
+        per_school = facts.per_school()
+        locations = school_locations(per_school)
         
-        # Get all visits (unfiltered by time) for schools last visited component
-        all_mentor_visits = MentorVisit.objects.all()
-        all_yebo_visits = YeboVisit.objects.all()
-        all_thousand_stories_visits = ThousandStoriesVisit.objects.all()
-        all_numeracy_visits = NumeracyVisit.objects.all()
-        
-        if school_filter:
-            all_mentor_visits = all_mentor_visits.filter(school_id=school_filter)
-            all_yebo_visits = all_yebo_visits.filter(school_id=school_filter)
-            all_thousand_stories_visits = all_thousand_stories_visits.filter(school_id=school_filter)
-            all_numeracy_visits = all_numeracy_visits.filter(school_id=school_filter)
-        if mentor_filter:
-            all_mentor_visits = all_mentor_visits.filter(mentor_id=mentor_filter)
-            all_yebo_visits = all_yebo_visits.filter(mentor_id=mentor_filter)
-            all_thousand_stories_visits = all_thousand_stories_visits.filter(mentor_id=mentor_filter)
-            all_numeracy_visits = all_numeracy_visits.filter(mentor_id=mentor_filter)
-        
-        # Generate comprehensive schools last visited data (all visit types)
-        from .visualizations.mentor_charts import generate_schools_last_visited_comprehensive
+        # Generate comprehensive schools last visited data (all visit types,
+        # unfiltered by time)
         schools_last_visited = generate_schools_last_visited_comprehensive(
-            all_mentor_visits, all_yebo_visits, all_thousand_stories_visits, all_numeracy_visits
+            VisitFacts(school_id=school_filter, mentor_id=mentor_filter)
         )
         
         # Get recent submissions for each visit type
@@ -292,32 +222,32 @@ def mentor_dashboard(request):
             'selected_mentor': mentor_filter,
             
             # Combined charts showing all visit types
-            'combined_visit_frequency_chart': generate_combined_visit_frequency_chart(mentor_visits, yebo_visits, thousand_stories_visits, numeracy_visits, time_period),
-            'combined_quality_rating_chart': generate_combined_quality_rating_chart(mentor_visits, yebo_visits, thousand_stories_visits, numeracy_visits),
-            'combined_school_visit_map': generate_combined_school_visit_map(mentor_visits, yebo_visits, thousand_stories_visits, numeracy_visits),
-            'combined_summary': generate_combined_dashboard_summary(mentor_visits, yebo_visits, thousand_stories_visits, numeracy_visits),
+            'combined_visit_frequency_chart': generate_combined_visit_frequency_chart(counts_by_period, time_period),
+            'combined_quality_rating_chart': generate_combined_quality_rating_chart(counts_by_quality),
+            'combined_school_visit_map': generate_combined_school_visit_map(per_school, locations),
+            'combined_summary': generate_combined_dashboard_summary(facts),
             
             # Literacy-specific charts
-            'literacy_visit_frequency_chart': generate_visit_frequency_chart(mentor_visits, time_period),
-            'literacy_quality_rating_chart': generate_quality_rating_chart(mentor_visits),
+            'literacy_visit_frequency_chart': generate_visit_frequency_chart(counts_by_period['literacy'], time_period),
+            'literacy_quality_rating_chart': generate_quality_rating_chart(counts_by_quality['literacy']),
             'letter_tracker_accuracy_chart': generate_letter_tracker_accuracy_chart(mentor_visits),
-            'literacy_school_visit_map': generate_school_visit_map(mentor_visits),
+            'literacy_school_visit_map': generate_school_visit_map(per_school['literacy'], locations),
             'literacy_summary': generate_dashboard_summary(mentor_visits),
             
             # Yebo-specific charts
-            'yebo_visit_frequency_chart': generate_visit_frequency_chart(yebo_visits, time_period),
-            'yebo_quality_rating_chart': generate_yebo_quality_rating_chart(yebo_visits),
-            'yebo_school_visit_map': generate_yebo_school_visit_map(yebo_visits),
+            'yebo_visit_frequency_chart': generate_visit_frequency_chart(counts_by_period['yebo'], time_period),
+            'yebo_quality_rating_chart': generate_quality_rating_chart(counts_by_quality['yebo']),
+            'yebo_school_visit_map': generate_school_visit_map(per_school['yebo'], locations),
             
             # 1000 Stories-specific charts  
-            'stories_visit_frequency_chart': generate_visit_frequency_chart(thousand_stories_visits, time_period),
-            'stories_quality_rating_chart': generate_thousand_stories_quality_rating_chart(thousand_stories_visits),
-            'stories_school_visit_map': generate_thousand_stories_school_visit_map(thousand_stories_visits),
+            'stories_visit_frequency_chart': generate_visit_frequency_chart(counts_by_period['stories'], time_period),
+            'stories_quality_rating_chart': generate_quality_rating_chart(counts_by_quality['stories']),
+            'stories_school_visit_map': generate_school_visit_map(per_school['stories'], locations),
             
             # Numeracy-specific charts
-            'numeracy_visit_frequency_chart': generate_visit_frequency_chart(numeracy_visits, time_period),
-            'numeracy_quality_rating_chart': generate_numeracy_quality_rating_chart(numeracy_visits),
-            'numeracy_school_visit_map': generate_numeracy_school_visit_map(numeracy_visits),
+            'numeracy_visit_frequency_chart': generate_visit_frequency_chart(counts_by_period['numeracy'], time_period),
+            'numeracy_quality_rating_chart': generate_quality_rating_chart(counts_by_quality['numeracy']),
+            'numeracy_school_visit_map': generate_school_visit_map(per_school['numeracy'], locations),
             
             # Recent submissions for each type
             'recent_literacy_submissions': recent_literacy_submissions,
@@ -350,82 +280,22 @@ def mentor_dashboard(request):
 @login_required
 def youth_dashboard(request):
     """
-    Dashboard view for youth data visualization using Airtable API
+    Dashboard view for youth data visualization, aggregated from the synced
+    Youth table (see dashboards/services/youth_analytics.py)
     """
     try:
-        # Fetch data from Airtable
-        records, error = fetch_youth_airtable_records()
-        
-        if error:
-            return render(request, 'dashboards/youth_dashboard.html', {
-                'error_message': error,
-                'troubleshooting_tips': [
-                    "Check your environment variables are properly set",
-                    "Verify that AIRTABLE_API_KEY, AIRTABLE_BASE_ID, and AIRTABLE_COMBINED_YOUTH_DATA_TABLE_ID are correctly configured",
-                    "Make sure your Airtable API key has access to the base containing the youth data"
-                ],
-                'title': 'Youth Dashboard'
-            })
-        
-        # Process the records
-        youth_df = process_youth_airtable_records(records)
-        
-        # Check if DataFrame was created successfully
-        if youth_df is None or youth_df.empty:
-            return render(request, 'dashboards/youth_dashboard.html', {
-                'error_message': 'No records found or error processing the data',
-                'title': 'Youth Dashboard'
-            })
-        
         # Apply filters from GET parameters
         employment_status = request.GET.get('employment_status', 'Active')
         site_type = request.GET.get('site_type', '')
         job_title = request.GET.get('job_title', '')
-        
-        # Create a filtered dataframe for charts that need it
-        filtered_df = youth_df.copy()
-        
-        if employment_status and employment_status != 'All':
-            filtered_df = filtered_df[filtered_df['Employment Status'] == employment_status]
-        
-        if site_type:
-            filtered_df = filtered_df[filtered_df['Site Type'] == site_type]
-            
-        if job_title:
-            filtered_df = filtered_df[filtered_df['Job Title'] == job_title]
-        
-        # Safely ensure string values for filtering columns
-        youth_df = ensure_string_values(youth_df, 'Employment Status')
-        youth_df = ensure_string_values(youth_df, 'Site Type')
-        youth_df = ensure_string_values(youth_df, 'Job Title')
-        
-        # Get unique values for filter dropdowns
-        status_options = youth_df['Employment Status'].dropna().unique().tolist()
-        site_type_options = youth_df['Site Type'].dropna().unique().tolist()
-        job_title_options = youth_df['Job Title'].dropna().unique().tolist()
-        
-        # Generate all chart data
-        context = {
-            'title': 'Youth Dashboard',
-            'summary': generate_youth_summary(youth_df),
-            'gender_chart': generate_gender_chart(filtered_df),
-            'race_chart': generate_race_chart(filtered_df),
-            'job_title_chart': generate_job_title_chart(filtered_df),
-            'site_type_chart': generate_site_type_chart(filtered_df),
-            'hiring_trend_chart': generate_hiring_trend_chart(youth_df),  # All youth for hiring trends
-            'leaving_reasons_chart': generate_leaving_reasons_chart(youth_df),  # All youth for leaving reasons
-            'age_distribution_chart': generate_age_distribution_chart(filtered_df),
-            'employment_duration_chart': generate_employment_duration_chart(youth_df),  # All youth for duration
-            'site_placement_table': generate_site_placement_table(filtered_df),
-            
-            # Filter options and selected values
-            'status_options': status_options,
-            'site_type_options': site_type_options,
-            'job_title_options': job_title_options,
-            'selected_status': employment_status,
-            'selected_site_type': site_type,
-            'selected_job_title': job_title
-        }
+
+        context = youth_dashboard_context(employment_status, site_type, job_title)
+
+        if not context['summary']['total_youth']:
+            return render(request, 'dashboards/youth_dashboard.html', {
+                'error_message': 'No youth records found. Has the youth sync (sync_airtable_youth) run?',
+                'title': 'Youth Dashboard'
+            })
         
         return render(request, 'dashboards/youth_dashboard.html', context)
         
@@ -704,6 +574,10 @@ def literacy_management_dashboard(request):
                 'Zama Zulu', 'Zola Mbusi', 'Zolani Sibengile', 'Babalo Rozani'
             ]
             
+            # Which programmes each mentor visited on each of those days, across
+            # all four visit types in one query
+            day_activity = VisitFacts(since=weekdays[-1], until=weekdays[0]).activity()
+            
             # Create visit activity matrix with visit counts for sorting
             mentor_activity_data = []
             for mentor in mentors:
@@ -722,49 +596,14 @@ def literacy_management_dashboard(request):
                 }
                 
                 for day in weekdays:
-                    # Check for visits across all visit types
-                    has_mentor_visit = MentorVisit.objects.filter(
-                        mentor=mentor,
-                        visit_date=day
-                    ).exists()
-                    
-                    has_yebo_visit = YeboVisit.objects.filter(
-                        mentor=mentor,
-                        visit_date=day
-                    ).exists()
-                    
-                    has_thousand_stories_visit = ThousandStoriesVisit.objects.filter(
-                        mentor=mentor,
-                        visit_date=day
-                    ).exists()
-                    
-                    has_numeracy_visit = NumeracyVisit.objects.filter(
-                        mentor=mentor,
-                        visit_date=day
-                    ).exists()
-                    
-                    # Check if any visit type occurred on this day
-                    has_any_visit = (has_mentor_visit or has_yebo_visit or 
-                                   has_thousand_stories_visit or has_numeracy_visit)
+                    programmes = day_activity.get((mentor.id, day), set())
+                    has_any_visit = bool(programmes)
                     
                     # Count how many different visit types occurred
-                    visit_count = sum([
-                        has_mentor_visit,
-                        has_yebo_visit, 
-                        has_thousand_stories_visit,
-                        has_numeracy_visit
-                    ])
+                    visit_count = len(programmes)
                     
                     # Determine which visit types occurred for tooltip/display
-                    visit_types = []
-                    if has_mentor_visit:
-                        visit_types.append('Literacy')
-                    if has_yebo_visit:
-                        visit_types.append('Yebo')
-                    if has_thousand_stories_visit:
-                        visit_types.append('1000 Stories')
-                    if has_numeracy_visit:
-                        visit_types.append('Numeracy')
+                    visit_types = [label for key, label in ACTIVITY_LABELS if key in programmes]
                     
                     mentor_activity['activity'].append({
                         'date': day,
@@ -940,18 +779,14 @@ def assessment_dashboard(request):
     available_schools = WELA_assessments.objects.values_list('school', flat=True).distinct().order_by('school')
     available_grades = WELA_assessments.objects.values_list('grade', flat=True).distinct().order_by('grade')
     
-    # Generate charts
-    progress_chart = AssessmentCharts.get_progress_over_time_chart(year=year, school=school, grade=grade)
-    school_comparison_chart = AssessmentCharts.get_school_comparison_chart(year=year)
-    skill_breakdown_chart = AssessmentCharts.get_skill_breakdown_chart(year=year, period='nov')
-    grade_performance_chart = AssessmentCharts.get_grade_performance_chart(year=year)
+    # Chart specs (cached per chart and filters), drawn client-side with one plotly.js
+    figures = {chart: decode(spec) for chart, spec in
+               figure_specs(year=year, school=school, grade=grade, period='nov').items()}
     
     context = {
         'stats': stats,
-        'progress_chart': progress_chart,
-        'school_comparison_chart': school_comparison_chart,
-        'skill_breakdown_chart': skill_breakdown_chart,
-        'grade_performance_chart': grade_performance_chart,
+        'figures': figures,
+        'plotly_js_url': PLOTLY_JS_URL,
         'available_years': available_years,
         'available_schools': available_schools,
         'available_grades': available_grades,
@@ -977,19 +812,12 @@ def assessment_data_api(request):
         except ValueError:
             year = None
     
-    if chart_type == 'progress':
-        chart_html = AssessmentCharts.get_progress_over_time_chart(year=year, school=school, grade=grade)
-    elif chart_type == 'schools':
-        chart_html = AssessmentCharts.get_school_comparison_chart(year=year)
-    elif chart_type == 'skills':
-        period = request.GET.get('period', 'nov')
-        chart_html = AssessmentCharts.get_skill_breakdown_chart(year=year, period=period)
-    elif chart_type == 'grades':
-        chart_html = AssessmentCharts.get_grade_performance_chart(year=year)
-    else:
+    if chart_type not in CHARTS:
         return JsonResponse({'error': 'Invalid chart type'}, status=400)
     
-    return JsonResponse({'chart_html': chart_html})
+    spec = figure_spec(chart_type, year=year, school=school, grade=grade,
+                       period=request.GET.get('period', 'nov'))
+    return JsonResponse({'figure': decode(spec)})
 
 @login_required
 def student_detail_view(request, mcode):
@@ -1005,64 +833,16 @@ def student_detail_view(request, mcode):
         # Get the latest record for basic info
         latest_assessment = student_assessments.last()
         
-        # Prepare data for individual student progress chart
-        years = []
-        jan_scores = []
-        june_scores = []
-        nov_scores = []
-        
-        for assessment in student_assessments:
-            years.append(assessment.assessment_year)
-            jan_scores.append(assessment.jan_total or 0)
-            june_scores.append(assessment.june_total or 0)
-            nov_scores.append(assessment.nov_total or 0)
-        
-        # Create individual progress chart
-        import plotly.graph_objects as go
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=years,
-            y=jan_scores,
-            mode='lines+markers',
-            name='January',
-            line=dict(color='#F18F01', width=2),
-            marker=dict(size=8)
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=years,
-            y=june_scores,
-            mode='lines+markers',
-            name='June',
-            line=dict(color='#C73E1D', width=2),
-            marker=dict(size=8)
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=years,
-            y=nov_scores,
-            mode='lines+markers',
-            name='November',
-            line=dict(color='#2E86AB', width=2),
-            marker=dict(size=8)
-        ))
-        
-        fig.update_layout(
-            title=f'Individual Progress: {latest_assessment.full_name}',
-            xaxis_title='Year',
-            yaxis_title='Total Score',
-            template='plotly_white',
-            height=400
-        )
-        
-        individual_chart = fig.to_html(include_plotlyjs=True)
+        # Individual progress chart, drawn client-side from its spec
+        individual_chart = decode(AssessmentCharts.get_student_progress_chart(
+            student_assessments, latest_assessment.full_name
+        ).to_json())
         
         context = {
             'student': latest_assessment,
             'assessments': student_assessments,
             'individual_chart': individual_chart,
+            'plotly_js_url': PLOTLY_JS_URL,
         }
         
         return render(request, 'dashboards/student_detail.html', context)
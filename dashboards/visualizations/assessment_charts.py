@@ -1,13 +1,15 @@
 # dashboard/visualizations/assessment_charts.py
 
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import pandas as pd
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, F, Q
 from api.models import WELA_assessments
 
 class AssessmentCharts:
+    """
+    Plotly figures for the WELA assessment dashboard, built from database
+    aggregates. Each chart returns a go.Figure (None when there is no data);
+    dashboards.services.assessment_figures serialises and caches them.
+    """
     
     @staticmethod
     def get_progress_over_time_chart(year=None, school=None, grade=None):
@@ -23,9 +25,10 @@ class AssessmentCharts:
             queryset = queryset.filter(grade=grade)
         
         # Get aggregated data
-        jan_avg = queryset.aggregate(avg=Avg('jan_total'))['avg'] or 0
-        june_avg = queryset.aggregate(avg=Avg('june_total'))['avg'] or 0
-        nov_avg = queryset.aggregate(avg=Avg('nov_total'))['avg'] or 0
+        averages = queryset.aggregate(jan=Avg('jan_total'), june=Avg('june_total'), nov=Avg('nov_total'))
+        jan_avg = averages['jan'] or 0
+        june_avg = averages['june'] or 0
+        nov_avg = averages['nov'] or 0
         
         fig = go.Figure()
         
@@ -46,7 +49,7 @@ class AssessmentCharts:
             height=400
         )
         
-        return fig.to_html(include_plotlyjs=True)
+        return fig
     
     @staticmethod
     def get_school_comparison_chart(year=None):
@@ -56,29 +59,15 @@ class AssessmentCharts:
         if year:
             queryset = queryset.filter(assessment_year=year)
         
-        # Calculate improvement by school
-        school_data = []
-        schools = queryset.values_list('school', flat=True).distinct()
-        
-        for school in schools:
-            school_students = queryset.filter(school=school)
-            
-            # Calculate average improvement (Nov - Jan)
-            improvements = []
-            for student in school_students:
-                if student.jan_total is not None and student.nov_total is not None:
-                    improvements.append(student.nov_total - student.jan_total)
-            
-            if improvements:
-                avg_improvement = sum(improvements) / len(improvements)
-                school_data.append({
-                    'school': school,
-                    'avg_improvement': avg_improvement,
-                    'student_count': len(improvements)
-                })
+        # Calculate average improvement (Nov - Jan) by school
+        school_data = list(
+            queryset.filter(jan_total__isnull=False, nov_total__isnull=False)
+            .values('school')
+            .annotate(avg_improvement=Avg(F('nov_total') - F('jan_total')), student_count=Count('id'))
+        )
         
         if not school_data:
-            return "<p>No data available for school comparison</p>"
+            return None
         
         # Sort by improvement
         school_data.sort(key=lambda x: x['avg_improvement'], reverse=True)
@@ -105,7 +94,7 @@ class AssessmentCharts:
             xaxis={'tickangle': 45}
         )
         
-        return fig.to_html(include_plotlyjs=True)
+        return fig
     
     @staticmethod
     def get_skill_breakdown_chart(year=None, period='nov'):
@@ -164,14 +153,15 @@ class AssessmentCharts:
         averages = []
         labels = []
         
+        skill_averages = queryset.aggregate(**{field_name: Avg(field_name) for field_name in skills.values()})
         for skill_name, field_name in skills.items():
-            avg = queryset.aggregate(avg=Avg(field_name))['avg']
+            avg = skill_averages[field_name]
             if avg is not None:
                 averages.append(avg)
                 labels.append(skill_name)
         
         if not averages:
-            return "<p>No skill data available</p>"
+            return None
         
         # Create radar chart
         fig = go.Figure()
@@ -195,7 +185,7 @@ class AssessmentCharts:
             height=600
         )
         
-        return fig.to_html(include_plotlyjs=True)
+        return fig
     
     @staticmethod
     def get_grade_performance_chart(year=None):
@@ -205,21 +195,20 @@ class AssessmentCharts:
         if year:
             queryset = queryset.filter(assessment_year=year)
         
-        # Get data by grade
-        grades = queryset.values_list('grade', flat=True).distinct()
+        # Get November scores by grade
+        scores_by_grade = {}
+        for grade, nov_total in (queryset.filter(nov_total__isnull=False)
+                                 .order_by('grade').values_list('grade', 'nov_total')):
+            scores_by_grade.setdefault(grade, []).append(nov_total)
         
         fig = go.Figure()
         
-        for grade in grades:
-            grade_students = queryset.filter(grade=grade)
-            nov_scores = [s.nov_total for s in grade_students if s.nov_total is not None]
-            
-            if nov_scores:
-                fig.add_trace(go.Box(
-                    y=nov_scores,
-                    name=grade,
-                    boxpoints='outliers'
-                ))
+        for grade, nov_scores in scores_by_grade.items():
+            fig.add_trace(go.Box(
+                y=nov_scores,
+                name=grade,
+                boxpoints='outliers'
+            ))
         
         fig.update_layout(
             title='Score Distribution by Grade (November Assessment)',
@@ -229,7 +218,46 @@ class AssessmentCharts:
             height=500
         )
         
-        return fig.to_html(include_plotlyjs=True)
+        return fig
+    
+    @staticmethod
+    def get_student_progress_chart(student_assessments, full_name):
+        """Create a line chart of one student's Jan/June/Nov totals per year"""
+        
+        years = []
+        jan_scores = []
+        june_scores = []
+        nov_scores = []
+        
+        for assessment in student_assessments:
+            years.append(assessment.assessment_year)
+            jan_scores.append(assessment.jan_total or 0)
+            june_scores.append(assessment.june_total or 0)
+            nov_scores.append(assessment.nov_total or 0)
+        
+        fig = go.Figure()
+        
+        for name, scores, colour in (('January', jan_scores, '#F18F01'),
+                                     ('June', june_scores, '#C73E1D'),
+                                     ('November', nov_scores, '#2E86AB')):
+            fig.add_trace(go.Scatter(
+                x=years,
+                y=scores,
+                mode='lines+markers',
+                name=name,
+                line=dict(color=colour, width=2),
+                marker=dict(size=8)
+            ))
+        
+        fig.update_layout(
+            title=f'Individual Progress: {full_name}',
+            xaxis_title='Year',
+            yaxis_title='Total Score',
+            template='plotly_white',
+            height=400
+        )
+        
+        return fig
     
     @staticmethod
     def get_summary_stats(year=None):
@@ -239,38 +267,32 @@ class AssessmentCharts:
         if year:
             queryset = queryset.filter(assessment_year=year)
         
-        total_students = queryset.count()
-        
-        # Students with improvement data
-        students_with_data = queryset.filter(
-            jan_total__isnull=False,
-            nov_total__isnull=False
+        improvement = F('nov_total') - F('jan_total')
+        with_data = Q(jan_total__isnull=False, nov_total__isnull=False)
+        totals = queryset.aggregate(
+            total_students=Count('id'),
+            with_data=Count('id', filter=with_data),
+            improved=Count('id', filter=with_data & Q(nov_total__gt=F('jan_total'))),
+            avg_improvement=Avg(improvement, filter=with_data),
+            jan_avg=Avg('jan_total'),
+            nov_avg=Avg('nov_total'),
+            schools_count=Count('school', distinct=True),
+            grades_count=Count('grade', distinct=True),
         )
         
-        # Calculate improvements
-        improvements = []
-        for student in students_with_data:
-            improvement = student.nov_total - student.jan_total
-            improvements.append(improvement)
-        
-        if improvements:
-            avg_improvement = sum(improvements) / len(improvements)
-            improved_count = len([x for x in improvements if x > 0])
-            improvement_rate = (improved_count / len(improvements)) * 100
+        if totals['with_data']:
+            avg_improvement = totals['avg_improvement']
+            improvement_rate = (totals['improved'] / totals['with_data']) * 100
         else:
             avg_improvement = 0
             improvement_rate = 0
         
-        # Get latest averages
-        jan_avg = queryset.aggregate(avg=Avg('jan_total'))['avg'] or 0
-        nov_avg = queryset.aggregate(avg=Avg('nov_total'))['avg'] or 0
-        
         return {
-            'total_students': total_students,
+            'total_students': totals['total_students'],
             'avg_improvement': round(avg_improvement, 1),
             'improvement_rate': round(improvement_rate, 1),
-            'jan_average': round(jan_avg, 1),
-            'nov_average': round(nov_avg, 1),
-            'schools_count': queryset.values('school').distinct().count(),
-            'grades_count': queryset.values('grade').distinct().count()
-        }
\ No newline at end of file
+            'jan_average': round(totals['jan_avg'] or 0, 1),
+            'nov_average': round(totals['nov_avg'] or 0, 1),
+            'schools_count': totals['schools_count'],
+            'grades_count': totals['grades_count']
+        }
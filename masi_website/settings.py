@@ -64,6 +64,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.response_cache.EditGenerationMiddleware',
 ]
 
 # Google Cloud Storage settings
@@ -172,6 +173,31 @@ if 'default' not in DATABASES or not DATABASES['default']:
     }
 
 
+# Cache (API response cache, see api/response_cache.py). Local memory per
+# worker by default; set API_CACHE_DIR to share one file-based cache between
+# the workers on a host. Entries are invalidated by generation counters, so the
+# timeout only bounds how long an unreferenced entry lingers.
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 60 * 60))
+if os.environ.get('API_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['API_CACHE_DIR'],
+            'TIMEOUT': API_CACHE_TIMEOUT,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'masi-api',
+            'TIMEOUT': API_CACHE_TIMEOUT,
+        }
+    }
+# Tests run uncached unless they opt in; see masi_website/test_runner.py.
+TEST_RUNNER = 'masi_website.test_runner.DummyCacheRunner'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,25 @@
+"""Test runner for ``manage.py test``.
+
+Test databases roll back between tests, but a cache does not. The response
+cache's generation counters (api/response_cache.py) live in the database, so
+they read 0 again after every rollback, and a response cached by one test
+would answer the next test's identical key. The run therefore uses a dummy
+cache throughout. Tests of the caching itself opt back in with
+``override_settings(CACHES=LOCMEM)`` and clear it per test.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}}
+
+
+class DummyCacheRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._no_cache = override_settings(CACHES=NO_CACHE)
+        self._no_cache.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._no_cache.disable()
+        super().teardown_test_environment(**kwargs)